@@ -1,5 +1,4 @@
 # app/controllers/auth_controller.py
-import bcrypt
 from app.database.connection import DatabaseConnection
 
 class AuthController:
@@ -24,6 +23,7 @@ class AuthController:
         db.close()
         
         if user:
+            import bcrypt  # Solo se necesita al validar, no para mostrar el login
             stored_hashed_password = user['password'].encode()  # Convertir a bytes
             if bcrypt.checkpw(password.encode(), stored_hashed_password):  # Comparar contraseñas
                 return {
@@ -1,24 +1,28 @@
 # app/controllers/client_controller.py
 import sqlite3
 from app.models.client import Client
-from app.database.connection import get_db_connection
+from app.database.connection import get_pool
+from app.database.remoto import operacion_remota
+from app.helpers.contexto_cliente import invalidar_contexto_cliente
+from app.helpers.busqueda_texto import filtro_texto
 
 
 class ClientController:
-    def __init__(self):
-        self.conn = get_db_connection()
+    def __init__(self, db_path=None):
+        # Sin ruta explícita se usa la BD configurada en DatabaseConnection
+        self.db_path = db_path
 
+    @operacion_remota(escritura=True, tabla="clientes")
     def create_client(self, client_data):
         """
         Crea un nuevo cliente con los datos proporcionados.
         """
         client = Client(**client_data)
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO clientes (id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (client.id, client.nombre ,client.cliente_ci, client.direccion, client.telefono, client.email, client.numero_conexion, client.estado))
-        self.conn.commit()
+        get_pool().ejecutar_escritura(lambda conn: conn.execute("""
+                INSERT INTO clientes (id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (client.id, client.nombre ,client.cliente_ci, client.direccion, client.telefono, client.email, client.numero_conexion, client.estado)), self.db_path, "crear_cliente")
+        invalidar_contexto_cliente("clientes")
 
     def validate_client_data(self, client_data):
         """
@@ -31,6 +35,7 @@ class ClientController:
                 return False, f"El campo '{field}' es obligatorio."
         return True, "Todos los campos están completos."
 
+    @operacion_remota()
     def get_client_by_unique_fields(self, cliente_ci, email, numero_conexion):
         """
         Busca clientes que tengan valores duplicados en los campos únicos.
@@ -40,78 +45,86 @@ class ClientController:
             WHERE cliente_ci = ? OR email = ? OR numero_conexion = ?
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query, (cliente_ci, email, numero_conexion))
-            result = cursor.fetchone()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(query, (cliente_ci, email, numero_conexion))
+                result = cursor.fetchone()
             return dict(result) if result else None
         except sqlite3.Error as e:
             print(f"Error al buscar cliente por campos únicos: {e}")
             return None
 
+    @operacion_remota()
     def get_clients(self, page=1, page_size=10):
-        cursor = self.conn.cursor()
         offset = (page - 1) * page_size
-        cursor.execute("""
-            SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado, fecha_registro
-            FROM clientes
-            ORDER BY fecha_registro DESC
-            LIMIT ? OFFSET ?
-        """, (page_size, offset))
-        return [dict(zip(["id", "nombre_cliente", "cliente_ci", "direccion", "telefono", "email", "numero_conexion", "estado", "fecha_registro"], row)) for row in cursor.fetchall()]
+        with get_pool().connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado, fecha_registro
+                FROM clientes
+                ORDER BY fecha_registro DESC
+                LIMIT ? OFFSET ?
+            """, (page_size, offset))
+            return [dict(zip(["id", "nombre_cliente", "cliente_ci", "direccion", "telefono", "email", "numero_conexion", "estado", "fecha_registro"], row)) for row in cursor.fetchall()]
 
+    @operacion_remota()
     def get_total_pages(self, page_size):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM clientes")
-        total_clients = cursor.fetchone()[0]
+        with get_pool().connection(self.db_path) as conn:
+            total_clients = conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
         return (total_clients + page_size - 1) // page_size
 
+    @operacion_remota()
     def search_clients(self, search_term):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado, fecha_registro
-            FROM clientes
-            WHERE nombre_cliente LIKE ? OR cliente_ci LIKE ? OR numero_conexion LIKE ?
-        """, (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-        return [dict(zip(["id", "nombre_cliente", "cliente_ci", "direccion", "telefono", "email", "numero_conexion", "estado", "fecha_registro"], row)) for row in cursor.fetchall()]
+        # Nombre, cédula o número de conexión por prefijo, sin distinguir tildes
+        condicion, params = filtro_texto(
+            self.db_path, "clientes", ("nombre_cliente", "cliente_ci", "numero_conexion"), search_term
+        )
+        with get_pool().connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado, fecha_registro
+                FROM clientes
+                WHERE {condicion or "1=1"}
+            """, params)
+            return [dict(zip(["id", "nombre_cliente", "cliente_ci", "direccion", "telefono", "email", "numero_conexion", "estado", "fecha_registro"], row)) for row in cursor.fetchall()]
 
+    @operacion_remota(escritura=True, tabla="clientes")
     def update_client(self, client_id, client_data):
         """
         Actualiza un cliente existente con los datos proporcionados.
         """
         client = Client(**client_data)
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE clientes
-            SET nombre_cliente = ?, cliente_ci = ?, direccion = ?, telefono = ?, email = ?, numero_conexion = ?, estado = ?
-            WHERE id = ?
-        """, (client.nombre, client.cliente_ci, client.direccion, client.telefono, client.email, client.numero_conexion, client.estado, client_id))
-        self.conn.commit()
+        get_pool().ejecutar_escritura(lambda conn: conn.execute("""
+                UPDATE clientes
+                SET nombre_cliente = ?, cliente_ci = ?, direccion = ?, telefono = ?, email = ?, numero_conexion = ?, estado = ?
+                WHERE id = ?
+            """, (client.nombre, client.cliente_ci, client.direccion, client.telefono, client.email, client.numero_conexion, client.estado, client_id)), self.db_path, "actualizar_cliente")
+        invalidar_contexto_cliente("clientes")
 
+    @operacion_remota(escritura=True, tabla="clientes")
     def delete_client(self, client_id):
         """
         Elimina un cliente basado en su ID.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM clientes WHERE id = ?", (client_id,))
-        self.conn.commit()
+        get_pool().ejecutar_escritura(
+            lambda conn: conn.execute("DELETE FROM clientes WHERE id = ?", (client_id,)), self.db_path, "eliminar_cliente"
+        )
+        invalidar_contexto_cliente("clientes")
 
+    @operacion_remota()
     def get_client_by_id(self, client_id):
         """
         Obtiene un cliente basado en su ID.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado, fecha_registro
-            FROM clientes
-            WHERE id = ?
-        """, (client_id,))
-        row = cursor.fetchone()
+        with get_pool().connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion, estado, fecha_registro
+                FROM clientes
+                WHERE id = ?
+            """, (client_id,))
+            row = cursor.fetchone()
         if row:
             return dict(zip(["id", "nombre_cliente", "cliente_ci", "direccion", "telefono", "email", "numero_conexion", "estado", "fecha_registro"], row))
         return None
-
-    def __del__(self):
-        """
-        Cierra la conexión a la base de datos al destruir la instancia.
-        """
-        self.conn.close()
@@ -4,9 +4,13 @@ class ConsultaController:
     def __init__(self, db_path):
         self.model = ConsultaModel(db_path)
 
-    def filtrar_facturas(self, filtros):
-        """Valida los filtros y solicita los datos al modelo."""
-        return self.model.obtener_facturas(filtros)
+    def contar_facturas(self, filtros, refrescar=False):
+        """Total de facturas de la búsqueda (guardado mientras se pagina)."""
+        return self.model.contar_facturas(filtros, refrescar)
+
+    def obtener_pagina(self, filtros, limite, cursor=None, hacia_atras=False):
+        """Página de facturas a partir de un cursor (fecha_emision, id)."""
+        return self.model.obtener_pagina_facturas(filtros, limite, cursor, hacia_atras)
         
     def obtener_factura_completa(self, id_factura):
         """Obtiene todos los datos de una factura específica para su reimpresión.
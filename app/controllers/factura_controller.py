@@ -1,20 +1,41 @@
 import sqlite3
+from app.database.connection import get_pool
+from app.database.remoto import operacion_remota
 from app.models.factura import FacturaModel
+from app.helpers.sistema_logs import get_logger
+from app.services.facturacion import calcular_montos, facturar_mes
+
+# Cliente, lectura (la indicada o la más reciente) y saldo del medidor en una
+# sola consulta; clientes.id es el número de medidor
+CONSULTA_CONTEXTO_FACTURACION = """
+    SELECT c.nombre_cliente, c.cliente_ci, c.direccion,
+           l.id, l.lectura_anterior, l.lectura_actual, l.consumo, COALESCE(l.direccion, ''),
+           COALESCE(s.total_deuda, 0), COALESCE(s.num_deudas, 0), s.mes_deuda_antigua, s.ultimo_estado
+    FROM clientes c
+    LEFT JOIN lecturas l ON l.id = COALESCE(:lectura_id, (
+        SELECT id FROM lecturas
+        WHERE medidor_id = c.id
+        ORDER BY fecha_lectura DESC, id DESC
+        LIMIT 1
+    ))
+    LEFT JOIN saldos_medidor s ON s.medidor_id = c.id
+    WHERE c.id = :medidor_id
+"""
 
 class FacturaController:
     def __init__(self, db_path):
         self.db_path = db_path
         self.model = FacturaModel(db_path)
 
+    @operacion_remota()
     def obtener_cliente_por_id(self, medidor_id):
         """Obtiene el nombre y la cédula del cliente por su ID."""
         try:
             query = "SELECT nombre_cliente, cliente_ci FROM clientes WHERE id = ?"
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(query, (medidor_id,))
-            resultado = cursor.fetchone()
-            conn.close()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (medidor_id,))
+                resultado = cursor.fetchone()
 
             if resultado:
                 return {"nombre_cliente": resultado[0], "cliente_ci": resultado[1]}  # Devuelve ambos datos
@@ -24,6 +45,7 @@ class FacturaController:
             return None
 
 
+    @operacion_remota()
     def obtener_lectura_por_cliente_id(self, medidor_id):
         """Obtiene la lectura más reciente, consumo y dirección de un cliente por su ID."""
         try:
@@ -34,11 +56,10 @@ class FacturaController:
                 ORDER BY fecha_lectura DESC
                 LIMIT 1
             """
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(query, (medidor_id,))
-            resultado = cursor.fetchone()
-            conn.close()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (medidor_id,))
+                resultado = cursor.fetchone()
 
             if resultado:
                 return {
@@ -52,40 +73,48 @@ class FacturaController:
             print(f"Error al obtener lectura: {e}")
             return None
 
-    def calcular_montos(self, consumo, tarifa_basica_index, tarifa_excedente_index):
-        """Calcula los montos básico, excedente y total."""
-        try:
-            tarifa_basica_rangos = [(10, 1.50), (50, 2.00), (100, 3.00), (101, 3.00)]
-            tarifa_excedente_rangos = [(10, 0.30), (25, 0.40), (50, 0.50), (101, 0.75)]
-
-            # Rango y tarifa básica seleccionados
-            rango_basico = tarifa_basica_rangos[tarifa_basica_index]
-            tarifa_basica_fija = rango_basico[1]
+    @operacion_remota()
+    def obtener_contexto_facturacion(self, medidor_id, lectura_id=None):
+        """
+        Obtiene todo lo que necesita una factura del medidor en una consulta.
 
-            # Rango y tarifa excedente seleccionados
-            rango_excedente = tarifa_excedente_rangos[tarifa_excedente_index]
-            tarifa_excedente_por_unidad = rango_excedente[1]
+        Args:
+            medidor_id: Número de medidor (ID del cliente)
+            lectura_id: Lectura a usar (default: la más reciente del medidor)
 
-            # Calcular consumo excedente (restar siempre 10 como constante)
-            consumo_excedente = max(consumo - 10, 0)
-
-            if consumo_excedente <= 0:
-                return {
-                    "monto_basico": tarifa_basica_fija,
-                    "monto_excedente": 0.0,
-                    "monto_total": tarifa_basica_fija
-                }
+        Returns:
+            dict: cliente (nombre_cliente, cliente_ci, direccion), lectura (id,
+            lectura_anterior, lectura_actual, consumo, direccion; None si no hay
+            lecturas) y deuda (total_deuda, num_deudas, mes_deuda_antigua,
+            ultimo_estado); None si el cliente no existe o hubo un error
+        """
+        try:
+            with get_pool().connection(self.db_path) as conn:
+                fila = conn.execute(
+                    CONSULTA_CONTEXTO_FACTURACION,
+                    {"medidor_id": medidor_id, "lectura_id": lectura_id}
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error al obtener contexto de facturacion: {e}")
+            return None
 
-            monto_basico = tarifa_basica_fija
-            monto_excedente = consumo_excedente * tarifa_excedente_por_unidad
-            monto_total = monto_basico + monto_excedente
+        if not fila:
+            return None
+        lectura = None
+        if fila[3] is not None:
+            lectura = dict(zip(("id", "lectura_anterior", "lectura_actual", "consumo", "direccion"), fila[3:8]))
+        return {
+            "cliente": dict(zip(("nombre_cliente", "cliente_ci", "direccion"), fila[0:3])),
+            "lectura": lectura,
+            "deuda": dict(zip(("total_deuda", "num_deudas", "mes_deuda_antigua", "ultimo_estado"), fila[8:12])),
+        }
 
-            return {
-                "monto_basico": monto_basico,
-                "monto_excedente": monto_excedente,
-                "monto_total": monto_total
-            }
-        except Exception as e:
+    @operacion_remota()
+    def calcular_montos(self, consumo, servicio, tercera_edad=False):
+        """Calcula los montos básico, excedente y total con la tarifa vigente."""
+        try:
+            return calcular_montos(self.db_path, consumo, servicio, tercera_edad)
+        except (sqlite3.Error, ValueError) as e:
             print(f"Error al calcular montos: {e}")
             return {"monto_basico": 0, "monto_excedente": 0, "monto_total": 0}
 
@@ -99,3 +128,62 @@ class FacturaController:
             return True, "Factura registrada exitosamente."
         else:
             return False, "Error al registrar la factura. Intente nuevamente."
+
+    @operacion_remota(escritura=True, tabla="facturas")
+    def emitir_factura(self, datos, usuario=None, rol=None):
+        """
+        Registra una factura nueva con su número en una sola transacción.
+
+        Args:
+            datos: Diccionario con los campos de la factura
+            usuario: Nombre del usuario para el log de auditoría (opcional)
+            rol: Rol del usuario (opcional)
+
+        Returns:
+            tuple: (factura_id, numero_factura); (None, None) si no se registró
+        """
+        factura_id, numero_factura = self.model.emitir_factura(datos)
+
+        # El log no participa de la transacción: solo se escribe lo confirmado
+        # (en el servidor de BD, cuando se confirma el lote de la factura)
+        if factura_id and usuario:
+            get_pool().al_confirmar(lambda: get_logger().log_crear_factura(
+                usuario, rol, factura_id, datos.get("nombre_cliente"), datos.get("monto_total", 0)
+            ), self.db_path)
+        return factura_id, numero_factura
+
+    @operacion_remota(escritura=True, tabla="facturas")
+    def actualizar_factura(self, factura_id, datos, usuario=None, rol=None):
+        """
+        Reemplaza los datos de una factura existente (ver FacturaModel.actualizar_factura).
+
+        Args:
+            factura_id: ID de la factura
+            datos: Diccionario con los campos a reemplazar
+            usuario: Nombre del usuario para el log de auditoría (opcional)
+            rol: Rol del usuario (opcional)
+
+        Returns:
+            tuple: (antes, despues) con solo los campos que cambiaron
+
+        Raises:
+            sqlite3.Error: Si no se pudo actualizar
+        """
+        antes, despues = self.model.actualizar_factura(factura_id, datos)
+        if usuario:
+            get_pool().al_confirmar(lambda: get_logger().log_editar_factura(
+                usuario, rol, factura_id, datos.get("nombre_cliente"), datos.get("monto_total", 0),
+                antes=antes, despues=despues
+            ), self.db_path)
+        return antes, despues
+
+    @operacion_remota(escritura=True, tabla="facturas")
+    def facturar_mes(self, mes_facturacion, fecha_emision=None):
+        """
+        Facturación masiva del mes sin progreso ni cancelación por lote, para
+        el modo servidor (la interfaz local usa FacturacionMasiva directamente).
+
+        Returns:
+            dict: Resumen de FacturacionMasiva.facturar_mes
+        """
+        return facturar_mes(self.db_path, mes_facturacion, fecha_emision)
@@ -1,9 +1,11 @@
 from app.models.lectura import Lectura
+from app.database.remoto import operacion_remota
 
 class LecturaController:
     def __init__(self, db_path):
         self.db_path = db_path
 
+    @operacion_remota(escritura=True, tabla="lecturas")
     def guardar_lectura(self, medidor_id, lectura_anterior, lectura_actual, consumo, usuario_id, fecha_lectura, direccion, nombre_cliente):
         try:
             lectura = Lectura(
@@ -23,14 +25,17 @@ class LecturaController:
             return False
 
 
+    @operacion_remota()
     def obtener_lecturas(self, medidor_id=None):
         """Obtiene todas las lecturas o las de un cliente específico."""
         return Lectura.obtener_lecturas(self.db_path, medidor_id)
 
+    @operacion_remota()
     def obtener_cliente_y_direccion(self, medidor_id):
         """Obtiene el nombre y dirección de un cliente por su ID."""
         return Lectura.obtener_cliente_y_direccion(self.db_path, medidor_id)
 
+    @operacion_remota()
     def obtener_ultima_lectura(self, medidor_id):
         """Obtiene la última lectura registrada de un cliente por su ID."""
         return Lectura.obtener_ultima_lectura(self.db_path, medidor_id)
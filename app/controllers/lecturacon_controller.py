@@ -7,3 +7,7 @@ class LecturaController:
     def obtener_lecturas(self, filtros=None):
         """Obtiene lecturas desde el modelo con filtros."""
         return self.model.obtener_lecturas(filtros)
+
+    def iterar_lecturas(self, filtros=None):
+        """Lecturas filtradas leídas por bloques (para la tabla de consulta)."""
+        return self.model.iterar_lecturas(filtros)
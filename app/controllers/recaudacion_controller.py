@@ -1,58 +1,72 @@
-import sqlite3
 from datetime import datetime
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
+from app.helpers.facturacion_masiva import MESES
 
 class RecaudacionController:
+    """
+    Datos del panel de recaudación.
+
+    Lee resumen_recaudacion (migración 10), que los triggers de facturas
+    mantienen agrupada por año, mes, dirección, estado y servicio.
+    """
+
     def __init__(self, db_path):
         self.db_path = db_path
+        asegurar_esquema(db_path)
 
     def obtener_años_disponibles(self):
         """Obtiene los años disponibles en la base de datos."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DISTINCT strftime('%Y', fecha_emision) as año 
-            FROM facturas 
-            ORDER BY año DESC
-        """)
-        años = [str(row[0]) for row in cursor.fetchall()]
-        conn.close()
+        with get_pool().connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT anio
+                FROM resumen_recaudacion
+                WHERE anio <> ''
+                ORDER BY anio DESC
+            """)
+            años = [row[0] for row in cursor.fetchall()]
         return años if años else [str(datetime.now().year)]
 
     def obtener_direcciones_disponibles(self):
         """Obtiene las direcciones disponibles en la base de datos."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT direccion FROM facturas ORDER BY direccion")
-        direcciones = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with get_pool().connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT direccion
+                FROM resumen_recaudacion
+                WHERE direccion <> ''
+                ORDER BY direccion
+            """)
+            direcciones = [row[0] for row in cursor.fetchall()]
         return direcciones
 
     def obtener_datos_recaudacion(self, anio, direccion):
-        """Obtiene los datos de recaudación filtrados por año y dirección."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """
+        Obtiene los datos de recaudación filtrados por año y dirección.
+
+        Returns:
+            list: Tuplas (mes_facturacion, cantidad) en orden de meses
+        """
         query = """
-            SELECT mes_facturacion, COUNT(*) as cantidad
-            FROM facturas
-            WHERE strftime('%Y', fecha_emision) = ?
+            SELECT mes_facturacion, SUM(cantidad) as cantidad
+            FROM resumen_recaudacion
+            WHERE anio = ?
         """
         params = [anio]
-        
+
         if direccion != "Todas":
             query += " AND direccion = ?"
             params.append(direccion)
-            
-        query += " GROUP BY mes_facturacion ORDER BY CASE mes_facturacion "
-        for i, mes in enumerate(["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", 
-                               "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]):
-            query += f"WHEN '{mes}' THEN {i} "
-        query += "END"
-        
-        cursor.execute(query, params)
-        datos = cursor.fetchall()
-        conn.close()
-        return datos
+
+        query += " AND mes_facturacion <> '' GROUP BY mes_facturacion"
+
+        with get_pool().connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            datos = cursor.fetchall()
+        orden = {mes: i for i, mes in enumerate(MESES)}
+        return sorted(datos, key=lambda fila: orden.get(fila[0], len(MESES)))
 
     def realizar_cierre_caja(self):
         """Función en desarrollo."""
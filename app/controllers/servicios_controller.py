@@ -1,25 +1,27 @@
 import sqlite3
+from app.database.connection import get_pool
+from app.database.remoto import operacion_remota
+from app.helpers.contexto_cliente import invalidar_contexto_cliente
 from datetime import datetime
 
 class ServiciosController:
     def __init__(self, db_path):
         self.db_path = db_path
 
+    @operacion_remota()
     def obtener_datos_cliente(self, medidor_id):
         """Obtiene los datos del cliente a partir del número de medidor."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
             
-            query = """
-                SELECT id, nombre_cliente, direccion, cliente_ci, telefono, email, numero_conexion
-                FROM clientes 
-                WHERE numero_conexion = ?
-            """
-            cursor.execute(query, (medidor_id,))
-            resultado = cursor.fetchone()
-            
-            conn.close()
+                query = """
+                    SELECT id, nombre_cliente, direccion, cliente_ci, telefono, email, numero_conexion
+                    FROM clientes 
+                    WHERE numero_conexion = ?
+                """
+                cursor.execute(query, (medidor_id,))
+                resultado = cursor.fetchone()
             
             if resultado:
                 return {
@@ -38,12 +40,10 @@ class ServiciosController:
             print(f"Error al obtener datos del cliente: {e}")
             return None
 
+    @operacion_remota(escritura=True, tabla="servicios")
     def registrar_servicio(self, datos_servicio):
         """Registra un nuevo servicio en la base de datos."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             query = """
                 INSERT INTO servicios (
                     numero_medidor, nombre_usuario, direccion_usuario, 
@@ -51,14 +51,14 @@ class ServiciosController:
                     pago_tres, pago_cuatro
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            
+        
             # Asegurarse de que los valores de pago sean números válidos
             pago_uno = float(datos_servicio.get("pago_uno", 0) or 0)
             pago_dos = float(datos_servicio.get("pago_dos", 0) or 0)
             pago_tres = float(datos_servicio.get("pago_tres", 0) or 0)
             pago_cuatro = float(datos_servicio.get("pago_cuatro", 0) or 0)
-            
-            cursor.execute(query, (
+        
+            parametros = (
                 datos_servicio["numero_medidor"],
                 datos_servicio["nombre_usuario"],
                 datos_servicio["direccion_usuario"],
@@ -68,29 +68,28 @@ class ServiciosController:
                 pago_dos,
                 pago_tres,
                 pago_cuatro
-            ))
-            
-            conn.commit()
-            id_servicio = cursor.lastrowid
-            conn.close()
+            )
+            id_servicio = get_pool().ejecutar_escritura(
+                lambda conn: conn.execute(query, parametros).lastrowid, self.db_path, "registrar_servicio"
+            )
             
+            invalidar_contexto_cliente("servicios")
             return id_servicio
             
         except sqlite3.Error as e:
             print(f"Error al registrar servicio: {e}")
             return None
 
+    @operacion_remota()
     def obtener_servicio_por_id(self, id_servicio):
         """Obtiene un servicio por su ID."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
             
-            query = "SELECT * FROM servicios WHERE id_servicio = ?"
-            cursor.execute(query, (id_servicio,))
-            resultado = cursor.fetchone()
-            
-            conn.close()
+                query = "SELECT * FROM servicios WHERE id_servicio = ?"
+                cursor.execute(query, (id_servicio,))
+                resultado = cursor.fetchone()
             
             if resultado:
                 return {
@@ -112,17 +111,16 @@ class ServiciosController:
             print(f"Error al obtener servicio: {e}")
             return None
 
+    @operacion_remota()
     def obtener_servicios_por_medidor(self, id):
         """Obtiene todos los servicios de un cliente por su número de medidor."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = "SELECT * FROM servicios WHERE numero_medidor = ?"
-            cursor.execute(query, (id,))
-            resultados = cursor.fetchall()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
             
-            conn.close()
+                query = "SELECT * FROM servicios WHERE numero_medidor = ?"
+                cursor.execute(query, (id,))
+                resultados = cursor.fetchall()
             
             servicios = []
             for resultado in resultados:
@@ -145,12 +143,10 @@ class ServiciosController:
             print(f"Error al obtener servicios: {e}")
             return []
 
+    @operacion_remota(escritura=True, tabla="servicios")
     def actualizar_servicio(self, id_servicio, datos_servicio):
         """Actualiza un servicio existente."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             query = """
                 UPDATE servicios SET
                     usuario_servicio = ?,
@@ -161,8 +157,8 @@ class ServiciosController:
                     pago_cuatro = ?
                 WHERE id_servicio = ?
             """
-            
-            cursor.execute(query, (
+        
+            parametros = (
                 datos_servicio["usuario_servicio"],
                 datos_servicio["monto_servicio"],
                 datos_servicio.get("pago_uno", 0),
@@ -170,29 +166,26 @@ class ServiciosController:
                 datos_servicio.get("pago_tres", 0),
                 datos_servicio.get("pago_cuatro", 0),
                 id_servicio
-            ))
-            
-            conn.commit()
-            conn.close()
+            )
+            get_pool().ejecutar_escritura(lambda conn: conn.execute(query, parametros), self.db_path, "actualizar_servicio")
             
+            invalidar_contexto_cliente("servicios")
             return True
             
         except sqlite3.Error as e:
             print(f"Error al actualizar servicio: {e}")
             return False
 
+    @operacion_remota(escritura=True, tabla="servicios")
     def eliminar_servicio(self, id_servicio):
         """Elimina un servicio por su ID."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = "DELETE FROM servicios WHERE id_servicio = ?"
-            cursor.execute(query, (id_servicio,))
-            
-            conn.commit()
-            conn.close()
+            get_pool().ejecutar_escritura(
+                lambda conn: conn.execute("DELETE FROM servicios WHERE id_servicio = ?", (id_servicio,)),
+                self.db_path, "eliminar_servicio"
+            )
             
+            invalidar_contexto_cliente("servicios")
             return True
             
         except sqlite3.Error as e:
@@ -1,2 +1,2 @@
 # app/database/__init__.py
-from .connection import get_db_connection, DatabaseConnection
\ No newline at end of file
+from .connection import get_db_connection, DatabaseConnection, ConnectionPool, get_pool, PERFILES_PRAGMA
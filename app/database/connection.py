@@ -2,7 +2,601 @@
 import sqlite3
 from sqlite3 import Error
 import os
+import random
 import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Perfiles de PRAGMA que se aplican a cada conexión nueva del pool.
+# journal_mode va primero: WAL permite que una consulta larga en una caja no
+# bloquee los INSERT de otra, y con synchronous=NORMAL cada commit deja de
+# pagar el fsync completo del rollback journal. WAL solo se usa si el archivo
+# está en un disco local (ver ruta_en_red).
+PERFILES_PRAGMA = {
+    # Uso normal en ventanilla: escrituras cortas y frecuentes
+    "caja": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,        # ~16 MB (valor negativo = KiB)
+        "mmap_size": 67108864,       # 64 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Importaciones y facturación masiva: se prioriza el rendimiento
+    "importacion": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,        # ~64 MB
+        "mmap_size": 268435456,      # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    # Equipo de consultas/reportes: solo lectura, caché grande
+    "reporte": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "query_only": "ON",
+    },
+}
+
+PERFIL_POR_DEFECTO = "caja"
+
+# Reintentos de ejecutar_escritura cuando la BD sigue bloqueada después del
+# busy_timeout del perfil (otra caja, una importación o un respaldo escribiendo).
+# La espera entre intentos crece al doble con un azar de ±50 %, así las cajas
+# que chocaron no vuelven a pedir el bloqueo todas al mismo tiempo.
+#
+# El presupuesto es de tiempo, no de intentos: SQLite no hace fila para el
+# bloqueo y, con muchas cajas, una puede perderlo varias veces seguidas. Con
+# el bloqueo retenido 300 ms de cada segundo y 12 cajas (benchmark de
+# escrituras concurrentes) la espera más larga medida fue de ~2.5 s; el plazo
+# deja varias veces ese margen.
+PLAZO_REINTENTOS = 15.0          # segundos de espera total antes de fallar
+ESPERA_BASE_REINTENTO = 0.05     # segundos
+ESPERA_MAXIMA_REINTENTO = 0.5
+
+# Modo de journal para una BD en una carpeta compartida por red: el índice
+# en memoria compartida de WAL solo funciona con todos los procesos en el
+# mismo equipo; por SMB/NFS las cajas pueden leer páginas viejas o dañar la BD.
+JOURNAL_EN_RED = "DELETE"
+
+# Sistemas de archivos de red (Linux, /proc/mounts)
+_SISTEMAS_ARCHIVOS_RED = ("cifs", "smb3", "smbfs", "nfs", "nfs4", "afs", "9p", "fuse.sshfs")
+
+# Ruta absoluta -> True si está en una unidad de red
+_rutas_en_red = {}
+
+# Códigos primarios SQLITE_BUSY y SQLITE_LOCKED
+_CODIGOS_BLOQUEO = (5, 6)
+
+
+def bd_bloqueada(error):
+    """Indica si un error de SQLite es "database is locked"/busy (se puede reintentar)."""
+    codigo = getattr(error, "sqlite_errorcode", None)
+    if codigo is not None:
+        return codigo & 0xFF in _CODIGOS_BLOQUEO
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+def ruta_en_red(db_path):
+    """
+    Indica si la BD está en una carpeta compartida por red.
+
+    En Windows: rutas UNC (\\\\servidor\\carpeta) y unidades mapeadas; en Linux,
+    el sistema de archivos del punto de montaje. Si no se puede saber, se
+    asume local.
+    """
+    ruta = os.path.abspath(db_path)
+    en_red = _rutas_en_red.get(ruta)
+    if en_red is not None:
+        return en_red
+
+    en_red = False
+    try:
+        if sys.platform == "win32":
+            if ruta.startswith(("\\\\", "//")):
+                en_red = True
+            else:
+                import ctypes
+                unidad = os.path.splitdrive(ruta)[0] + "\\"
+                en_red = ctypes.windll.kernel32.GetDriveTypeW(unidad) == 4  # DRIVE_REMOTE
+        elif os.path.exists("/proc/mounts"):
+            montaje, tipo = "", ""
+            with open("/proc/mounts", encoding="utf-8") as f:
+                for linea in f:
+                    campos = linea.split()
+                    if len(campos) < 3:
+                        continue
+                    punto = campos[1].replace("\\040", " ")
+                    dentro = ruta == punto or ruta.startswith(punto.rstrip("/") + "/")
+                    if dentro and len(punto) >= len(montaje):
+                        montaje, tipo = punto, campos[2]
+            en_red = tipo in _SISTEMAS_ARCHIVOS_RED
+    except (OSError, AttributeError, ValueError) as e:
+        print(f"[WARN] No se pudo saber si {ruta} esta en red: {e}")
+
+    _rutas_en_red[ruta] = en_red
+    return en_red
+
+
+class _EntradaPool:
+    """Conexión abierta de un hilo para una ruta de base de datos."""
+
+    __slots__ = ("conn", "db_path", "hilo_id", "profundidad", "transacciones", "al_confirmar",
+                 "ultima_verificacion", "generacion")
+
+    def __init__(self, conn, db_path, hilo_id, generacion):
+        self.conn = conn
+        self.db_path = db_path
+        self.hilo_id = hilo_id
+        self.profundidad = 0
+        self.transacciones = 0  # transaction()/ejecutar_escritura abiertos
+        self.al_confirmar = []  # funciones a ejecutar después del commit externo
+        self.ultima_verificacion = time.monotonic()
+        self.generacion = generacion
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite reutilizables por hilo.
+
+    Cada hilo mantiene una conexión abierta por ruta de base de datos, así
+    abrir la conexión deja de estar en el camino de cada consulta.
+
+    Las adquisiciones son reentrantes: si un helper pide la conexión mientras
+    otro código del mismo hilo ya la tiene, ambos comparten la misma conexión
+    y solo la liberación más externa descarta una transacción sin confirmar.
+    """
+
+    # Segundos que una conexión ociosa puede pasar sin volver a verificarse
+    INTERVALO_VERIFICACION = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._registro = {}  # (hilo_id, db_path) -> _EntradaPool
+        self._generacion = 0
+        self._perfil = PERFIL_POR_DEFECTO
+        self._metricas = {}  # operacion -> contadores de ejecutar_escritura
+        self._avisos_red = set()  # rutas en red ya avisadas
+
+    def _resolver_ruta(self, db_path):
+        """Normaliza la ruta para que 'bd.db' y su ruta absoluta compartan conexión."""
+        if db_path is None:
+            db_path = DatabaseConnection.get_db_path()
+        return os.path.abspath(db_path)
+
+    def _entradas_hilo(self):
+        entradas = getattr(self._local, "entradas", None)
+        if entradas is None:
+            entradas = {}
+            self._local.entradas = entradas
+        return entradas
+
+    def _abrir(self, db_path):
+        """Abre una conexión nueva y la registra para poder drenarla luego."""
+        hilo_id = threading.get_ident()
+        # check_same_thread=False solo para que drain() pueda cerrarla desde
+        # otro hilo; en uso normal cada conexión la usa únicamente su hilo.
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._aplicar_pragmas(conn, self._perfil, db_path)
+        with self._lock:
+            self._purgar_hilos_terminados()
+            entrada = _EntradaPool(conn, db_path, hilo_id, self._generacion)
+            self._registro[(hilo_id, db_path)] = entrada
+        return entrada
+
+    def _aplicar_pragmas(self, conn, perfil, db_path):
+        """Aplica los PRAGMA del perfil; un PRAGMA rechazado no impide usar la conexión."""
+        for pragma, valor in PERFILES_PRAGMA[perfil].items():
+            if pragma == "journal_mode" and str(valor).upper() == "WAL" and ruta_en_red(db_path):
+                # También devuelve a DELETE una BD que quedó en WAL
+                if db_path not in self._avisos_red:
+                    self._avisos_red.add(db_path)
+                    print(f"[WARN] {db_path} esta en una carpeta de red: se usa journal_mode={JOURNAL_EN_RED} "
+                          "en lugar de WAL (para varias cajas, usar el modo servidor)")
+                valor = JOURNAL_EN_RED
+            try:
+                resultado = conn.execute(f"PRAGMA {pragma} = {valor}").fetchone()
+                # journal_mode devuelve el modo efectivo (p. ej. en unidades de red no hay WAL)
+                if pragma == "journal_mode" and resultado and str(resultado[0]).upper() != str(valor).upper():
+                    print(f"[WARN] journal_mode={valor} no disponible, se usa {resultado[0]}")
+            except Error as e:
+                print(f"[WARN] No se pudo aplicar PRAGMA {pragma}={valor}: {e}")
+
+    def set_perfil(self, perfil):
+        """
+        Cambia el perfil de PRAGMA de las conexiones.
+
+        Args:
+            perfil: Nombre del perfil (ver PERFILES_PRAGMA)
+
+        Returns:
+            bool: True si el perfil es válido
+        """
+        if perfil not in PERFILES_PRAGMA:
+            print(f"[WARN] Perfil de BD desconocido: {perfil}. Opciones: {', '.join(PERFILES_PRAGMA)}")
+            return False
+        if perfil != self._perfil:
+            self._perfil = perfil
+            # Las conexiones abiertas conservan los PRAGMA del perfil anterior
+            self.drain()
+        return True
+
+    def get_perfil(self):
+        """Devuelve el nombre del perfil de PRAGMA activo."""
+        return self._perfil
+
+    def _purgar_hilos_terminados(self):
+        """Cierra las conexiones de hilos que ya terminaron (llamar con el lock tomado)."""
+        vivos = {hilo.ident for hilo in threading.enumerate()}
+        for clave in [clave for clave in self._registro if clave[0] not in vivos]:
+            entrada = self._registro.pop(clave)
+            try:
+                entrada.conn.close()
+            except Error:
+                pass
+
+    def _cerrar(self, entrada):
+        with self._lock:
+            if self._registro.get((entrada.hilo_id, entrada.db_path)) is entrada:
+                del self._registro[(entrada.hilo_id, entrada.db_path)]
+        try:
+            entrada.conn.close()
+        except Error:
+            pass
+
+    def _buscar_entrada(self, conn):
+        for entrada in self._entradas_hilo().values():
+            if entrada.conn is conn:
+                return entrada
+        return None
+
+    def health_check(self, conn):
+        """Devuelve True si la conexión sigue respondiendo."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Error:
+            return False
+
+    def acquire(self, db_path=None):
+        """
+        Obtiene la conexión del hilo actual para la base de datos indicada.
+
+        Toda llamada a acquire() debe emparejarse con release(); en lo posible
+        usar los context managers connection() o transaction().
+        """
+        db_path = self._resolver_ruta(db_path)
+        entradas = self._entradas_hilo()
+        entrada = entradas.get(db_path)
+
+        if entrada is not None and entrada.generacion != self._generacion:
+            # El pool fue drenado (cambio de BD): la conexión ya está cerrada
+            entrada = None
+
+        if entrada is None:
+            entrada = self._abrir(db_path)
+            entradas[db_path] = entrada
+        elif entrada.profundidad == 0:
+            ahora = time.monotonic()
+            if ahora - entrada.ultima_verificacion > self.INTERVALO_VERIFICACION:
+                if not self.health_check(entrada.conn):
+                    print(f"[WARN] Conexion a {db_path} no responde, se reabre")
+                    self._cerrar(entrada)
+                    entrada = self._abrir(db_path)
+                    entradas[db_path] = entrada
+                entrada.ultima_verificacion = ahora
+
+        entrada.profundidad += 1
+        return entrada.conn
+
+    def release(self, conn):
+        """Devuelve la conexión al pool descartando transacciones sin confirmar."""
+        entrada = self._buscar_entrada(conn)
+        if entrada is None:
+            return
+        entrada.profundidad = max(entrada.profundidad - 1, 0)
+        if entrada.profundidad == 0:
+            try:
+                if conn.in_transaction:
+                    entrada.al_confirmar.clear()
+                    conn.rollback()
+            except Error:
+                # Conexión cerrada o dañada: se reemplaza en el próximo acquire
+                self._cerrar(entrada)
+                self._entradas_hilo().pop(entrada.db_path, None)
+
+    @contextmanager
+    def connection(self, db_path=None):
+        """Context manager para lecturas o escrituras que confirman por su cuenta."""
+        conn = self.acquire(db_path)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self, db_path=None, immediate=False):
+        """
+        Context manager que confirma al salir y revierte si hay una excepción.
+
+        Si ya hay una transacción abierta en el mismo hilo, el bloque se une a
+        ella y la confirmación queda a cargo de la transacción externa. El
+        bloque anidado corre dentro de un SAVEPOINT: si falla se revierten
+        solo sus cambios, aunque quien lo llamó atrape la excepción y siga.
+        Dentro de un connection() sin cambios pendientes no hay nadie que
+        confirme después: el bloque es la transacción externa y confirma él.
+
+        Con immediate=True la transacción abre con BEGIN IMMEDIATE: toma el
+        bloqueo de escritura al inicio e incluye también sentencias DDL, que
+        el módulo sqlite3 no envuelve en una transacción implícita.
+        """
+        conn = self.acquire(db_path)
+        entrada = self._buscar_entrada(conn)
+        externa = entrada.transacciones == 0 and not conn.in_transaction
+        savepoint = f"anidada_{entrada.profundidad}"
+        pendientes = len(entrada.al_confirmar)
+        confirmada = False
+        entrada.transacciones += 1
+        try:
+            if externa and immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            elif not externa:
+                # Sin BEGIN previo, liberar el SAVEPOINT confirmaría lo de la transacción externa
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                conn.execute(f"SAVEPOINT {savepoint}")
+            yield conn
+            if externa:
+                conn.commit()
+                confirmada = True
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        except BaseException:
+            # Lo que el bloque dejó para después del commit ya no corresponde
+            del entrada.al_confirmar[pendientes:]
+            if externa:
+                conn.rollback()
+            else:
+                try:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                except Error:
+                    # La transacción externa ya se revirtió: no queda savepoint
+                    pass
+            raise
+        finally:
+            entrada.transacciones -= 1
+            self.release(conn)
+        if confirmada:
+            self._ejecutar_al_confirmar(entrada)
+
+    def ejecutar_escritura(self, escritura, db_path=None, operacion="escritura"):
+        """
+        Ejecuta escritura(conn) en una transacción BEGIN IMMEDIATE, reintentando
+        si la BD está bloqueada.
+
+        BEGIN IMMEDIATE toma el bloqueo de escritura antes de leer, así una
+        secuencia leer-modificar-escribir (numeración, saldos) no falla al
+        pasar de lectura a escritura. Cada intento espera el busy_timeout del
+        perfil; si la BD sigue bloqueada, se revierte, se espera con backoff
+        exponencial con azar y se vuelve a ejecutar escritura desde el
+        principio (hasta PLAZO_REINTENTOS de espera en total), por eso no debe
+        tener efectos fuera de la BD; para esos, al_confirmar.
+
+        Dentro de otra transacción del mismo hilo (o de un connection() con
+        cambios sin confirmar) corre como transacción anidada, sin reintentos:
+        el bloqueo y la confirmación son de la transacción externa.
+
+        Args:
+            escritura: Función que recibe la conexión y hace las escrituras
+            db_path: Ruta a la base de datos (default: la configurada)
+            operacion: Nombre para las métricas de espera (metricas_escritura)
+
+        Returns:
+            Lo que devuelva escritura(conn)
+
+        Raises:
+            sqlite3.Error: Si falla, o si la BD sigue bloqueada tras los reintentos
+        """
+        entrada = self._entradas_hilo().get(self._resolver_ruta(db_path))
+        if (entrada is not None and entrada.profundidad > 0 and entrada.generacion == self._generacion
+                and (entrada.transacciones > 0 or entrada.conn.in_transaction)):
+            with self.transaction(db_path) as conn:
+                return escritura(conn)
+
+        espera = 0.0
+        intento = 0
+        while True:
+            conn = self.acquire(db_path)
+            entrada = self._buscar_entrada(conn)
+            entrada.transacciones += 1
+            confirmada = comenzada = False
+            inicio = time.perf_counter()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                comenzada = True
+                espera += time.perf_counter() - inicio
+                resultado = escritura(conn)
+                conn.commit()
+                confirmada = True
+                self._registrar_espera(operacion, espera, intento, True)
+            except Error as e:
+                entrada.al_confirmar.clear()
+                try:
+                    conn.rollback()
+                except Error:
+                    pass
+                if not bd_bloqueada(e):
+                    self._registrar_espera(operacion, espera, intento, False)
+                    raise
+                if not comenzada:
+                    espera += time.perf_counter() - inicio
+                pausa = min(ESPERA_BASE_REINTENTO * 2 ** intento, ESPERA_MAXIMA_REINTENTO) * random.uniform(0.5, 1.5)
+                if espera + pausa > PLAZO_REINTENTOS:
+                    self._registrar_espera(operacion, espera, intento, False)
+                    print(f"[ERROR] {operacion}: BD bloqueada después de {intento + 1} intentos ({espera:.1f} s)")
+                    raise
+                print(f"[WARN] {operacion}: BD bloqueada ({e}), reintento {intento + 1} en {pausa * 1000:.0f} ms")
+            except BaseException:
+                entrada.al_confirmar.clear()
+                conn.rollback()
+                raise
+            finally:
+                entrada.transacciones -= 1
+                self.release(conn)
+            if confirmada:
+                self._ejecutar_al_confirmar(entrada)
+                return resultado
+            time.sleep(pausa)
+            espera += pausa
+            intento += 1
+
+    def al_confirmar(self, funcion, db_path=None):
+        """
+        Ejecuta funcion() cuando se confirme la transacción abierta en este hilo.
+
+        Para efectos fuera de la BD (logs, cachés) de una operación que puede
+        estar dentro de una transacción ajena, como un lote del servidor de BD:
+        si la transacción se revierte, funcion no se ejecuta. Sin transacción
+        abierta se ejecuta en el momento.
+
+        Args:
+            funcion: Función sin argumentos
+            db_path: Ruta a la base de datos (default: la configurada)
+        """
+        entrada = self._entradas_hilo().get(self._resolver_ruta(db_path))
+        if entrada is None or entrada.transacciones == 0 or entrada.generacion != self._generacion:
+            funcion()
+        else:
+            entrada.al_confirmar.append(funcion)
+
+    def _ejecutar_al_confirmar(self, entrada):
+        pendientes = entrada.al_confirmar[:]
+        entrada.al_confirmar.clear()
+        for funcion in pendientes:
+            try:
+                funcion()
+            except Exception as e:
+                print(f"[WARN] Error despues de confirmar la transaccion: {e}")
+
+    def _registrar_espera(self, operacion, espera, reintentos, exito):
+        with self._lock:
+            metrica = self._metricas.setdefault(operacion, {
+                "escrituras": 0, "fallidas": 0, "reintentos": 0, "espera_total": 0.0, "espera_maxima": 0.0,
+            })
+            metrica["escrituras" if exito else "fallidas"] += 1
+            metrica["reintentos"] += reintentos
+            metrica["espera_total"] += espera
+            metrica["espera_maxima"] = max(metrica["espera_maxima"], espera)
+
+    def metricas_escritura(self):
+        """
+        Espera por el bloqueo de escritura de ejecutar_escritura, por operación.
+
+        Returns:
+            dict: operacion -> escrituras, fallidas, reintentos y espera_total,
+            espera_media y espera_maxima en milisegundos
+        """
+        with self._lock:
+            metricas = {operacion: dict(metrica) for operacion, metrica in self._metricas.items()}
+        for metrica in metricas.values():
+            total = metrica["escrituras"] + metrica["fallidas"]
+            metrica["espera_media"] = round(metrica["espera_total"] * 1000 / total, 2) if total else 0.0
+            metrica["espera_total"] = round(metrica["espera_total"] * 1000, 2)
+            metrica["espera_maxima"] = round(metrica["espera_maxima"] * 1000, 2)
+        return metricas
+
+    def drain(self):
+        """Cierra todas las conexiones del pool (p. ej. al cambiar la ruta de la BD)."""
+        with self._lock:
+            entradas = list(self._registro.values())
+            self._registro.clear()
+            self._generacion += 1
+        for entrada in entradas:
+            try:
+                entrada.conn.close()
+            except Error:
+                pass
+        if entradas:
+            print(f"[DEBUG] Pool drenado: {len(entradas)} conexion(es) cerrada(s)")
+
+    def stats(self):
+        """Resumen del estado del pool para diagnóstico."""
+        with self._lock:
+            return {
+                "conexiones": len(self._registro),
+                "en_uso": sum(1 for e in self._registro.values() if e.profundidad > 0),
+                "generacion": self._generacion,
+                "perfil": self._perfil,
+            }
+
+
+_pool_instance = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Obtiene el pool global de conexiones (patrón Singleton).
+
+    Returns:
+        ConnectionPool: Instancia del pool
+    """
+    global _pool_instance
+    if _pool_instance is None:
+        with _pool_lock:
+            if _pool_instance is None:
+                _pool_instance = ConnectionPool()
+    return _pool_instance
+
+
+def iterar_por_bloques(consulta, params=(), db_path=None, tamano_bloque=500):
+    """
+    Recorre el resultado de una consulta por bloques ordenados por id.
+
+    Cada bloque es una consulta corta (id > último id leído, LIMIT), así no se
+    deja un cursor abierto entre bloques y solo se leen las filas que se
+    piden. Pensado para alimentar ModeloTablaPerezoso.
+
+    Args:
+        consulta: SELECT sin ORDER BY ni LIMIT cuya primera columna se llama id
+        params: Parámetros de la consulta
+        db_path: Ruta a la base de datos (default: la configurada)
+        tamano_bloque: Filas por consulta
+
+    Yields:
+        tuple: Filas en orden de id
+    """
+    ultimo_id = None
+    while True:
+        try:
+            with get_pool().connection(db_path) as conn:
+                if ultimo_id is None:
+                    filas = conn.execute(
+                        f"SELECT * FROM ({consulta}) ORDER BY id LIMIT ?",
+                        (*params, tamano_bloque)
+                    ).fetchall()
+                else:
+                    filas = conn.execute(
+                        f"SELECT * FROM ({consulta}) WHERE id > ? ORDER BY id LIMIT ?",
+                        (*params, ultimo_id, tamano_bloque)
+                    ).fetchall()
+        except Error as e:
+            print(f"[ERROR] Error al leer bloque de resultados: {e}")
+            return
+        yield from filas
+        if len(filas) < tamano_bloque:
+            return
+        ultimo_id = filas[-1][0]
+
 
 class DatabaseConnection:
     _instance = None
@@ -17,9 +611,20 @@ class DatabaseConnection:
     @classmethod
     def set_db_path(cls, db_path):
         """Establece la ruta de la base de datos para el singleton"""
+        ruta_anterior = cls._db_path
         cls._db_path = db_path
         print(f"[DEBUG] DatabaseConnection.set_db_path establecido a: {db_path}")
 
+        # Las conexiones abiertas apuntan a la BD anterior
+        if ruta_anterior is not None and ruta_anterior != db_path:
+            get_pool().drain()
+
+    @classmethod
+    def set_perfil(cls, perfil):
+        """Establece el perfil de PRAGMA (caja, importacion, reporte) de todas las conexiones"""
+        if get_pool().set_perfil(perfil):
+            print(f"[DEBUG] DatabaseConnection.set_perfil establecido a: {perfil}")
+
     @classmethod
     def get_db_path(cls):
         """Obtiene la ruta de la base de datos"""
@@ -35,23 +640,12 @@ class DatabaseConnection:
         return cls._db_path
 
     def connect(self):
+        """Toma la conexión del pool para el hilo actual; liberar con close()."""
         try:
             # SIEMPRE obtener la ruta actual (no cachear)
             # Esto permite cambiar de BD sin reiniciar
-            db_file = self.__class__.get_db_path()
-
-            # Cerrar conexion anterior si existe
-            if self.conn:
-                try:
-                    self.conn.close()
-                    print(f"[DEBUG] Conexion anterior cerrada")
-                except:
-                    pass
-
-            # Crear nueva conexion
-            self.conn = sqlite3.connect(db_file)
-            self.conn.row_factory = sqlite3.Row  # Permite acceder a las columnas por nombre
-            print(f"[DEBUG] Conexion establecida a: {db_file}")
+            self.close()
+            self.conn = get_pool().acquire(self.__class__.get_db_path())
             return self.conn
         except Error as e:
             print(f"[ERROR] Error al conectar a SQLite: {e}")
@@ -59,7 +653,7 @@ class DatabaseConnection:
 
     def close(self):
         if self.conn:
-            self.conn.close()
+            get_pool().release(self.conn)
             self.conn = None
 
     def execute_query(self, query, parameters=()):
@@ -75,6 +669,7 @@ class DatabaseConnection:
     def fetch_all(self, query, parameters=()):
         try:
             cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row  # Permite acceder a las columnas por nombre
             cursor.execute(query, parameters)
             return cursor.fetchall()
         except Error as e:
@@ -84,6 +679,7 @@ class DatabaseConnection:
     def fetch_one(self, query, parameters=()):
         try:
             cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row  # Permite acceder a las columnas por nombre
             cursor.execute(query, parameters)
             return cursor.fetchone()
         except Error as e:
@@ -94,4 +690,4 @@ class DatabaseConnection:
 def get_db_connection():
     db = DatabaseConnection()
     connection = db.connect()
-    return connection
\ No newline at end of file
+    return connection
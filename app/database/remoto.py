@@ -0,0 +1,179 @@
+"""
+Modo servidor: los controladores de las cajas llaman al servidor de la BD.
+
+Con varias cajas sobre un mismo sistema_facturacion.db compartido por red,
+los bloqueos de archivo de SQLite sobre SMB son lentos y pueden dañar la BD.
+En modo servidor (servidor=host:puerto en config.txt) los métodos marcados
+con @operacion_remota no abren el archivo: envían la llamada al proceso que
+lo administra (app/helpers/servidor_bd.py), que ejecuta el mismo método.
+
+Protocolo: un objeto JSON por línea sobre TCP.
+    petición:  {"op": "FacturaController.emitir_factura", "args": [...], "kwargs": {...}, "clave": "..."}
+    respuesta: {"ok": true, "resultado": ...} o {"ok": false, "error": "..."}
+"""
+
+import functools
+import json
+import socket
+import sqlite3
+import threading
+
+PUERTO_POR_DEFECTO = 8765
+
+# Nombre ("Clase.metodo") -> (módulo, clase, método, escritura)
+OPERACIONES = {}
+
+
+class ErrorServidor(sqlite3.Error):
+    """Error del servidor o de la conexión; los controladores ya atrapan sqlite3.Error."""
+
+
+def operacion_remota(escritura=False, tabla=None):
+    """
+    Marca un método de controlador como operación del servidor.
+
+    Sin servidor configurado el método se ejecuta igual que siempre. Con
+    servidor, la llamada se envía con sus argumentos (deben poder pasarse a
+    JSON) y se devuelve el resultado del servidor; las tuplas llegan como listas.
+
+    Args:
+        escritura: True si escribe en la BD (el servidor la pasa por la cola del escritor)
+        tabla: Tabla que modifica, para invalidar la caché de contexto local
+    """
+    def decorador(funcion):
+        clase, metodo = funcion.__qualname__.split(".")
+        nombre = f"{clase}.{metodo}"
+        OPERACIONES[nombre] = (funcion.__module__, clase, metodo, escritura)
+
+        @functools.wraps(funcion)
+        def envoltura(self, *args, **kwargs):
+            cliente = get_cliente_servidor()
+            if cliente is None:
+                return funcion(self, *args, **kwargs)
+            resultado = cliente.llamar(nombre, args, kwargs, reintentar=not escritura)
+            if escritura:
+                from app.helpers.contexto_cliente import invalidar_contexto_cliente
+                invalidar_contexto_cliente(tabla)
+            return resultado
+        return envoltura
+    return decorador
+
+
+def enviar_mensaje(escritor, mensaje):
+    """Codifica un mensaje del protocolo (una línea JSON)."""
+    escritor.write(json.dumps(mensaje, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+
+def separar_direccion(direccion):
+    """'host:puerto' o 'host' -> (host, puerto)."""
+    host, _, puerto = direccion.strip().rpartition(":")
+    if not host:
+        return puerto, PUERTO_POR_DEFECTO
+    return host, int(puerto)
+
+
+class ClienteServidor:
+    """
+    Cliente del servidor de la BD con una conexión TCP por hilo.
+
+    Los campos de número de medidor consultan desde hilos aparte; cada hilo
+    usa su propio socket, así sus consultas no esperan a las de otro.
+    """
+
+    def __init__(self, host, puerto=PUERTO_POR_DEFECTO, clave=None, timeout=30):
+        self.host = host
+        self.puerto = puerto
+        self.clave = clave
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conexion(self):
+        archivo = getattr(self._local, "archivo", None)
+        if archivo is None:
+            sock = socket.create_connection((self.host, self.puerto), self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            archivo = sock.makefile("rwb")
+            self._local.sock, self._local.archivo = sock, archivo
+        return archivo
+
+    def cerrar(self):
+        """Cierra la conexión del hilo actual."""
+        archivo = getattr(self._local, "archivo", None)
+        if archivo is not None:
+            for recurso in (archivo, self._local.sock):
+                try:
+                    recurso.close()
+                except OSError:
+                    pass
+            self._local.archivo = self._local.sock = None
+
+    def llamar(self, nombre, args=(), kwargs=None, reintentar=True):
+        """
+        Ejecuta una operación en el servidor.
+
+        Args:
+            nombre: Operación ("Clase.metodo" o "estado")
+            args: Argumentos posicionales
+            kwargs: Argumentos por nombre
+            reintentar: Reconectar y repetir una vez si la conexión se cortó
+                (solo lecturas: una escritura sin respuesta pudo haberse registrado)
+
+        Returns:
+            Resultado de la operación
+
+        Raises:
+            ErrorServidor: Si el servidor no responde o la operación falló
+        """
+        mensaje = {"op": nombre, "args": list(args), "kwargs": kwargs or {}}
+        if self.clave:
+            mensaje["clave"] = self.clave
+        for intento in range(2 if reintentar else 1):
+            try:
+                archivo = self._conexion()
+                enviar_mensaje(archivo, mensaje)
+                archivo.flush()
+                linea = archivo.readline()
+                if not linea:
+                    raise ConnectionError("el servidor cerro la conexion")
+                break
+            except OSError as e:
+                # Socket de una conexión anterior (servidor reiniciado, red caída)
+                self.cerrar()
+                if intento == 1 or not reintentar:
+                    raise ErrorServidor(f"Sin respuesta del servidor {self.host}:{self.puerto} ({e})") from e
+        respuesta = json.loads(linea)
+        if not respuesta.get("ok"):
+            raise ErrorServidor(respuesta.get("error", "error desconocido en el servidor"))
+        return respuesta.get("resultado")
+
+
+_cliente_instance = None
+
+def configurar_servidor(direccion, clave=None):
+    """
+    Activa el modo servidor para este proceso (None lo desactiva).
+
+    Args:
+        direccion: 'host:puerto' del servidor de la BD
+        clave: Clave compartida, si el servidor la pide
+
+    Returns:
+        ClienteServidor: Cliente configurado, o None
+    """
+    global _cliente_instance
+    if not direccion:
+        _cliente_instance = None
+        return None
+    host, puerto = separar_direccion(direccion)
+    _cliente_instance = ClienteServidor(host, puerto, clave)
+    return _cliente_instance
+
+
+def get_cliente_servidor():
+    """
+    Obtiene el cliente del servidor de la BD.
+
+    Returns:
+        ClienteServidor: Cliente activo, o None en modo archivo directo
+    """
+    return _cliente_instance
@@ -0,0 +1,377 @@
+"""
+Almacén de respaldos incremental, comprimido y sin duplicados.
+
+Cada respaldo (instantánea) toma una copia consistente de la BD con la API de
+backup de SQLite (en memoria, sin escribir la BD completa en disco), la corta
+en bloques de 64 KB y guarda cada bloque comprimido con zlib bajo su SHA-256.
+Un bloque que ya está en el almacén no se vuelve a escribir, así una
+instantánea solo ocupa lo que cambió desde las anteriores (las páginas de las
+facturas del día y sus índices). La instantánea es un manifiesto JSON con la
+lista ordenada de bloques:
+
+    backups/almacen/
+        bloques/ab/ab12...ef      bloque comprimido, nombre = SHA-256 del contenido
+        instantaneas/2026-10-18_173005.json
+
+Uso:
+    python -m app.helpers.almacen_respaldos crear [ruta_a_base_datos]
+    python -m app.helpers.almacen_respaldos listar [ruta_a_base_datos]
+    python -m app.helpers.almacen_respaldos verificar [ruta_a_base_datos] [--completo]
+    python -m app.helpers.almacen_respaldos restaurar <instantanea> [ruta_a_base_datos]
+    python -m app.helpers.almacen_respaldos podar [ruta_a_base_datos] [--conservar=N]
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from app.helpers.backup_helper import BACKUP_DIR, copiar_a_conexion, copiar_bd, get_db_path
+
+ALMACEN_DIR = "almacen"
+BLOQUE_BYTES = 64 * 1024        # 16 páginas de 4 KB
+NIVEL_COMPRESION = 6
+CONSERVAR_INSTANTANEAS = 30
+# Un bloque escrito o reutilizado hace menos de esto no se borra al podar:
+# puede pertenecer a una instantánea que otra estación todavía está guardando
+GRACIA_PODA = 3600              # segundos
+
+
+def directorio_almacen(db_path=None):
+    """Directorio del almacén: backups/almacen junto a la BD."""
+    if db_path is None:
+        db_path = get_db_path()
+    db_dir = os.path.dirname(db_path) if os.path.dirname(db_path) else '.'
+    return os.path.join(db_dir, BACKUP_DIR, ALMACEN_DIR)
+
+
+def _ruta_bloque(almacen, huella):
+    return os.path.join(almacen, "bloques", huella[:2], huella)
+
+
+def _ruta_manifiesto(almacen, id_instantanea):
+    return os.path.join(almacen, "instantaneas", f"{id_instantanea}.json")
+
+
+def _escribir_atomico(ruta, datos):
+    """Escribe en un temporal del mismo directorio y lo renombra: nunca queda un archivo a medias."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(datos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _leer_bloque(almacen, huella):
+    """Contenido descomprimido de un bloque; ValueError si falta o no coincide su SHA-256."""
+    try:
+        with open(_ruta_bloque(almacen, huella), "rb") as archivo:
+            datos = zlib.decompress(archivo.read())
+    except FileNotFoundError:
+        raise ValueError(f"falta el bloque {huella[:12]}")
+    except zlib.error as e:
+        raise ValueError(f"bloque {huella[:12]} ilegible: {e}")
+    if hashlib.sha256(datos).hexdigest() != huella:
+        raise ValueError(f"el bloque {huella[:12]} no coincide con su SHA-256")
+    return datos
+
+
+def guardar_instantanea(db_path=None, almacen=None, progreso=None, nota=""):
+    """
+    Guarda una instantánea de la BD en el almacén.
+
+    Args:
+        db_path: Ruta de la BD (default: la del ejecutable)
+        almacen: Directorio del almacén (default: backups/almacen junto a la BD)
+        progreso: Función opcional progreso(paginas_copiadas, paginas_totales) de la copia
+        nota: Texto libre que queda en el manifiesto
+
+    Returns:
+        tuple: (exito: bool, manifiesto: dict o mensaje de error: str)
+    """
+    if db_path is None:
+        db_path = get_db_path()
+    if almacen is None:
+        almacen = directorio_almacen(db_path)
+
+    copia = sqlite3.connect(":memory:")
+    try:
+        exito, mensaje = copiar_a_conexion(db_path, copia, progreso)
+        if not exito:
+            return False, mensaje
+        contenido = copia.serialize()
+    finally:
+        copia.close()
+
+    try:
+        huellas = []
+        nuevos = bytes_escritos = 0
+        with memoryview(contenido) as vista:
+            for inicio in range(0, len(contenido), BLOQUE_BYTES):
+                bloque = vista[inicio:inicio + BLOQUE_BYTES]
+                huella = hashlib.sha256(bloque).hexdigest()
+                huellas.append(huella)
+                ruta = _ruta_bloque(almacen, huella)
+                if os.path.exists(ruta):
+                    # Reutilizado: se renueva la fecha para que una poda simultánea no lo borre
+                    os.utime(ruta)
+                    continue
+                comprimido = zlib.compress(bloque, NIVEL_COMPRESION)
+                _escribir_atomico(ruta, comprimido)
+                nuevos += 1
+                bytes_escritos += len(comprimido)
+
+        fecha = datetime.now()
+        id_instantanea = fecha.strftime("%Y-%m-%d_%H%M%S")
+        sufijo = 1
+        while os.path.exists(_ruta_manifiesto(almacen, id_instantanea)):
+            sufijo += 1
+            id_instantanea = f"{fecha.strftime('%Y-%m-%d_%H%M%S')}-{sufijo}"
+
+        manifiesto = {
+            "id": id_instantanea,
+            "fecha": fecha.isoformat(timespec="seconds"),
+            "origen": os.path.abspath(db_path),
+            "nota": nota,
+            "tamano": len(contenido),
+            "sha256": hashlib.sha256(contenido).hexdigest(),
+            "bloque_bytes": BLOQUE_BYTES,
+            "bloques": huellas,
+            "bloques_nuevos": nuevos,
+            "bytes_escritos": bytes_escritos,
+        }
+        # El manifiesto va al final: la instantánea existe solo si todos sus bloques están guardados
+        _escribir_atomico(_ruta_manifiesto(almacen, id_instantanea),
+                          json.dumps(manifiesto, indent=1).encode("utf-8"))
+        return True, manifiesto
+    except OSError as e:
+        return False, f"Error al guardar la instantanea: {e}"
+
+
+def listar_instantaneas(almacen):
+    """Manifiestos del almacén, del más antiguo al más reciente."""
+    directorio = os.path.join(almacen, "instantaneas")
+    if not os.path.isdir(directorio):
+        return []
+    manifiestos = []
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.endswith(".json"):
+            with open(os.path.join(directorio, nombre), encoding="utf-8") as archivo:
+                manifiestos.append(json.load(archivo))
+    return sorted(manifiestos, key=lambda m: (m["fecha"], m["id"]))
+
+
+def _cargar_manifiesto(almacen, id_instantanea):
+    with open(_ruta_manifiesto(almacen, id_instantanea), encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def _reconstruir(almacen, manifiesto):
+    """Bytes de la BD de una instantánea, verificando cada bloque y el total."""
+    contenido = b"".join(_leer_bloque(almacen, huella) for huella in manifiesto["bloques"])
+    if len(contenido) != manifiesto["tamano"] or hashlib.sha256(contenido).hexdigest() != manifiesto["sha256"]:
+        raise ValueError("la BD reconstruida no coincide con el SHA-256 del manifiesto")
+    return contenido
+
+
+def verificar_almacen(almacen, completo=False):
+    """
+    Verifica que cada instantánea tenga todos sus bloques íntegros.
+
+    Args:
+        almacen: Directorio del almacén
+        completo: Además reconstruye cada instantánea y ejecuta PRAGMA integrity_check
+
+    Returns:
+        list: Tuplas (id_instantanea, problema); vacía si todo está bien
+    """
+    problemas = []
+    verificados = set()
+    for manifiesto in listar_instantaneas(almacen):
+        try:
+            if completo:
+                contenido = bytearray(_reconstruir(almacen, manifiesto))
+                # Bytes 18-19 del encabezado en 1 (modo rollback): una BD en memoria no abre en WAL
+                contenido[18:20] = b"\x01\x01"
+                conn = sqlite3.connect(":memory:")
+                try:
+                    conn.deserialize(bytes(contenido))
+                    resultado = [fila[0] for fila in conn.execute("PRAGMA integrity_check")]
+                finally:
+                    conn.close()
+                if resultado != ["ok"]:
+                    problemas.append((manifiesto["id"], "; ".join(resultado[:5])))
+            else:
+                for huella in manifiesto["bloques"]:
+                    if huella not in verificados:
+                        _leer_bloque(almacen, huella)
+                        verificados.add(huella)
+        except (ValueError, sqlite3.Error) as e:
+            problemas.append((manifiesto["id"], str(e)))
+    return problemas
+
+
+def restaurar_instantanea(id_instantanea, db_path=None, almacen=None):
+    """
+    Restaura una instantánea sobre la BD indicada.
+
+    Antes de reemplazarla guarda una instantánea de la BD actual. El
+    reemplazo se hace con la API de backup (no copiando el archivo), así un
+    archivo -wal de la BD anterior no se aplica sobre la restaurada.
+    Las demás estaciones deben estar cerradas.
+
+    Returns:
+        tuple: (exito: bool, mensaje: str)
+    """
+    from app.database.connection import get_pool
+
+    if db_path is None:
+        db_path = get_db_path()
+    if almacen is None:
+        almacen = directorio_almacen(db_path)
+
+    try:
+        manifiesto = _cargar_manifiesto(almacen, id_instantanea)
+        contenido = _reconstruir(almacen, manifiesto)
+    except FileNotFoundError:
+        return False, f"No existe la instantanea {id_instantanea}"
+    except ValueError as e:
+        return False, f"La instantanea {id_instantanea} esta danada: {e}"
+
+    get_pool().drain()
+    if os.path.exists(db_path):
+        exito, resultado = guardar_instantanea(db_path, almacen, nota=f"antes de restaurar {id_instantanea}")
+        if not exito:
+            return False, f"No se pudo respaldar la BD actual: {resultado}"
+        print(f"  [OK] BD actual guardada como {resultado['id']}")
+
+    temporal = db_path + ".restaurando"
+    try:
+        with open(temporal, "wb") as archivo:
+            archivo.write(contenido)
+        if os.path.exists(db_path):
+            exito, mensaje = copiar_bd(temporal, db_path, pausa=0)
+            if not exito:
+                return False, mensaje
+        else:
+            conn = sqlite3.connect(temporal)
+            try:
+                resultado = [fila[0] for fila in conn.execute("PRAGMA integrity_check")]
+            finally:
+                conn.close()
+            if resultado != ["ok"]:
+                return False, f"La instantanea no paso la verificacion de integridad: {resultado[0]}"
+            os.replace(temporal, db_path)
+    except (OSError, sqlite3.Error) as e:
+        return False, f"Error al restaurar: {e}"
+    finally:
+        for archivo in (temporal, temporal + "-wal", temporal + "-shm"):
+            if os.path.exists(archivo):
+                os.remove(archivo)
+    return True, f"Instantanea {id_instantanea} ({manifiesto['fecha']}) restaurada en {db_path}"
+
+
+def podar_almacen(almacen, conservar=CONSERVAR_INSTANTANEAS):
+    """
+    Borra las instantáneas más antiguas y los bloques que ya nadie usa.
+
+    Args:
+        almacen: Directorio del almacén
+        conservar: Instantáneas más recientes que se mantienen
+
+    Returns:
+        tuple: (instantaneas_borradas, bloques_borrados, bytes_liberados)
+    """
+    manifiestos = listar_instantaneas(almacen)
+    sobrantes = manifiestos[:-conservar] if conservar > 0 else manifiestos
+    for manifiesto in sobrantes:
+        os.remove(_ruta_manifiesto(almacen, manifiesto["id"]))
+
+    # Los manifiestos se releen: otra estación pudo guardar uno mientras tanto
+    en_uso = {huella for manifiesto in listar_instantaneas(almacen) for huella in manifiesto["bloques"]}
+    limite = time.time() - GRACIA_PODA
+    borrados = liberados = 0
+    directorio = os.path.join(almacen, "bloques")
+    for raiz, _, archivos in os.walk(directorio):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            if nombre in en_uso:
+                continue
+            estado = os.stat(ruta)
+            if estado.st_mtime > limite:
+                continue
+            os.remove(ruta)
+            borrados += 1
+            liberados += estado.st_size
+    return len(sobrantes), borrados, liberados
+
+
+def tamano_almacen(almacen):
+    """Bytes ocupados por los bloques del almacén."""
+    total = 0
+    for raiz, _, archivos in os.walk(os.path.join(almacen, "bloques")):
+        total += sum(os.path.getsize(os.path.join(raiz, nombre)) for nombre in archivos)
+    return total
+
+
+if __name__ == "__main__":
+    import sys
+
+    comandos = ("crear", "listar", "verificar", "restaurar", "podar")
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not argumentos or argumentos[0] not in comandos:
+        print(__doc__.split("Uso:")[1].rstrip())
+        sys.exit(2)
+
+    comando = argumentos.pop(0)
+    id_instantanea = argumentos.pop(0) if comando == "restaurar" and argumentos else None
+    db_path = argumentos[0] if argumentos else "sistema_facturacion.db"
+    almacen = directorio_almacen(db_path)
+
+    if comando == "crear":
+        exito, resultado = guardar_instantanea(db_path, almacen)
+        if not exito:
+            print(f"[ERROR] {resultado}")
+            sys.exit(1)
+        print(f"[OK] Instantanea {resultado['id']}: {len(resultado['bloques'])} bloques, "
+              f"{resultado['bloques_nuevos']} nuevos ({resultado['bytes_escritos'] / 1024:.0f} KB escritos)")
+
+    elif comando == "listar":
+        manifiestos = listar_instantaneas(almacen)
+        for m in manifiestos:
+            print(f"  {m['id']:<22}{m['tamano'] / 1024 / 1024:>8.1f} MB{m['bloques_nuevos']:>7} bloques nuevos"
+                  f"{m['bytes_escritos'] / 1024:>9.0f} KB  {m['nota']}")
+        print(f"{len(manifiestos)} instantaneas, {tamano_almacen(almacen) / 1024 / 1024:.1f} MB en {almacen}")
+
+    elif comando == "verificar":
+        problemas = verificar_almacen(almacen, completo="--completo" in sys.argv)
+        for id_problema, problema in problemas:
+            print(f"  [ERROR] {id_problema}: {problema}")
+        if problemas:
+            sys.exit(1)
+        print(f"[OK] {len(listar_instantaneas(almacen))} instantaneas verificadas")
+
+    elif comando == "restaurar":
+        if id_instantanea is None:
+            print("Uso: python -m app.helpers.almacen_respaldos restaurar <instantanea> [ruta_a_base_datos]")
+            sys.exit(2)
+        exito, mensaje = restaurar_instantanea(id_instantanea, db_path, almacen)
+        print(f"[OK] {mensaje}" if exito else f"[ERROR] {mensaje}")
+        sys.exit(0 if exito else 1)
+
+    elif comando == "podar":
+        conservar = CONSERVAR_INSTANTANEAS
+        for argumento in sys.argv[1:]:
+            if argumento.startswith("--conservar="):
+                conservar = int(argumento.split("=", 1)[1])
+        instantaneas, bloques, liberados = podar_almacen(almacen, conservar)
+        print(f"[LIMPIEZA] {instantaneas} instantaneas y {bloques} bloques eliminados "
+              f"({liberados / 1024 / 1024:.1f} MB liberados)")
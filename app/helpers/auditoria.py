@@ -0,0 +1,215 @@
+"""
+Registro de auditoría consultable (tabla auditoria).
+
+SistemaLogs escribe aquí, por lotes desde su hilo, cada acción registrada
+con la entidad afectada (factura, cliente, medidor, servicio) y los valores
+antes y después. Las filas con más de DIAS_EN_BD días se mueven a una BD de
+archivo aparte (<bd>_auditoria.db, adjuntada con ATTACH), así la BD de
+trabajo no crece con el historial; las consultas pueden incluirla.
+
+Uso:
+    python -m app.helpers.auditoria [ruta_a_base_datos] [--archivar[=dias]]
+        [--usuario=...] [--accion=...] [--entidad=factura:4521] [--desde=AAAA-MM-DD] [--hasta=AAAA-MM-DD]
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ESQUEMA_AUDITORIA
+
+DIAS_EN_BD = 180
+COLUMNAS = ("id", "fecha", "usuario", "rol", "accion", "entidad", "entidad_id", "detalle", "antes", "despues")
+
+
+def ruta_archivo(db_path):
+    """BD de archivo de una BD: sistema_facturacion.db -> sistema_facturacion_auditoria.db."""
+    return f"{os.path.splitext(db_path)[0]}_auditoria.db"
+
+
+def leer_estado(conn, tabla, id_fila, columnas):
+    """
+    Valores actuales de una fila, para guardarlos como "antes" de un cambio.
+
+    Returns:
+        dict: {columna: valor}; None si la fila no existe
+    """
+    fila = conn.execute(f"SELECT {', '.join(columnas)} FROM {tabla} WHERE id = ?", (id_fila,)).fetchone()
+    return dict(zip(columnas, fila)) if fila else None
+
+
+def solo_cambios(antes, despues):
+    """
+    Reduce antes/después a las claves cuyo valor cambió.
+
+    Returns:
+        tuple: (antes, despues) con solo los campos modificados
+    """
+    if not antes or not despues:
+        return antes, despues
+    claves = [c for c in despues if c in antes and antes[c] != despues[c]]
+    return {c: antes[c] for c in claves}, {c: despues[c] for c in claves}
+
+
+def insertar_registros(db_path, filas):
+    """
+    Inserta un lote de registros en una sola transacción.
+
+    Args:
+        db_path: Ruta a la base de datos
+        filas: Tuplas (fecha, usuario, rol, accion, entidad, entidad_id, detalle, antes, despues)
+    """
+    get_pool().ejecutar_escritura(lambda conn: conn.executemany("""
+        INSERT INTO auditoria (fecha, usuario, rol, accion, entidad, entidad_id, detalle, antes, despues)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, filas), db_path, "auditoria")
+
+
+def _condiciones(usuario, accion, desde, hasta, entidad, entidad_id):
+    condiciones, params = [], []
+    if usuario:
+        condiciones.append("usuario = ?")
+        params.append(usuario)
+    if accion:
+        condiciones.append("accion = ?")
+        params.append(accion)
+    if entidad:
+        condiciones.append("entidad = ?")
+        params.append(entidad)
+    if entidad_id not in (None, ""):
+        condiciones.append("entidad_id = ?")
+        params.append(str(entidad_id))
+    if desde:
+        condiciones.append("fecha >= ?")
+        params.append(desde)
+    if hasta:
+        # Fecha sin hora: incluye todo ese día
+        condiciones.append("fecha < ?")
+        params.append(hasta + "~" if len(hasta) == 10 else hasta)
+    return " AND ".join(condiciones) or "1=1", params
+
+
+def buscar_auditoria(db_path, usuario=None, accion=None, desde=None, hasta=None,
+                     entidad=None, entidad_id=None, incluir_archivo=False, tamano_bloque=200):
+    """
+    Registros de auditoría que cumplen los filtros, del más reciente al más antiguo.
+
+    Se leen por bloques ((fecha, id) menor que el último leído, el orden de
+    los índices), sin dejar cursores abiertos; con incluir_archivo, al
+    terminar la BD de trabajo sigue con la de archivo.
+
+    Args:
+        db_path: Ruta a la base de datos
+        usuario, accion, entidad, entidad_id: Valores exactos (None = todos)
+        desde, hasta: Fechas 'AAAA-MM-DD' (o con hora), ambas incluidas
+        incluir_archivo: Incluir los registros movidos a la BD de archivo
+        tamano_bloque: Filas por consulta
+
+    Yields:
+        tuple: Filas con las columnas de COLUMNAS
+    """
+    condicion, params = _condiciones(usuario, accion, desde, hasta, entidad, entidad_id)
+    consulta = f"""
+        SELECT {', '.join(COLUMNAS)} FROM auditoria
+        WHERE {condicion} AND (fecha, id) < (?, ?)
+        ORDER BY fecha DESC, id DESC LIMIT ?
+    """
+
+    def bloques(leer):
+        ultima = ("~", 0)
+        while True:
+            filas = leer(consulta, (*params, *ultima, tamano_bloque))
+            yield from filas
+            if len(filas) < tamano_bloque:
+                return
+            ultima = (filas[-1][1], filas[-1][0])
+
+    def leer_bd(sql, valores):
+        with get_pool().connection(db_path) as conn:
+            return conn.execute(sql, valores).fetchall()
+
+    yield from bloques(leer_bd)
+
+    archivo = ruta_archivo(db_path)
+    if incluir_archivo and os.path.exists(archivo):
+        conn = sqlite3.connect(f"file:{archivo}?mode=ro", uri=True)
+        try:
+            yield from bloques(lambda sql, valores: conn.execute(sql, valores).fetchall())
+        finally:
+            conn.close()
+
+
+def valores_filtro(db_path):
+    """
+    Usuarios y acciones registrados, para los filtros del visor.
+
+    Returns:
+        tuple: (usuarios, acciones) ordenados
+    """
+    with get_pool().connection(db_path) as conn:
+        usuarios = [f[0] for f in conn.execute(
+            "SELECT DISTINCT usuario FROM auditoria WHERE usuario IS NOT NULL ORDER BY usuario")]
+        acciones = [f[0] for f in conn.execute("SELECT DISTINCT accion FROM auditoria ORDER BY accion")]
+    return usuarios, acciones
+
+
+def archivar_auditoria(db_path, dias=DIAS_EN_BD):
+    """
+    Mueve los registros con más de `dias` días a la BD de archivo.
+
+    Copia con INSERT OR IGNORE (mismo id) y después borra: si se interrumpe
+    entre ambos pasos, volver a ejecutarlo no duplica registros.
+
+    Returns:
+        int: Registros movidos; None si hubo un error
+    """
+    limite = (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d")
+    archivo = ruta_archivo(db_path)
+    try:
+        with get_pool().connection(db_path) as conn:
+            if conn.execute("SELECT 1 FROM auditoria WHERE fecha < ? LIMIT 1", (limite,)).fetchone() is None:
+                return 0
+            conn.execute("ATTACH DATABASE ? AS archivo", (archivo,))
+            try:
+                for sentencia in ESQUEMA_AUDITORIA:
+                    conn.execute(sentencia.format(esquema="archivo"))
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(f"""
+                        INSERT OR IGNORE INTO archivo.auditoria ({', '.join(COLUMNAS)})
+                        SELECT {', '.join(COLUMNAS)} FROM main.auditoria WHERE fecha < ?
+                    """, (limite,))
+                    movidos = conn.execute("DELETE FROM main.auditoria WHERE fecha < ?", (limite,)).rowcount
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+            finally:
+                conn.execute("DETACH DATABASE archivo")
+        print(f"[OK] {movidos} registros de auditoria archivados en {archivo}")
+        return movidos
+    except sqlite3.Error as e:
+        print(f"[ERROR] Error al archivar la auditoria: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opciones = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "") for a in sys.argv[1:] if a.startswith("--"))
+    db_path = argumentos[0] if argumentos else "sistema_facturacion.db"
+
+    if "archivar" in opciones:
+        movidos = archivar_auditoria(db_path, int(opciones["archivar"] or DIAS_EN_BD))
+        sys.exit(0 if movidos is not None else 1)
+
+    entidad, _, entidad_id = opciones.get("entidad", "").partition(":")
+    for fila in buscar_auditoria(db_path, opciones.get("usuario"), opciones.get("accion"),
+                                 opciones.get("desde"), opciones.get("hasta"),
+                                 entidad or None, entidad_id or None, incluir_archivo=True):
+        registro = dict(zip(COLUMNAS, fila))
+        objetivo = f" {registro['entidad']} {registro['entidad_id']}" if registro["entidad"] else ""
+        print(f"{registro['fecha']}  {registro['usuario']} ({registro['rol']})  {registro['accion']}{objetivo}  {registro['detalle']}")
+        if registro["antes"] or registro["despues"]:
+            print(f"    antes:   {registro['antes']}\n    despues: {registro['despues']}")
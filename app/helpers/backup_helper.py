@@ -1,13 +1,26 @@
 import os
-import shutil
 import sqlite3
 import sys
+import time
 from datetime import datetime, timedelta
 
 # Configuración
 BACKUP_DIR = "backups"
 RETENCION_DIAS = 5  # Mantener solo la copia más reciente en un rango de 5 días
 
+# Copia por pasos con la API de backup de SQLite: entre paso y paso se suelta
+# la BD para que las cajas sigan registrando facturas
+PAGINAS_POR_PASO = 256      # ~1 MB con páginas de 4 KB
+PAUSA_ENTRE_PASOS = 0.005   # segundos
+
+# Sin WAL (BD en carpeta de red) cada escritura de otra conexión reinicia la
+# copia desde la primera página. Después de REINICIOS_POR_INTENTO reinicios se
+# vuelve a empezar con pasos AUMENTO_PASO veces más grandes (menos ventanas en
+# las que una escritura la interrumpe); el último intento copia en un solo paso.
+REINICIOS_POR_INTENTO = 3
+AUMENTO_PASO = 8
+INTENTOS_SIN_WAL = 3
+
 def get_db_path():
     """Obtiene la ruta correcta de la base de datos según el entorno."""
     if getattr(sys, 'frozen', False):
@@ -17,8 +30,136 @@ def get_db_path():
         # Desarrollo: BD está en la raíz del proyecto
         return "sistema_facturacion.db"
 
-def crear_backup(db_path=None):
-    """Crea un respaldo de la base de datos con la fecha en el nombre del archivo."""
+def copiar_bd(origen, destino, progreso=None, paginas_por_paso=PAGINAS_POR_PASO, pausa=PAUSA_ENTRE_PASOS):
+    """
+    Copia una base de datos en uso con sqlite3.Connection.backup y verifica la copia.
+
+    A diferencia de copiar el archivo, la copia es siempre consistente (incluye
+    lo que todavía está en el archivo -wal y nunca una escritura a medias) y
+    no bloquea a quien escribe en el origen. Con WAL la copia refleja el estado
+    de la BD al empezar y lo que se escriba mientras tanto queda para el
+    próximo respaldo; sin WAL refleja el estado al terminar (ver
+    copiar_a_conexion).
+
+    Args:
+        origen: Ruta de la BD a copiar
+        destino: Ruta de la copia (si existe, su contenido se reemplaza)
+        progreso: Función opcional progreso(paginas_copiadas, paginas_totales)
+        paginas_por_paso: Páginas que se copian en cada paso
+        pausa: Segundos de espera entre pasos
+
+    Returns:
+        tuple: (exito: bool, mensaje: str)
+    """
+    copia = None
+    try:
+        copia = sqlite3.connect(destino)
+        exito, mensaje = copiar_a_conexion(origen, copia, progreso, paginas_por_paso, pausa)
+        return exito, destino if exito else mensaje
+    except sqlite3.Error as e:
+        return False, f"Error al copiar la base de datos: {e}"
+    finally:
+        if copia is not None:
+            copia.close()
+
+class _CopiaReiniciada(Exception):
+    """Las escrituras de otras conexiones reiniciaron la copia demasiadas veces."""
+
+
+def copiar_a_conexion(origen, copia, progreso=None, paginas_por_paso=PAGINAS_POR_PASO, pausa=PAUSA_ENTRE_PASOS):
+    """
+    Igual que copiar_bd pero sobre una conexión ya abierta (por ejemplo ":memory:").
+
+    Con journal_mode=WAL se mantiene una lectura abierta durante toda la copia:
+    fija una instantánea del origen y, como en WAL los lectores no bloquean a
+    los escritores, las cajas siguen registrando. Sin WAL (DELETE en carpetas
+    de red) esa lectura sería un bloqueo SHARED que haría fallar a todas las
+    escrituras con "database is locked" hasta terminar, así que cada paso toma
+    y suelta el bloqueo. Si una escritura reinicia la copia más de
+    REINICIOS_POR_INTENTO veces, se empieza de nuevo con pasos AUMENTO_PASO
+    veces más grandes; el intento INTENTOS_SIN_WAL copia todo en un solo paso
+    (las escrituras esperan lo que dure ese paso, dentro de su busy_timeout).
+
+    Returns:
+        tuple: (exito: bool, mensaje: str)
+    """
+    fuente = None
+    try:
+        fuente = sqlite3.connect(origen, timeout=30, isolation_level=None)
+        modo = fuente.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        if modo == "wal":
+            # Sin la instantánea, cada factura registrada por otra conexión
+            # reinicia la copia desde la primera página y con cajas activas
+            # el respaldo no termina nunca.
+            fuente.execute("BEGIN")
+            fuente.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            _copiar_por_pasos(fuente, copia, progreso, paginas_por_paso, pausa)
+            fuente.execute("COMMIT")
+        else:
+            for intento in range(1, INTENTOS_SIN_WAL + 1):
+                ultimo = intento == INTENTOS_SIN_WAL
+                paso = -1 if ultimo else paginas_por_paso * AUMENTO_PASO ** (intento - 1)
+                try:
+                    _copiar_por_pasos(fuente, copia, progreso, paso, pausa,
+                                      None if ultimo else REINICIOS_POR_INTENTO)
+                    break
+                except _CopiaReiniciada:
+                    print(f"[WARN] Respaldo de {origen} reiniciado por escrituras (journal_mode={modo}), "
+                          f"intento {intento} de {INTENTOS_SIN_WAL}")
+
+        resultado = [fila[0] for fila in copia.execute("PRAGMA integrity_check")]
+        if resultado != ["ok"]:
+            detalle = "; ".join("\n".join(resultado).splitlines()[:5])
+            return False, f"La copia no paso la verificacion de integridad: {detalle}"
+        return True, "ok"
+    except sqlite3.Error as e:
+        return False, f"Error al copiar la base de datos: {e}"
+    finally:
+        if fuente is not None:
+            fuente.close()
+
+def _copiar_por_pasos(fuente, copia, progreso, paginas_por_paso, pausa, reinicios_maximos=None):
+    """
+    Ejecuta fuente.backup informando el avance.
+
+    Una copia reiniciada vuelve a empezar desde la primera página: se detecta
+    porque las páginas copiadas no aumentan. Con reinicios_maximos, al pasarlo
+    se corta con _CopiaReiniciada.
+    """
+    estado = {"copiadas": 0, "reinicios": 0}
+
+    def avance(_estado, restantes, totales):
+        copiadas = totales - restantes
+        if copiadas <= estado["copiadas"]:
+            estado["reinicios"] += 1
+            if reinicios_maximos is not None and estado["reinicios"] > reinicios_maximos:
+                raise _CopiaReiniciada()
+        estado["copiadas"] = copiadas
+        if progreso:
+            progreso(copiadas, totales)
+        if pausa:
+            time.sleep(pausa)
+
+    fuente.backup(copia, pages=paginas_por_paso, progress=avance)
+
+def crear_backup(db_path=None, progreso=None):
+    """
+    Guarda una instantánea de la base de datos en el almacén de respaldos.
+
+    Solo se escriben los bloques que cambiaron desde la última instantánea
+    (ver app/helpers/almacen_respaldos.py); después se podan las instantáneas
+    más antiguas y las copias completas backup_AAAA-MM-DD.db de versiones
+    anteriores.
+
+    Args:
+        db_path: Ruta de la BD (default: la del ejecutable)
+        progreso: Función opcional progreso(paginas_copiadas, paginas_totales)
+
+    Returns:
+        tuple: (exito: bool, descripción del respaldo o mensaje de error)
+    """
+    from app.helpers.almacen_respaldos import directorio_almacen, guardar_instantanea, podar_almacen
+
     if db_path is None:
         db_path = get_db_path()
 
@@ -26,21 +167,24 @@ def crear_backup(db_path=None):
     db_dir = os.path.dirname(db_path) if os.path.dirname(db_path) else '.'
     backup_dir = os.path.join(db_dir, BACKUP_DIR)
 
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
-
-    fecha_actual = datetime.now().strftime("%Y-%m-%d")
-    backup_path = os.path.join(backup_dir, f"backup_{fecha_actual}.db")
-
     try:
-        # Crear la copia de seguridad
-        shutil.copy2(db_path, backup_path)
-        print(f"[OK] Backup creado: {backup_path}")
-
-        # Limpiar copias antiguas
+        almacen = directorio_almacen(db_path)
+        exito, resultado = guardar_instantanea(db_path, almacen, progreso)
+        if not exito:
+            print(f"[ERROR] Error al crear backup: {resultado}")
+            return False, resultado
+
+        mensaje = (f"Instantanea {resultado['id']}: {resultado['bloques_nuevos']} de "
+                   f"{len(resultado['bloques'])} bloques nuevos ({resultado['bytes_escritos'] / 1024:.0f} KB escritos)")
+        print(f"[OK] Backup creado: {mensaje}")
+
+        # Limpiar instantáneas y copias antiguas
+        podar_almacen(almacen)
         limpiar_backups_antiguos(backup_dir)
+        return True, mensaje
     except Exception as e:
         print(f"[ERROR] Error al crear backup: {e}")
+        return False, str(e)
 
 def limpiar_backups_antiguos(backup_dir=None):
     """Elimina las copias de seguridad antiguas y solo mantiene la más reciente dentro del período de retención."""
@@ -71,4 +215,5 @@ def limpiar_backups_antiguos(backup_dir=None):
         print(f"[ERROR] Error al limpiar backups antiguos: {e}")
 
 if __name__ == "__main__":
-    crear_backup()
+    exito, _ = crear_backup(sys.argv[1] if len(sys.argv) > 1 else None)
+    sys.exit(0 if exito else 1)
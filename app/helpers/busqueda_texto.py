@@ -0,0 +1,155 @@
+"""
+Búsqueda de texto sobre los índices FTS5 (migración 9).
+
+Las pantallas de búsqueda arman sus condiciones con filtro_texto(): cada
+palabra escrita se busca como prefijo y sin distinguir tildes ni mayúsculas
+("jose pe" encuentra "José Pérez"). Si la BD no tiene los índices (SQLite
+sin FTS5) se usa LIKE por palabra, como antes.
+
+Uso desde la línea de comandos:
+    python -m app.helpers.busqueda_texto [ruta_a_base_datos] [--reconstruir]
+"""
+
+import os
+import re
+import sqlite3
+from app.database.connection import DatabaseConnection, get_pool
+from app.helpers.database_migrator import INDICES_BUSQUEDA, asegurar_esquema
+
+_PALABRA = re.compile(r"\w+")
+
+# {tabla: tabla_fts}
+_TABLAS_FTS = {tabla: tabla_fts for tabla_fts, tabla, _ in INDICES_BUSQUEDA}
+
+# Tablas con índice de búsqueda por BD: {ruta_absoluta: {tabla, ...}}
+_indices_disponibles = {}
+
+
+def palabras(texto):
+    """Palabras de un texto de búsqueda (letras, números y guion bajo)."""
+    return _PALABRA.findall(texto or "")
+
+
+def expresion_busqueda(texto, columnas=None):
+    """
+    Convierte un texto en una expresión MATCH de FTS5.
+
+    Args:
+        texto: Lo que escribió el usuario
+        columnas: Columnas en las que buscar (default: todas las del índice)
+
+    Returns:
+        str: Ej. '{nombre_cliente} : ("jose"* "pe"*)'; None si no hay palabras
+    """
+    terminos = " ".join(f'"{palabra}"*' for palabra in palabras(texto))
+    if not terminos:
+        return None
+    if columnas:
+        return f"{{{' '.join(columnas)}}} : ({terminos})"
+    return terminos
+
+
+def _tablas_indexadas(db_path):
+    clave = os.path.abspath(db_path)
+    tablas = _indices_disponibles.get(clave)
+    if tablas is None:
+        asegurar_esquema(db_path)
+        with get_pool().connection(db_path) as conn:
+            existentes = {
+                fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+        tablas = {tabla for tabla, tabla_fts in _TABLAS_FTS.items() if tabla_fts in existentes}
+        _indices_disponibles[clave] = tablas
+    return tablas
+
+
+def filtro_texto(db_path, tabla, columnas, texto, alias=None):
+    """
+    Condición SQL para buscar un texto en columnas de clientes, facturas o lecturas.
+
+    Args:
+        db_path: Ruta a la base de datos (None = la configurada)
+        tabla: "clientes", "facturas" o "lecturas"
+        columnas: Columnas indexadas en las que buscar
+        texto: Lo que escribió el usuario
+        alias: Alias de la tabla en la consulta (ej. "c")
+
+    Returns:
+        tuple: (condicion, params); ("", []) si el texto no tiene palabras
+    """
+    if db_path is None:
+        db_path = DatabaseConnection.get_db_path()
+    prefijo = f"{alias}." if alias else ""
+
+    if tabla in _tablas_indexadas(db_path):
+        expresion = expresion_busqueda(texto, columnas)
+        if expresion is None:
+            return "", []
+        tabla_fts = _TABLAS_FTS[tabla]
+        return f"{prefijo}id IN (SELECT rowid FROM {tabla_fts} WHERE {tabla_fts} MATCH ?)", [expresion]
+
+    # Sin FTS5: cada palabra debe aparecer en alguna de las columnas
+    condiciones, params = [], []
+    for palabra in palabras(texto):
+        condiciones.append("(" + " OR ".join(f"{prefijo}{columna} LIKE ?" for columna in columnas) + ")")
+        params.extend([f"%{palabra}%"] * len(columnas))
+    return " AND ".join(condiciones), params
+
+
+def reconstruir_indices(db_path):
+    """
+    Vuelve a generar los índices de búsqueda desde sus tablas.
+
+    Returns:
+        bool: True si se reconstruyeron
+    """
+    asegurar_esquema(db_path)
+    try:
+        with get_pool().transaction(db_path, immediate=True) as conn:
+            for tabla in sorted(_tablas_indexadas(db_path)):
+                tabla_fts = _TABLAS_FTS[tabla]
+                conn.execute(f"INSERT INTO {tabla_fts} ({tabla_fts}) VALUES ('rebuild')")
+                print(f"[OK] Indice {tabla_fts} reconstruido")
+        return True
+    except sqlite3.Error as e:
+        print(f"[ERROR] Error al reconstruir indices de busqueda: {e}")
+        return False
+
+
+def verificar_indices_busqueda(db_path):
+    """
+    Comprueba que cada índice de búsqueda coincida con su tabla.
+
+    Returns:
+        list: Nombres de los índices con diferencias
+    """
+    asegurar_esquema(db_path)
+    danados = []
+    with get_pool().connection(db_path) as conn:
+        for tabla in sorted(_tablas_indexadas(db_path)):
+            tabla_fts = _TABLAS_FTS[tabla]
+            try:
+                conn.execute(f"INSERT INTO {tabla_fts} ({tabla_fts}, rank) VALUES ('integrity-check', 1)")
+            except sqlite3.Error as e:
+                print(f"[ERROR] {tabla_fts}: {e}")
+                danados.append(tabla_fts)
+    return danados
+
+
+if __name__ == "__main__":
+    import sys
+
+    argumentos = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    db_path = argumentos[0] if argumentos else "sistema_facturacion.db"
+
+    if not _tablas_indexadas(db_path):
+        print("[WARN] La BD no tiene indices de busqueda (SQLite sin FTS5)")
+        sys.exit(0)
+    if "--reconstruir" in sys.argv:
+        sys.exit(0 if reconstruir_indices(db_path) else 1)
+
+    danados = verificar_indices_busqueda(db_path)
+    if danados:
+        print(f"[ERROR] Indices con diferencias: {', '.join(danados)} (usar --reconstruir)")
+        sys.exit(1)
+    print("[OK] Indices de busqueda al dia")
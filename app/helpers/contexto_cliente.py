@@ -0,0 +1,128 @@
+"""
+Caché de datos de cliente para los campos de número de medidor.
+
+Los formularios de Lecturas, Servicios y Facturas consultan el cliente, su
+última lectura y su deuda cada vez que se escribe un número de medidor. Este
+servicio guarda esos resultados en una caché LRU compartida y los descarta
+cuando se escribe en las tablas de las que dependen.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ContextoClienteService:
+    """Caché LRU de contextos de cliente, segura entre hilos."""
+
+    def __init__(self, capacidad=256, vigencia=30.0):
+        """
+        Args:
+            capacidad: Máximo de contextos guardados
+            vigencia: Segundos que dura una entrada (cubre los cambios hechos
+                desde otros equipos, que no pasan por invalidar)
+        """
+        self.capacidad = capacidad
+        self.vigencia = vigencia
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        # Cambia en cada invalidación: una carga que empezó antes no se guarda
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def buscar(self, tipo, clave):
+        """
+        Busca un contexto guardado.
+
+        Args:
+            tipo: Formulario que lo pide ("lecturas", "servicios", "facturas")
+            clave: Número de medidor o de conexión
+
+        Returns:
+            tuple: (encontrado, contexto); encontrado es False si no está o venció
+        """
+        with self._lock:
+            entrada = self._entradas.get((tipo, clave))
+            if entrada is None or time.monotonic() - entrada[0] > self.vigencia:
+                self.fallos += 1
+                return False, None
+            self._entradas.move_to_end((tipo, clave))
+            self.aciertos += 1
+            return True, entrada[2]
+
+    def guardar(self, tipo, clave, contexto, tablas, generacion=None):
+        """
+        Guarda un contexto.
+
+        Args:
+            tipo: Formulario que lo pide
+            clave: Número de medidor o de conexión
+            contexto: Datos a guardar (None también se guarda: "no existe")
+            tablas: Tablas de las que depende, para invalidar
+            generacion: Valor de generacion() antes de consultar la BD; si hubo
+                una invalidación desde entonces el contexto no se guarda
+        """
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._entradas[(tipo, clave)] = (time.monotonic(), frozenset(tablas), contexto)
+            self._entradas.move_to_end((tipo, clave))
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+
+    def obtener(self, tipo, clave, cargar, tablas):
+        """
+        Devuelve el contexto desde la caché o lo carga con cargar(clave).
+
+        Args:
+            tipo: Formulario que lo pide
+            clave: Número de medidor o de conexión
+            cargar: Función que consulta la BD
+            tablas: Tablas de las que depende el resultado
+        """
+        encontrado, contexto = self.buscar(tipo, clave)
+        if not encontrado:
+            generacion = self.generacion()
+            contexto = cargar(clave)
+            self.guardar(tipo, clave, contexto, tablas, generacion)
+        return contexto
+
+    def generacion(self):
+        return self._generacion
+
+    def invalidar(self, tabla=None):
+        """
+        Descarta los contextos que dependen de una tabla (o todos).
+
+        Args:
+            tabla: clientes, lecturas, facturas o servicios; None borra todo
+        """
+        with self._lock:
+            self._generacion += 1
+            if tabla is None:
+                self._entradas.clear()
+                return
+            for clave in [c for c, entrada in self._entradas.items() if tabla in entrada[1]]:
+                del self._entradas[clave]
+
+
+# Instancia global
+_contexto_instance = None
+
+def get_contexto_cliente():
+    """
+    Obtiene la caché compartida de contextos de cliente (patrón Singleton).
+
+    Returns:
+        ContextoClienteService: Instancia de la caché
+    """
+    global _contexto_instance
+    if _contexto_instance is None:
+        _contexto_instance = ContextoClienteService()
+    return _contexto_instance
+
+
+def invalidar_contexto_cliente(tabla=None):
+    """Atajo para los puntos de escritura: invalida la caché por tabla."""
+    get_contexto_cliente().invalidar(tabla)
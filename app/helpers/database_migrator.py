@@ -8,6 +8,590 @@ que todas las tablas y campos necesarios existan en la base de datos.
 import sqlite3
 import os
 from pathlib import Path
+from app.database.connection import get_pool
+from app.database.remoto import get_cliente_servidor
+
+
+# ---------------------------------------------------------------------------
+# Registro de migraciones
+#
+# Cada migración recibe un cursor dentro de una transacción propia y debe ser
+# idempotente: las BD anteriores a schema_version ya pueden tener aplicados
+# algunos de estos cambios. Las versiones nuevas se agregan al final de
+# MIGRACIONES con el siguiente número; nunca se renumeran ni se modifican las
+# ya publicadas.
+# ---------------------------------------------------------------------------
+
+def _columnas(cursor, tabla):
+    cursor.execute(f"PRAGMA table_info({tabla})")
+    return [columna[1] for columna in cursor.fetchall()]
+
+
+def _v1_numero_factura(cursor):
+    """Agrega el campo numero_factura a la tabla facturas."""
+    if "numero_factura" not in _columnas(cursor, "facturas"):
+        cursor.execute("""
+            ALTER TABLE facturas
+            ADD COLUMN numero_factura TEXT
+        """)
+        print("  [OK] Campo 'numero_factura' agregado exitosamente")
+    else:
+        print("  [OK] Campo 'numero_factura' ya existe en tabla facturas")
+
+
+def _v2_tabla_secuencias(cursor):
+    """Crea la tabla de secuencias de facturación e inicializa la secuencia 001-010."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS secuencias_facturacion (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            establecimiento TEXT NOT NULL,
+            punto_emision TEXT NOT NULL,
+            secuencial INTEGER NOT NULL DEFAULT 0,
+            activo INTEGER NOT NULL DEFAULT 1,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(establecimiento, punto_emision)
+        )
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO secuencias_facturacion
+        (establecimiento, punto_emision, secuencial, activo)
+        VALUES ('001', '010', 0, 1)
+    """)
+    if cursor.rowcount:
+        print("  [OK] Secuencia 001-010 inicializada (comienza desde 1)")
+    else:
+        print("  [OK] Secuencia 001-010 ya existe")
+
+
+def _v3_tercera_edad(cursor):
+    """Agrega el campo tercera_edad a la tabla facturas."""
+    if "tercera_edad" not in _columnas(cursor, "facturas"):
+        cursor.execute("""
+            ALTER TABLE facturas
+            ADD COLUMN tercera_edad INTEGER DEFAULT 0
+        """)
+        print("  [OK] Campo 'tercera_edad' agregado exitosamente")
+    else:
+        print("  [OK] Campo 'tercera_edad' ya existe en tabla facturas")
+
+
+# Índices de las búsquedas que se ejecutan en cada tecleo o en cada factura
+# (nombre, tabla, columnas). Ver app/helpers/verificar_indices.py
+INDICES_CONSULTAS = [
+    # Saldo pendiente, conteo de deudas y ActualizarDeudasHelper (cubre monto_total)
+    ("idx_facturas_medidor_estado", "facturas", "medidor_id, estado, monto_total"),
+    # Asignación del número de factura
+    ("idx_facturas_numero_factura", "facturas", "numero_factura"),
+    # Consultas de pagados/deudores y filtros por mes
+    ("idx_facturas_mes_estado", "facturas", "mes_facturacion, estado"),
+    # Última lectura del medidor
+    ("idx_lecturas_medidor_fecha", "lecturas", "medidor_id, fecha_lectura"),
+    # ServiciosController.obtener_datos_cliente
+    ("idx_clientes_numero_conexion", "clientes", "numero_conexion"),
+    # ServiciosController.obtener_servicios_por_medidor
+    ("idx_servicios_numero_medidor", "servicios", "numero_medidor"),
+]
+
+
+def _tabla_existe(cursor, tabla):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tabla,))
+    return cursor.fetchone() is not None
+
+
+def _v4_indices_consultas(cursor):
+    """Crea los índices de las consultas frecuentes y actualiza las estadísticas."""
+    for nombre, tabla, columnas in INDICES_CONSULTAS:
+        if not _tabla_existe(cursor, tabla):
+            print(f"  [WARN] Tabla '{tabla}' no existe, se omite {nombre}")
+            continue
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})")
+        print(f"  [OK] Indice {nombre} ({tabla}: {columnas})")
+
+    # Estadísticas para que el planificador elija los índices nuevos
+    cursor.execute("ANALYZE")
+    print("  [OK] ANALYZE ejecutado")
+
+
+def _v5_secuencial_facturas(cursor):
+    """
+    Numeración de facturas por columna entera e índice único.
+
+    Agrega facturas.serie ('001-010') y facturas.secuencial (entero), los
+    completa a partir de numero_factura y crea huecos_facturacion con los
+    números libres de cada serie. Un trigger devuelve a huecos_facturacion el
+    número de cada factura eliminada, así la asignación sigue reutilizando
+    huecos sin recorrer las facturas existentes.
+    """
+    columnas = _columnas(cursor, "facturas")
+    if "serie" not in columnas:
+        cursor.execute("ALTER TABLE facturas ADD COLUMN serie TEXT")
+    if "secuencial" not in columnas:
+        cursor.execute("ALTER TABLE facturas ADD COLUMN secuencial INTEGER")
+
+    # Formato EEE-PPP-NNNNNNNNNN (los números antiguos 001-001 tienen 9 dígitos)
+    cursor.execute("""
+        UPDATE facturas
+        SET serie = substr(numero_factura, 1, 7),
+            secuencial = CAST(substr(numero_factura, 9) AS INTEGER)
+        WHERE secuencial IS NULL
+          AND numero_factura GLOB '[0-9][0-9][0-9]-[0-9][0-9][0-9]-[0-9]*'
+    """)
+    print(f"  [OK] {cursor.rowcount} facturas con secuencial asignado")
+
+    # Un número repetido en datos antiguos impediría crear el índice único:
+    # lo conserva la factura más antigua
+    cursor.execute("""
+        UPDATE facturas SET secuencial = NULL
+        WHERE secuencial IS NOT NULL
+          AND id NOT IN (
+              SELECT MIN(id) FROM facturas
+              WHERE secuencial IS NOT NULL
+              GROUP BY serie, secuencial
+          )
+    """)
+    if cursor.rowcount:
+        print(f"  [WARN] {cursor.rowcount} facturas con numero repetido quedan sin secuencial")
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_facturas_serie_secuencial
+        ON facturas (serie, secuencial)
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS huecos_facturacion (
+            serie TEXT NOT NULL,
+            secuencial INTEGER NOT NULL,
+            PRIMARY KEY (serie, secuencial)
+        ) WITHOUT ROWID
+    """)
+
+    # Huecos actuales de cada serie configurada, entre 1 y el mayor número emitido
+    cursor.execute("SELECT establecimiento || '-' || punto_emision FROM secuencias_facturacion")
+    for (serie,) in cursor.fetchall():
+        cambios_previos = cursor.connection.total_changes
+        cursor.execute("""
+            WITH RECURSIVE numeros(n) AS (
+                SELECT 1 WHERE (SELECT MAX(secuencial) FROM facturas WHERE serie = :serie) >= 1
+                UNION ALL
+                SELECT n + 1 FROM numeros
+                WHERE n < (SELECT MAX(secuencial) FROM facturas WHERE serie = :serie)
+            )
+            INSERT OR IGNORE INTO huecos_facturacion (serie, secuencial)
+            SELECT :serie, n FROM numeros
+            WHERE NOT EXISTS (
+                SELECT 1 FROM facturas WHERE serie = :serie AND secuencial = numeros.n
+            )
+        """, {"serie": serie})
+        # rowcount no se informa para sentencias que empiezan con WITH
+        huecos = cursor.connection.total_changes - cambios_previos
+        print(f"  [OK] Serie {serie}: {huecos} huecos registrados")
+
+    # secuencias_facturacion.secuencial pasa a ser el mayor número emitido
+    cursor.execute("""
+        UPDATE secuencias_facturacion
+        SET secuencial = COALESCE((
+            SELECT MAX(f.secuencial) FROM facturas f
+            WHERE f.serie = secuencias_facturacion.establecimiento || '-' || secuencias_facturacion.punto_emision
+        ), 0)
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_facturas_liberar_numero
+        AFTER DELETE ON facturas
+        WHEN old.secuencial IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO huecos_facturacion (serie, secuencial)
+            VALUES (old.serie, old.secuencial);
+        END
+    """)
+    print("  [OK] Tabla huecos_facturacion y trigger de eliminacion creados")
+
+
+def _v6_tarifas(cursor):
+    """
+    Tablas de tarifas versionadas.
+
+    tarifas guarda la tarifa básica de cada servicio y tarifas_excedente los
+    tramos por m³; cada versión rige desde su fecha vigente_desde. La versión 1
+    son los valores que usaban FacturasWidget y FacturaEditWidget.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tarifas (
+            version INTEGER NOT NULL,
+            servicio TEXT NOT NULL,
+            tarifa_basica REAL NOT NULL,
+            consumo_base REAL NOT NULL DEFAULT 10,
+            descuento_tercera_edad REAL NOT NULL DEFAULT 0.5,
+            vigente_desde TEXT NOT NULL,
+            PRIMARY KEY (version, servicio)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tarifas_excedente (
+            version INTEGER NOT NULL,
+            consumo_hasta REAL,
+            precio_m3 REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tarifas_excedente_version
+        ON tarifas_excedente (version)
+    """)
+
+    cursor.execute("SELECT COUNT(*) FROM tarifas")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany("""
+            INSERT INTO tarifas (version, servicio, tarifa_basica, consumo_base, descuento_tercera_edad, vigente_desde)
+            VALUES (1, ?, ?, 10, 0.5, '2000-01-01')
+        """, [("DOMICILIARIA", 2.50), ("COMERCIAL", 3.50), ("INDUSTRIAL", 4.50)])
+        # consumo_hasta NULL = sin límite superior
+        cursor.executemany("""
+            INSERT INTO tarifas_excedente (version, consumo_hasta, precio_m3)
+            VALUES (1, ?, ?)
+        """, [(50, 0.40), (100, 0.60), (None, 0.80)])
+        print("  [OK] Tarifas version 1 registradas")
+    else:
+        print("  [OK] Tabla tarifas ya tiene datos")
+
+
+# Recalcula la fila de saldos_medidor de un medidor ({medidor} se reemplaza por
+# NEW.medidor_id u OLD.medidor_id dentro de los triggers). Todas las subconsultas
+# usan idx_facturas_medidor_estado y solo recorren las facturas de ese medidor.
+_RECALCULAR_SALDO = """
+    INSERT OR REPLACE INTO saldos_medidor (
+        medidor_id, total_deuda, num_deudas, mes_deuda_antigua, ultimo_estado, ultima_factura_id
+    )
+    SELECT {medidor},
+        (SELECT COALESCE(SUM(monto_total), 0) FROM facturas WHERE medidor_id = {medidor} AND estado = 'Deuda'),
+        (SELECT COUNT(*) FROM facturas WHERE medidor_id = {medidor} AND estado = 'Deuda'),
+        (SELECT mes_facturacion FROM facturas WHERE medidor_id = {medidor} AND estado = 'Deuda' ORDER BY id LIMIT 1),
+        (SELECT estado FROM facturas WHERE medidor_id = {medidor} ORDER BY id DESC LIMIT 1),
+        (SELECT MAX(id) FROM facturas WHERE medidor_id = {medidor})
+    WHERE {medidor} IS NOT NULL;
+"""
+
+# Saldos calculados desde facturas para todos los medidores (carga inicial y verificación)
+SALDOS_CALCULADOS = """
+    SELECT g.medidor_id, g.total_deuda, g.num_deudas,
+        (SELECT d.mes_facturacion FROM facturas d
+         WHERE d.medidor_id = g.medidor_id AND d.estado = 'Deuda' ORDER BY d.id LIMIT 1),
+        u.estado, g.ultima_factura_id
+    FROM (
+        SELECT medidor_id,
+            COALESCE(SUM(CASE WHEN estado = 'Deuda' THEN monto_total END), 0) AS total_deuda,
+            COALESCE(SUM(estado = 'Deuda'), 0) AS num_deudas,
+            MAX(id) AS ultima_factura_id
+        FROM facturas
+        WHERE medidor_id IS NOT NULL
+        GROUP BY medidor_id
+    ) g
+    JOIN facturas u ON u.id = g.ultima_factura_id
+"""
+
+
+def _v7_saldos_medidor(cursor):
+    """
+    Tabla saldos_medidor con el saldo en deuda de cada medidor.
+
+    Los triggers sobre facturas la mantienen al día en cada INSERT, UPDATE y
+    DELETE, así el saldo pendiente es una lectura por clave primaria.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS saldos_medidor (
+            medidor_id INTEGER PRIMARY KEY,
+            total_deuda REAL NOT NULL DEFAULT 0,
+            num_deudas INTEGER NOT NULL DEFAULT 0,
+            mes_deuda_antigua TEXT,
+            ultimo_estado TEXT,
+            ultima_factura_id INTEGER
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_saldos_insert
+        AFTER INSERT ON facturas
+        BEGIN
+            {_RECALCULAR_SALDO.format(medidor="NEW.medidor_id")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_saldos_delete
+        AFTER DELETE ON facturas
+        BEGIN
+            {_RECALCULAR_SALDO.format(medidor="OLD.medidor_id")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_saldos_update
+        AFTER UPDATE OF medidor_id, estado, monto_total, mes_facturacion ON facturas
+        BEGIN
+            {_RECALCULAR_SALDO.format(medidor="NEW.medidor_id")}
+        END
+    """)
+    # Factura pasada a otro medidor: también cambia el saldo del anterior
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_saldos_update_medidor
+        AFTER UPDATE OF medidor_id ON facturas
+        WHEN OLD.medidor_id IS NOT NEW.medidor_id
+        BEGIN
+            {_RECALCULAR_SALDO.format(medidor="OLD.medidor_id")}
+        END
+    """)
+
+    cursor.execute("DELETE FROM saldos_medidor")
+    cursor.execute(f"""
+        INSERT OR REPLACE INTO saldos_medidor (
+            medidor_id, total_deuda, num_deudas, mes_deuda_antigua, ultimo_estado, ultima_factura_id
+        )
+        {SALDOS_CALCULADOS}
+    """)
+    print(f"  [OK] Saldos de {cursor.rowcount} medidores calculados y triggers creados")
+
+
+def _v8_indice_fecha_emision(cursor):
+    """
+    Índice por fecha de emisión para la consulta de facturas.
+
+    La consulta pagina por (fecha_emision, id): el índice entrega las filas del
+    rango de fechas ya ordenadas, sin recorrer ni ordenar todo el historial.
+    """
+    if not _tabla_existe(cursor, "facturas"):
+        print("  [WARN] Tabla 'facturas' no existe, se omite idx_facturas_fecha_emision")
+        return
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_facturas_fecha_emision ON facturas (fecha_emision)")
+    cursor.execute("ANALYZE idx_facturas_fecha_emision")
+    print("  [OK] Indice idx_facturas_fecha_emision (facturas: fecha_emision)")
+
+
+# Índices de texto completo (FTS5) de las pantallas de búsqueda:
+# (tabla_fts, tabla, columnas). La tabla FTS usa la tabla original como
+# contenido externo (rowid = id) y los triggers la mantienen al día.
+# Ver app/helpers/busqueda_texto.py
+INDICES_BUSQUEDA = [
+    ("busqueda_clientes", "clientes", ("nombre_cliente", "cliente_ci", "direccion", "numero_conexion")),
+    ("busqueda_facturas", "facturas", ("nombre_cliente", "direccion")),
+    ("busqueda_lecturas", "lecturas", ("nombre_cliente", "direccion")),
+]
+
+# Sin distinguir tildes (remove_diacritics 2) y con índices de prefijo de 2 y 3 letras
+OPCIONES_FTS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+
+def _fts5_disponible(cursor):
+    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    return bool(cursor.fetchone()[0])
+
+
+def _crear_indice_busqueda(cursor, tabla_fts, tabla, columnas):
+    """Tabla FTS5 de contenido externo sobre tabla, triggers y carga inicial."""
+    lista = ", ".join(columnas)
+    nuevos = ", ".join(f"NEW.{columna}" for columna in columnas)
+    viejos = ", ".join(f"OLD.{columna}" for columna in columnas)
+
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {tabla_fts} USING fts5(
+            {lista}, content = '{tabla}', content_rowid = 'id', {OPCIONES_FTS}
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabla_fts}_insert AFTER INSERT ON {tabla}
+        BEGIN
+            INSERT INTO {tabla_fts} (rowid, {lista}) VALUES (NEW.id, {nuevos});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabla_fts}_delete AFTER DELETE ON {tabla}
+        BEGIN
+            INSERT INTO {tabla_fts} ({tabla_fts}, rowid, {lista}) VALUES ('delete', OLD.id, {viejos});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabla_fts}_update AFTER UPDATE OF id, {lista} ON {tabla}
+        BEGIN
+            INSERT INTO {tabla_fts} ({tabla_fts}, rowid, {lista}) VALUES ('delete', OLD.id, {viejos});
+            INSERT INTO {tabla_fts} (rowid, {lista}) VALUES (NEW.id, {nuevos});
+        END
+    """)
+    cursor.execute(f"INSERT INTO {tabla_fts} ({tabla_fts}) VALUES ('rebuild')")
+
+
+def _v9_indices_busqueda(cursor):
+    """
+    Índices FTS5 para buscar por nombre, cédula, dirección y número de conexión.
+
+    Reemplazan los LIKE '%texto%' de las pantallas de búsqueda, que recorrían
+    la tabla completa. Si SQLite no trae FTS5 las búsquedas siguen con LIKE.
+    """
+    if not _fts5_disponible(cursor):
+        print("  [WARN] SQLite sin FTS5: las busquedas seguiran usando LIKE")
+        return
+    for tabla_fts, tabla, columnas in INDICES_BUSQUEDA:
+        if not _tabla_existe(cursor, tabla):
+            print(f"  [WARN] Tabla '{tabla}' no existe, se omite {tabla_fts}")
+            continue
+        _crear_indice_busqueda(cursor, tabla_fts, tabla, columnas)
+        print(f"  [OK] Indice de busqueda {tabla_fts} ({tabla}: {', '.join(columnas)})")
+
+
+# Clave de resumen_recaudacion de una factura (NEW, OLD o la tabla en la carga inicial)
+_CLAVE_RESUMEN = (
+    ("anio", "COALESCE(strftime('%Y', {f}fecha_emision), '')"),
+    ("mes_facturacion", "COALESCE({f}mes_facturacion, '')"),
+    ("direccion", "COALESCE({f}direccion, '')"),
+    ("estado", "COALESCE({f}estado, '')"),
+    ("servicio", "COALESCE({f}servicio, '')"),
+)
+COLUMNAS_CLAVE_RESUMEN = tuple(columna for columna, _ in _CLAVE_RESUMEN)
+
+# Resumen calculado desde facturas (carga inicial y verificación)
+RESUMEN_CALCULADO = f"""
+    SELECT {", ".join(expresion.format(f="") for _, expresion in _CLAVE_RESUMEN)},
+        COUNT(*), COALESCE(SUM(monto_total), 0)
+    FROM facturas
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def _sumar_resumen(fila):
+    valores = ", ".join(expresion.format(f=f"{fila}.") for _, expresion in _CLAVE_RESUMEN)
+    return f"""
+        INSERT INTO resumen_recaudacion ({", ".join(COLUMNAS_CLAVE_RESUMEN)}, cantidad, monto_total)
+        VALUES ({valores}, 1, COALESCE({fila}.monto_total, 0))
+        ON CONFLICT ({", ".join(COLUMNAS_CLAVE_RESUMEN)}) DO UPDATE SET
+            cantidad = cantidad + 1,
+            monto_total = monto_total + excluded.monto_total;
+    """
+
+
+def _restar_resumen(fila):
+    condicion = " AND ".join(
+        f"{columna} = {expresion.format(f=f'{fila}.')}" for columna, expresion in _CLAVE_RESUMEN
+    )
+    return f"""
+        UPDATE resumen_recaudacion
+        SET cantidad = cantidad - 1, monto_total = monto_total - COALESCE({fila}.monto_total, 0)
+        WHERE {condicion};
+        DELETE FROM resumen_recaudacion WHERE {condicion} AND cantidad <= 0;
+    """
+
+
+def _v10_resumen_recaudacion(cursor):
+    """
+    Tabla resumen_recaudacion: cantidad y monto de facturas por año, mes,
+    dirección, estado y servicio.
+
+    Los triggers sobre facturas la mantienen al día, así el gráfico de
+    recaudación y los filtros de año y dirección leen unas pocas filas en
+    lugar de agrupar todo el historial.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumen_recaudacion (
+            anio TEXT NOT NULL,
+            mes_facturacion TEXT NOT NULL,
+            direccion TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            servicio TEXT NOT NULL,
+            cantidad INTEGER NOT NULL DEFAULT 0,
+            monto_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (anio, mes_facturacion, direccion, estado, servicio)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_resumen_recaudacion_direccion
+        ON resumen_recaudacion (direccion, anio)
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_insert
+        AFTER INSERT ON facturas
+        BEGIN
+            {_sumar_resumen("NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_delete
+        AFTER DELETE ON facturas
+        BEGIN
+            {_restar_resumen("OLD")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_update
+        AFTER UPDATE OF fecha_emision, mes_facturacion, direccion, estado, servicio, monto_total ON facturas
+        BEGIN
+            {_restar_resumen("OLD")}
+            {_sumar_resumen("NEW")}
+        END
+    """)
+
+    cursor.execute("DELETE FROM resumen_recaudacion")
+    cursor.execute(f"""
+        INSERT INTO resumen_recaudacion ({", ".join(COLUMNAS_CLAVE_RESUMEN)}, cantidad, monto_total)
+        {RESUMEN_CALCULADO}
+    """)
+    print(f"  [OK] Resumen de recaudacion ({cursor.rowcount} grupos) calculado y triggers creados")
+
+
+# Tabla de auditoría e índices; {esquema} es "main" o el alias de la BD de
+# archivo adjunta (app/helpers/auditoria.py crea la misma tabla allí)
+ESQUEMA_AUDITORIA = [
+    """
+    CREATE TABLE IF NOT EXISTS {esquema}.auditoria (
+        id INTEGER PRIMARY KEY,
+        fecha TEXT NOT NULL,
+        usuario TEXT,
+        rol TEXT,
+        accion TEXT NOT NULL,
+        entidad TEXT,
+        entidad_id TEXT,
+        detalle TEXT,
+        antes TEXT,
+        despues TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_auditoria_entidad ON auditoria (entidad, entidad_id, fecha)",
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_auditoria_fecha ON auditoria (fecha)",
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_auditoria_usuario ON auditoria (usuario, fecha)",
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_auditoria_accion ON auditoria (accion, fecha)",
+]
+
+
+def _v11_auditoria(cursor):
+    """
+    Tabla auditoria: quién hizo qué y cuándo, sobre qué registro (entidad e
+    id) y con los valores antes y después en JSON.
+
+    La escribe el hilo de SistemaLogs por lotes; los índices permiten
+    consultar por registro, usuario, acción y rango de fechas.
+    """
+    for sentencia in ESQUEMA_AUDITORIA:
+        cursor.execute(sentencia.format(esquema="main"))
+    print("  [OK] Tabla auditoria e indices creados")
+
+
+# (version, descripcion, funcion) en orden de aplicación
+MIGRACIONES = [
+    (1, "Campo numero_factura en facturas", _v1_numero_factura),
+    (2, "Tabla secuencias_facturacion", _v2_tabla_secuencias),
+    (3, "Campo tercera_edad en facturas", _v3_tercera_edad),
+    (4, "Indices de consultas frecuentes", _v4_indices_consultas),
+    (5, "Numeracion de facturas por secuencial entero", _v5_secuencial_facturas),
+    (6, "Tablas de tarifas versionadas", _v6_tarifas),
+    (7, "Saldos por medidor mantenidos por triggers", _v7_saldos_medidor),
+    (8, "Indice por fecha de emision para la consulta de facturas", _v8_indice_fecha_emision),
+    (9, "Indices de busqueda de texto (FTS5)", _v9_indices_busqueda),
+    (10, "Resumen de recaudacion mantenido por triggers", _v10_resumen_recaudacion),
+    (11, "Tabla de auditoria", _v11_auditoria),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+# BD ya verificadas en este proceso (ruta absoluta)
+_esquemas_verificados = set()
+
+# BD cuya migración falló en este proceso: ruta absoluta -> descripción del error.
+# asegurar_esquema no la reintenta (cada intento toma el bloqueo de escritura).
+_migraciones_fallidas = {}
 
 
 class DatabaseMigrator:
@@ -29,124 +613,95 @@ class DatabaseMigrator:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
 
-    def run_all_migrations(self):
+    def obtener_version(self):
         """
-        Ejecuta todas las migraciones necesarias.
+        Obtiene la versión de esquema aplicada.
 
-        Este método debe ser llamado al iniciar la aplicación para
-        asegurar que la base de datos esté actualizada.
+        Una sola lectura sobre la clave primaria de schema_version; si la
+        tabla no existe la BD es anterior al registro de versiones.
+
+        Returns:
+            int: Última versión aplicada (0 si no hay ninguna)
         """
-        print("=" * 60)
-        print("INICIANDO MIGRACIONES DE BASE DE DATOS")
-        print("=" * 60)
-        print()
+        try:
+            with get_pool().connection(self.db_path) as conn:
+                resultado = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+            return resultado[0] or 0
+        except sqlite3.OperationalError:
+            return 0
+
+    def _crear_tabla_version(self):
+        with get_pool().transaction(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    descripcion TEXT NOT NULL,
+                    aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
 
-        # Migración 1: Campo numero_factura en tabla facturas
-        self._migrar_numero_factura()
+    def run_all_migrations(self):
+        """
+        Ejecuta las migraciones pendientes.
 
-        # Migración 2: Tabla de secuencias de facturación
-        self._migrar_tabla_secuencias()
+        Este método debe ser llamado al iniciar la aplicación para
+        asegurar que la base de datos esté actualizada. Si la BD ya está en
+        la última versión no se ejecuta ninguna migración.
 
-        # Migración 3: Tabla de logs (si no existe)
+        Returns:
+            bool: True si la BD quedó en la última versión
+        """
+        # Carpeta de logs (no depende de la versión del esquema)
         self._migrar_tabla_logs()
 
-        # Migración 4: Campo tercera_edad en tabla facturas
-        self._migrar_tercera_edad()
+        version_actual = self.obtener_version()
+        if version_actual >= VERSION_ESQUEMA:
+            print(f"[OK] Esquema de BD al dia (version {version_actual})")
+            _esquemas_verificados.add(os.path.abspath(self.db_path))
+            _migraciones_fallidas.pop(os.path.abspath(self.db_path), None)
+            return True
 
-        print()
         print("=" * 60)
-        print("MIGRACIONES COMPLETADAS EXITOSAMENTE")
+        print("INICIANDO MIGRACIONES DE BASE DE DATOS")
+        print(f"Version actual: {version_actual} -> {VERSION_ESQUEMA}")
         print("=" * 60)
         print()
 
-    def _migrar_numero_factura(self):
-        """Agrega el campo numero_factura a la tabla facturas si no existe."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Verificar si la columna ya existe
-            cursor.execute("PRAGMA table_info(facturas)")
-            columnas = [columna[1] for columna in cursor.fetchall()]
-
-            if "numero_factura" not in columnas:
-                print("[OK] Agregando campo 'numero_factura' a tabla facturas...")
-                cursor.execute("""
-                    ALTER TABLE facturas
-                    ADD COLUMN numero_factura TEXT
-                """)
-                conn.commit()
-                print("  [OK] Campo 'numero_factura' agregado exitosamente")
-            else:
-                print("[OK] Campo 'numero_factura' ya existe en tabla facturas")
-
-            conn.close()
-
+            self._crear_tabla_version()
         except sqlite3.Error as e:
-            print(f"  [ERROR] Error al migrar campo numero_factura: {e}")
-
-    def _migrar_tabla_secuencias(self):
-        """Crea la tabla de secuencias de facturación si no existe."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Verificar si la tabla existe
-            cursor.execute("""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name='secuencias_facturacion'
-            """)
-            tabla_existe = cursor.fetchone() is not None
-
-            if not tabla_existe:
-                print("[OK] Creando tabla 'secuencias_facturacion'...")
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS secuencias_facturacion (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        establecimiento TEXT NOT NULL,
-                        punto_emision TEXT NOT NULL,
-                        secuencial INTEGER NOT NULL DEFAULT 0,
-                        activo INTEGER NOT NULL DEFAULT 1,
-                        fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(establecimiento, punto_emision)
+            print(f"  [ERROR] No se pudo crear la tabla schema_version: {e}")
+            _migraciones_fallidas[os.path.abspath(self.db_path)] = f"No se pudo crear la tabla schema_version: {e}"
+            return False
+
+        for version, descripcion, migracion in MIGRACIONES:
+            if version <= version_actual:
+                continue
+
+            print(f"[{version}] {descripcion}...")
+            try:
+                # Una transacción por versión: se aplica completa o no se aplica
+                with get_pool().transaction(self.db_path, immediate=True) as conn:
+                    migracion(conn.cursor())
+                    conn.execute(
+                        "INSERT INTO schema_version (version, descripcion) VALUES (?, ?)",
+                        (version, descripcion)
                     )
-                """)
-                conn.commit()
-                print("  [OK] Tabla 'secuencias_facturacion' creada exitosamente")
-
-                # Inicializar la secuencia 001-010
-                print("[OK] Inicializando secuencia 001-010...")
-                cursor.execute("""
-                    INSERT OR IGNORE INTO secuencias_facturacion
-                    (establecimiento, punto_emision, secuencial, activo)
-                    VALUES ('001', '010', 0, 1)
-                """)
-                conn.commit()
-                print("  [OK] Secuencia 001-010 inicializada (comienza desde 1)")
-            else:
-                print("[OK] Tabla 'secuencias_facturacion' ya existe")
-
-                # Verificar si existe la secuencia 001-010
-                cursor.execute("""
-                    SELECT id FROM secuencias_facturacion
-                    WHERE establecimiento = '001' AND punto_emision = '010'
-                """)
-                if not cursor.fetchone():
-                    print("[OK] Inicializando secuencia 001-010...")
-                    cursor.execute("""
-                        INSERT INTO secuencias_facturacion
-                        (establecimiento, punto_emision, secuencial, activo)
-                        VALUES ('001', '010', 0, 1)
-                    """)
-                    conn.commit()
-                    print("  [OK] Secuencia 001-010 inicializada")
-                else:
-                    print("[OK] Secuencia 001-010 ya existe")
-
-            conn.close()
+            except sqlite3.Error as e:
+                # Las siguientes versiones pueden depender de esta: se detiene aquí
+                print(f"  [ERROR] Migracion {version} fallida, se revierte: {e}")
+                _migraciones_fallidas[os.path.abspath(self.db_path)] = f"Migracion {version} ({descripcion}): {e}"
+                return False
 
-        except sqlite3.Error as e:
-            print(f"  [ERROR] Error al migrar tabla secuencias: {e}")
+        _esquemas_verificados.add(os.path.abspath(self.db_path))
+        _migraciones_fallidas.pop(os.path.abspath(self.db_path), None)
+
+        print()
+        print("=" * 60)
+        print("MIGRACIONES COMPLETADAS EXITOSAMENTE")
+        print("=" * 60)
+        print()
+        return True
 
     def _migrar_tabla_logs(self):
         """Verifica que exista la carpeta de logs."""
@@ -163,37 +718,49 @@ class DatabaseMigrator:
                 print("[OK] Creando carpeta de logs...")
                 os.makedirs(logs_path, exist_ok=True)
                 print(f"  [OK] Carpeta de logs creada en: {logs_path}")
-            else:
-                print("[OK] Carpeta de logs ya existe")
 
         except Exception as e:
             print(f"  [ERROR] Error al crear carpeta de logs: {e}")
 
-    def _migrar_tercera_edad(self):
-        """Agrega el campo tercera_edad a la tabla facturas si no existe."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Verificar si la columna ya existe
-            cursor.execute("PRAGMA table_info(facturas)")
-            columnas = [columna[1] for columna in cursor.fetchall()]
-
-            if "tercera_edad" not in columnas:
-                print("[OK] Agregando campo 'tercera_edad' a tabla facturas...")
-                cursor.execute("""
-                    ALTER TABLE facturas
-                    ADD COLUMN tercera_edad INTEGER DEFAULT 0
-                """)
-                conn.commit()
-                print("  [OK] Campo 'tercera_edad' agregado exitosamente")
-            else:
-                print("[OK] Campo 'tercera_edad' ya existe en tabla facturas")
 
-            conn.close()
+def asegurar_esquema(db_path):
+    """
+    Garantiza que la BD esté migrada antes de usarla.
 
-        except sqlite3.Error as e:
-            print(f"  [ERROR] Error al agregar campo tercera_edad: {e}")
+    Pensada para los constructores de modelos y helpers: después de la
+    primera verificación en el proceso solo cuesta una búsqueda en memoria.
+    Si una migración ya falló en este proceso no se reintenta (ver
+    migracion_fallida); ejecutar_migraciones sí vuelve a intentarla. En
+    modo servidor no migra: lo hace el servidor de BD al iniciar.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        bool: True si la BD está en la última versión
+    """
+    ruta = os.path.abspath(db_path)
+    if ruta in _esquemas_verificados:
+        return True
+    if ruta in _migraciones_fallidas:
+        return False
+    if get_cliente_servidor() is not None:
+        # Modo servidor: el servidor de BD migra el esquema; la caja no escribe en el archivo
+        return True
+    return DatabaseMigrator(db_path).run_all_migrations()
+
+
+def migracion_fallida(db_path):
+    """
+    Error de la migración que falló en este proceso.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        str: Descripción del error, o None si no falló ninguna
+    """
+    return _migraciones_fallidas.get(os.path.abspath(db_path))
 
 
 def ejecutar_migraciones(db_path):
@@ -226,7 +793,7 @@ def migrar_bd_externa(bd_externa_path, bd_destino_path):
     Returns:
         tuple: (exito: bool, mensaje: str)
     """
-    import shutil
+    from app.helpers.backup_helper import copiar_bd
 
     print("\n" + "=" * 60)
     print("IMPORTACION Y MIGRACION DE BASE DE DATOS EXTERNA")
@@ -245,43 +812,57 @@ def migrar_bd_externa(bd_externa_path, bd_destino_path):
         # 2. Verificar que BD externa es valida
         print("[1/4] Validando BD externa...")
         try:
-            conn = sqlite3.connect(bd_externa_path)
-            cursor = conn.cursor()
+            with get_pool().connection(bd_externa_path) as conn:
+                cursor = conn.cursor()
 
-            # Verificar que tenga tablas basicas
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tablas = [row[0] for row in cursor.fetchall()]
+                # Verificar que tenga tablas basicas
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                tablas = [row[0] for row in cursor.fetchall()]
 
-            if 'clientes' not in tablas:
-                conn.close()
-                mensaje = "[ERROR] BD externa no tiene tabla 'clientes'. No es una BD valida del sistema."
-                print(mensaje)
-                return False, mensaje
+                if 'clientes' not in tablas:
+                    mensaje = "[ERROR] BD externa no tiene tabla 'clientes'. No es una BD valida del sistema."
+                    print(mensaje)
+                    return False, mensaje
 
-            # Obtener info de la BD
-            cursor.execute("SELECT COUNT(*) FROM clientes")
-            num_clientes = cursor.fetchone()[0]
-            print(f"  [OK] BD valida: {len(tablas)} tablas, {num_clientes} clientes")
-
-            conn.close()
+                # Obtener info de la BD
+                cursor.execute("SELECT COUNT(*) FROM clientes")
+                num_clientes = cursor.fetchone()[0]
+                print(f"  [OK] BD valida: {len(tablas)} tablas, {num_clientes} clientes")
 
         except sqlite3.Error as e:
             mensaje = f"[ERROR] BD externa corrupta o invalida: {e}"
             print(mensaje)
             return False, mensaje
 
-        # 3. Crear backup de BD destino si existe
+        # Cerrar las conexiones del pool: la BD externa se renombra despues de
+        # importarla y la BD destino no debe tener conexiones abiertas al reemplazarla
+        get_pool().drain()
+
+        # 3. Crear backup de BD destino si existe. Las copias usan la API de
+        # backup de SQLite (incluye el archivo -wal y verifica la integridad)
+        backup_path = None
         if os.path.exists(bd_destino_path):
             print("[2/4] Creando backup de BD actual...")
             backup_path = bd_destino_path + ".backup_antes_importar"
-            shutil.copy2(bd_destino_path, backup_path)
+            exito, mensaje = copiar_bd(bd_destino_path, backup_path, pausa=0)
+            if not exito:
+                mensaje = f"[ERROR] No se pudo respaldar la BD actual: {mensaje}"
+                print(mensaje)
+                return False, mensaje
             print(f"  [OK] Backup creado: {backup_path}")
         else:
             print("[2/4] No hay BD destino, se creara nueva")
 
         # 4. Copiar BD externa a ubicacion destino
         print("[3/4] Copiando BD externa...")
-        shutil.copy2(bd_externa_path, bd_destino_path)
+        exito, mensaje = copiar_bd(bd_externa_path, bd_destino_path, pausa=0)
+        if not exito:
+            if backup_path:
+                copiar_bd(backup_path, bd_destino_path, pausa=0)
+                print(f"  [OK] BD actual restaurada desde: {backup_path}")
+            mensaje = f"[ERROR] No se pudo copiar la BD externa: {mensaje}"
+            print(mensaje)
+            return False, mensaje
         print(f"  [OK] BD copiada a: {bd_destino_path}")
 
         # 5. Ejecutar migraciones sobre la BD importada
@@ -0,0 +1,54 @@
+"""
+Exportación del gráfico de recaudación a imagen o PDF con matplotlib.
+
+matplotlib es opcional: la pantalla dibuja el gráfico con QPainter
+(app/views/grafico_barras.py) y solo la exportación lo usa. Si no está
+instalado, exportar_grafico_barras lanza ImportError y la vista guarda la
+imagen de pantalla.
+"""
+
+
+def exportar_grafico_barras(ruta, titulo, etiquetas, valores, titulo_x="", titulo_y=""):
+    """
+    Guarda un gráfico de barras con el estilo del panel de recaudación.
+
+    Args:
+        ruta: Archivo de salida (.png, .pdf, .svg)
+        titulo: Título del gráfico
+        etiquetas: Texto bajo cada barra
+        valores: Altura de cada barra
+        titulo_x: Nombre del eje X
+        titulo_y: Nombre del eje Y
+    """
+    from matplotlib.figure import Figure
+
+    figura = Figure(figsize=(8, 5))
+    ax = figura.add_subplot(111)
+
+    barras = ax.bar(etiquetas, valores,
+                    color=['#3498db' if v > 0 else '#d5dbdb' for v in valores],
+                    alpha=0.8,
+                    width=0.7)
+    for barra in barras:
+        altura = barra.get_height()
+        if altura > 0:
+            ax.text(barra.get_x() + barra.get_width() / 2, altura + 0.2,
+                    str(int(altura)),
+                    ha='center', va='bottom',
+                    fontsize=10, fontweight='bold',
+                    color='#2c3e50')
+
+    ax.set_xlabel(titulo_x, fontsize=12, fontweight="bold", color="#2c3e50")
+    ax.set_ylabel(titulo_y, fontsize=12, fontweight="bold", color="#2c3e50")
+    ax.set_title(titulo, fontsize=14, fontweight="bold", color="#2c3e50", pad=20)
+    ax.set_xticks(range(len(etiquetas)))
+    ax.set_xticklabels(etiquetas, rotation=45, fontsize=10, color="#2c3e50")
+    ax.set_yticks([])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#ddd')
+    ax.spines['bottom'].set_color('#ddd')
+    ax.grid(axis='y', linestyle='--', alpha=0.7, color='#ddd')
+
+    figura.tight_layout()
+    figura.savefig(ruta)
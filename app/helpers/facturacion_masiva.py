@@ -0,0 +1,242 @@
+"""
+Facturación mensual masiva.
+
+Genera de una vez la factura del mes para cada cliente activo a partir de su
+última lectura, sin pasar por FacturasWidget. Se puede usar desde la interfaz
+(con callbacks de progreso y cancelación) o desde la línea de comandos:
+
+    python -m app.helpers.facturacion_masiva <mes> [ruta_a_base_datos]
+"""
+
+import sqlite3
+from datetime import datetime
+from app.database.connection import get_pool
+from app.models.factura import INSERT_FACTURA
+from app.helpers.database_migrator import asegurar_esquema
+from app.helpers.secuencia_facturacion import SecuenciaFacturacion
+from app.helpers.motor_tarifas import obtener_tarifario
+from app.helpers.contexto_cliente import invalidar_contexto_cliente
+
+
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+]
+
+TAMANO_LOTE = 500
+
+# Última lectura de cada medidor de un cliente activo que todavía no fue
+# facturada, con el saldo en deuda y el servicio/descuento de su última factura
+CONSULTA_PENDIENTES = """
+    WITH ultimas AS (
+        SELECT id, medidor_id, consumo, direccion,
+               ROW_NUMBER() OVER (
+                   PARTITION BY medidor_id ORDER BY fecha_lectura DESC, id DESC
+               ) AS orden
+        FROM lecturas
+    )
+    SELECT c.id, c.nombre_cliente, COALESCE(u.direccion, c.direccion),
+           u.id, COALESCE(u.consumo, 0), COALESCE(s.total_deuda, 0),
+           COALESCE(f.servicio, 'DOMICILIARIA'), COALESCE(f.tercera_edad, 0)
+    FROM clientes c
+    JOIN ultimas u ON u.medidor_id = c.id AND u.orden = 1
+    LEFT JOIN saldos_medidor s ON s.medidor_id = c.id
+    LEFT JOIN facturas f ON f.id = s.ultima_factura_id
+    WHERE (c.estado IS NULL OR c.estado = 1)
+      AND u.id NOT IN (SELECT lectura_id FROM facturas WHERE lectura_id IS NOT NULL)
+    ORDER BY c.id
+"""
+
+
+class FacturacionMasiva:
+    """Emite las facturas de un mes para todos los clientes activos."""
+
+    def __init__(self, db_path, establecimiento="001", punto_emision="010"):
+        """
+        Args:
+            db_path: Ruta a la base de datos SQLite
+            establecimiento: Código de establecimiento de la serie a usar
+            punto_emision: Código de punto de emisión de la serie a usar
+        """
+        self.db_path = db_path
+        self.establecimiento = establecimiento
+        self.punto_emision = punto_emision
+        asegurar_esquema(db_path)
+        self.secuencia = SecuenciaFacturacion(db_path)
+
+    def obtener_pendientes(self):
+        """
+        Lista los medidores que tienen una lectura sin facturar.
+
+        Returns:
+            list: Tuplas (medidor_id, nombre_cliente, direccion, lectura_id,
+            consumo, saldo_pendiente, servicio, tercera_edad)
+        """
+        try:
+            with get_pool().connection(self.db_path) as conn:
+                return conn.execute(CONSULTA_PENDIENTES).fetchall()
+        except sqlite3.Error as e:
+            print(f"[ERROR] Error al obtener lecturas pendientes de facturar: {e}")
+            return []
+
+    def facturar_mes(self, mes_facturacion, fecha_emision=None, progreso=None,
+                     cancelado=None, tamano_lote=TAMANO_LOTE):
+        """
+        Emite una factura en 'Deuda' por cada lectura pendiente.
+
+        Cada lote se numera y se inserta en su propia transacción (BEGIN
+        IMMEDIATE + executemany, con ejecutar_escritura: si una caja tiene el
+        bloqueo se reintenta el lote). Si se cancela, los lotes ya confirmados se
+        conservan y una nueva ejecución continúa con los medidores restantes,
+        porque las lecturas ya facturadas no vuelven a aparecer.
+
+        Args:
+            mes_facturacion: Nombre del mes (ej: "Enero")
+            fecha_emision: Fecha YYYY-MM-DD (default: hoy)
+            progreso: Función opcional progreso(procesadas, total) llamada tras cada lote
+            cancelado: Función opcional sin argumentos; si devuelve True se detiene
+            tamano_lote: Facturas por transacción
+
+        Returns:
+            dict: Resumen con total, facturadas, monto_total, saldo_pendiente,
+            primer_numero, ultimo_numero, cancelado, error y la lista facturas
+        """
+        if mes_facturacion not in MESES:
+            raise ValueError(f"Mes de facturacion invalido: {mes_facturacion}")
+        fecha_emision = fecha_emision or datetime.now().strftime("%Y-%m-%d")
+
+        pendientes = self.obtener_pendientes()
+        resumen = {
+            "total": len(pendientes),
+            "facturadas": 0,
+            "monto_total": 0.0,
+            "saldo_pendiente": 0.0,
+            "primer_numero": None,
+            "ultimo_numero": None,
+            "cancelado": False,
+            "error": None,
+            "facturas": [],
+        }
+        serie = f"{self.establecimiento}-{self.punto_emision}"
+
+        # Montos de todas las facturas en una sola operación vectorizada
+        if pendientes:
+            tarifario = obtener_tarifario(self.db_path, fecha_emision)
+            basicos, excedentes = tarifario.calcular_vector(
+                [pendiente[4] for pendiente in pendientes],
+                [pendiente[6] for pendiente in pendientes],
+                [pendiente[7] for pendiente in pendientes]
+            )
+            montos = list(zip(basicos.round(2).tolist(), excedentes.round(2).tolist()))
+
+        for inicio in range(0, len(pendientes), tamano_lote):
+            if cancelado and cancelado():
+                resumen["cancelado"] = True
+                break
+
+            lote = pendientes[inicio:inicio + tamano_lote]
+
+            def facturar_lote(conn, lote=lote, inicio=inicio):
+                cursor = conn.cursor()
+                secuenciales = self.secuencia.reservar_bloque(
+                    cursor, len(lote), self.establecimiento, self.punto_emision
+                )
+                if secuenciales is None:
+                    return None
+
+                filas = []
+                for indice, (pendiente, secuencial) in enumerate(zip(lote, secuenciales), inicio):
+                    filas.append(self._datos_factura(
+                        pendiente, montos[indice], secuencial, serie, mes_facturacion, fecha_emision
+                    ))
+                cursor.executemany(INSERT_FACTURA, filas)
+                return filas
+
+            try:
+                # Un lote por transacción: entre lotes las cajas pueden tomar el bloqueo
+                filas = get_pool().ejecutar_escritura(facturar_lote, self.db_path, "facturacion_masiva")
+            except sqlite3.Error as e:
+                resumen["error"] = str(e)
+                print(f"[ERROR] Error al facturar el lote {inicio // tamano_lote + 1}: {e}")
+                break
+            if filas is None:
+                resumen["error"] = f"No existe secuencia activa para {serie}"
+                break
+
+            for datos, pendiente in zip(filas, lote):
+                resumen["facturas"].append({
+                    "numero_factura": datos["numero_factura"],
+                    "medidor_id": datos["medidor_id"],
+                    "nombre_cliente": datos["nombre_cliente"],
+                    "monto_total": datos["monto_total"],
+                    "saldo_pendiente": pendiente[5],
+                })
+                resumen["monto_total"] += datos["monto_total"]
+                resumen["saldo_pendiente"] += pendiente[5]
+            resumen["facturadas"] += len(filas)
+            if progreso:
+                progreso(resumen["facturadas"], resumen["total"])
+
+        if resumen["facturas"]:
+            # En el servidor de BD las facturas quedan escritas al confirmar el lote del escritor
+            get_pool().al_confirmar(lambda: invalidar_contexto_cliente("facturas"), self.db_path)
+            numeros = sorted(factura["numero_factura"] for factura in resumen["facturas"])
+            resumen["primer_numero"], resumen["ultimo_numero"] = numeros[0], numeros[-1]
+
+        print(f"[OK] Facturacion de {mes_facturacion}: {resumen['facturadas']} de {resumen['total']} facturas emitidas")
+        return resumen
+
+    def _datos_factura(self, pendiente, montos, secuencial, serie, mes_facturacion, fecha_emision):
+        """Arma los parámetros de INSERT_FACTURA para una lectura pendiente."""
+        medidor_id, nombre_cliente, direccion, lectura_id, consumo, _, servicio, tercera_edad = pendiente
+        monto_basico, monto_excedente = montos
+        return {
+            "medidor_id": medidor_id,
+            "nombre_cliente": nombre_cliente,
+            "lectura_id": lectura_id,
+            "mes_facturacion": mes_facturacion,
+            "monto_total": round(monto_basico + monto_excedente, 2),
+            "fecha_emision": fecha_emision,
+            "estado": "Deuda",
+            "servicio": servicio,
+            "traspaso": 0.0,
+            "medidor": 0.0,
+            "reconexion": 0.0,
+            "multas_sesiones": 0.0,
+            "otros": 0.0,
+            "tarifa_basica": monto_basico,
+            "tarifa_excedente": monto_excedente,
+            "direccion": direccion,
+            "monto_lectura": consumo,
+            "conexion_nueva": 0.0,
+            "multas_mingas": 0.0,
+            "materiales": 0.0,
+            "numero_factura": self.secuencia.formatear_numero_factura(
+                secuencial, self.establecimiento, self.punto_emision
+            ),
+            "tercera_edad": tercera_edad,
+            "serie": serie,
+            "secuencial": secuencial,
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m app.helpers.facturacion_masiva <mes> [ruta_a_base_datos]")
+        sys.exit(2)
+
+    mes = sys.argv[1].capitalize()
+    db_path = sys.argv[2] if len(sys.argv) > 2 else "sistema_facturacion.db"
+
+    def mostrar_progreso(procesadas, total):
+        print(f"  {procesadas}/{total} facturas")
+
+    resultado = FacturacionMasiva(db_path).facturar_mes(mes, progreso=mostrar_progreso)
+    if resultado["facturadas"]:
+        print(f"Numeros: {resultado['primer_numero']} a {resultado['ultimo_numero']}")
+        print(f"Monto facturado: ${resultado['monto_total']:.2f}  Saldo anterior en deuda: ${resultado['saldo_pendiente']:.2f}")
+    if resultado["error"]:
+        print(f"[ERROR] {resultado['error']}")
+        sys.exit(1)
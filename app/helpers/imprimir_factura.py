@@ -1,8 +1,6 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
-from PyQt6.QtWidgets import QMessageBox
-import os
 import sys
 
 class ImprimirFactura:
@@ -13,7 +11,14 @@ class ImprimirFactura:
         self.servicios_otros = self.factura_data.get("Servicios Otros", [])
 
     def generar_pdf(self, output_path="factura.pdf"):
-        """Genera un archivo PDF en formato A4 con dos facturas en la misma hoja."""
+        """
+        Genera un archivo PDF en formato A4 con dos facturas en la misma hoja.
+
+        No muestra mensajes ni abre el archivo (se usa también sin interfaz).
+
+        Returns:
+            tuple: (exito, ruta del PDF o mensaje de error)
+        """
         try:
             c = canvas.Canvas(output_path, pagesize=A4)
             width, height = A4
@@ -201,8 +206,7 @@ class ImprimirFactura:
             dibujar_factura(height)
             dibujar_factura(mitad_altura)
             c.save()
-
-            QMessageBox.information(None, "Éxito", f"Factura generada en: {output_path}")
-            os.startfile(output_path)
+            return True, output_path
         except Exception as e:
-            QMessageBox.critical(None, "Error", f"No se pudo generar el PDF: {e}")
\ No newline at end of file
+            print(f"[ERROR] No se pudo generar el PDF {output_path}: {e}")
+            return False, str(e)
@@ -1,6 +1,4 @@
-import os
 from PyQt6.QtGui import QPainter, QFont, QPageSize, QPageLayout, QPen
-from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtPrintSupport import QPrinter
 from PyQt6.QtCore import Qt, QRectF
 
@@ -22,6 +20,7 @@ class ImprimirListado:
         Genera un archivo PDF con la lista de pagados o deudores con mejoras gráficas.
         
         :param output_path: Ruta donde se guardará el PDF.
+        :return: (exito, ruta del PDF o mensaje de error)
         """
         try:
             # Configurar el PDF Writer
@@ -94,9 +93,8 @@ class ImprimirListado:
 
             # Terminar el pintor
             painter.end()
-
-            # Mostrar mensaje de éxito
-            QMessageBox.information(None, "Éxito", f"Listado generado correctamente en: {output_path}")
-            os.startfile(output_path)  # Abrir el PDF en el visor predeterminado
+            return True, output_path
         except Exception as e:
-            QMessageBox.critical(None, "Error", f"No se pudo generar el PDF: {e}")
+            print(f"[ERROR] No se pudo generar el PDF {output_path}: {e}")
+            return False, str(e)
+
@@ -1,6 +1,5 @@
 from reportlab.lib.pagesizes import A4, letter
 from reportlab.pdfgen import canvas
-from PyQt6.QtWidgets import QMessageBox
 import os
 import sys
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
@@ -12,11 +11,16 @@ class ImprimirServicio:
         """Inicializa el componente con los datos del servicio."""
         self.servicio_data = servicio_data
 
-    def generar_pdf(self):
-        """Genera el PDF del comprobante de servicio."""
+    def generar_pdf(self, output_path="comprobante_servicio.pdf"):
+        """
+        Genera el PDF del comprobante de servicio.
+
+        Returns:
+            tuple: (exito, ruta del PDF o mensaje de error)
+        """
         try:
             # Crear el documento PDF
-            doc = SimpleDocTemplate("comprobante_servicio.pdf", pagesize=A4)
+            doc = SimpleDocTemplate(output_path, pagesize=A4)
             elements = []
 
             # Estilos
@@ -106,9 +110,9 @@ class ImprimirServicio:
 
             # Generar el PDF
             doc.build(elements)
-
-            # Abrir el PDF generado
-            os.startfile("comprobante_servicio.pdf")
+            return True, output_path
 
         except Exception as e:
-            QMessageBox.critical(None, "Error", f"Error al generar el PDF: {str(e)}") 
\ No newline at end of file
+            print(f"[ERROR] Error al generar el PDF {output_path}: {e}")
+            return False, str(e)
+ 
\ No newline at end of file
@@ -1,4 +1,5 @@
 import sqlite3
+from app.database.connection import get_pool
 
 
 def agregar_campo_numero_factura(db_path="sistema_facturacion.db"):
@@ -9,37 +10,35 @@ def agregar_campo_numero_factura(db_path="sistema_facturacion.db"):
     para poder mantener la trazabilidad y permitir ediciones sin perder el número.
     """
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        with get_pool().connection(db_path) as conn:
+            cursor = conn.cursor()
 
-        # Verificar si la columna ya existe
-        cursor.execute("PRAGMA table_info(facturas)")
-        columnas = [columna[1] for columna in cursor.fetchall()]
+            # Verificar si la columna ya existe
+            cursor.execute("PRAGMA table_info(facturas)")
+            columnas = [columna[1] for columna in cursor.fetchall()]
 
-        if "numero_factura" not in columnas:
-            # Agregar la columna
-            cursor.execute("""
-                ALTER TABLE facturas
-                ADD COLUMN numero_factura TEXT
-            """)
+            if "numero_factura" not in columnas:
+                # Agregar la columna
+                cursor.execute("""
+                    ALTER TABLE facturas
+                    ADD COLUMN numero_factura TEXT
+                """)
 
-            conn.commit()
-            print("✅ Campo 'numero_factura' agregado exitosamente a la tabla facturas")
-
-            # Migrar facturas antiguas (opcional)
-            # Las facturas antiguas tendrán NULL en numero_factura
-            # Podríamos generarles un número basado en el formato antiguo si se desea
-            cursor.execute("SELECT COUNT(*) FROM facturas WHERE numero_factura IS NULL")
-            facturas_antiguas = cursor.fetchone()[0]
+                conn.commit()
+                print("✅ Campo 'numero_factura' agregado exitosamente a la tabla facturas")
 
-            if facturas_antiguas > 0:
-                print(f"ℹ️  Hay {facturas_antiguas} facturas antiguas sin número de factura")
-                print("   Estas facturas mantendrán NULL hasta que sean editadas o reimpresas")
+                # Migrar facturas antiguas (opcional)
+                # Las facturas antiguas tendrán NULL en numero_factura
+                # Podríamos generarles un número basado en el formato antiguo si se desea
+                cursor.execute("SELECT COUNT(*) FROM facturas WHERE numero_factura IS NULL")
+                facturas_antiguas = cursor.fetchone()[0]
 
-        else:
-            print("ℹ️  El campo 'numero_factura' ya existe en la tabla facturas")
+                if facturas_antiguas > 0:
+                    print(f"ℹ️  Hay {facturas_antiguas} facturas antiguas sin número de factura")
+                    print("   Estas facturas mantendrán NULL hasta que sean editadas o reimpresas")
 
-        conn.close()
+            else:
+                print("ℹ️  El campo 'numero_factura' ya existe en la tabla facturas")
 
     except sqlite3.Error as e:
         print(f"❌ Error al agregar campo numero_factura: {e}")
@@ -54,36 +53,33 @@ def migrar_facturas_antiguas_formato_001_001(db_path="sistema_facturacion.db"):
     a las facturas antiguas que tienen numero_factura NULL.
     """
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        with get_pool().connection(db_path) as conn:
+            cursor = conn.cursor()
 
-        # Obtener todas las facturas sin número de factura
-        cursor.execute("SELECT id FROM facturas WHERE numero_factura IS NULL")
-        facturas_sin_numero = cursor.fetchall()
+            # Obtener todas las facturas sin número de factura
+            cursor.execute("SELECT id FROM facturas WHERE numero_factura IS NULL")
+            facturas_sin_numero = cursor.fetchall()
 
-        if not facturas_sin_numero:
-            print("ℹ️  No hay facturas antiguas para migrar")
-            conn.close()
-            return
+            if not facturas_sin_numero:
+                print("ℹ️  No hay facturas antiguas para migrar")
+                return
 
-        print(f"🔄 Migrando {len(facturas_sin_numero)} facturas antiguas...")
+            print(f"🔄 Migrando {len(facturas_sin_numero)} facturas antiguas...")
 
-        for factura in facturas_sin_numero:
-            factura_id = factura[0]
-            # Generar número en formato antiguo 001-001-XXXXXXXXX
-            numero_antiguo = f"001-001-{factura_id:09d}"
+            for factura in facturas_sin_numero:
+                factura_id = factura[0]
+                # Generar número en formato antiguo 001-001-XXXXXXXXX
+                numero_antiguo = f"001-001-{factura_id:09d}"
 
-            cursor.execute("""
-                UPDATE facturas
-                SET numero_factura = ?
-                WHERE id = ?
-            """, (numero_antiguo, factura_id))
+                cursor.execute("""
+                    UPDATE facturas
+                    SET numero_factura = ?
+                    WHERE id = ?
+                """, (numero_antiguo, factura_id))
 
-        conn.commit()
-        print(f"✅ {len(facturas_sin_numero)} facturas antiguas migradas exitosamente")
-        print("   Formato usado: 001-001-XXXXXXXXX")
-
-        conn.close()
+            conn.commit()
+            print(f"✅ {len(facturas_sin_numero)} facturas antiguas migradas exitosamente")
+            print("   Formato usado: 001-001-XXXXXXXXX")
 
     except sqlite3.Error as e:
         print(f"❌ Error al migrar facturas antiguas: {e}")
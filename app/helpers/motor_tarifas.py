@@ -0,0 +1,227 @@
+"""
+Motor de tarifas.
+
+Carga las tablas tarifas y tarifas_excedente una sola vez por base de datos y
+las deja compiladas en objetos Tarifario. Lo usan el formulario de facturas,
+la edición de facturas, la facturación masiva y los reportes, así todos
+calculan con las mismas reglas:
+
+- Tarifa básica según el servicio (con descuento si es tercera edad).
+- El consumo por encima de consumo_base se cobra completo al precio del tramo
+  en el que cae el consumo total.
+"""
+
+import bisect
+import os
+import sqlite3
+from datetime import date
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
+
+
+# Servicio que se usa cuando llega uno desconocido (mismo criterio que el formulario)
+SERVICIO_POR_DEFECTO = "INDUSTRIAL"
+
+# Tarifarios compilados por BD: {ruta_absoluta: [Tarifario, ...] ordenados por vigencia}
+_tarifarios = {}
+
+
+class Tarifario:
+    """Una versión de tarifas lista para calcular."""
+
+    def __init__(self, version, vigente_desde, basicas, consumo_base, descuento_tercera_edad, tramos):
+        """
+        Args:
+            version: Número de versión de la tarifa
+            vigente_desde: Fecha YYYY-MM-DD desde la que rige
+            basicas: Diccionario {servicio: tarifa_basica}
+            consumo_base: m³ incluidos en la tarifa básica
+            descuento_tercera_edad: Fracción que se descuenta de la básica (0.5 = 50%)
+            tramos: Lista de (consumo_hasta, precio_m3); consumo_hasta None = sin límite
+        """
+        self.version = version
+        self.vigente_desde = vigente_desde
+        self.basicas = basicas
+        self.consumo_base = consumo_base
+        self.descuento_tercera_edad = descuento_tercera_edad
+
+        tramos = sorted(tramos, key=lambda tramo: float("inf") if tramo[0] is None else tramo[0])
+        self.limites = [float("inf") if hasta is None else hasta for hasta, _ in tramos]
+        self.precios = [precio for _, precio in tramos]
+
+    def tarifa_basica(self, servicio, tercera_edad=False):
+        basica = self.basicas.get(servicio, self.basicas.get(SERVICIO_POR_DEFECTO, 0.0))
+        if tercera_edad:
+            basica = basica * (1 - self.descuento_tercera_edad)
+        return basica
+
+    def precio_excedente(self, consumo):
+        """Precio por m³ del tramo en el que cae el consumo (consumo <= consumo_hasta)."""
+        indice = bisect.bisect_left(self.limites, consumo)
+        return self.precios[min(indice, len(self.precios) - 1)]
+
+    def calcular(self, consumo, servicio, tercera_edad=False):
+        """
+        Calcula los montos de una factura.
+
+        Args:
+            consumo: Consumo del mes en m³
+            servicio: DOMICILIARIA, COMERCIAL o INDUSTRIAL
+            tercera_edad: True si aplica el descuento de tercera edad
+
+        Returns:
+            tuple: (monto_basico, monto_excedente)
+        """
+        monto_basico = self.tarifa_basica(servicio, tercera_edad)
+        if consumo <= self.consumo_base:
+            return monto_basico, 0.0
+        return monto_basico, (consumo - self.consumo_base) * self.precio_excedente(consumo)
+
+    def calcular_vector(self, consumos, servicios, tercera_edad):
+        """
+        Calcula los montos de muchas facturas en una sola operación con NumPy.
+
+        Args:
+            consumos: Secuencia de consumos en m³
+            servicios: Secuencia de servicios (uno por consumo) o un único servicio
+            tercera_edad: Secuencia de 0/1 (uno por consumo) o un único valor
+
+        Returns:
+            tuple: (montos_basicos, montos_excedentes) como arreglos de NumPy
+        """
+        import numpy as np
+
+        consumos = np.asarray(consumos, dtype=np.float64)
+        tercera_edad = np.broadcast_to(np.asarray(tercera_edad, dtype=bool), consumos.shape)
+
+        if isinstance(servicios, str):
+            basicas = np.full(consumos.shape, self.tarifa_basica(servicios))
+        else:
+            # Búsqueda en diccionario: más rápida que np.unique sobre cadenas
+            por_defecto = self.tarifa_basica(SERVICIO_POR_DEFECTO)
+            basicas = np.fromiter(
+                (self.basicas.get(servicio, por_defecto) for servicio in servicios),
+                dtype=np.float64, count=len(consumos)
+            )
+        montos_basicos = np.where(tercera_edad, basicas * (1 - self.descuento_tercera_edad), basicas)
+
+        limites = np.array(self.limites)
+        indices_tramo = np.minimum(np.searchsorted(limites, consumos, side="left"), len(self.precios) - 1)
+        precios = np.array(self.precios)[indices_tramo]
+        montos_excedentes = np.where(
+            consumos > self.consumo_base, (consumos - self.consumo_base) * precios, 0.0
+        )
+        return montos_basicos, montos_excedentes
+
+
+def _cargar_tarifarios(db_path):
+    """Lee todas las versiones de tarifas de la BD y las compila."""
+    asegurar_esquema(db_path)
+    with get_pool().connection(db_path) as conn:
+        filas = conn.execute("""
+            SELECT version, servicio, tarifa_basica, consumo_base, descuento_tercera_edad, vigente_desde
+            FROM tarifas
+            ORDER BY vigente_desde, version
+        """).fetchall()
+        tramos = conn.execute("""
+            SELECT version, consumo_hasta, precio_m3 FROM tarifas_excedente
+        """).fetchall()
+
+    versiones = {}
+    for version, servicio, basica, consumo_base, descuento, vigente_desde in filas:
+        datos = versiones.setdefault(version, {
+            "vigente_desde": vigente_desde,
+            "basicas": {},
+            "consumo_base": consumo_base,
+            "descuento": descuento,
+            "tramos": [],
+        })
+        datos["basicas"][servicio] = basica
+    for version, hasta, precio in tramos:
+        if version in versiones:
+            versiones[version]["tramos"].append((hasta, precio))
+
+    return [
+        Tarifario(version, datos["vigente_desde"], datos["basicas"], datos["consumo_base"],
+                  datos["descuento"], datos["tramos"])
+        for version, datos in versiones.items()
+        if datos["tramos"]
+    ]
+
+
+def obtener_tarifario(db_path, fecha=None):
+    """
+    Devuelve la tarifa vigente en una fecha.
+
+    La primera llamada por BD lee las tablas de tarifas; las siguientes usan la
+    versión compilada en memoria.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+        fecha: Fecha YYYY-MM-DD (default: hoy)
+
+    Returns:
+        Tarifario: Versión vigente
+    """
+    clave = os.path.abspath(db_path)
+    tarifarios = _tarifarios.get(clave)
+    if tarifarios is None:
+        tarifarios = _cargar_tarifarios(db_path)
+        if not tarifarios:
+            raise ValueError(f"No hay tarifas registradas en {db_path}")
+        _tarifarios[clave] = tarifarios
+
+    if fecha is None:
+        fecha = date.today().isoformat()
+    # Una versión con vigente_desde futuro todavía no se aplica
+    vigentes = [tarifario for tarifario in tarifarios if tarifario.vigente_desde <= fecha]
+    return vigentes[-1] if vigentes else tarifarios[0]
+
+
+def invalidar_tarifas(db_path=None):
+    """Descarta las tarifas compiladas (de una BD o de todas) para releerlas."""
+    if db_path is None:
+        _tarifarios.clear()
+    else:
+        _tarifarios.pop(os.path.abspath(db_path), None)
+
+
+def registrar_version_tarifas(db_path, vigente_desde, basicas, tramos,
+                              consumo_base=10, descuento_tercera_edad=0.5):
+    """
+    Agrega una nueva versión de tarifas.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+        vigente_desde: Fecha YYYY-MM-DD desde la que rige
+        basicas: Diccionario {servicio: tarifa_basica}
+        tramos: Lista de (consumo_hasta, precio_m3); el último con consumo_hasta None
+        consumo_base: m³ incluidos en la tarifa básica
+        descuento_tercera_edad: Fracción de descuento sobre la básica
+
+    Returns:
+        int: Número de la versión creada; None si hubo un error
+    """
+    def registrar(conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM tarifas")
+        version = cursor.fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO tarifas (version, servicio, tarifa_basica, consumo_base, descuento_tercera_edad, vigente_desde)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(version, servicio, basica, consumo_base, descuento_tercera_edad, vigente_desde)
+              for servicio, basica in basicas.items()])
+        cursor.executemany(
+            "INSERT INTO tarifas_excedente (version, consumo_hasta, precio_m3) VALUES (?, ?, ?)",
+            [(version, hasta, precio) for hasta, precio in tramos]
+        )
+        return version
+
+    try:
+        version = get_pool().ejecutar_escritura(registrar, db_path, "registrar_tarifas")
+        invalidar_tarifas(db_path)
+        print(f"[OK] Tarifas version {version} registradas (vigentes desde {vigente_desde})")
+        return version
+    except sqlite3.Error as e:
+        print(f"[ERROR] Error al registrar tarifas: {e}")
+        return None
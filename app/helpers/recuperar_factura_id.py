@@ -1,4 +1,5 @@
 import sqlite3
+from app.database.connection import get_pool
 
 class RecuperarFacturaID:
     def __init__(self, db_path):
@@ -16,20 +17,19 @@ class RecuperarFacturaID:
         :return: El ID de la factura (int) o None si no se encuentra.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
 
-            if factura_id:
-                # Buscar una factura específica por su ID
-                query = "SELECT id FROM facturas WHERE id = ?"
-                cursor.execute(query, (factura_id,))
-            else:
-                # Obtener el ID más reciente de la factura
-                query = "SELECT id FROM facturas ORDER BY id DESC LIMIT 1"
-                cursor.execute(query)
+                if factura_id:
+                    # Buscar una factura específica por su ID
+                    query = "SELECT id FROM facturas WHERE id = ?"
+                    cursor.execute(query, (factura_id,))
+                else:
+                    # Obtener el ID más reciente de la factura
+                    query = "SELECT id FROM facturas ORDER BY id DESC LIMIT 1"
+                    cursor.execute(query)
 
-            resultado = cursor.fetchone()
-            conn.close()
+                resultado = cursor.fetchone()
 
             return resultado[0] if resultado else None
 
@@ -1,4 +1,5 @@
 import sqlite3
+from app.database.connection import get_pool
 
 class RecuperarLecturas:
     def __init__(self, db_path):
@@ -12,19 +13,18 @@ class RecuperarLecturas:
         :return: Un diccionario con los valores de consumo_anterior y consumo_actual o None si no se encuentra.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
 
-            query = """
-                SELECT lectura_anterior, lectura_actual
-                FROM lecturas
-                WHERE medidor_id = ?
-                ORDER BY fecha_lectura DESC
-                LIMIT 1
-            """
-            cursor.execute(query, (medidor_id,))
-            resultado = cursor.fetchone()
-            conn.close()
+                query = """
+                    SELECT lectura_anterior, lectura_actual
+                    FROM lecturas
+                    WHERE medidor_id = ?
+                    ORDER BY fecha_lectura DESC
+                    LIMIT 1
+                """
+                cursor.execute(query, (medidor_id,))
+                resultado = cursor.fetchone()
 
             if resultado:
                 return {
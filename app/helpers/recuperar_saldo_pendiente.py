@@ -1,27 +1,36 @@
 import sqlite3
-import time
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
 
 class SaldoPendienteHelper:
     def __init__(self, db_path):
         self.db_path = db_path
+        # saldos_medidor y sus triggers llegan por migración
+        asegurar_esquema(db_path)
 
-    def obtener_saldo_pendiente(self, medidor_id):
-        """Busca facturas con estado 'Deuda' y suma sus montos."""
-        try:
-            conn_saldo = sqlite3.connect(self.db_path)
-            cursor_saldo = conn_saldo.cursor()
-
-            query_saldo = """
-                SELECT id, monto_total FROM facturas 
-                WHERE medidor_id = ? AND estado = 'Deuda'
-            """
-            cursor_saldo.execute(query_saldo, (medidor_id,))
-            facturas_deuda = cursor_saldo.fetchall()
-
-            saldo_pendiente = sum(factura[1] for factura in facturas_deuda) if facturas_deuda else 0.00
+    def obtener_resumen_deuda(self, medidor_id):
+        """
+        Lee el saldo materializado del medidor (una lectura por clave primaria).
 
-            conn_saldo.close()
-            return saldo_pendiente
+        Returns:
+            dict: total_deuda, num_deudas, mes_deuda_antigua y ultimo_estado;
+            en cero si el medidor no tiene facturas
+        """
+        resumen = {"total_deuda": 0.00, "num_deudas": 0, "mes_deuda_antigua": None, "ultimo_estado": None}
+        try:
+            with get_pool().connection(self.db_path) as conn:
+                fila = conn.execute("""
+                    SELECT total_deuda, num_deudas, mes_deuda_antigua, ultimo_estado
+                    FROM saldos_medidor
+                    WHERE medidor_id = ?
+                """, (medidor_id,)).fetchone()
+            if fila:
+                resumen.update(zip(("total_deuda", "num_deudas", "mes_deuda_antigua", "ultimo_estado"), fila))
+            return resumen
         except sqlite3.Error as e:
-            print(f"Error al recuperar saldo pendiente: {e}")
-            return 0.00
+            print(f"Error al recuperar resumen de deuda: {e}")
+            return resumen
+
+    def obtener_saldo_pendiente(self, medidor_id):
+        """Suma de las facturas en estado 'Deuda' del medidor."""
+        return self.obtener_resumen_deuda(medidor_id)["total_deuda"]
@@ -1,5 +1,7 @@
 import sqlite3
 from pathlib import Path
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
 
 
 class SecuenciaFacturacion:
@@ -18,166 +20,161 @@ class SecuenciaFacturacion:
             db_path: Ruta a la base de datos SQLite
         """
         self.db_path = db_path
-        self._crear_tabla_secuencias()
+        # La tabla secuencias_facturacion y la secuencia 001-010 se crean por migración
+        asegurar_esquema(db_path)
 
-    def _crear_tabla_secuencias(self):
-        """
-        Crea la tabla de secuencias si no existe.
-
-        Campos:
-        - id: ID autoincremental
-        - establecimiento: Código de establecimiento (ej: "001")
-        - punto_emision: Código de punto de emisión (ej: "001" o "010")
-        - secuencial: Último número secuencial utilizado
-        - activo: Indica si esta secuencia está activa (1) o no (0)
-        - fecha_creacion: Fecha de creación de la secuencia
+    def obtener_siguiente_numero(self, establecimiento="001", punto_emision="010"):
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        Obtiene y reserva el siguiente número de factura disponible en la secuencia.
 
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS secuencias_facturacion (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    establecimiento TEXT NOT NULL,
-                    punto_emision TEXT NOT NULL,
-                    secuencial INTEGER NOT NULL DEFAULT 0,
-                    activo INTEGER NOT NULL DEFAULT 1,
-                    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(establecimiento, punto_emision)
-                )
-            """)
-
-            conn.commit()
-            conn.close()
-
-            # Inicializar la nueva secuencia 001-010 si no existe
-            self._inicializar_secuencia_001_010()
+        IMPORTANTE: Esta función entrega primero el menor número libre (hueco) de
+        la secuencia. Si se elimina una factura, su número será reutilizado.
 
-        except sqlite3.Error as e:
-            print(f"Error al crear tabla de secuencias: {e}")
+        Args:
+            establecimiento: Código de establecimiento (default: "001")
+            punto_emision: Código de punto de emisión (default: "010")
 
-    def _inicializar_secuencia_001_010(self):
-        """
-        Inicializa la secuencia 001-010 si no existe.
-        Esta es la nueva secuencia que comienza desde 1.
+        Returns:
+            str: Número de factura formateado (ej: "001-010-0000000001")
+            None: Si hay un error
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Verificar si ya existe la secuencia 001-010
-            cursor.execute("""
-                SELECT id FROM secuencias_facturacion
-                WHERE establecimiento = '001' AND punto_emision = '010'
-            """)
+            secuencial_nuevo = get_pool().ejecutar_escritura(
+                lambda conn: self.reservar_secuencial(conn.cursor(), establecimiento, punto_emision),
+                self.db_path, "obtener_siguiente_numero"
+            )
 
-            if not cursor.fetchone():
-                # Insertar la nueva secuencia
-                cursor.execute("""
-                    INSERT INTO secuencias_facturacion (establecimiento, punto_emision, secuencial, activo)
-                    VALUES ('001', '010', 0, 1)
-                """)
-                conn.commit()
-                print("Secuencia 001-010 inicializada correctamente")
+            if secuencial_nuevo is None:
+                print(f"[ERROR] No existe secuencia activa para {establecimiento}-{punto_emision}")
+                return None
 
-            conn.close()
+            # Formatear como 001-010-0000000001 (10 dígitos para el secuencial)
+            numero_factura = self.formatear_numero_factura(secuencial_nuevo, establecimiento, punto_emision)
+            print(f"[OK] Número de factura generado: {numero_factura} (primer número disponible)")
+            return numero_factura
 
         except sqlite3.Error as e:
-            print(f"Error al inicializar secuencia 001-010: {e}")
+            print(f"[ERROR] Error al obtener siguiente número de factura: {e}")
+            return None
 
-    def obtener_siguiente_numero(self, establecimiento="001", punto_emision="010"):
+    def reservar_secuencial(self, cursor, establecimiento="001", punto_emision="010"):
         """
-        Obtiene y reserva el siguiente número de factura disponible en la secuencia.
+        Reserva un secuencial dentro de la transacción del cursor recibido.
 
-        IMPORTANTE: Esta función busca el primer número disponible (hueco) en la
-        secuencia de facturas. Si se elimina una factura, su número será reutilizado.
+        Toma el menor hueco de huecos_facturacion o, si no hay, incrementa el
+        contador de la secuencia. Ambos casos son lecturas por índice, sin
+        importar cuántas facturas existan.
 
         Args:
-            establecimiento: Código de establecimiento (default: "001")
-            punto_emision: Código de punto de emisión (default: "010")
+            cursor: Cursor de una transacción de escritura abierta
+            establecimiento: Código de establecimiento
+            punto_emision: Código de punto de emisión
 
         Returns:
-            str: Número de factura formateado (ej: "001-010-0000000001")
-            None: Si hay un error
+            int: Secuencial reservado
+            None: Si la secuencia no existe o está inactiva
         """
-        conn = None
-        try:
-            # Conectar con isolation_level DEFERRED para transacción explícita
-            conn = sqlite3.connect(self.db_path, isolation_level='DEFERRED')
-            cursor = conn.cursor()
+        cursor.execute("""
+            SELECT secuencial
+            FROM secuencias_facturacion
+            WHERE establecimiento = ? AND punto_emision = ? AND activo = 1
+        """, (establecimiento, punto_emision))
+        fila = cursor.fetchone()
+        if not fila:
+            return None
 
-            # Prefijo del número de factura
-            prefijo = f"{establecimiento}-{punto_emision}-"
+        serie = f"{establecimiento}-{punto_emision}"
+        cursor.execute("SELECT MIN(secuencial) FROM huecos_facturacion WHERE serie = ?", (serie,))
+        hueco = cursor.fetchone()[0]
+        if hueco is not None:
+            cursor.execute(
+                "DELETE FROM huecos_facturacion WHERE serie = ? AND secuencial = ?",
+                (serie, hueco)
+            )
+            return hueco
+
+        cursor.execute("""
+            UPDATE secuencias_facturacion
+            SET secuencial = secuencial + 1
+            WHERE establecimiento = ? AND punto_emision = ? AND activo = 1
+        """, (establecimiento, punto_emision))
+        return fila[0] + 1
+
+    def reservar_bloque(self, cursor, cantidad, establecimiento="001", punto_emision="010"):
+        """
+        Reserva varios secuenciales de una vez dentro de la transacción del cursor.
 
-            # Buscar el primer número disponible en la secuencia
-            # Obtener todos los números de factura existentes con este prefijo
-            cursor.execute("""
-                SELECT numero_factura
-                FROM facturas
-                WHERE numero_factura LIKE ?
-                ORDER BY numero_factura ASC
-            """, (f"{prefijo}%",))
-
-            numeros_existentes = cursor.fetchall()
-
-            # Extraer solo los secuenciales numéricos
-            secuenciales_usados = set()
-            for (numero_completo,) in numeros_existentes:
-                try:
-                    # Extraer la parte del secuencial (después del segundo guion)
-                    partes = numero_completo.split('-')
-                    if len(partes) == 3:
-                        secuencial = int(partes[2])
-                        secuenciales_usados.add(secuencial)
-                except (ValueError, IndexError):
-                    continue
-
-            # Buscar el primer número disponible (el primer hueco o el siguiente)
-            secuencial_nuevo = 1
-            while secuencial_nuevo in secuenciales_usados:
-                secuencial_nuevo += 1
-
-            # Actualizar la tabla de secuencias con el mayor valor encontrado
-            # (solo para mantener un registro del último número usado)
-            cursor.execute("""
-                UPDATE secuencias_facturacion
-                SET secuencial = ?
-                WHERE establecimiento = ? AND punto_emision = ? AND activo = 1
-            """, (secuencial_nuevo, establecimiento, punto_emision))
+        Primero se usan los huecos más bajos de la serie y el resto sale del
+        contador con un único UPDATE.
 
-            if cursor.rowcount == 0:
-                print(f"[ERROR] No existe secuencia activa para {establecimiento}-{punto_emision}")
-                return None
+        Args:
+            cursor: Cursor de una transacción de escritura abierta
+            cantidad: Número de secuenciales a reservar
+            establecimiento: Código de establecimiento
+            punto_emision: Código de punto de emisión
 
-            # COMMIT EXPLÍCITO - CRÍTICO
-            conn.commit()
+        Returns:
+            list: Secuenciales reservados en orden ascendente
+            None: Si la secuencia no existe o está inactiva
+        """
+        cursor.execute("""
+            SELECT secuencial
+            FROM secuencias_facturacion
+            WHERE establecimiento = ? AND punto_emision = ? AND activo = 1
+        """, (establecimiento, punto_emision))
+        fila = cursor.fetchone()
+        if not fila:
+            return None
 
-            # Verificar que se guardó
+        serie = f"{establecimiento}-{punto_emision}"
+        cursor.execute("""
+            SELECT secuencial FROM huecos_facturacion
+            WHERE serie = ?
+            ORDER BY secuencial
+            LIMIT ?
+        """, (serie, cantidad))
+        reservados = [hueco for (hueco,) in cursor.fetchall()]
+        if reservados:
+            cursor.execute(
+                "DELETE FROM huecos_facturacion WHERE serie = ? AND secuencial <= ?",
+                (serie, reservados[-1])
+            )
+
+        faltantes = cantidad - len(reservados)
+        if faltantes > 0:
             cursor.execute("""
-                SELECT secuencial
-                FROM secuencias_facturacion
-                WHERE establecimiento = ? AND punto_emision = ?
-            """, (establecimiento, punto_emision))
+                UPDATE secuencias_facturacion
+                SET secuencial = secuencial + ?
+                WHERE establecimiento = ? AND punto_emision = ? AND activo = 1
+            """, (faltantes, establecimiento, punto_emision))
+            reservados.extend(range(fila[0] + 1, fila[0] + faltantes + 1))
+        return reservados
 
-            verificacion = cursor.fetchone()
+    def liberar_numero(self, numero_factura):
+        """
+        Devuelve a la secuencia un número reservado que no llegó a usarse.
 
-            if not verificacion or verificacion[0] != secuencial_nuevo:
-                raise Exception(f"Secuencial {secuencial_nuevo} no se confirmó después del commit")
+        Args:
+            numero_factura: Número formateado (ej: "001-010-0000000001")
 
-            # Formatear como 001-010-0000000001 (10 dígitos para el secuencial)
-            numero_factura = f"{establecimiento}-{punto_emision}-{secuencial_nuevo:010d}"
-            print(f"[OK] Número de factura generado: {numero_factura} (primer número disponible)")
-            return numero_factura
+        Returns:
+            bool: True si el número quedó disponible
+        """
+        serie, secuencial = descomponer_numero_factura(numero_factura)
+        if secuencial is None:
+            return False
 
+        try:
+            with get_pool().transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT OR IGNORE INTO huecos_facturacion (serie, secuencial)
+                    SELECT ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM facturas WHERE serie = ? AND secuencial = ?)
+                """, (serie, secuencial, serie, secuencial))
+            return True
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
-            print(f"[ERROR] Error al obtener siguiente número de factura: {e}")
-            return None
-        finally:
-            if conn:
-                conn.close()
+            print(f"[ERROR] Error al liberar numero de factura {numero_factura}: {e}")
+            return False
 
     def obtener_secuencial_actual(self, establecimiento="001", punto_emision="010"):
         """
@@ -192,17 +189,16 @@ class SecuenciaFacturacion:
             None: Si hay un error
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                SELECT secuencial
-                FROM secuencias_facturacion
-                WHERE establecimiento = ? AND punto_emision = ?
-            """, (establecimiento, punto_emision))
+                cursor.execute("""
+                    SELECT secuencial
+                    FROM secuencias_facturacion
+                    WHERE establecimiento = ? AND punto_emision = ?
+                """, (establecimiento, punto_emision))
 
-            resultado = cursor.fetchone()
-            conn.close()
+                resultado = cursor.fetchone()
 
             return resultado[0] if resultado else None
 
@@ -237,16 +233,15 @@ class SecuenciaFacturacion:
             bool: True si se creó exitosamente, False en caso contrario
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                INSERT INTO secuencias_facturacion (establecimiento, punto_emision, secuencial, activo)
-                VALUES (?, ?, ?, 1)
-            """, (establecimiento, punto_emision, secuencial_inicial))
+                cursor.execute("""
+                    INSERT INTO secuencias_facturacion (establecimiento, punto_emision, secuencial, activo)
+                    VALUES (?, ?, ?, 1)
+                """, (establecimiento, punto_emision, secuencial_inicial))
 
-            conn.commit()
-            conn.close()
+                conn.commit()
 
             print(f"Secuencia {establecimiento}-{punto_emision} creada correctamente")
             return True
@@ -270,17 +265,16 @@ class SecuenciaFacturacion:
             bool: True si se desactivó exitosamente
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                UPDATE secuencias_facturacion
-                SET activo = 0
-                WHERE establecimiento = ? AND punto_emision = ?
-            """, (establecimiento, punto_emision))
+                cursor.execute("""
+                    UPDATE secuencias_facturacion
+                    SET activo = 0
+                    WHERE establecimiento = ? AND punto_emision = ?
+                """, (establecimiento, punto_emision))
 
-            conn.commit()
-            conn.close()
+                conn.commit()
 
             return True
 
@@ -296,17 +290,16 @@ class SecuenciaFacturacion:
             list: Lista de tuplas con información de secuencias
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("""
-                SELECT establecimiento, punto_emision, secuencial, activo, fecha_creacion
-                FROM secuencias_facturacion
-                ORDER BY fecha_creacion DESC
-            """)
+                cursor.execute("""
+                    SELECT establecimiento, punto_emision, secuencial, activo, fecha_creacion
+                    FROM secuencias_facturacion
+                    ORDER BY fecha_creacion DESC
+                """)
 
-            resultados = cursor.fetchall()
-            conn.close()
+                resultados = cursor.fetchall()
 
             return resultados
 
@@ -315,6 +308,24 @@ class SecuenciaFacturacion:
             return []
 
 
+def descomponer_numero_factura(numero_factura):
+    """
+    Separa un número de factura en serie y secuencial.
+
+    Args:
+        numero_factura: Número formateado (ej: "001-010-0000000123")
+
+    Returns:
+        tuple: (serie, secuencial), p. ej. ("001-010", 123); (None, None) si
+        el número no tiene el formato esperado
+    """
+    try:
+        establecimiento, punto_emision, secuencial = numero_factura.split('-')
+        return f"{establecimiento}-{punto_emision}", int(secuencial)
+    except (AttributeError, ValueError):
+        return None, None
+
+
 # Función de conveniencia para obtener la instancia
 _secuencia_instance = None
 
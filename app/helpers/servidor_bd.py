@@ -0,0 +1,265 @@
+"""
+Servidor de la base de datos para varias cajas.
+
+Un solo proceso abre sistema_facturacion.db y las cajas en modo servidor
+(servidor=host:puerto en config.txt, ver app/database/remoto.py) le envían
+las operaciones de sus controladores, en lugar de bloquear el archivo por
+la red.
+
+Las lecturas se atienden en paralelo en un grupo de hilos (con WAL no
+esperan al escritor). Las escrituras pasan por una cola con un único
+escritor: toma todas las pendientes y las confirma en una sola transacción,
+cada una en su SAVEPOINT, así una operación que falla no deshace las demás
+del lote y diez cajas que facturan a la vez pagan un solo commit.
+
+Uso:
+    python -m app.helpers.servidor_bd [ruta_bd] [--host=0.0.0.0] [--puerto=8765] [--clave=...]
+"""
+
+import asyncio
+import hmac
+import importlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.database.connection import DatabaseConnection, get_pool
+from app.database.remoto import OPERACIONES, PUERTO_POR_DEFECTO, enviar_mensaje
+
+# Módulos con métodos @operacion_remota (al importarlos se registran)
+MODULOS_OPERACIONES = (
+    "app.controllers.client_controller",
+    "app.controllers.factura_controller",
+    "app.controllers.lectura_controller",
+    "app.controllers.servicios_controller",
+    "app.helpers.actualizar_deudas",
+)
+
+# Escrituras que el escritor confirma juntas como máximo
+LOTE_MAXIMO = 64
+
+# Hilos para las lecturas
+LECTORES = 8
+
+# Largo máximo de una petición (una línea JSON)
+LIMITE_PETICION = 1024 * 1024
+
+
+def _respuesta_error(error):
+    return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+
+class ServidorBD:
+    """Servidor asyncio con lecturas en paralelo y un único escritor por lotes."""
+
+    def __init__(self, db_path, host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, clave=None,
+                 lectores=LECTORES, lote_maximo=LOTE_MAXIMO):
+        """
+        Args:
+            db_path: Ruta a la base de datos
+            host: Interfaz donde escuchar (0.0.0.0 para aceptar otras PCs)
+            puerto: Puerto TCP
+            clave: Clave compartida que deben enviar las cajas (None = sin clave)
+            lectores: Hilos para las lecturas
+            lote_maximo: Escrituras por transacción como máximo
+        """
+        self.db_path = db_path
+        self.host = host
+        self.puerto = puerto
+        self.clave = clave
+        self.lote_maximo = lote_maximo
+        self._lectores = ThreadPoolExecutor(lectores, thread_name_prefix="lector_bd")
+        # Un solo hilo escritor: una sola conexión escribe en la BD
+        self._hilo_escritor = ThreadPoolExecutor(1, thread_name_prefix="escritor_bd")
+        self._cola = None
+        self._servidor = None
+        self._instancias = {}
+        self._lock = threading.Lock()
+        self.conexiones = 0
+        self.lecturas = 0
+        self.escrituras = 0
+        self.lotes = 0
+        self.errores = 0
+
+        for modulo in MODULOS_OPERACIONES:
+            importlib.import_module(modulo)
+
+    def _metodo(self, nombre):
+        """Método del controlador de la operación (una instancia por clase, sin estado propio)."""
+        modulo, clase, metodo, _ = OPERACIONES[nombre]
+        with self._lock:
+            instancia = self._instancias.get(clase)
+            if instancia is None:
+                instancia = getattr(importlib.import_module(modulo), clase)(self.db_path)
+                self._instancias[clase] = instancia
+        return getattr(instancia, metodo)
+
+    def ejecutar(self, nombre, args, kwargs):
+        """Ejecuta una operación en el hilo actual."""
+        return self._metodo(nombre)(*args, **kwargs)
+
+    def _ejecutar_lote(self, lote):
+        """
+        Hilo escritor: ejecuta las escrituras del lote en una transacción.
+
+        Returns:
+            list: Una respuesta por escritura, en el mismo orden
+        """
+        def ejecutar_lote(conn):
+            respuestas = []
+            for nombre, args, kwargs in lote:
+                try:
+                    # Transacción anidada = SAVEPOINT propio de la operación
+                    with get_pool().transaction(self.db_path):
+                        respuestas.append({"ok": True, "resultado": self.ejecutar(nombre, args, kwargs)})
+                except Exception as e:
+                    print(f"[ERROR] {nombre}: {e}")
+                    respuestas.append(_respuesta_error(e))
+            return respuestas
+
+        try:
+            # Si otro proceso tiene el bloqueo (respaldo, importación), el lote se reintenta entero
+            return get_pool().ejecutar_escritura(ejecutar_lote, self.db_path, "lote_servidor")
+        except Exception as e:
+            # Sin commit no quedó escrita ninguna operación del lote
+            print(f"[ERROR] No se pudo confirmar un lote de {len(lote)} escrituras: {e}")
+            return [_respuesta_error(e)] * len(lote)
+
+    async def _escritor(self):
+        """Toma las escrituras pendientes de la cola y las confirma por lotes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            # Lo que llegó mientras se confirmaba el lote anterior va junto
+            while len(lote) < self.lote_maximo and not self._cola.empty():
+                lote.append(self._cola.get_nowait())
+            respuestas = await loop.run_in_executor(
+                self._hilo_escritor, self._ejecutar_lote, [peticion[1:] for peticion in lote]
+            )
+            self.lotes += 1
+            self.escrituras += len(lote)
+            for (futuro, *_), respuesta in zip(lote, respuestas):
+                if not respuesta["ok"]:
+                    self.errores += 1
+                if not futuro.done():
+                    futuro.set_result(respuesta)
+
+    async def _responder(self, linea):
+        """Respuesta a una petición del protocolo."""
+        try:
+            peticion = json.loads(linea)
+            nombre = peticion["op"]
+            args = list(peticion.get("args", []))
+            kwargs = dict(peticion.get("kwargs", {}))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"ok": False, "error": "Peticion invalida"}
+
+        if self.clave and not hmac.compare_digest(str(peticion.get("clave", "")), self.clave):
+            return {"ok": False, "error": "Clave del servidor incorrecta"}
+        if nombre == "estado":
+            return {"ok": True, "resultado": self.estado()}
+        if nombre not in OPERACIONES:
+            return {"ok": False, "error": f"Operacion desconocida: {nombre}"}
+
+        loop = asyncio.get_running_loop()
+        if OPERACIONES[nombre][3]:
+            futuro = loop.create_future()
+            await self._cola.put((futuro, nombre, args, kwargs))
+            return await futuro
+
+        self.lecturas += 1
+        try:
+            resultado = await loop.run_in_executor(self._lectores, self.ejecutar, nombre, args, kwargs)
+            return {"ok": True, "resultado": resultado}
+        except Exception as e:
+            self.errores += 1
+            return _respuesta_error(e)
+
+    async def _atender(self, lector, escritor):
+        """Atiende las peticiones de una caja, una por línea, hasta que se desconecte."""
+        self.conexiones += 1
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                enviar_mensaje(escritor, await self._responder(linea))
+                await escritor.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            print(f"[WARN] Conexion cerrada: {e}")
+        finally:
+            self.conexiones -= 1
+            escritor.close()
+
+    def estado(self):
+        """Contadores del servidor para diagnóstico."""
+        return {
+            "bd": self.db_path,
+            "conexiones": self.conexiones,
+            "pendientes": self._cola.qsize() if self._cola else 0,
+            "lecturas": self.lecturas,
+            "escrituras": self.escrituras,
+            "lotes": self.lotes,
+            "escrituras_por_lote": round(self.escrituras / self.lotes, 2) if self.lotes else 0,
+            "errores": self.errores,
+            "espera_bloqueo": get_pool().metricas_escritura().get("lote_servidor", {}),
+        }
+
+    async def servir(self):
+        """Atiende a las cajas hasta que se cancele la tarea (Ctrl+C)."""
+        self._cola = asyncio.Queue()
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto, limit=LIMITE_PETICION)
+        escritor = asyncio.create_task(self._escritor())
+        print(f"[OK] Servidor de BD en {self.host}:{self.puerto} ({self.db_path})")
+        try:
+            async with self._servidor:
+                await self._servidor.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            escritor.cancel()
+            self._lectores.shutdown(wait=True)
+            self._hilo_escritor.shutdown(wait=True)
+            print(f"[OK] Servidor de BD detenido: {self.estado()}")
+
+
+def iniciar_servidor(db_path, host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, clave=None):
+    """
+    Migra la BD, activa la auditoría y atiende a las cajas hasta Ctrl+C.
+
+    Returns:
+        bool: False si la BD no se pudo migrar
+    """
+    from app.helpers.database_migrator import asegurar_esquema
+    from app.helpers.sistema_logs import get_logger
+
+    if not asegurar_esquema(db_path):
+        print(f"[ERROR] No se pudo migrar la base de datos {db_path}")
+        return False
+    DatabaseConnection.set_db_path(db_path)
+    get_logger().usar_bd(db_path)
+
+    try:
+        asyncio.run(ServidorBD(db_path, host, puerto, clave).servir())
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opciones = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "") for a in sys.argv[1:] if a.startswith("--"))
+    db_path = argumentos[0] if argumentos else "sistema_facturacion.db"
+    if not os.path.exists(db_path):
+        print(f"[ERROR] No existe la base de datos {db_path}")
+        sys.exit(1)
+
+    iniciado = iniciar_servidor(
+        os.path.abspath(db_path),
+        opciones.get("host", "127.0.0.1"),
+        int(opciones.get("puerto", PUERTO_POR_DEFECTO)),
+        opciones.get("clave") or None,
+    )
+    sys.exit(0 if iniciado else 1)
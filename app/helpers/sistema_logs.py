@@ -1,83 +1,265 @@
-import os
+import atexit
 import datetime
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
 from pathlib import Path
 
+# Registros que el hilo escritor junta en una sola escritura
+LOTE_MAXIMO = 500
+# Segundos que un registro puede esperar en la cola antes de escribirse
+INTERVALO_ESCRITURA = 0.5
+# Tamaño a partir del cual el archivo del día se cierra y se comprime
+TAMANO_MAXIMO = 5 * 1024 * 1024
+DIAS_RETENCION = 5
+
 
 class SistemaLogs:
     """
     Sistema de logging para registrar acciones de usuarios en el sistema.
 
     Características:
-    - Crea archivos de log por fecha en la carpeta 'logs/'
-    - Registra timestamp, usuario, rol y acción
-    - Limpieza automática de logs mayores a 5 días
+    - Un registro JSON por línea en logs/log_AAAA-MM-DD.jsonl
+    - Registra timestamp, usuario, rol, acción y detalle, y si se indican la
+      entidad afectada (factura, cliente...) y sus valores antes y después
+    - Con usar_bd, cada lote se guarda además en la tabla auditoria
+      (app/helpers/auditoria.py), que se puede consultar por registro,
+      usuario, acción y fecha
+    - registrar_accion solo encola: un hilo aparte escribe por lotes, así
+      registrar una acción no agrega espera a la facturación
+    - Al cambiar el día o superar TAMANO_MAXIMO el archivo se cierra y se
+      comprime con gzip
+    - Limpieza automática de logs mayores a DIAS_RETENCION días
+    - Los registros pendientes se escriben al cerrar el programa
     """
 
-    def __init__(self):
-        """Inicializa el sistema de logs y crea el directorio si no existe."""
+    def __init__(self, logs_dir=None):
+        """Inicializa el sistema de logs, crea el directorio e inicia el hilo escritor."""
         # Obtener la ruta base del proyecto
         self.base_path = Path(__file__).parent.parent.parent
-        self.logs_dir = self.base_path / "logs"
+        self.logs_dir = Path(logs_dir) if logs_dir else self.base_path / "logs"
 
         # Crear directorio de logs si no existe
         self.logs_dir.mkdir(exist_ok=True)
 
-        # Realizar limpieza de logs antiguos al inicializar
-        self.limpiar_logs_antiguos()
+        self._cola = queue.Queue()
+        self._archivo = None
+        self._fecha_archivo = None
+        self._db_path = None
+        self._error_bd = False
+        self._hilo = threading.Thread(target=self._escribir, name="SistemaLogs", daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
 
-    def obtener_nombre_archivo_log(self):
+    def obtener_nombre_archivo_log(self, fecha=None):
         """
-        Genera el nombre del archivo de log basado en la fecha actual.
+        Genera el nombre del archivo de log de una fecha (por defecto hoy).
 
         Returns:
-            Path: Ruta completa al archivo de log del día actual
+            Path: Ruta completa al archivo de log del día
+        """
+        if fecha is None:
+            fecha = datetime.datetime.now().strftime("%Y-%m-%d")
+        return self.logs_dir / f"log_{fecha}.jsonl"
+
+    def usar_bd(self, db_path):
+        """
+        Guarda también los registros en la tabla auditoria de esta BD.
+
+        Al configurarla, el hilo escritor archiva los registros antiguos
+        (auditoria.archivar_auditoria) sin demorar el inicio.
         """
-        fecha_actual = datetime.datetime.now().strftime("%Y-%m-%d")
-        nombre_archivo = f"log_{fecha_actual}.txt"
-        return self.logs_dir / nombre_archivo
+        self._db_path = db_path
+        if self._hilo is not None:
+            from app.helpers.auditoria import archivar_auditoria
+            self._cola.put(lambda: archivar_auditoria(db_path))
 
-    def registrar_accion(self, usuario, rol, accion, detalle=""):
+    def registrar_accion(self, usuario, rol, accion, detalle="", entidad=None, entidad_id=None,
+                         antes=None, despues=None):
         """
-        Registra una acción en el archivo de log correspondiente.
+        Encola una acción para el archivo de log correspondiente.
 
         Args:
             usuario (str): Nombre del usuario que realizó la acción
             rol (str): Rol del usuario (Administrador, Recaudador, etc.)
             accion (str): Tipo de acción realizada (LOGIN, CREAR_CLIENTE, etc.)
             detalle (str, optional): Detalles adicionales de la acción
+            entidad (str, optional): Tipo de registro afectado (factura, cliente, medidor, servicio)
+            entidad_id (optional): ID del registro afectado
+            antes (dict, optional): Valores del registro antes del cambio
+            despues (dict, optional): Valores del registro después del cambio
         """
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            archivo_log = self.obtener_nombre_archivo_log()
-
-            # Construir mensaje de log
-            mensaje = f"[{timestamp}] [{usuario}] [{rol}] [{accion}]"
-            if detalle:
-                mensaje += f" - {detalle}"
-            mensaje += "\n"
-
-            # Escribir en el archivo (modo append)
-            with open(archivo_log, "a", encoding="utf-8") as f:
-                f.write(mensaje)
+        if self._hilo is None:
+            print(f"Error al registrar log: el sistema de logs esta cerrado ({accion})")
+            return False
+        fecha = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entidad_id = None if entidad_id is None else str(entidad_id)
+        # La línea y la fila se arman aquí: el hilo escritor solo concatena y escribe
+        registro = {
+            "fecha": fecha,
+            "usuario": usuario,
+            "rol": rol,
+            "accion": accion,
+            "detalle": detalle,
+            "entidad": entidad,
+            "entidad_id": entidad_id,
+            "antes": antes,
+            "despues": despues,
+        }
+        linea = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+        fila = (fecha, usuario, rol, accion, entidad, entidad_id, detalle,
+                None if antes is None else json.dumps(antes, ensure_ascii=False, default=str),
+                None if despues is None else json.dumps(despues, ensure_ascii=False, default=str))
+        self._cola.put((fecha[:10], linea, fila))
+        return True
+
+    def vaciar(self, timeout=5):
+        """
+        Espera a que los registros encolados hasta ahora estén escritos.
 
+        Returns:
+            bool: True si se escribieron antes del timeout
+        """
+        if self._hilo is None:
             return True
+        escrito = threading.Event()
+        self._cola.put(escrito)
+        return escrito.wait(timeout)
+
+    def cerrar(self, timeout=5):
+        """Escribe los registros pendientes y detiene el hilo escritor (se llama al salir)."""
+        hilo, self._hilo = self._hilo, None
+        if hilo is None:
+            return
+        self._cola.put(None)
+        hilo.join(timeout)
+        atexit.unregister(self.cerrar)
+
+    def _escribir(self):
+        """Hilo escritor: junta lo que haya en la cola y lo escribe en una sola operación."""
+        self._comprimir_pendientes()
+        self.limpiar_logs_antiguos()
+        terminar = False
+        while not terminar:
+            try:
+                elementos = [self._cola.get(timeout=INTERVALO_ESCRITURA)]
+            except queue.Empty:
+                continue
+            while len(elementos) < LOTE_MAXIMO:
+                try:
+                    elementos.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            registros = [e for e in elementos if isinstance(e, tuple)]
+            try:
+                if registros:
+                    self._escribir_lote(registros)
+            except Exception as e:
+                print(f"Error al registrar log: {e}")
+            if registros and self._db_path:
+                self._guardar_en_bd([fila for _, _, fila in registros])
+
+            for elemento in elementos:
+                if elemento is None:
+                    terminar = True
+                elif isinstance(elemento, threading.Event):
+                    elemento.set()
+                elif callable(elemento):
+                    try:
+                        elemento()
+                    except Exception as e:
+                        print(f"Error en tarea de logs: {e}")
+
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def _guardar_en_bd(self, filas):
+        """Inserta el lote en la tabla auditoria; si falla, el archivo .jsonl ya tiene los registros."""
+        from app.helpers.auditoria import insertar_registros
+        try:
+            insertar_registros(self._db_path, filas)
+            self._error_bd = False
         except Exception as e:
-            print(f"Error al registrar log: {e}")
-            return False
+            # Un solo aviso hasta que vuelva a funcionar (p. ej. perfil 'reporte' de solo lectura)
+            if not self._error_bd:
+                print(f"[ERROR] No se pudo guardar la auditoria en la BD: {e}")
+            self._error_bd = True
+
+    def _escribir_lote(self, registros):
+        """Escribe las líneas (fecha, línea, fila) en el archivo de su día, rotando cuando corresponde."""
+        inicio = 0
+        while inicio < len(registros):
+            fecha = registros[inicio][0]
+            if fecha != self._fecha_archivo:
+                self._rotar(fecha)
+            # Tramo de registros del mismo día: una sola escritura
+            fin = inicio
+            while fin < len(registros) and registros[fin][0] == fecha:
+                fin += 1
+            self._archivo.write("".join(linea for _, linea, _ in registros[inicio:fin]))
+            self._archivo.flush()
+            if self._archivo.tell() >= TAMANO_MAXIMO:
+                self._rotar(fecha, por_tamano=True)
+            inicio = fin
+
+    def _rotar(self, fecha, por_tamano=False):
+        """Cierra y comprime el archivo actual y abre el de la fecha indicada."""
+        anterior = self._fecha_archivo
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+            self._fecha_archivo = None
+        if anterior is not None and (por_tamano or anterior != fecha):
+            self._comprimir(self.obtener_nombre_archivo_log(anterior))
+            if anterior != fecha:
+                self.limpiar_logs_antiguos()
+        self._archivo = open(self.obtener_nombre_archivo_log(fecha), "a", encoding="utf-8")
+        self._fecha_archivo = fecha
+
+    def _comprimir(self, ruta):
+        """Comprime un archivo cerrado como log_AAAA-MM-DD[.N].jsonl.gz y borra el original."""
+        if not ruta.exists():
+            return
+        base = ruta.name[:-len(".jsonl")]
+        destino = self.logs_dir / f"{base}.jsonl.gz"
+        numero = 1
+        while destino.exists():
+            destino = self.logs_dir / f"{base}.{numero}.jsonl.gz"
+            numero += 1
+        with open(ruta, "rb") as origen, gzip.open(destino, "wb") as comprimido:
+            shutil.copyfileobj(origen, comprimido)
+        os.remove(ruta)
+
+    def _comprimir_pendientes(self):
+        """Comprime los archivos de días anteriores que quedaron abiertos (cierre inesperado)."""
+        hoy = self.obtener_nombre_archivo_log().name
+        for archivo in self.logs_dir.glob("log_*.jsonl"):
+            if archivo.name != hoy:
+                try:
+                    self._comprimir(archivo)
+                except OSError as e:
+                    print(f"Error al comprimir log {archivo.name}: {e}")
 
     def limpiar_logs_antiguos(self):
         """
-        Elimina archivos de log con más de 5 días de antigüedad.
+        Elimina archivos de log con más de DIAS_RETENCION días de antigüedad.
+
+        Se ejecuta en el hilo escritor al iniciar y al cambiar de día.
         """
         try:
-            fecha_limite = datetime.datetime.now() - datetime.timedelta(days=5)
+            fecha_limite = datetime.datetime.now() - datetime.timedelta(days=DIAS_RETENCION)
 
-            # Iterar sobre todos los archivos en el directorio de logs
-            for archivo in self.logs_dir.glob("log_*.txt"):
+            # Logs actuales (.jsonl, .jsonl.gz) y de texto de versiones anteriores
+            for archivo in self.logs_dir.glob("log_*"):
                 # Obtener la fecha de modificación del archivo
                 fecha_modificacion = datetime.datetime.fromtimestamp(archivo.stat().st_mtime)
 
-                # Eliminar si es más antiguo que 5 días
+                # Eliminar si es más antiguo que DIAS_RETENCION días
                 if fecha_modificacion < fecha_limite:
                     archivo.unlink()
                     print(f"Log eliminado: {archivo.name}")
@@ -102,40 +284,40 @@ class SistemaLogs:
         detalle = f"Nuevo cliente: {cliente_nombre} (CI: {cliente_ci})"
         return self.registrar_accion(usuario, rol, "CREAR_CLIENTE", detalle)
 
-    def log_editar_cliente(self, usuario, rol, cliente_id, cliente_nombre):
-        """Registra la edición de un cliente."""
+    def log_editar_cliente(self, usuario, rol, cliente_id, cliente_nombre, antes=None, despues=None):
+        """Registra la edición de un cliente (antes/después: valores modificados)."""
         detalle = f"Cliente editado: ID {cliente_id} - {cliente_nombre}"
-        return self.registrar_accion(usuario, rol, "EDITAR_CLIENTE", detalle)
+        return self.registrar_accion(usuario, rol, "EDITAR_CLIENTE", detalle, "cliente", cliente_id, antes, despues)
 
     def log_eliminar_cliente(self, usuario, rol, cliente_id, cliente_nombre):
         """Registra la eliminación de un cliente."""
         detalle = f"Cliente eliminado: ID {cliente_id} - {cliente_nombre}"
-        return self.registrar_accion(usuario, rol, "ELIMINAR_CLIENTE", detalle)
+        return self.registrar_accion(usuario, rol, "ELIMINAR_CLIENTE", detalle, "cliente", cliente_id)
 
     def log_crear_lectura(self, usuario, rol, medidor_id, lectura_actual, consumo):
         """Registra la creación de una nueva lectura."""
         detalle = f"Lectura registrada para medidor {medidor_id}: {lectura_actual} m³ (Consumo: {consumo} m³)"
-        return self.registrar_accion(usuario, rol, "CREAR_LECTURA", detalle)
+        return self.registrar_accion(usuario, rol, "CREAR_LECTURA", detalle, "medidor", medidor_id)
 
     def log_crear_factura(self, usuario, rol, factura_id, cliente_nombre, monto_total):
         """Registra la creación de una nueva factura."""
         detalle = f"Factura #{factura_id} creada para {cliente_nombre} - Monto: ${monto_total:.2f}"
-        return self.registrar_accion(usuario, rol, "CREAR_FACTURA", detalle)
+        return self.registrar_accion(usuario, rol, "CREAR_FACTURA", detalle, "factura", factura_id)
 
-    def log_editar_factura(self, usuario, rol, factura_id, cliente_nombre, monto_total):
-        """Registra la edición de una factura existente."""
+    def log_editar_factura(self, usuario, rol, factura_id, cliente_nombre, monto_total, antes=None, despues=None):
+        """Registra la edición de una factura existente (antes/después: valores modificados)."""
         detalle = f"Factura #{factura_id} editada para {cliente_nombre} - Nuevo monto: ${monto_total:.2f}"
-        return self.registrar_accion(usuario, rol, "EDITAR_FACTURA", detalle)
+        return self.registrar_accion(usuario, rol, "EDITAR_FACTURA", detalle, "factura", factura_id, antes, despues)
 
     def log_reimprimir_factura(self, usuario, rol, factura_id, cliente_nombre):
         """Registra la reimpresión de una factura."""
         detalle = f"Factura #{factura_id} reimpresa - Cliente: {cliente_nombre}"
-        return self.registrar_accion(usuario, rol, "REIMPRIMIR_FACTURA", detalle)
+        return self.registrar_accion(usuario, rol, "REIMPRIMIR_FACTURA", detalle, "factura", factura_id)
 
     def log_crear_servicio(self, usuario, rol, servicio_id, cliente_nombre, monto):
         """Registra la creación de un servicio adicional."""
         detalle = f"Servicio #{servicio_id} creado para {cliente_nombre} - Monto: ${monto:.2f}"
-        return self.registrar_accion(usuario, rol, "CREAR_SERVICIO", detalle)
+        return self.registrar_accion(usuario, rol, "CREAR_SERVICIO", detalle, "servicio", servicio_id)
 
     def log_consulta_facturas(self, usuario, rol, num_resultados):
         """Registra una consulta de facturas."""
@@ -0,0 +1,114 @@
+"""
+Verificación y reconstrucción de tablas materializadas desde facturas.
+
+saldos_medidor y resumen_recaudacion se mantienen con triggers; cada una
+tiene una consulta que calcula los mismos valores directamente desde
+facturas. Estas funciones comparan la tabla con esa consulta, la regeneran
+y arman la línea de comandos de app/helpers/verificar_saldos.py y
+app/helpers/verificar_resumen.py.
+"""
+
+import sqlite3
+import sys
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
+
+
+def _iguales(materializado, calculado):
+    if isinstance(materializado, float) or isinstance(calculado, float):
+        return abs((materializado or 0) - (calculado or 0)) < 0.005
+    return materializado == calculado
+
+
+def verificar_tabla(db_path, consulta, tabla, claves, columnas, vacio):
+    """
+    Compara una tabla materializada con los valores calculados por consulta.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+        consulta: SELECT que devuelve las columnas claves y después columnas
+        tabla: Tabla materializada
+        claves: Columnas que identifican cada fila
+        columnas: Columnas de valores a comparar
+        vacio: Valores de una fila que falta en uno de los dos lados
+
+    Returns:
+        list: Tuplas (clave, columna, materializado, calculado) con cada
+        diferencia; la clave es el valor si hay una sola columna clave y una
+        tupla si hay varias
+    """
+    asegurar_esquema(db_path)
+    n = len(claves)
+
+    def por_clave(filas):
+        return {(fila[0] if n == 1 else fila[:n]): fila[n:] for fila in filas}
+
+    with get_pool().connection(db_path) as conn:
+        calculados = por_clave(conn.execute(consulta))
+        materializados = por_clave(conn.execute(
+            f"SELECT {', '.join(claves)}, {', '.join(columnas)} FROM {tabla}"
+        ))
+
+    diferencias = []
+    for clave in sorted(set(calculados) | set(materializados), key=str):
+        esperado = calculados.get(clave, vacio)
+        actual = materializados.get(clave, vacio)
+        for columna, valor_actual, valor_esperado in zip(columnas, actual, esperado):
+            if not _iguales(valor_actual, valor_esperado):
+                diferencias.append((clave, columna, valor_actual, valor_esperado))
+    return diferencias
+
+
+def reconstruir_tabla(db_path, consulta, tabla, claves, columnas):
+    """
+    Regenera una tabla materializada desde consulta en una sola transacción.
+
+    Returns:
+        int: Filas registradas; None si hubo un error
+    """
+    asegurar_esquema(db_path)
+    try:
+        with get_pool().transaction(db_path, immediate=True) as conn:
+            conn.execute(f"DELETE FROM {tabla}")
+            cursor = conn.execute(f"""
+                INSERT OR REPLACE INTO {tabla} ({', '.join(claves)}, {', '.join(columnas)})
+                {consulta}
+            """)
+        return cursor.rowcount
+    except sqlite3.Error as e:
+        print(f"[ERROR] Error al reconstruir {tabla}: {e}")
+        return None
+
+
+def main(tabla, titulo, verificar, reconstruir, describir_clave, unidad):
+    """
+    Línea de comandos: [ruta_a_base_datos] [--reconstruir].
+
+    Args:
+        tabla: Tabla materializada (para los mensajes)
+        titulo: Qué se verifica (p. ej. "saldos por medidor")
+        verificar: Función verificar(db_path) que devuelve las diferencias
+        reconstruir: Función reconstruir(db_path) que devuelve las filas o None
+        describir_clave: Función que convierte una clave en texto
+        unidad: Nombre de las filas para el mensaje final (p. ej. "medidores")
+    """
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    db_path = argumentos[0] if argumentos else "sistema_facturacion.db"
+
+    print(f"\nVerificando {titulo} en: {db_path}")
+    diferencias = verificar(db_path)
+    for clave, columna, actual, esperado in diferencias[:50]:
+        print(f"  [ERROR] {describir_clave(clave)}: {columna} = {actual!r}, desde facturas = {esperado!r}")
+    if len(diferencias) > 50:
+        print(f"  ... y {len(diferencias) - 50} diferencias mas")
+
+    if not diferencias:
+        print(f"[OK] {tabla} coincide con facturas")
+    elif "--reconstruir" in sys.argv:
+        filas = reconstruir(db_path)
+        if filas is None:
+            sys.exit(1)
+        print(f"[OK] {tabla} reconstruida ({filas} {unidad})")
+    else:
+        print("[ERROR] Hay diferencias; ejecute con --reconstruir para regenerar la tabla")
+        sys.exit(1)
@@ -0,0 +1,168 @@
+"""
+Verificación de los planes de las consultas frecuentes.
+
+Imprime el EXPLAIN QUERY PLAN de cada consulta que se ejecuta al escribir un
+número de medidor o al registrar una factura, y marca las que recorren la
+tabla completa (SCAN) en lugar de usar un índice (SEARCH).
+
+Uso:
+    python -m app.helpers.verificar_indices [ruta_a_base_datos]
+"""
+
+import sqlite3
+from app.database.connection import get_pool
+from app.controllers.factura_controller import CONSULTA_CONTEXTO_FACTURACION
+
+
+# (descripcion, consulta, parametros) con la misma forma que usa la aplicación
+CONSULTAS_FRECUENTES = [
+    (
+        "Saldo pendiente (SaldoPendienteHelper)",
+        "SELECT total_deuda, num_deudas, mes_deuda_antigua, ultimo_estado FROM saldos_medidor WHERE medidor_id = ?",
+        (1,),
+    ),
+    (
+        "Suma de deudas del medidor (triggers de saldos_medidor)",
+        "SELECT COALESCE(SUM(monto_total), 0) FROM facturas WHERE medidor_id = ? AND estado = 'Deuda'",
+        (1,),
+    ),
+    (
+        "Deuda mas antigua del medidor (triggers de saldos_medidor)",
+        "SELECT mes_facturacion FROM facturas WHERE medidor_id = ? AND estado = 'Deuda' ORDER BY id LIMIT 1",
+        (1,),
+    ),
+    (
+        "Ultima factura del medidor (ActualizarDeudasHelper)",
+        "SELECT estado FROM facturas WHERE medidor_id = ? ORDER BY id DESC LIMIT 1",
+        (1,),
+    ),
+    (
+        "Pasar deudas a pagado (ActualizarDeudasHelper)",
+        "UPDATE facturas SET estado = 'Pagado' WHERE medidor_id = ? AND estado = 'Deuda'",
+        (1,),
+    ),
+    (
+        "Ultima lectura (FacturaController)",
+        "SELECT id, consumo, direccion FROM lecturas WHERE medidor_id = ? ORDER BY fecha_lectura DESC LIMIT 1",
+        (1,),
+    ),
+    (
+        "Contexto de facturacion (FacturaController)",
+        CONSULTA_CONTEXTO_FACTURACION,
+        {"medidor_id": 1, "lectura_id": None},
+    ),
+    (
+        "Menor hueco de la serie (SecuenciaFacturacion)",
+        "SELECT MIN(secuencial) FROM huecos_facturacion WHERE serie = ?",
+        ("001-010",),
+    ),
+    (
+        "Contador de la serie (SecuenciaFacturacion)",
+        "UPDATE secuencias_facturacion SET secuencial = secuencial + 1 WHERE establecimiento = ? AND punto_emision = ? AND activo = 1",
+        ("001", "010"),
+    ),
+    (
+        "Pagados del mes (ConsultaRegistrosYDeudasModel)",
+        """SELECT f.medidor_id, c.nombre_cliente, f.estado, c.direccion
+           FROM facturas f JOIN clientes c ON f.medidor_id = c.id
+           WHERE f.mes_facturacion = ? AND f.estado = 'Pagado'
+             AND c.id IN (SELECT rowid FROM busqueda_clientes WHERE busqueda_clientes MATCH ?)""",
+        ("Enero", '{direccion} : ("centro"*)'),
+    ),
+    (
+        "Busqueda de clientes por nombre (ClientController)",
+        """SELECT * FROM clientes
+           WHERE id IN (SELECT rowid FROM busqueda_clientes WHERE busqueda_clientes MATCH ?)""",
+        ('{nombre_cliente} : ("jose"* "pe"*)',),
+    ),
+    (
+        "Pagina de facturas por fecha (ConsultaModel)",
+        """SELECT id, medidor_id, nombre_cliente, lectura_id, mes_facturacion, monto_total, fecha_emision, estado
+           FROM facturas WHERE fecha_emision BETWEEN ? AND ? AND (fecha_emision, id) > (?, ?)
+           ORDER BY fecha_emision, id LIMIT ?""",
+        ("2026-01-01", "2026-01-31", "2026-01-01", 0, 20),
+    ),
+    (
+        "Grafico de recaudacion (RecaudacionController)",
+        """SELECT mes_facturacion, SUM(cantidad) FROM resumen_recaudacion
+           WHERE anio = ? AND direccion = ? AND mes_facturacion <> '' GROUP BY mes_facturacion""",
+        ("2026", "Centro"),
+    ),
+    (
+        "Historial de un registro (auditoria)",
+        """SELECT id, fecha, usuario, accion FROM auditoria
+           WHERE entidad = ? AND entidad_id = ? AND (fecha, id) < (?, ?) ORDER BY fecha DESC, id DESC LIMIT ?""",
+        ("factura", "4521", "~", 0, 200),
+    ),
+    (
+        "Acciones de un usuario por fecha (auditoria)",
+        """SELECT id, fecha, accion FROM auditoria
+           WHERE usuario = ? AND fecha >= ? AND fecha < ? AND (fecha, id) < (?, ?) ORDER BY fecha DESC, id DESC LIMIT ?""",
+        ("admin", "2026-10-01", "2026-10-18~", "~", 0, 200),
+    ),
+    (
+        "Cliente por numero de conexion (ServiciosController)",
+        "SELECT id, nombre_cliente FROM clientes WHERE numero_conexion = ?",
+        ("1",),
+    ),
+    (
+        "Servicios del medidor (ServiciosController)",
+        "SELECT * FROM servicios WHERE numero_medidor = ?",
+        ("1",),
+    ),
+]
+
+
+def _es_scan_completo(detalle):
+    """SCAN de una tabla o de un índice completo; SEARCH indica uso de índice."""
+    # En las tablas FTS5 el plan dice SCAN aunque la búsqueda use su índice
+    return detalle.startswith("SCAN ") and "CONSTANT ROW" not in detalle and "VIRTUAL TABLE" not in detalle
+
+
+def verificar_planes(db_path):
+    """
+    Imprime el plan de cada consulta frecuente.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        bool: True si ninguna consulta hace un recorrido completo
+    """
+    todas_ok = True
+    with get_pool().connection(db_path) as conn:
+        for descripcion, consulta, parametros in CONSULTAS_FRECUENTES:
+            print(f"\n{descripcion}")
+            try:
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros).fetchall()
+            except sqlite3.Error as e:
+                print(f"  [ERROR] {e}")
+                todas_ok = False
+                continue
+
+            for fila in plan:
+                detalle = fila[3]
+                if _es_scan_completo(detalle):
+                    todas_ok = False
+                    print(f"  [ERROR] {detalle}")
+                else:
+                    print(f"  [OK] {detalle}")
+
+    print()
+    if todas_ok:
+        print("[OK] Ninguna consulta frecuente recorre una tabla completa")
+    else:
+        print("[ERROR] Hay consultas sin indice; ejecute las migraciones (database_migrator.py)")
+    return todas_ok
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        db_path = sys.argv[1]
+    else:
+        db_path = "sistema_facturacion.db"
+
+    print(f"\nVerificando planes de consulta en: {db_path}")
+    sys.exit(0 if verificar_planes(db_path) else 1)
@@ -0,0 +1,45 @@
+"""
+Verificación de la tabla resumen_recaudacion.
+
+Compara el resumen materializado con el calculado directamente desde
+facturas y, con --reconstruir, vuelve a generarlo a partir de todo el
+historial (por ejemplo después de importar facturas con los triggers
+desactivados).
+
+Uso:
+    python -m app.helpers.verificar_resumen [ruta_a_base_datos] [--reconstruir]
+"""
+
+from app.helpers.database_migrator import COLUMNAS_CLAVE_RESUMEN, RESUMEN_CALCULADO
+from app.helpers.tabla_materializada import main, reconstruir_tabla, verificar_tabla
+
+COLUMNAS = ("cantidad", "monto_total")
+
+
+def verificar_resumen(db_path):
+    """
+    Compara resumen_recaudacion con el resumen calculado desde facturas.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        list: Tuplas (clave, columna, materializado, calculado) con cada diferencia
+    """
+    return verificar_tabla(db_path, RESUMEN_CALCULADO, "resumen_recaudacion", COLUMNAS_CLAVE_RESUMEN, COLUMNAS,
+                           vacio=(0, 0))
+
+
+def reconstruir_resumen(db_path):
+    """
+    Regenera resumen_recaudacion desde facturas en una sola transacción.
+
+    Returns:
+        int: Grupos (año, mes, dirección, estado, servicio) registrados; None si hubo un error
+    """
+    return reconstruir_tabla(db_path, RESUMEN_CALCULADO, "resumen_recaudacion", COLUMNAS_CLAVE_RESUMEN, COLUMNAS)
+
+
+if __name__ == "__main__":
+    main("resumen_recaudacion", "resumen de recaudacion", verificar_resumen, reconstruir_resumen,
+         lambda clave: " / ".join(clave), "grupos")
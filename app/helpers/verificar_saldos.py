@@ -0,0 +1,44 @@
+"""
+Verificación de la tabla saldos_medidor.
+
+Compara los saldos materializados con los calculados directamente desde
+facturas y, con --reconstruir, vuelve a generar la tabla completa.
+
+Uso:
+    python -m app.helpers.verificar_saldos [ruta_a_base_datos] [--reconstruir]
+"""
+
+from app.helpers.database_migrator import SALDOS_CALCULADOS
+from app.helpers.tabla_materializada import main, reconstruir_tabla, verificar_tabla
+
+CLAVES = ("medidor_id",)
+COLUMNAS = ("total_deuda", "num_deudas", "mes_deuda_antigua", "ultimo_estado", "ultima_factura_id")
+
+
+def verificar_saldos(db_path):
+    """
+    Compara saldos_medidor con los saldos calculados desde facturas.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        list: Tuplas (medidor_id, columna, materializado, calculado) con cada diferencia
+    """
+    return verificar_tabla(db_path, SALDOS_CALCULADOS, "saldos_medidor", CLAVES, COLUMNAS,
+                           vacio=(0, 0, None, None, None))
+
+
+def reconstruir_saldos(db_path):
+    """
+    Regenera saldos_medidor desde facturas en una sola transacción.
+
+    Returns:
+        int: Medidores con saldo registrado; None si hubo un error
+    """
+    return reconstruir_tabla(db_path, SALDOS_CALCULADOS, "saldos_medidor", CLAVES, COLUMNAS)
+
+
+if __name__ == "__main__":
+    main("saldos_medidor", "saldos por medidor", verificar_saldos, reconstruir_saldos,
+         lambda medidor_id: f"Medidor {medidor_id}", "medidores")
@@ -1,39 +1,122 @@
 import sqlite3
+import time
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
+from app.helpers.busqueda_texto import filtro_texto
+
+# Columnas que muestra la tabla de ConsultaWidget, en el mismo orden
+COLUMNAS_CONSULTA = (
+    "id, medidor_id, nombre_cliente, lectura_id, mes_facturacion, "
+    "monto_total, fecha_emision, estado"
+)
 
 class ConsultaModel:
-    def __init__(self, db_path):
+    def __init__(self, db_path, vigencia_conteo=30.0):
+        """
+        Args:
+            db_path: Ruta a la base de datos SQLite
+            vigencia_conteo: Segundos que se reutiliza el total de una búsqueda
+        """
         self.db_path = db_path
+        self.vigencia_conteo = vigencia_conteo
+        # {(condiciones, parametros): (momento, total)}
+        self._conteos = {}
+        # idx_facturas_fecha_emision llega por migración
+        asegurar_esquema(db_path)
 
-    def obtener_facturas(self, filtros):
-        """Obtiene facturas según los filtros proporcionados."""
-        base_query = "SELECT * FROM facturas WHERE 1=1"
+    def _condiciones(self, filtros):
+        """Arma el WHERE de la búsqueda y sus parámetros a partir de los filtros."""
+        condiciones = "1=1"
         params = []
 
         # Agregar filtros dinámicamente
         if filtros.get("fecha_inicio") and filtros.get("fecha_fin"):
-            base_query += " AND fecha_emision BETWEEN ? AND ?"
+            condiciones += " AND fecha_emision BETWEEN ? AND ?"
             params.extend([filtros["fecha_inicio"], filtros["fecha_fin"]])
         if filtros.get("mes"):
-            base_query += " AND mes_facturacion = ?"
+            condiciones += " AND mes_facturacion = ?"
             params.append(filtros["mes"])
-        if filtros.get("direccion"):
-            base_query += " AND direccion LIKE ?"
-            params.append(f"%{filtros['direccion']}%")
-        if filtros.get("nombre"):
-            base_query += " AND nombre_cliente LIKE ?"
-            params.append(f"%{filtros['nombre']}%")
+        # Dirección y nombre por el índice de búsqueda de facturas
+        for columna, clave in (("direccion", "direccion"), ("nombre_cliente", "nombre")):
+            if filtros.get(clave):
+                condicion, params_texto = filtro_texto(self.db_path, "facturas", (columna,), filtros[clave])
+                if condicion:
+                    condiciones += f" AND {condicion}"
+                    params.extend(params_texto)
+        return condiciones, params
+
+    def contar_facturas(self, filtros, refrescar=False):
+        """
+        Cuenta las facturas de una búsqueda.
+
+        El total se guarda por combinación de filtros durante vigencia_conteo
+        segundos, así cambiar de página no vuelve a contar.
+
+        Args:
+            filtros: Diccionario de filtros (fecha_inicio, fecha_fin, mes, direccion, nombre)
+            refrescar: True para ignorar el total guardado (búsqueda nueva)
+
+        Returns:
+            int: Número de facturas que cumplen los filtros
+        """
+        condiciones, params = self._condiciones(filtros)
+        clave = (condiciones, tuple(params))
+        guardado = self._conteos.get(clave)
+        if not refrescar and guardado and time.monotonic() - guardado[0] <= self.vigencia_conteo:
+            return guardado[1]
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(base_query, params)
-            resultados = cursor.fetchall()
-            conn.close()
-            return resultados
+            with get_pool().connection(self.db_path) as conn:
+                total = conn.execute(f"SELECT COUNT(*) FROM facturas WHERE {condiciones}", params).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error al contar facturas: {e}")
+            return 0
+        self._conteos[clave] = (time.monotonic(), total)
+        return total
+
+    def obtener_pagina_facturas(self, filtros, limite, cursor=None, hacia_atras=False):
+        """
+        Obtiene una página de facturas con paginación por cursor (keyset).
+
+        Las facturas se ordenan por (fecha_emision, id), que es el orden de
+        idx_facturas_fecha_emision: cada página es una búsqueda en el índice
+        a partir del cursor, sin OFFSET ni filas de páginas anteriores.
+
+        Args:
+            filtros: Diccionario de filtros (ver contar_facturas)
+            limite: Facturas por página
+            cursor: (fecha_emision, id) de la última fila de la página anterior,
+                o de la primera si hacia_atras; None para empezar por un extremo
+            hacia_atras: True para leer la página anterior al cursor (o la
+                última página si no hay cursor)
+
+        Returns:
+            list: Tuplas con COLUMNAS_CONSULTA en orden ascendente
+        """
+        condiciones, params = self._condiciones(filtros)
+        if cursor is not None:
+            condiciones += " AND (fecha_emision, id) < (?, ?)" if hacia_atras else " AND (fecha_emision, id) > (?, ?)"
+            params.extend(cursor)
+        orden = "DESC" if hacia_atras else "ASC"
+
+        try:
+            with get_pool().connection(self.db_path) as conn:
+                filas = conn.execute(f"""
+                    SELECT {COLUMNAS_CONSULTA}
+                    FROM facturas
+                    WHERE {condiciones}
+                    ORDER BY fecha_emision {orden}, id {orden}
+                    LIMIT ?
+                """, params + [limite]).fetchall()
         except sqlite3.Error as e:
             print(f"Error al consultar facturas: {e}")
             return []
-            
+        return filas[::-1] if hacia_atras else filas
+
+    def invalidar_conteos(self):
+        """Descarta los totales guardados (después de editar facturas)."""
+        self._conteos.clear()
+
     def obtener_factura_por_id(self, id_factura):
         """Obtiene todos los datos de una factura específica para su reimpresión.
         
@@ -44,18 +127,20 @@ class ConsultaModel:
             Un diccionario con todos los datos de la factura o None si no se encuentra
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Permite acceder a columnas por nombre
-            cursor = conn.cursor()
-            
-            # Consulta principal para obtener datos de la factura
-            cursor.execute("SELECT * FROM facturas WHERE id = ?", (id_factura,))
-            factura = cursor.fetchone()
-            
-            if factura:
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row  # Permite acceder a columnas por nombre
+
+                # Consulta principal para obtener datos de la factura
+                cursor.execute("SELECT * FROM facturas WHERE id = ?", (id_factura,))
+                factura = cursor.fetchone()
+
+                if not factura:
+                    return None
+
                 # Convertir el objeto Row a un diccionario
                 factura_dict = dict(factura)
-                
+
                 # Opcionalmente: Obtener detalles de la factura si existe una tabla de detalles
                 # Esto asume que existe una tabla de detalles relacionada
                 try:
@@ -65,12 +150,8 @@ class ConsultaModel:
                 except sqlite3.Error:
                     # Si no existe la tabla de detalles o hay otro error, continuamos sin detalles
                     factura_dict["detalles"] = []
-                
-                conn.close()
+
                 return factura_dict
-            else:
-                conn.close()
-                return None
                 
         except sqlite3.Error as e:
             print(f"Error al obtener factura con ID {id_factura}: {e}")
@@ -1,24 +1,31 @@
 # app/models/consulta_pagados.py
 import sqlite3
+from app.database.connection import get_pool
+from app.helpers.busqueda_texto import filtro_texto
 
 class ConsultaRegistrosYDeudasModel:
     def __init__(self, db_path):
         self.db_path = db_path
 
+    def _filtro_direccion(self, direccion):
+        """Condición sobre c.direccion con el índice de búsqueda de clientes."""
+        condicion, params = filtro_texto(self.db_path, "clientes", ("direccion",), direccion, alias="c")
+        return condicion or "1=1", params
+
     def obtener_pagados(self, mes_facturacion, direccion):
         """Obtiene los usuarios que han registrado facturas en un mes específico con estado 'Pagado'."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = """
-                SELECT f.medidor_id, c.nombre_cliente, f.estado, c.direccion
-                FROM facturas f
-                JOIN clientes c ON f.medidor_id = c.id
-                WHERE f.mes_facturacion = ? AND f.estado = 'Pagado' AND c.direccion LIKE ?
-            """
-            cursor.execute(query, (mes_facturacion, f"%{direccion}%"))
-            resultados = cursor.fetchall()
-            conn.close()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                filtro, params = self._filtro_direccion(direccion)
+                query = f"""
+                    SELECT f.medidor_id, c.nombre_cliente, f.estado, c.direccion
+                    FROM facturas f
+                    JOIN clientes c ON f.medidor_id = c.id
+                    WHERE f.mes_facturacion = ? AND f.estado = 'Pagado' AND {filtro}
+                """
+                cursor.execute(query, (mes_facturacion, *params))
+                resultados = cursor.fetchall()
             return resultados
         except sqlite3.Error as e:
             print(f"Error al obtener usuarios pagados: {e}")
@@ -27,17 +34,17 @@ class ConsultaRegistrosYDeudasModel:
     def obtener_deudores(self, mes_facturacion, direccion):
         """Obtiene los clientes que no tienen facturas registradas en el mes especificado o cuya factura está en estado 'Deuda'."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = """
-                SELECT c.id, c.nombre_cliente, COALESCE(f.estado, 'Sin registrar') AS estado_factura, c.direccion
-                FROM clientes c
-                LEFT JOIN facturas f ON c.id = f.medidor_id AND f.mes_facturacion = ?
-                WHERE (f.estado IS NULL OR f.estado = 'Deuda') AND c.direccion LIKE ?
-            """
-            cursor.execute(query, (mes_facturacion, f"%{direccion}%"))
-            resultados = cursor.fetchall()
-            conn.close()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                filtro, params = self._filtro_direccion(direccion)
+                query = f"""
+                    SELECT c.id, c.nombre_cliente, COALESCE(f.estado, 'Sin registrar') AS estado_factura, c.direccion
+                    FROM clientes c
+                    LEFT JOIN facturas f ON c.id = f.medidor_id AND f.mes_facturacion = ?
+                    WHERE (f.estado IS NULL OR f.estado = 'Deuda') AND {filtro}
+                """
+                cursor.execute(query, (mes_facturacion, *params))
+                resultados = cursor.fetchall()
             return resultados
         except sqlite3.Error as e:
             print(f"Error al obtener deudores sin facturas: {e}")
@@ -46,19 +53,19 @@ class ConsultaRegistrosYDeudasModel:
     def mostrar_deudores_por_totales(self, direccion):
         """Obtiene los clientes y cuenta el número de facturas en estado 'Deuda', devolviendo solo los que tienen al menos 1 en deuda."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = """
-                SELECT c.id, c.nombre_cliente, COUNT(f.id) AS facturas_en_deuda, c.direccion
-                FROM clientes c
-                JOIN facturas f ON c.id = f.medidor_id
-                WHERE f.estado = 'Deuda' AND c.direccion LIKE ?
-                GROUP BY c.id
-                HAVING COUNT(f.id) > 0
-            """
-            cursor.execute(query, (f"%{direccion}%",))
-            resultados = cursor.fetchall()
-            conn.close()
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                filtro, params = self._filtro_direccion(direccion)
+                query = f"""
+                    SELECT c.id, c.nombre_cliente, COUNT(f.id) AS facturas_en_deuda, c.direccion
+                    FROM clientes c
+                    JOIN facturas f ON c.id = f.medidor_id
+                    WHERE f.estado = 'Deuda' AND {filtro}
+                    GROUP BY c.id
+                    HAVING COUNT(f.id) > 0
+                """
+                cursor.execute(query, params)
+                resultados = cursor.fetchall()
             return resultados
         except sqlite3.Error as e:
             print(f"Error al obtener deudores por totales: {e}")
@@ -1,78 +1,149 @@
 import sqlite3
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
+from app.helpers.auditoria import leer_estado, solo_cambios
+from app.helpers.contexto_cliente import invalidar_contexto_cliente
+from app.helpers.secuencia_facturacion import SecuenciaFacturacion, descomponer_numero_factura
+
+INSERT_FACTURA = """
+    INSERT INTO facturas (
+        medidor_id, nombre_cliente, lectura_id, mes_facturacion,
+        monto_total, fecha_emision, estado, servicio, traspaso, medidor,
+        reconexion, multas_sesiones, otros, tarifa_basica, tarifa_excedente,
+        direccion, monto_lectura, conexion_nueva, multas_mingas, materiales, numero_factura, tercera_edad,
+        serie, secuencial
+    ) VALUES (:medidor_id, :nombre_cliente, :lectura_id, :mes_facturacion,
+        :monto_total, :fecha_emision, :estado, :servicio, :traspaso, :medidor,
+        :reconexion, :multas_sesiones, :otros, :tarifa_basica, :tarifa_excedente,
+        :direccion, :monto_lectura, :conexion_nueva, :multas_mingas, :materiales, :numero_factura, :tercera_edad,
+        :serie, :secuencial)
+"""
+
+# Campos que se pueden cambiar al editar una factura (el número no cambia)
+COLUMNAS_EDITABLES = (
+    "medidor_id", "nombre_cliente", "lectura_id", "monto_lectura", "mes_facturacion", "monto_total",
+    "estado", "servicio", "traspaso", "medidor", "reconexion", "multas_sesiones", "multas_mingas",
+    "conexion_nueva", "otros", "tarifa_basica", "tarifa_excedente", "direccion", "materiales", "tercera_edad",
+)
+
 
 class FacturaModel:
     def __init__(self, db_path):
         self.db_path = db_path
-        self._verificar_campo_numero_factura()
+        # Columnas como numero_factura y tercera_edad llegan por migraciones
+        asegurar_esquema(db_path)
+        self.secuencia = SecuenciaFacturacion(db_path)
 
-    def _verificar_campo_numero_factura(self):
-        """Verifica y agrega el campo numero_factura si no existe."""
-        conn = None
+    def registrar_factura(self, datos):
+        """Registra una factura en la base de datos."""
+        # serie/secuencial alimentan el índice único de numeración
+        serie, secuencial = descomponer_numero_factura(datos.get("numero_factura"))
+        datos = dict(datos, serie=serie, secuencial=secuencial)
         try:
-            conn = sqlite3.connect(self.db_path, isolation_level='DEFERRED')
-            cursor = conn.cursor()
+            # INSERT y COMMIT, reintentando si otra caja tiene el bloqueo de escritura
+            factura_id = get_pool().ejecutar_escritura(
+                lambda conn: conn.execute(INSERT_FACTURA, datos).lastrowid, self.db_path, "registrar_factura"
+            )
 
-            # Verificar si la columna ya existe
-            cursor.execute("PRAGMA table_info(facturas)")
-            columnas = [columna[1] for columna in cursor.fetchall()]
+            # Verificar que se guardó
+            with get_pool().connection(self.db_path) as conn:
+                verificacion = conn.execute("SELECT id FROM facturas WHERE id = ?", (factura_id,)).fetchone()
 
-            if "numero_factura" not in columnas:
-                # Agregar la columna
-                cursor.execute("""
-                    ALTER TABLE facturas
-                    ADD COLUMN numero_factura TEXT
-                """)
-                conn.commit()
-                print("[OK] Campo 'numero_factura' agregado a la tabla facturas")
+            if not verificacion:
+                raise Exception(f"Factura {factura_id} no se encontró después del commit")
+
+            invalidar_contexto_cliente("facturas")
+            return factura_id
 
         except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
-            print(f"[ERROR] Error al verificar campo numero_factura: {e}")
-        finally:
-            if conn:
-                conn.close()
+            # Lo no confirmado se descarta al devolver la conexión al pool
+            print(f"[ERROR] Error al registrar factura: {e}")
+            return False
 
-    def registrar_factura(self, datos):
-        """Registra una factura en la base de datos."""
-        query = """
-            INSERT INTO facturas (
-                medidor_id, nombre_cliente, lectura_id, mes_facturacion,
-                monto_total, fecha_emision, estado, servicio, traspaso, medidor,
-                reconexion, multas_sesiones, otros, tarifa_basica, tarifa_excedente,
-                direccion, monto_lectura, conexion_nueva, multas_mingas, materiales, numero_factura, tercera_edad
-            ) VALUES (:medidor_id, :nombre_cliente, :lectura_id, :mes_facturacion,
-                :monto_total, :fecha_emision, :estado, :servicio, :traspaso, :medidor,
-                :reconexion, :multas_sesiones, :otros, :tarifa_basica, :tarifa_excedente,
-                :direccion, :monto_lectura, :conexion_nueva, :multas_mingas, :materiales, :numero_factura, :tercera_edad)
+    def emitir_factura(self, datos, establecimiento="001", punto_emision="010"):
         """
-        conn = None
-        try:
-            # Conectar a la base de datos con ruta absoluta
-            conn = sqlite3.connect(self.db_path, isolation_level='DEFERRED')
+        Numera, registra y salda deudas de una factura en una sola transacción.
+
+        Dentro de un BEGIN IMMEDIATE (ejecutar_escritura, que reintenta si otra
+        caja tiene el bloqueo) se reserva el número de la secuencia, se
+        inserta la factura y, si se emite como 'Pagado', se pasan a 'Pagado' las
+        facturas en 'Deuda' del medidor, igual que ActualizarDeudasHelper.
+        Si algo falla no queda nada escrito, ni siquiera el número reservado.
+
+        Args:
+            datos: Diccionario con los campos de la factura (sin numero_factura)
+            establecimiento: Código de establecimiento
+            punto_emision: Código de punto de emisión
+
+        Returns:
+            tuple: (factura_id, numero_factura); (None, None) si hubo un error
+        """
+        def emitir(conn):
             cursor = conn.cursor()
 
-            # Ejecutar el INSERT
-            cursor.execute(query, datos)
+            secuencial = self.secuencia.reservar_secuencial(cursor, establecimiento, punto_emision)
+            if secuencial is None:
+                return None, None
+
+            numero_factura = self.secuencia.formatear_numero_factura(secuencial, establecimiento, punto_emision)
+            cursor.execute(INSERT_FACTURA, dict(
+                datos,
+                numero_factura=numero_factura,
+                serie=f"{establecimiento}-{punto_emision}",
+                secuencial=secuencial
+            ))
             factura_id = cursor.lastrowid
 
-            # COMMIT EXPLÍCITO - CRÍTICO PARA PRODUCCIÓN
-            conn.commit()
+            if datos.get("estado") == "Pagado":
+                cursor.execute("""
+                    UPDATE facturas
+                    SET estado = 'Pagado'
+                    WHERE medidor_id = ? AND estado = 'Deuda'
+                """, (datos["medidor_id"],))
+            return factura_id, numero_factura
 
-            # Verificar que se guardó
-            cursor.execute("SELECT id FROM facturas WHERE id = ?", (factura_id,))
-            verificacion = cursor.fetchone()
+        try:
+            factura_id, numero_factura = get_pool().ejecutar_escritura(emitir, self.db_path, "emitir_factura")
+        except sqlite3.Error as e:
+            print(f"[ERROR] Error al emitir factura: {e}")
+            return None, None
 
-            if not verificacion:
-                raise Exception(f"Factura {factura_id} no se encontró después del commit")
+        if factura_id is None:
+            print(f"[ERROR] No existe secuencia activa para {establecimiento}-{punto_emision}")
+            return None, None
+        # En el servidor de BD la factura queda escrita recién al confirmar su lote
+        get_pool().al_confirmar(lambda: invalidar_contexto_cliente("facturas"), self.db_path)
+        print(f"[OK] Factura {numero_factura} registrada con ID {factura_id}")
+        return factura_id, numero_factura
 
-            return factura_id
+    def actualizar_factura(self, factura_id, datos):
+        """
+        Reemplaza los datos de una factura existente.
 
-        except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
-            print(f"[ERROR] Error al registrar factura: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
+        Los valores anteriores se leen dentro del mismo BEGIN IMMEDIATE que el
+        UPDATE, así otra caja no puede cambiarlos entre medio.
+
+        Args:
+            factura_id: ID de la factura
+            datos: Diccionario con los campos de COLUMNAS_EDITABLES
+
+        Returns:
+            tuple: (antes, despues) con solo los campos que cambiaron, para la auditoría
+
+        Raises:
+            sqlite3.Error: Si no se pudo actualizar
+        """
+        columnas = [columna for columna in COLUMNAS_EDITABLES if columna in datos]
+        nuevos = {columna: datos[columna] for columna in columnas}
+
+        def actualizar(conn):
+            cambios = solo_cambios(leer_estado(conn, "facturas", factura_id, columnas), nuevos)
+            conn.execute(
+                f"UPDATE facturas SET {', '.join(f'{columna} = :{columna}' for columna in columnas)} WHERE id = :id",
+                dict(nuevos, id=factura_id)
+            )
+            return cambios
+
+        antes, despues = get_pool().ejecutar_escritura(actualizar, self.db_path, "actualizar_factura")
+        get_pool().al_confirmar(lambda: invalidar_contexto_cliente("facturas"), self.db_path)
+        return antes, despues
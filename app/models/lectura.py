@@ -1,5 +1,7 @@
 import sqlite3
 from datetime import datetime
+from app.database.connection import get_pool
+from app.helpers.contexto_cliente import invalidar_contexto_cliente
 
 class Lectura:
     def __init__(self, medidor_id, lectura_anterior, lectura_actual, consumo, usuario_id, fecha_lectura, direccion, nombre_cliente):
@@ -19,37 +21,32 @@ class Lectura:
     @staticmethod
     def guardar_lectura(db_path, lectura):
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
             query = """
                 INSERT INTO lecturas (medidor_id, lectura_anterior, lectura_actual, consumo, fecha_lectura, usuario_id, direccion, nombre_cliente)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            get_pool().ejecutar_escritura(lambda conn: conn.execute(query, (
                 lectura.medidor_id, lectura.lectura_anterior, lectura.lectura_actual,
                 lectura.consumo, lectura.fecha_lectura, lectura.usuario_id,
                 lectura.direccion, lectura.nombre_cliente
-            ))
-            conn.commit()
+            )), db_path, "guardar_lectura")
+            invalidar_contexto_cliente("lecturas")
             return True
         except sqlite3.Error as e:
             print(f"Error al guardar la lectura: {e}")
             return False
-        finally:
-            conn.close()
 
 
     @staticmethod
     def obtener_lecturas(db_path, medidor_id=None):
         """Obtiene todas las lecturas o las de un cliente específico."""
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        if medidor_id:
-            cursor.execute("SELECT * FROM lecturas WHERE medidor_id = ?", (medidor_id,))
-        else:
-            cursor.execute("SELECT * FROM lecturas")
-        lecturas = cursor.fetchall()
-        conn.close()
+        with get_pool().connection(db_path) as conn:
+            cursor = conn.cursor()
+            if medidor_id:
+                cursor.execute("SELECT * FROM lecturas WHERE medidor_id = ?", (medidor_id,))
+            else:
+                cursor.execute("SELECT * FROM lecturas")
+            lecturas = cursor.fetchall()
         return lecturas
 
     @staticmethod
@@ -61,11 +58,10 @@ class Lectura:
             WHERE id = ?
         """
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute(query, (medidor_id,))
-            cliente = cursor.fetchone()
-            conn.close()
+            with get_pool().connection(db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (medidor_id,))
+                cliente = cursor.fetchone()
             if cliente:
                 return {"nombre_cliente": cliente[0], "direccion": cliente[1]}
             return None
@@ -84,11 +80,10 @@ class Lectura:
             LIMIT 1
         """
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute(query, (medidor_id,))
-            ultima_lectura = cursor.fetchone()
-            conn.close()
+            with get_pool().connection(db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (medidor_id,))
+                ultima_lectura = cursor.fetchone()
             if ultima_lectura:
                 return ultima_lectura[0]
             return None
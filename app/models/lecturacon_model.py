@@ -1,41 +1,58 @@
 import sqlite3
+from app.database.connection import get_pool, iterar_por_bloques
+from app.helpers.busqueda_texto import filtro_texto
+
+# Columnas en el orden de la tabla de ConsultaLecturasWidget
+COLUMNAS_LECTURAS = (
+    "id, medidor_id, lectura_anterior, lectura_actual, consumo, "
+    "fecha_lectura, usuario_id, direccion, nombre_cliente"
+)
 
 class LecturaModel:
     def __init__(self, db_path):
         self.db_path = db_path
 
-    def obtener_lecturas(self, filtros=None):
-        """Obtiene lecturas de la base de datos con filtros opcionales."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            query = "SELECT * FROM lecturas"
-            params = []
-
-            # Aplicar filtros
-            if filtros:
-                condiciones = []
-                if "mes" in filtros:
-                    condiciones.append("strftime('%m', fecha_lectura) = ?")
-                    params.append(f"{int(filtros['mes']):02d}")
-                if "año" in filtros:
-                    condiciones.append("strftime('%Y', fecha_lectura) = ?")
-                    params.append(filtros["año"])
-                if "direccion" in filtros:
-                    condiciones.append("direccion LIKE ?")
-                    params.append(f"%{filtros['direccion']}%")
-                if "nombre_cliente" in filtros:
-                    condiciones.append("nombre_cliente LIKE ?")
-                    params.append(f"%{filtros['nombre_cliente']}%")
+    def _consulta(self, filtros=None):
+        """Arma la consulta de lecturas y sus parámetros a partir de los filtros."""
+        query = f"SELECT {COLUMNAS_LECTURAS} FROM lecturas"
+        params = []
+
+        # Aplicar filtros
+        if filtros:
+            condiciones = []
+            if "mes" in filtros:
+                condiciones.append("strftime('%m', fecha_lectura) = ?")
+                params.append(f"{int(filtros['mes']):02d}")
+            if "año" in filtros:
+                condiciones.append("strftime('%Y', fecha_lectura) = ?")
+                params.append(filtros["año"])
+            # Dirección y cliente por el índice de búsqueda de lecturas
+            for columna in ("direccion", "nombre_cliente"):
+                if columna in filtros:
+                    condicion, params_texto = filtro_texto(self.db_path, "lecturas", (columna,), filtros[columna])
+                    if condicion:
+                        condiciones.append(condicion)
+                        params.extend(params_texto)
 
+            if condiciones:
                 query += " WHERE " + " AND ".join(condiciones)
+        return query, params
 
-            cursor.execute(query, params)
-            resultados = cursor.fetchall()
-            conn.close()
+    def obtener_lecturas(self, filtros=None):
+        """Obtiene lecturas de la base de datos con filtros opcionales."""
+        query, params = self._consulta(filtros)
+        try:
+            with get_pool().connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                resultados = cursor.fetchall()
 
             return resultados
         except sqlite3.Error as e:
             print(f"Error al obtener lecturas: {e}")
             return []
+
+    def iterar_lecturas(self, filtros=None, tamano_bloque=500):
+        """Recorre las lecturas filtradas por bloques, a medida que se piden."""
+        query, params = self._consulta(filtros)
+        return iterar_por_bloques(query, params, self.db_path, tamano_bloque)
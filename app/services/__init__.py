@@ -0,0 +1,7 @@
+"""
+Servicios de negocio sin interfaz gráfica.
+
+Nada de este paquete importa PyQt6: los usan los widgets y también la línea
+de comandos (celestine.py), así los trabajos nocturnos y de fin de mes se
+pueden ejecutar sin pantalla.
+"""
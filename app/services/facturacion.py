@@ -0,0 +1,158 @@
+"""
+Servicio de facturación: montos de una factura, facturación del mes y
+reimpresión en PDF.
+
+Los cargos fijos del formulario (traspaso, reconexión, multas...) viven aquí
+para que el formulario, la edición y la línea de comandos cobren lo mismo.
+"""
+
+import os
+import sqlite3
+from app.database.connection import get_pool
+from app.helpers.facturacion_masiva import FacturacionMasiva
+from app.helpers.motor_tarifas import obtener_tarifario
+
+# Cargos que se marcan en el formulario de facturas: (nombre, valor)
+CARGOS_ADICIONALES = (
+    ("Traspaso", 30.00),
+    ("Medidor", 50.00),
+    ("Reconexión", 10.00),
+    ("Multas Mingas", 10.00),
+    ("Multas Sesiones", 10.00),
+    ("Conexion Nueva", 500.00),
+)
+
+# Servicios de la sección "Otros" (se guardan sumados en facturas.otros)
+OTROS_SERVICIOS = (
+    ("Reubicacion", 30.00),
+    ("Sanciones", 100.00),
+    ("Multa carnet", 5.00),
+    ("Carnet Nuevo", 1.00),
+)
+
+# Carpeta de los PDF generados (main.py la crea junto al ejecutable)
+FACTURAS_DIR = "facturas_pdf"
+
+# Factura con la cédula del cliente y las lecturas de la lectura facturada
+CONSULTA_FACTURA = """
+    SELECT f.*, c.cliente_ci, l.lectura_anterior, l.lectura_actual
+    FROM facturas f
+    LEFT JOIN clientes c ON c.id = f.medidor_id
+    LEFT JOIN lecturas l ON l.id = f.lectura_id
+"""
+
+
+def calcular_montos(db_path, consumo, servicio, tercera_edad=False, adicionales=0.0, fecha=None):
+    """
+    Montos de una factura con la tarifa vigente.
+
+    Args:
+        db_path: Ruta a la base de datos
+        consumo: m³ consumidos
+        servicio: Tipo de servicio (DOMICILIARIA, COMERCIAL, ...)
+        tercera_edad: Aplicar el descuento de tercera edad a la básica
+        adicionales: Suma de cargos, otros servicios y materiales
+        fecha: Fecha YYYY-MM-DD de la tarifa a usar (default: hoy)
+
+    Returns:
+        dict: monto_basico, monto_excedente y monto_total
+    """
+    monto_basico, monto_excedente = obtener_tarifario(db_path, fecha).calcular(consumo, servicio, tercera_edad)
+    return {
+        "monto_basico": monto_basico,
+        "monto_excedente": monto_excedente,
+        "monto_total": monto_basico + monto_excedente + adicionales,
+    }
+
+
+def facturar_mes(db_path, mes_facturacion, fecha_emision=None, progreso=None, cancelado=None):
+    """
+    Emite la factura del mes para cada lectura pendiente (ver FacturacionMasiva).
+
+    Returns:
+        dict: Resumen de FacturacionMasiva.facturar_mes
+    """
+    return FacturacionMasiva(db_path).facturar_mes(
+        mes_facturacion, fecha_emision, progreso=progreso, cancelado=cancelado
+    )
+
+
+def buscar_factura(db_path, referencia):
+    """
+    Busca una factura por ID o por número (001-010-XXXXXXXXXX).
+
+    Returns:
+        dict: Columnas de facturas más cliente_ci, lectura_anterior y
+        lectura_actual; None si no existe o hubo un error
+    """
+    referencia = str(referencia).strip()
+    condicion = "f.id = ?" if referencia.isdigit() else "f.numero_factura = ?"
+    try:
+        with get_pool().connection(db_path) as conn:
+            cursor = conn.execute(f"{CONSULTA_FACTURA} WHERE {condicion}", (referencia,))
+            fila = cursor.fetchone()
+            if fila is None:
+                return None
+            return dict(zip((columna[0] for columna in cursor.description), fila))
+    except sqlite3.Error as e:
+        print(f"[ERROR] Error al buscar la factura {referencia}: {e}")
+        return None
+
+
+def datos_impresion(factura):
+    """
+    Convierte una fila de buscar_factura al diccionario de ImprimirFactura.
+
+    Las lecturas son las de la lectura facturada y la fecha es la de emisión
+    original, no la de la reimpresión.
+    """
+    def dinero(columna):
+        return f"${factura.get(columna) or 0:.2f}"
+
+    return {
+        "Numero de Factura": factura["numero_factura"] or factura["id"],
+        "Cliente": factura["nombre_cliente"],
+        "Cédula/ID": factura["cliente_ci"] or "",
+        "Medidor": factura["medidor_id"],
+        "Barrio": factura["direccion"],
+        "Lectura Actual": int(factura["lectura_actual"] or 0),
+        "Lectura Anterior": int(factura["lectura_anterior"] or 0),
+        "Consumo Mensual(m³)": int(factura["monto_lectura"] or 0),
+        "Tarifa Básica": dinero("tarifa_basica"),
+        "Tarifa Excedente": dinero("tarifa_excedente"),
+        "Traspaso": dinero("traspaso"),
+        "Medidor nuevo": dinero("medidor"),
+        "Reconexión": dinero("reconexion"),
+        "Multas sesiones": dinero("multas_sesiones"),
+        "Multas mingas": dinero("multas_mingas"),
+        "Conexion nueva": dinero("conexion_nueva"),
+        "Materiales": dinero("materiales"),
+        "Monto Otros": dinero("otros"),
+        "Monto Total": dinero("monto_total"),
+        "Estado": factura["estado"],
+        "Mes Facturación": factura["mes_facturacion"],
+        "Fecha Emisión": factura["fecha_emision"],
+    }
+
+
+def generar_pdf_factura(factura, output_path=None):
+    """
+    Genera el PDF de una factura ya registrada.
+
+    Args:
+        factura: Diccionario de buscar_factura
+        output_path: Ruta del PDF (default: facturas_pdf/factura_<número>.pdf)
+
+    Returns:
+        tuple: (exito, ruta del PDF o mensaje de error)
+    """
+    try:
+        from app.helpers.imprimir_factura import ImprimirFactura
+    except ImportError as e:
+        return False, f"Falta reportlab para generar PDF ({e})"
+
+    if output_path is None:
+        os.makedirs(FACTURAS_DIR, exist_ok=True)
+        output_path = os.path.join(FACTURAS_DIR, f"factura_{factura['numero_factura'] or factura['id']}.pdf")
+    return ImprimirFactura(datos_impresion(factura)).generar_pdf(output_path)
+
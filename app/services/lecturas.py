@@ -0,0 +1,130 @@
+"""
+Importación de lecturas desde un archivo CSV.
+
+El archivo trae una fila por medidor con las columnas medidor_id y
+lectura_actual (y opcionalmente fecha_lectura), separadas por coma o punto y
+coma. La lectura anterior y el consumo se calculan con la última lectura
+registrada de cada medidor, con las mismas validaciones del formulario de
+Lecturas. Las filas válidas se guardan por lotes de TAMANO_LOTE, cada uno en
+su transacción para no retener el bloqueo de escritura frente a las cajas; las
+demás se informan con su número de línea. Si un lote falla, los anteriores
+quedan guardados y una nueva importación del mismo archivo los rechaza como ya
+registrados.
+"""
+
+import csv
+import sqlite3
+from datetime import datetime
+from app.database.connection import get_pool
+from app.helpers.contexto_cliente import invalidar_contexto_cliente
+
+# Lecturas por transacción
+TAMANO_LOTE = 500
+
+# Nombres aceptados para cada columna del CSV
+COLUMNAS_CSV = {
+    "medidor_id": ("medidor_id", "medidor", "id"),
+    "lectura_actual": ("lectura_actual", "lectura"),
+    "fecha_lectura": ("fecha_lectura", "fecha"),
+}
+
+# Nombre, dirección, última lectura y su fecha de cada cliente (índice lecturas(medidor_id, fecha_lectura))
+CONSULTA_ULTIMAS_LECTURAS = """
+    SELECT c.id, c.nombre_cliente, c.direccion,
+           (SELECT lectura_actual FROM lecturas
+            WHERE medidor_id = c.id ORDER BY fecha_lectura DESC, id DESC LIMIT 1),
+           (SELECT MAX(fecha_lectura) FROM lecturas WHERE medidor_id = c.id)
+    FROM clientes c
+"""
+
+
+def _leer_csv(archivo):
+    """Filas del CSV como diccionarios con los nombres de COLUMNAS_CSV."""
+    with open(archivo, newline="", encoding="utf-8-sig") as f:
+        # Separador según el encabezado (Excel en español guarda con punto y coma)
+        encabezado = f.readline()
+        f.seek(0)
+        lector = csv.DictReader(f, delimiter=";" if encabezado.count(";") > encabezado.count(",") else ",")
+        encabezados = {(nombre or "").strip().lower(): nombre for nombre in lector.fieldnames or []}
+        columnas = {}
+        for columna, alias in COLUMNAS_CSV.items():
+            original = next((encabezados[a] for a in alias if a in encabezados), None)
+            if original is not None:
+                columnas[columna] = original
+        faltantes = [c for c in ("medidor_id", "lectura_actual") if c not in columnas]
+        if faltantes:
+            raise ValueError(f"Faltan las columnas {', '.join(faltantes)} en {archivo}")
+        for fila in lector:
+            yield lector.line_num, {columna: (fila.get(original) or "").strip() for columna, original in columnas.items()}
+
+
+def importar_lecturas(db_path, archivo, fecha_lectura=None, usuario_id=1):
+    """
+    Registra las lecturas de un archivo CSV.
+
+    Args:
+        db_path: Ruta a la base de datos
+        archivo: Ruta del CSV
+        fecha_lectura: Fecha YYYY-MM-DD para las filas sin fecha (default: hoy)
+        usuario_id: Usuario que registra las lecturas
+
+    Returns:
+        dict: total (filas leídas), importadas, errores (lista de (línea,
+        mensaje)) y lecturas (lista de (medidor_id, lectura_actual, consumo))
+    """
+    fecha_lectura = fecha_lectura or datetime.now().strftime("%Y-%m-%d")
+    resumen = {"total": 0, "importadas": 0, "errores": [], "lecturas": []}
+
+    with get_pool().connection(db_path) as conn:
+        clientes = {fila[0]: fila[1:] for fila in conn.execute(CONSULTA_ULTIMAS_LECTURAS)}
+
+    filas = []
+    for linea, datos in _leer_csv(archivo):
+        resumen["total"] += 1
+        try:
+            medidor_id = int(datos["medidor_id"])
+            lectura_actual = float(datos["lectura_actual"].replace(",", "."))
+            fecha = datos.get("fecha_lectura") or fecha_lectura
+            datetime.strptime(fecha, "%Y-%m-%d")
+        except ValueError:
+            resumen["errores"].append((linea, f"Valores invalidos: {datos}"))
+            continue
+
+        if medidor_id not in clientes:
+            resumen["errores"].append((linea, f"El medidor {medidor_id} no existe"))
+            continue
+        nombre_cliente, direccion, lectura_anterior, ultima_fecha = clientes[medidor_id]
+        lectura_anterior = lectura_anterior if lectura_anterior is not None else 0.0
+        if ultima_fecha is not None and fecha <= ultima_fecha:
+            resumen["errores"].append((linea, f"El medidor {medidor_id} ya tiene una lectura del {ultima_fecha}"))
+            continue
+        if lectura_actual < lectura_anterior:
+            resumen["errores"].append((linea, f"Medidor {medidor_id}: la lectura {lectura_actual} es menor que la anterior ({lectura_anterior})"))
+            continue
+
+        consumo = lectura_actual - lectura_anterior
+        filas.append((medidor_id, lectura_anterior, lectura_actual, consumo, fecha, usuario_id, direccion, nombre_cliente))
+        resumen["lecturas"].append((medidor_id, lectura_actual, consumo))
+        # Una segunda fila del mismo medidor parte de esta lectura
+        clientes[medidor_id] = (nombre_cliente, direccion, lectura_actual, fecha)
+
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        lote = filas[inicio:inicio + TAMANO_LOTE]
+        try:
+            get_pool().ejecutar_escritura(lambda conn, lote=lote: conn.executemany("""
+                INSERT INTO lecturas (medidor_id, lectura_anterior, lectura_actual, consumo, fecha_lectura, usuario_id, direccion, nombre_cliente)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, lote), db_path, "importar_lecturas")
+        except sqlite3.Error as e:
+            print(f"[ERROR] Error al guardar las lecturas importadas (desde la fila valida {inicio + 1}): {e}")
+            resumen["errores"].append((None, str(e)))
+            break
+        resumen["importadas"] += len(lote)
+
+    # Solo las lecturas que quedaron guardadas
+    resumen["lecturas"] = resumen["lecturas"][:resumen["importadas"]]
+    if resumen["importadas"]:
+        invalidar_contexto_cliente("lecturas")
+
+    print(f"[OK] {resumen['importadas']} de {resumen['total']} lecturas importadas desde {archivo}")
+    return resumen
@@ -0,0 +1,90 @@
+"""
+Pagos de servicios adicionales (por ahora, NUEVO MEDIDOR).
+
+El servicio se paga en un solo pago o diferido en cuatro cuotas que se
+registran en orden. Estas reglas las usa el formulario de Servicios y se
+pueden usar sin interfaz.
+"""
+
+from app.controllers.servicios_controller import ServiciosController
+
+NUEVO_MEDIDOR = "NUEVO MEDIDOR"
+MONTO_NUEVO_MEDIDOR = 500.00
+CUOTAS_DIFERIDAS = (250.00, 100.00, 100.00, 50.00)
+CAMPOS_PAGO = ("pago_uno", "pago_dos", "pago_tres", "pago_cuatro")
+
+
+def monto_servicio(tipo_servicio):
+    """Monto total de un servicio (0 si no tiene precio fijo)."""
+    return MONTO_NUEVO_MEDIDOR if tipo_servicio == NUEVO_MEDIDOR else 0.0
+
+
+def cuotas_servicio(tipo_servicio, monto, diferido=False):
+    """
+    Valor de cada uno de los cuatro pagos.
+
+    Returns:
+        list: Cuatro montos; sin diferir, todo en el primero
+    """
+    if tipo_servicio == NUEVO_MEDIDOR and diferido:
+        return list(CUOTAS_DIFERIDAS)
+    return [monto, 0.0, 0.0, 0.0]
+
+
+def siguiente_pago(pagados):
+    """
+    Índice del próximo pago que se puede registrar (se pagan en orden).
+
+    Args:
+        pagados: Cuatro booleanos, uno por pago
+
+    Returns:
+        int: Índice del primer pago sin registrar; None si están todos
+    """
+    return next((indice for indice, pagado in enumerate(pagados) if not pagado), None)
+
+
+def total_pagado(cuotas, pagados):
+    """Suma de las cuotas marcadas como pagadas."""
+    return sum(cuota for cuota, pagado in zip(cuotas, pagados) if pagado)
+
+
+def saldo_pendiente(monto, cuotas, pagados):
+    """Lo que falta pagar del servicio."""
+    return monto - total_pagado(cuotas, pagados)
+
+
+def validar_pago(datos_servicio):
+    """
+    Valida un pago antes de registrarlo.
+
+    Returns:
+        tuple: (valido, mensaje de error)
+    """
+    if (not datos_servicio.get("numero_medidor") or datos_servicio.get("usuario_servicio") != NUEVO_MEDIDOR
+            or not datos_servicio.get("monto_servicio", 0) > 0):
+        return False, "Seleccione 'NUEVO MEDIDOR' y complete los datos requeridos."
+    if not any(float(datos_servicio.get(campo) or 0) for campo in CAMPOS_PAGO):
+        return False, "Seleccione al menos un pago para registrar."
+    return True, ""
+
+
+def registrar_pago(db_path, datos_servicio):
+    """
+    Valida y registra un pago de servicio.
+
+    Args:
+        db_path: Ruta a la base de datos
+        datos_servicio: numero_medidor, nombre_usuario, direccion_usuario,
+            usuario_servicio, monto_servicio y pago_uno..pago_cuatro
+
+    Returns:
+        tuple: (id_servicio o None, mensaje)
+    """
+    valido, mensaje = validar_pago(datos_servicio)
+    if not valido:
+        return None, mensaje
+    id_servicio = ServiciosController(db_path).registrar_servicio(datos_servicio)
+    if id_servicio is None:
+        return None, "Error al registrar el pago."
+    return id_servicio, f"Pago registrado con ID: {id_servicio}"
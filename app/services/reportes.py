@@ -0,0 +1,93 @@
+"""
+Reportes sin interfaz: listados de pagados y deudores y recaudación del año.
+
+Cada reporte devuelve (encabezados, filas); escribir_csv los guarda en un
+archivo que se abre directamente en Excel.
+"""
+
+import csv
+import os
+from datetime import datetime
+from app.database.connection import get_pool
+from app.helpers.database_migrator import asegurar_esquema
+from app.helpers.facturacion_masiva import MESES
+from app.models.consulta_pagados import ConsultaRegistrosYDeudasModel
+
+REPORTES_DIR = "reportes"
+
+REPORTES = ("pagados", "deudores", "deudas", "recaudacion")
+
+
+def listado_pagados(db_path, mes_facturacion, direccion=""):
+    """Clientes con la factura del mes pagada."""
+    filas = ConsultaRegistrosYDeudasModel(db_path).obtener_pagados(mes_facturacion, direccion)
+    return ("Medidor ID", "Nombre Cliente", "Estado", "Dirección"), filas
+
+
+def listado_deudores(db_path, mes_facturacion, direccion=""):
+    """Clientes con la factura del mes en deuda o sin registrar."""
+    filas = ConsultaRegistrosYDeudasModel(db_path).obtener_deudores(mes_facturacion, direccion)
+    return ("Medidor ID", "Nombre Cliente", "Estado", "Dirección"), filas
+
+
+def listado_deudas(db_path, direccion=""):
+    """Clientes con al menos una factura en deuda y cuántas tienen."""
+    filas = ConsultaRegistrosYDeudasModel(db_path).mostrar_deudores_por_totales(direccion)
+    return ("Medidor ID", "Nombre Cliente", "Facturas en Deuda", "Dirección"), filas
+
+
+def recaudacion_anual(db_path, anio, direccion=""):
+    """
+    Facturas y montos por mes y estado, de resumen_recaudacion.
+
+    Returns:
+        tuple: (encabezados, filas (mes, estado, cantidad, monto) en orden de meses)
+    """
+    asegurar_esquema(db_path)
+    condicion, params = ("AND direccion = ?", (direccion,)) if direccion else ("", ())
+    with get_pool().connection(db_path) as conn:
+        filas = conn.execute(f"""
+            SELECT mes_facturacion, estado, SUM(cantidad), ROUND(SUM(monto_total), 2)
+            FROM resumen_recaudacion
+            WHERE anio = ? {condicion}
+            GROUP BY mes_facturacion, estado
+        """, (str(anio), *params)).fetchall()
+    orden = {mes: indice for indice, mes in enumerate(MESES)}
+    filas.sort(key=lambda fila: (orden.get(fila[0], len(MESES)), fila[1]))
+    return ("Mes", "Estado", "Facturas", "Monto"), filas
+
+
+def generar_reporte(db_path, tipo, mes_facturacion=None, anio=None, direccion=""):
+    """
+    Genera un reporte por nombre (ver REPORTES).
+
+    Returns:
+        tuple: (encabezados, filas)
+    """
+    if tipo in ("pagados", "deudores"):
+        if mes_facturacion not in MESES:
+            raise ValueError(f"El reporte {tipo} necesita un mes valido")
+        listado = listado_pagados if tipo == "pagados" else listado_deudores
+        return listado(db_path, mes_facturacion, direccion)
+    if tipo == "deudas":
+        return listado_deudas(db_path, direccion)
+    if tipo == "recaudacion":
+        return recaudacion_anual(db_path, anio or datetime.now().year, direccion)
+    raise ValueError(f"Reporte desconocido: {tipo} (opciones: {', '.join(REPORTES)})")
+
+
+def escribir_csv(ruta, encabezados, filas):
+    """
+    Guarda un reporte en CSV (UTF-8 con BOM, para Excel).
+
+    Returns:
+        str: Ruta del archivo escrito
+    """
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta, "w", newline="", encoding="utf-8-sig") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(encabezados)
+        escritor.writerows(filas)
+    return ruta
@@ -0,0 +1,34 @@
+"""
+Respaldos sin interfaz: instantánea en el almacén y verificación.
+
+Pensado para el trabajo nocturno: guarda la instantánea (crear_backup) y
+comprueba que el almacén tenga todos sus bloques íntegros.
+"""
+
+from app.helpers.almacen_respaldos import directorio_almacen, listar_instantaneas, verificar_almacen
+from app.helpers.backup_helper import crear_backup
+
+
+def respaldar(db_path, progreso=None, verificar=True, completo=False):
+    """
+    Guarda una instantánea de la BD y, opcionalmente, verifica el almacén.
+
+    Args:
+        db_path: Ruta a la base de datos
+        progreso: Función opcional progreso(paginas_copiadas, paginas_totales)
+        verificar: Verificar los bloques de todas las instantáneas
+        completo: Además reconstruir cada instantánea y ejecutar integrity_check
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    exito, mensaje = crear_backup(db_path, progreso)
+    if not exito or not verificar:
+        return exito, mensaje
+
+    almacen = directorio_almacen(db_path)
+    problemas = verificar_almacen(almacen, completo)
+    if problemas:
+        detalle = "; ".join(f"{id_instantanea}: {problema}" for id_instantanea, problema in problemas[:5])
+        return False, f"{mensaje}. El almacen tiene {len(problemas)} instantaneas con problemas: {detalle}"
+    return True, f"{mensaje}. {len(listar_instantaneas(almacen))} instantaneas verificadas"
@@ -0,0 +1,29 @@
+import os
+from PyQt6.QtCore import QUrl
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import QMessageBox
+
+
+def mostrar_pdf(parent, resultado, aviso=None):
+    """
+    Abre en el visor predeterminado el PDF generado, o muestra el error.
+
+    Los generadores de PDF (app/helpers/imprimir_*.py) no tocan la interfaz:
+    devuelven (exito, ruta o mensaje) y las vistas lo muestran con esta función.
+
+    Args:
+        parent: Widget padre de los mensajes
+        resultado: Tupla (exito, ruta del PDF o mensaje de error)
+        aviso: Texto del mensaje de éxito antes de la ruta (None = abrir sin avisar)
+
+    Returns:
+        bool: True si el PDF se generó
+    """
+    exito, mensaje = resultado
+    if not exito:
+        QMessageBox.critical(parent, "Error", f"No se pudo generar el PDF: {mensaje}")
+        return False
+    if aviso:
+        QMessageBox.information(parent, "Éxito", f"{aviso}: {mensaje}")
+    QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(mensaje)))
+    return True
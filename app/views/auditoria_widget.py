@@ -0,0 +1,141 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableView,
+    QPushButton, QHeaderView, QComboBox, QDateEdit, QCheckBox
+)
+from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtGui import QFont
+import json
+from app.helpers.auditoria import buscar_auditoria, valores_filtro
+from app.helpers.sistema_logs import get_logger
+from app.views.modelo_tabla import ModeloTablaPerezoso
+
+ENTIDADES = ["Todas", "factura", "cliente", "medidor", "servicio"]
+
+
+def texto_cambios(antes, despues):
+    """'campo: antes -> después' por cada campo modificado."""
+    if not antes and not despues:
+        return ""
+    antes = json.loads(antes) if antes else {}
+    despues = json.loads(despues) if despues else {}
+    return "; ".join(f"{campo}: {antes.get(campo, '')} -> {despues.get(campo, '')}"
+                     for campo in dict.fromkeys([*antes, *despues]))
+
+
+class AuditoriaWidget(QWidget):
+    """Visor de la tabla auditoria: quién hizo qué, cuándo y sobre qué registro."""
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.init_ui()
+
+    def init_ui(self):
+        """Inicializa la interfaz gráfica."""
+        main_layout = QVBoxLayout()
+
+        titulo = QLabel("Auditoría")
+        titulo.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        titulo.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(titulo)
+
+        # Filtros - Primera fila
+        filter_layout1 = QHBoxLayout()
+
+        filter_layout1.addWidget(QLabel("Usuario:"))
+        self.usuario_combo = QComboBox()
+        filter_layout1.addWidget(self.usuario_combo)
+
+        filter_layout1.addWidget(QLabel("Acción:"))
+        self.accion_combo = QComboBox()
+        filter_layout1.addWidget(self.accion_combo)
+
+        filter_layout1.addWidget(QLabel("Registro:"))
+        self.entidad_combo = QComboBox()
+        self.entidad_combo.addItems(ENTIDADES)
+        filter_layout1.addWidget(self.entidad_combo)
+        self.entidad_id_filter = QLineEdit()
+        self.entidad_id_filter.setPlaceholderText("ID (ej. número de factura)")
+        self.entidad_id_filter.returnPressed.connect(self.buscar)
+        filter_layout1.addWidget(self.entidad_id_filter)
+
+        main_layout.addLayout(filter_layout1)
+
+        # Filtros - Segunda fila
+        filter_layout2 = QHBoxLayout()
+
+        filter_layout2.addWidget(QLabel("Desde:"))
+        self.desde_edit = QDateEdit(QDate.currentDate().addDays(-30))
+        self.desde_edit.setCalendarPopup(True)
+        self.desde_edit.setDisplayFormat("yyyy-MM-dd")
+        filter_layout2.addWidget(self.desde_edit)
+
+        filter_layout2.addWidget(QLabel("Hasta:"))
+        self.hasta_edit = QDateEdit(QDate.currentDate())
+        self.hasta_edit.setCalendarPopup(True)
+        self.hasta_edit.setDisplayFormat("yyyy-MM-dd")
+        filter_layout2.addWidget(self.hasta_edit)
+
+        self.archivo_check = QCheckBox("Incluir registros archivados")
+        filter_layout2.addWidget(self.archivo_check)
+        filter_layout2.addStretch()
+
+        self.buscar_button = QPushButton("Buscar")
+        self.buscar_button.clicked.connect(self.buscar)
+        filter_layout2.addWidget(self.buscar_button)
+
+        main_layout.addLayout(filter_layout2)
+
+        # Tabla (los registros se leen a medida que se desplaza)
+        self.table = QTableView()
+        self.table_model = ModeloTablaPerezoso([
+            "Fecha", "Usuario", "Rol", "Acción", "Registro", "ID", "Detalle", "Cambios"
+        ], texto=lambda valor: "" if valor is None else str(valor), parent=self)
+        self.table.setModel(self.table_model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        main_layout.addWidget(self.table)
+
+        self.setLayout(main_layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Cada vez que se abre la página: usuarios/acciones nuevos y últimos registros
+        self.cargar_filtros()
+        self.buscar()
+
+    def cargar_filtros(self):
+        """Llena los combos de usuario y acción conservando la selección."""
+        usuarios, acciones = valores_filtro(self.db_path)
+        for combo, todos, valores in ((self.usuario_combo, "Todos", usuarios), (self.accion_combo, "Todas", acciones)):
+            actual = combo.currentText()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems([todos] + valores)
+            if combo.findText(actual) >= 0:
+                combo.setCurrentText(actual)
+            combo.blockSignals(False)
+
+    def buscar(self):
+        """Consulta la auditoría con los filtros seleccionados."""
+        # Incluir las acciones recién registradas que el hilo de logs aún no escribió
+        get_logger().vaciar(timeout=1)
+
+        usuario = self.usuario_combo.currentText()
+        accion = self.accion_combo.currentText()
+        entidad = self.entidad_combo.currentText()
+        registros = buscar_auditoria(
+            self.db_path,
+            usuario=None if usuario in ("", "Todos") else usuario,
+            accion=None if accion in ("", "Todas") else accion,
+            desde=self.desde_edit.date().toString("yyyy-MM-dd"),
+            hasta=self.hasta_edit.date().toString("yyyy-MM-dd"),
+            entidad=None if entidad == "Todas" else entidad,
+            entidad_id=self.entidad_id_filter.text().strip() or None,
+            incluir_archivo=self.archivo_check.isChecked(),
+        )
+        self.table_model.cargar(
+            (fecha, usuario, rol, accion, entidad, entidad_id, detalle, texto_cambios(antes, despues))
+            for _, fecha, usuario, rol, accion, entidad, entidad_id, detalle, antes, despues in registros
+        )
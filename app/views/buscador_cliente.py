@@ -0,0 +1,108 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from app.helpers.contexto_cliente import get_contexto_cliente
+
+# Un único hilo para las consultas: las búsquedas viejas se descartan antes de
+# ejecutarse y el hilo conserva su conexión del pool
+_hilo_consultas = None
+
+def _get_hilo_consultas():
+    global _hilo_consultas
+    if _hilo_consultas is None:
+        _hilo_consultas = QThreadPool()
+        _hilo_consultas.setMaxThreadCount(1)
+        _hilo_consultas.setExpiryTimeout(-1)
+    return _hilo_consultas
+
+
+class _ConsultaCliente(QRunnable):
+    """Carga un contexto de cliente fuera del hilo de la interfaz."""
+
+    def __init__(self, buscador, secuencia, clave):
+        super().__init__()
+        self.buscador = buscador
+        self.secuencia = secuencia
+        self.clave = clave
+
+    def run(self):
+        # Si mientras esperaba se escribió otro número, no se consulta
+        if self.secuencia != self.buscador.secuencia:
+            return
+        try:
+            contexto = get_contexto_cliente().obtener(
+                self.buscador.tipo, self.clave, self.buscador.cargar, self.buscador.tablas
+            )
+        except Exception as e:
+            print(f"[ERROR] Error al consultar cliente {self.clave}: {e}")
+            contexto = None
+        self.buscador._consulta_terminada.emit(self.secuencia, self.clave, contexto)
+
+
+class BuscadorCliente(QObject):
+    """
+    Búsqueda de cliente mientras se escribe en un campo de número de medidor.
+
+    Espera a que se deje de escribir (retraso_ms), consulta en segundo plano
+    con la caché compartida y emite `encontrado(clave, contexto)` solo con el
+    resultado del último texto escrito. contexto es None si no existe o si el
+    texto no es válido.
+
+    Cada cambio del texto emite antes `cambiado(texto)`: mientras la consulta
+    está pendiente el formulario debe vaciar los datos del cliente anterior y
+    no permitir registrar.
+    """
+    encontrado = pyqtSignal(str, object)
+    cambiado = pyqtSignal(str)
+    _consulta_terminada = pyqtSignal(int, str, object)
+
+    def __init__(self, campo, tipo, cargar, tablas, retraso_ms=250, validar=str.isdigit, parent=None):
+        """
+        Args:
+            campo: QLineEdit del número de medidor
+            tipo: Nombre del formulario para la caché ("lecturas", "servicios", "facturas")
+            cargar: Función cargar(clave) que consulta la BD y devuelve el contexto
+            tablas: Tablas de las que depende el contexto
+            retraso_ms: Espera después de la última tecla
+            validar: Función que indica si el texto merece una consulta
+        """
+        super().__init__(parent or campo)
+        self.campo = campo
+        self.tipo = tipo
+        self.cargar = cargar
+        self.tablas = tablas
+        self.validar = validar
+        self.secuencia = 0
+
+        self._temporizador = QTimer(self)
+        self._temporizador.setSingleShot(True)
+        self._temporizador.setInterval(retraso_ms)
+        self._temporizador.timeout.connect(self._consultar)
+        self._consulta_terminada.connect(self._entregar)
+        campo.textChanged.connect(self._texto_cambiado)
+
+    def _texto_cambiado(self, texto):
+        self.secuencia += 1
+        self.cambiado.emit(texto)
+        if not self.validar(texto):
+            self._temporizador.stop()
+            self.encontrado.emit(texto, None)
+            return
+        self._temporizador.start()
+
+    def _consultar(self):
+        clave = self.campo.text()
+        encontrado, contexto = get_contexto_cliente().buscar(self.tipo, clave)
+        if encontrado:
+            self.encontrado.emit(clave, contexto)
+            return
+        _get_hilo_consultas().start(_ConsultaCliente(self, self.secuencia, clave))
+
+    def _entregar(self, secuencia, clave, contexto):
+        # Resultado de un texto que ya cambió: se descarta
+        if secuencia == self.secuencia:
+            self.encontrado.emit(clave, contexto)
+
+    def refrescar(self):
+        """Vuelve a consultar el texto actual sin esperar (p. ej. después de guardar)."""
+        self.secuencia += 1
+        if self.validar(self.campo.text()):
+            self._consultar()
@@ -1,9 +1,11 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableWidget, 
-    QTableWidgetItem, QPushButton, QHeaderView
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableView,
+    QPushButton, QHeaderView
 )
 from PyQt6.QtCore import Qt
-import sqlite3
+from app.database.connection import iterar_por_bloques
+from app.helpers.busqueda_texto import filtro_texto
+from app.views.modelo_tabla import ModeloTablaPerezoso
 
 class ConsultaClientesWidget(QWidget):
     def __init__(self, db_path, parent=None):
@@ -59,13 +61,12 @@ class ConsultaClientesWidget(QWidget):
         main_layout.addLayout(filter_layout2)
 
         # Tabla para mostrar los datos
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)  # Número de columnas
-        self.table.setHorizontalHeaderLabels([
+        self.table = QTableView()
+        self.table_model = ModeloTablaPerezoso([
             "ID", "Nombres del cliente", "CI", "Dirección", "Teléfono", "Email", "Número de conexión"
-        ])
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        ], parent=self)
+        self.table.setModel(self.table_model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
@@ -77,55 +78,33 @@ class ConsultaClientesWidget(QWidget):
 
     def cargar_datos(self):
         """Carga los datos desde la base de datos a la tabla."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            query = "SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion FROM clientes"
-            cursor.execute(query)
-            clientes = cursor.fetchall()
-            conn.close()
-
-            self.mostrar_datos(clientes)
-        except sqlite3.Error as e:
-            print(f"Error al cargar los datos: {e}")
+        query = "SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion FROM clientes"
+        self.mostrar_datos(iterar_por_bloques(query, (), self.db_path))
 
     def mostrar_datos(self, clientes):
-        """Muestra los datos en la tabla."""
-        self.table.setRowCount(0)  # Limpia la tabla
-        for row_number, cliente in enumerate(clientes):
-            self.table.insertRow(row_number)
-            for column_number, data in enumerate(cliente):
-                self.table.setItem(row_number, column_number, QTableWidgetItem(str(data)))
+        """Muestra los datos en la tabla (los clientes se leen a medida que se desplaza)."""
+        self.table_model.cargar(clientes)
 
     def filtrar_datos(self):
         """Filtra los datos según los valores ingresados en los filtros."""
         id_cliente = self.id_filter.text().strip()
         ci_cliente = self.ci_filter.text().strip()
-        nombre = self.nombre_filter.text().strip().lower()
-        direccion = self.direccion_filter.text().strip().lower()
-
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            query = """
-                SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion
-                FROM clientes
-                WHERE 
-                    (id LIKE ? OR ? = '') AND
-                    (cliente_ci LIKE ? OR ? = '') AND
-                    (LOWER(nombre_cliente) LIKE ? OR ? = '') AND
-                    (LOWER(direccion) LIKE ? OR ? = '')
-            """
-            cursor.execute(query, (
-                f"%{id_cliente}%", id_cliente,
-                f"%{ci_cliente}%", ci_cliente,
-                f"%{nombre}%", nombre,
-                f"%{direccion}%", direccion
-            ))
-            clientes = cursor.fetchall()
-            conn.close()
-
-            self.mostrar_datos(clientes)
-        except sqlite3.Error as e:
-            print(f"Error al filtrar los datos: {e}")
+        nombre = self.nombre_filter.text().strip()
+        direccion = self.direccion_filter.text().strip()
+
+        condiciones = ["(id LIKE ? OR ? = '')"]
+        params = [f"%{id_cliente}%", id_cliente]
+
+        # CI, nombre y dirección por el índice de búsqueda (prefijos, sin tildes)
+        for columna, texto in (("cliente_ci", ci_cliente), ("nombre_cliente", nombre), ("direccion", direccion)):
+            condicion, params_texto = filtro_texto(self.db_path, "clientes", (columna,), texto)
+            if condicion:
+                condiciones.append(condicion)
+                params.extend(params_texto)
+
+        query = f"""
+            SELECT id, nombre_cliente, cliente_ci, direccion, telefono, email, numero_conexion
+            FROM clientes
+            WHERE {" AND ".join(condiciones)}
+        """
+        self.mostrar_datos(iterar_por_bloques(query, params, self.db_path))
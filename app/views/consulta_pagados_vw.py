@@ -1,12 +1,31 @@
 # app/views/consulta_registros_y_deudas.py
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, 
-    QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+    QLineEdit, QTableView, QHeaderView, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
 from app.controllers.consulta_pagados_contrl import ConsultaRegistrosYDeudasController
-from app.helpers.imprimir_pagados import ImprimirListado
+from app.views.modelo_tabla import ModeloTablaPerezoso, texto_celda
+
+# Colores por cantidad de facturas en deuda
+COLOR_DEUDA_ALTA = QColor(255, 100, 100)  # Rojo para 6 o más facturas en deuda
+COLOR_DEUDA_MEDIA = QColor(255, 255, 100)  # Amarillo para 3 a 5 facturas en deuda
+COLOR_SIN_DEUDA = QColor(255, 255, 255)  # Blanco (sin color especial)
+
+
+def texto_o_sin_registro(dato):
+    return str(dato) if dato is not None else "Sin registro"
+
+
+def color_por_deudas(deudor):
+    """Color de la fila según el número de facturas en deuda (columna 2)."""
+    facturas_en_deuda = int(deudor[2])
+    if facturas_en_deuda >= 6:
+        return COLOR_DEUDA_ALTA
+    if facturas_en_deuda >= 3:
+        return COLOR_DEUDA_MEDIA
+    return COLOR_SIN_DEUDA
 
 class ConsultaRegistrosYDeudas(QWidget):
     def __init__(self, db_path, parent=None):
@@ -53,9 +72,11 @@ class ConsultaRegistrosYDeudas(QWidget):
         layout.addLayout(button_layout)
 
         # Tabla de resultados
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(4)
-        self.result_table.setHorizontalHeaderLabels(["Medidor ID", "Nombre Cliente", "Estado Factura", "Dirección"])
+        self.result_table = QTableView()
+        self.result_model = ModeloTablaPerezoso(
+            ["Medidor ID", "Nombre Cliente", "Estado Factura", "Dirección"], parent=self
+        )
+        self.result_table.setModel(self.result_model)
         self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.result_table)
 
@@ -79,13 +100,7 @@ class ConsultaRegistrosYDeudas(QWidget):
         mes = self.mes_facturacion_combo.currentText()
         direccion = self.direccion_input.text()
         resultados = self.controller.buscar_pagados(mes, direccion)
-
-        self.result_table.setRowCount(len(resultados))
-        for row, factura in enumerate(resultados):
-            for col, dato in enumerate(factura):
-                item = QTableWidgetItem(str(dato) if dato is not None else "Sin registro")
-                item.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled)  # Hace la celda de solo lectura
-                self.result_table.setItem(row, col, item)
+        self.mostrar_resultados(resultados, texto_o_sin_registro)
 
         self.imprimir_pagados_btn.setEnabled(bool(resultados))  # Habilitar botón si hay datos
 
@@ -94,13 +109,7 @@ class ConsultaRegistrosYDeudas(QWidget):
         mes = self.mes_facturacion_combo.currentText()
         direccion = self.direccion_input.text()
         resultados = self.controller.buscar_deudores(mes, direccion)
-
-        self.result_table.setRowCount(len(resultados))
-        for row, deudor in enumerate(resultados):
-            for col, dato in enumerate(deudor):
-                item = QTableWidgetItem(str(dato) if dato is not None else "Sin registro")
-                item.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled)  # Hace la celda de solo lectura
-                self.result_table.setItem(row, col, item)
+        self.mostrar_resultados(resultados, texto_o_sin_registro)
 
         self.imprimir_deudores_btn.setEnabled(bool(resultados))  # Habilitar botón si hay datos
 
@@ -108,31 +117,27 @@ class ConsultaRegistrosYDeudas(QWidget):
         """Obtiene y muestra los clientes con facturas en estado 'Deuda' y su cantidad de facturas en deuda."""
         direccion = self.direccion_input.text()
         resultados = self.controller.buscar_deudores_por_totales(direccion)
+        self.mostrar_resultados(resultados, texto_celda, color_por_deudas)
 
-        self.result_table.setRowCount(len(resultados))
-        for row, deudor in enumerate(resultados):
-            facturas_en_deuda = int(deudor[2])  # Número de facturas en deuda
-
-            # Determinar el color de la fila
-            if facturas_en_deuda >= 6:
-                color = QColor(255, 100, 100)  # Rojo para 6 o más facturas en deuda
-            elif facturas_en_deuda >= 3:
-                color = QColor(255, 255, 100)  # Amarillo para 3 a 5 facturas en deuda
-            else:
-                color = QColor(255, 255, 255)  # Blanco (sin color especial)
+    def mostrar_resultados(self, resultados, texto, color_fila=None):
+        """Carga los resultados en el modelo de la tabla (texto y color se calculan al dibujar)."""
+        self.result_model.texto = texto
+        self.result_model.color_fila = color_fila
+        self.result_model.cargar(resultados)
 
-            for col, dato in enumerate(deudor):
-                item = QTableWidgetItem(str(dato))
-                item.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled)  # Hace la celda de solo lectura
-                item.setBackground(color)  # Aplicar color de fondo
-                self.result_table.setItem(row, col, item)
+    def filas_para_imprimir(self):
+        """Filas de la tabla con el mismo texto que se muestra en pantalla."""
+        texto = self.result_model.texto
+        return [[texto(dato) for dato in fila[:4]] for fila in self.result_model.todas_las_filas()]
 
     def imprimir_pagados(self):
         """Llama al helper para imprimir la lista de pagados."""
         try:
             mes = self.mes_facturacion_combo.currentText()
-            datos = [[self.result_table.item(row, col).text() for col in range(4)] for row in range(self.result_table.rowCount())]
-            ImprimirListado("Lista de Pagados", datos, mes).generar_pdf()
+            datos = self.filas_para_imprimir()
+            from app.helpers.imprimir_pagados import ImprimirListado
+            from app.views.abrir_pdf import mostrar_pdf
+            mostrar_pdf(self, ImprimirListado("Lista de Pagados", datos, mes).generar_pdf(), "Listado generado correctamente en")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo generar el PDF: {e}")
 
@@ -140,7 +145,9 @@ class ConsultaRegistrosYDeudas(QWidget):
         """Llama al helper para imprimir la lista de deudores."""
         try:
             mes = self.mes_facturacion_combo.currentText()
-            datos = [[self.result_table.item(row, col).text() for col in range(4)] for row in range(self.result_table.rowCount())]
-            ImprimirListado("Lista de Deudores", datos, mes).generar_pdf()
+            datos = self.filas_para_imprimir()
+            from app.helpers.imprimir_pagados import ImprimirListado
+            from app.views.abrir_pdf import mostrar_pdf
+            mostrar_pdf(self, ImprimirListado("Lista de Deudores", datos, mes).generar_pdf(), "Listado generado correctamente en")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo generar el PDF: {e}")
@@ -1,20 +1,34 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QLabel, QLineEdit, QComboBox, QPushButton,
-    QTableWidget, QTableWidgetItem, QDateEdit, QMessageBox, QGroupBox, QHBoxLayout,
+    QTableView, QDateEdit, QMessageBox, QGroupBox, QHBoxLayout,
     QHeaderView, QSpacerItem, QSizePolicy, QFrame, QPushButton
 )
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QFont, QColor, QIcon
 from app.controllers.consulta_controller import ConsultaController
-from app.helpers.imprimir_factura import ImprimirFactura
-from app.views.factura_edit import FacturaEditWidget
+from app.views.modelo_tabla import ModeloTablaPerezoso
+
+# Color de fondo de la fila según el estado de la factura
+COLORES_ESTADO = {
+    "pagado": QColor("#e6ffe6"),  # Verde claro para pagados
+    "pendiente": QColor("#fff0e6"),  # Naranja claro para pendientes
+    "vencido": QColor("#ffe6e6"),  # Rojo claro para vencidos
+}
+COLOR_POR_DEFECTO = QColor("#ffffff")  # Blanco por defecto
+
+
+def color_por_estado(factura):
+    """El estado está en la columna 7 (ver COLUMNAS_CONSULTA)."""
+    return COLORES_ESTADO.get(str(factura[7]).lower(), COLOR_POR_DEFECTO)
 
 class ConsultaWidget(QWidget):
     def __init__(self, db_path, parent=None):
         super().__init__(parent)
         self.controller = ConsultaController(db_path)
         self.selected_factura = None
-        self.resultados_totales = []  # Almacena todos los resultados de la búsqueda
+        self.filtros_actuales = None  # Filtros de la última búsqueda
+        self.total_resultados = 0  # Total de la búsqueda (COUNT guardado en el modelo)
+        self.registros_pagina = []  # Solo las filas de la página visible
         self.pagina_actual = 0  # Página actual para la paginación
         self.registros_por_pagina = 2  # Limitar a 2 registros por página
         self.init_ui()
@@ -121,17 +135,18 @@ class ConsultaWidget(QWidget):
         resultados_layout.setSpacing(8)  # Reducir el espaciado entre elementos
 
         # Tabla de resultados con estilo mejorado
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
+        self.table = QTableView()
+        self.table_model = ModeloTablaPerezoso([
             "ID", "Cliente ID", "Nombre Cliente", "Lectura ID", "Mes", "Monto Total", 
             "Fecha Emisión", "Estado"
-        ])
+        ], color_fila=color_por_estado, parent=self)
+        self.table.setModel(self.table_model)
         
         # Configura el aspecto de la tabla
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.table.verticalHeader().setDefaultSectionSize(30)  # Altura fija de 30 píxeles por fila
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.horizontalHeader().setStyleSheet("QHeaderView::section { background-color: #4a86e8; color: white; font-weight: bold; }")
 
@@ -144,7 +159,7 @@ class ConsultaWidget(QWidget):
         self.table.setFixedHeight(table_height)
         
         # Conectar evento de selección
-        self.table.itemSelectionChanged.connect(self.on_factura_selected)
+        self.table.selectionModel().selectionChanged.connect(self.on_factura_selected)
         
         resultados_layout.addWidget(self.table)
         
@@ -262,22 +277,23 @@ class ConsultaWidget(QWidget):
             "nombre": self.nombre_input.text() if self.nombre_input.text() else None
         }
 
-        # Obtener resultados completos de la búsqueda
-        self.resultados_totales = self.controller.filtrar_facturas(filtros)
+        # Contar la búsqueda y traer solo la primera página
+        self.filtros_actuales = filtros
+        self.total_resultados = self.controller.contar_facturas(filtros, refrescar=True)
         
         # Reiniciar a la primera página
         self.pagina_actual = 0
+        self.registros_pagina = self.controller.obtener_pagina(filtros, self.registros_por_pagina) if self.total_resultados else []
         
         # Actualizar la visualización con los resultados
-        if self.resultados_totales:
+        if self.registros_pagina:
             # Mostrar la primera página
             self.mostrar_pagina_actual()
             # Mostrar un mensaje de éxito
-            QMessageBox.information(self, "Búsqueda Exitosa", f"Se encontraron {len(self.resultados_totales)} facturas.")
+            QMessageBox.information(self, "Búsqueda Exitosa", f"Se encontraron {self.total_resultados} facturas.")
         else:
             # Limpiar la tabla si no hay resultados
-            self.table.clearContents()
-            self.table.setRowCount(0)
+            self.table_model.limpiar()
             self.info_paginacion_label.setText("Sin resultados")
             self.actualizar_controles_paginacion()
             QMessageBox.warning(self, "Sin Resultados", "No se encontraron facturas con los filtros aplicados.")
@@ -285,43 +301,17 @@ class ConsultaWidget(QWidget):
     def mostrar_pagina_actual(self):
         """Muestra la página actual de resultados en la tabla."""
         # Calcular el índice de inicio y fin para la página actual
+        registros_pagina = self.registros_pagina
         inicio = self.pagina_actual * self.registros_por_pagina
-        fin = min(inicio + self.registros_por_pagina, len(self.resultados_totales))
+        fin = inicio + len(registros_pagina)
         
-        # Obtener los registros para la página actual
-        registros_pagina = self.resultados_totales[inicio:fin]
-        
-        # Limpiar y configurar la tabla
-        self.table.clearContents()
-        self.table.setRowCount(len(registros_pagina))
-        
-        # Ajustar altura de filas para que sean uniformes
-        for i in range(self.table.rowCount()):
-            self.table.setRowHeight(i, 30)  # Altura fija de 30 píxeles por fila
-        
-        # Llenar la tabla con los datos de la página actual
-        for row, factura in enumerate(registros_pagina):
-            # Aplicar color de fondo según el estado de la factura
-            estado = str(factura[7])  # Asumiendo que el estado está en la columna 7
-            row_color = QColor("#ffffff")  # Blanco por defecto
-            
-            if estado.lower() == "pagado":
-                row_color = QColor("#e6ffe6")  # Verde claro para pagados
-            elif estado.lower() == "pendiente":
-                row_color = QColor("#fff0e6")  # Naranja claro para pendientes
-            elif estado.lower() == "vencido":
-                row_color = QColor("#ffe6e6")  # Rojo claro para vencidos
-            
-            for col, dato in enumerate(factura):
-                item = QTableWidgetItem(str(dato))
-                item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)  # Solo lectura
-                item.setBackground(row_color)
-                self.table.setItem(row, col, item)
+        # Llenar la tabla con los datos de la página actual (el color lo da el modelo)
+        self.table_model.cargar(registros_pagina)
         
         # Actualizar la etiqueta de información de paginación
         total_paginas = self.calcular_total_paginas()
         self.info_paginacion_label.setText(
-            f"Mostrando {inicio + 1}-{fin} de {len(self.resultados_totales)} facturas (Página {self.pagina_actual + 1} de {total_paginas})"
+            f"Mostrando {inicio + 1}-{fin} de {self.total_resultados} facturas (Página {self.pagina_actual + 1} de {total_paginas})"
         )
         
         # Actualizar los controles de paginación
@@ -336,6 +326,7 @@ class ConsultaWidget(QWidget):
         # Verificar que la página esté dentro de los límites
         total_paginas = self.calcular_total_paginas()
         if 0 <= nueva_pagina < total_paginas:
+            self.registros_pagina = self.leer_pagina(nueva_pagina, total_paginas)
             self.pagina_actual = nueva_pagina
             self.mostrar_pagina_actual()
             
@@ -344,14 +335,33 @@ class ConsultaWidget(QWidget):
             self.reimprimir_button.setEnabled(False)
             self.editar_button.setEnabled(False)
     
+    def leer_pagina(self, nueva_pagina, total_paginas):
+        """Lee una página desde la BD usando como cursor la página visible."""
+        filtros = self.filtros_actuales
+        limite = self.registros_por_pagina
+        if nueva_pagina == 0:
+            return self.controller.obtener_pagina(filtros, limite)
+        if nueva_pagina == total_paginas - 1:
+            # La última página puede estar incompleta
+            return self.controller.obtener_pagina(
+                filtros, self.total_resultados - nueva_pagina * limite, hacia_atras=True
+            )
+        if nueva_pagina == self.pagina_actual + 1:
+            ultima = self.registros_pagina[-1]
+            return self.controller.obtener_pagina(filtros, limite, (ultima[6], ultima[0]))
+        if nueva_pagina == self.pagina_actual - 1:
+            primera = self.registros_pagina[0]
+            return self.controller.obtener_pagina(filtros, limite, (primera[6], primera[0]), hacia_atras=True)
+        return self.registros_pagina
+
     def calcular_total_paginas(self):
         """Calcula el número total de páginas."""
-        total_registros = len(self.resultados_totales)
+        total_registros = self.total_resultados
         return max(1, (total_registros + self.registros_por_pagina - 1) // self.registros_por_pagina)
     
     def actualizar_controles_paginacion(self):
         """Actualiza el estado de los controles de paginación."""
-        tiene_resultados = len(self.resultados_totales) > 0
+        tiene_resultados = self.total_resultados > 0
         total_paginas = self.calcular_total_paginas()
         
         # Habilitar o deshabilitar botones según la posición actual
@@ -362,16 +372,16 @@ class ConsultaWidget(QWidget):
     
     def on_factura_selected(self):
         """Maneja la selección de una factura en la tabla."""
-        selected_rows = self.table.selectedItems()
+        selected_rows = self.table.selectionModel().selectedRows()
         if selected_rows:
-            selected_row = self.table.currentRow()
+            selected_row = selected_rows[0].row()
 
             # Obtener todos los datos de la factura seleccionada
-            factura_data = {}
-            for col in range(self.table.columnCount()):
-                header = self.table.horizontalHeaderItem(col).text()
-                value = self.table.item(selected_row, col).text()
-                factura_data[header] = value
+            factura = self.table_model.fila(selected_row)
+            factura_data = {
+                header: self.table_model.texto(value)
+                for header, value in zip(self.table_model.encabezados, factura)
+            }
 
             # Guardar los datos de la factura seleccionada
             self.selected_factura = factura_data
@@ -390,15 +400,14 @@ class ConsultaWidget(QWidget):
             try:
                 # Obtener el ID de la factura seleccionada
                 factura_id = int(self.selected_factura["ID"])
-                
-                # Obtener los datos completos de la factura desde la base de datos
-                # (esto debe implementarse en el controlador)
-                factura_completa = self.controller.obtener_factura_completa(factura_id)
-                
+
+                # Factura con la cédula y las lecturas facturadas, lista para el PDF
+                from app.services.facturacion import buscar_factura, generar_pdf_factura
+                factura_completa = buscar_factura(self.controller.model.db_path, factura_id)
+
                 if factura_completa:
-                    # Llamar al componente de impresión
-                    ImprimirFactura(factura_completa)
-                    QMessageBox.information(self, "Reimpresión", "Factura reenviada a impresión correctamente.")
+                    from app.views.abrir_pdf import mostrar_pdf
+                    mostrar_pdf(self, generar_pdf_factura(factura_completa), "Factura reimpresa en")
                 else:
                     QMessageBox.warning(self, "Error", "No se pudo obtener los datos completos de la factura.")
             except Exception as e:
@@ -415,9 +424,10 @@ class ConsultaWidget(QWidget):
         self.nombre_input.clear()
         
         # Limpiar la tabla y reiniciar los datos de paginación
-        self.table.clearContents()
-        self.table.setRowCount(0)
-        self.resultados_totales = []
+        self.table_model.limpiar()
+        self.filtros_actuales = None
+        self.total_resultados = 0
+        self.registros_pagina = []
         self.pagina_actual = 0
         self.info_paginacion_label.setText("Sin resultados")
         self.actualizar_controles_paginacion()
@@ -439,6 +449,7 @@ class ConsultaWidget(QWidget):
 
                 if factura_completa:
                     # Abrir el diálogo de edición
+                    from app.views.factura_edit import FacturaEditWidget
                     dialog = FacturaEditWidget(self.controller.model.db_path, factura_completa, self)
                     resultado = dialog.exec()
 
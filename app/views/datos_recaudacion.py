@@ -1,13 +1,31 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QComboBox, QHBoxLayout, QPushButton, 
-    QMessageBox, QGroupBox, QFrame
+    QMessageBox, QGroupBox, QFrame, QApplication
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont, QPalette, QColor
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+import os
 from app.controllers.recaudacion_controller import RecaudacionController
 from app.helpers import backup_helper
+from app.helpers.facturacion_masiva import MESES
+from app.views.grafico_barras import GraficoBarras
+
+TEXTO_RESPALDO = "Generar Respaldo de Base de Datos"
+
+
+class RespaldoWorker(QThread):
+    """Ejecuta backup_helper.crear_backup fuera del hilo de la interfaz."""
+    progreso = pyqtSignal(int, int)
+    terminado = pyqtSignal(bool, str)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+
+    def run(self):
+        exito, mensaje = backup_helper.crear_backup(self.db_path, progreso=self.progreso.emit)
+        self.terminado.emit(exito, mensaje)
+
 
 class DatosRecaudacion(QWidget):
     def __init__(self, db_path, parent=None):
@@ -134,16 +152,15 @@ class DatosRecaudacion(QWidget):
         grafico_layout = QVBoxLayout()
         grafico_layout.setContentsMargins(15, 15, 15, 15)
 
-        # Crear el gráfico
-        self.figure = Figure(figsize=(8, 5))
-        self.canvas = FigureCanvas(self.figure)
-        grafico_layout.addWidget(self.canvas)
+        # Crear el gráfico (dibujado con QPainter; matplotlib solo para exportar)
+        self.grafico = GraficoBarras("Mes", "Facturas Pagadas")
+        grafico_layout.addWidget(self.grafico)
 
         grafico_group.setLayout(grafico_layout)
         main_layout.addWidget(grafico_group)
 
         # Botón de respaldo
-        self.boton_respaldo = QPushButton("Generar Respaldo de Base de Datos")
+        self.boton_respaldo = QPushButton(TEXTO_RESPALDO)
         self.boton_respaldo.setFont(QFont("Arial", 10))
         self.boton_respaldo.setStyleSheet("""
             QPushButton {
@@ -164,9 +181,29 @@ class DatosRecaudacion(QWidget):
         self.boton_respaldo.clicked.connect(self.generar_respaldo)
         self.boton_respaldo.setFixedHeight(40)
 
+        # Botón de exportación del gráfico
+        self.boton_exportar = QPushButton("Exportar Gráfico")
+        self.boton_exportar.setFont(QFont("Arial", 10))
+        self.boton_exportar.setStyleSheet("""
+            QPushButton {
+                background-color: #007bff;
+                color: white;
+                padding: 10px 20px;
+                border: none;
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #0069d9;
+            }
+        """)
+        self.boton_exportar.clicked.connect(self.exportar_grafico)
+        self.boton_exportar.setFixedHeight(40)
+
         # Layout para los botones
         button_layout = QHBoxLayout()
         button_layout.addStretch()
+        button_layout.addWidget(self.boton_exportar)
         button_layout.addWidget(self.boton_respaldo)
         button_layout.addStretch()
         main_layout.addLayout(button_layout)
@@ -178,7 +215,7 @@ class DatosRecaudacion(QWidget):
         self.actualizar_grafico()
 
     def generar_respaldo(self):
-        """Solicita confirmación y genera el respaldo si el usuario lo aprueba."""
+        """Solicita confirmación y genera el respaldo en segundo plano si el usuario lo aprueba."""
         respuesta = QMessageBox.question(
             self, "Generar Backup",
             "Es recomendable generar respaldos al finalizar la jornada de recaudación.\n\n¿Generar backup ahora?",
@@ -186,77 +223,70 @@ class DatosRecaudacion(QWidget):
         )
         
         if respuesta == QMessageBox.StandardButton.Yes:
-            backup_helper.crear_backup(self.db_path)
-            QMessageBox.information(self, "Respaldo Exitoso", "✔ Backup generado correctamente.")
+            # La copia no bloquea la interfaz ni a las cajas que registran facturas
+            self.boton_respaldo.setEnabled(False)
+            self.boton_respaldo.setText("Respaldando... 0%")
+            self.worker_respaldo = RespaldoWorker(self.db_path, self)
+            self.worker_respaldo.progreso.connect(self._actualizar_progreso_respaldo)
+            self.worker_respaldo.terminado.connect(self._respaldo_terminado)
+            self.worker_respaldo.start()
         else:
             QMessageBox.information(self, "Cancelado", "❌ Respaldo cancelado.")
 
+    def _actualizar_progreso_respaldo(self, copiadas, total):
+        porcentaje = copiadas * 100 // total if total else 0
+        self.boton_respaldo.setText(f"Respaldando... {porcentaje}%")
+
+    def _respaldo_terminado(self, exito, mensaje):
+        self.boton_respaldo.setText(TEXTO_RESPALDO)
+        self.boton_respaldo.setEnabled(True)
+        if exito:
+            QMessageBox.information(self, "Respaldo Exitoso", f"✔ Backup generado correctamente.\n{mensaje}")
+        else:
+            QMessageBox.critical(self, "Error", f"No se pudo generar el respaldo:\n{mensaje}")
+
+    def showEvent(self, event):
+        """Al volver a la página se relee el resumen (puede haber facturas nuevas)."""
+        super().showEvent(event)
+        self.actualizar_grafico()
+
     def actualizar_grafico(self):
         """Genera un gráfico de barras con los datos filtrados."""
         anio = self.combo_anio.currentText()
         direccion = self.combo_direccion.currentText()
-        datos = self.controller.obtener_datos_recaudacion(anio, direccion)
-
-        # Definir los 12 meses con valores iniciales de 0
-        meses_map = {
-            "Enero": 0, "Febrero": 0, "Marzo": 0, "Abril": 0,
-            "Mayo": 0, "Junio": 0, "Julio": 0, "Agosto": 0,
-            "Septiembre": 0, "Octubre": 0, "Noviembre": 0, "Diciembre": 0
-        }
-
-        # Llenar con los datos obtenidos
-        for mes, cantidad in datos:
-            meses_map[mes] = cantidad
-
-        # Extraer datos en orden
-        meses = list(meses_map.keys())
-        cantidades = list(meses_map.values())
-
-        # Limpiar el gráfico antes de redibujar
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-
-        # Crear gráfico de barras con mejor estilo
-        barras = ax.bar(meses, cantidades, 
-                       color=['#3498db' if c > 0 else '#d5dbdb' for c in cantidades],
-                       alpha=0.8,
-                       width=0.7)
-
-        # Agregar etiquetas en las barras
-        for barra in barras:
-            height = barra.get_height()
-            if height > 0:  # Solo mostrar etiquetas para barras con valores
-                ax.text(barra.get_x() + barra.get_width()/2, height + 0.2, 
-                        str(int(height)), 
-                        ha='center', va='bottom', 
-                        fontsize=10, fontweight='bold', 
-                        color='#2c3e50')
-
-        # Personalizar el gráfico
-        ax.set_xlabel("Mes", fontsize=12, fontweight="bold", color="#2c3e50")
-        ax.set_ylabel("Facturas Pagadas", fontsize=12, fontweight="bold", color="#2c3e50")
-        ax.set_title(f"Facturas Pagadas en {anio} ({direccion})", 
-                    fontsize=14, fontweight="bold", color="#2c3e50", pad=20)
-        
-        # Configurar ejes
-        ax.set_xticks(range(len(meses)))
-        ax.set_xticklabels(meses, rotation=45, fontsize=10, color="#2c3e50")
-        # Eliminar los valores del eje Y
-        ax.set_yticks([])
-        ax.tick_params(axis='y', colors='#2c3e50')
-
-        # Personalizar el fondo y las líneas
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('#ddd')
-        ax.spines['bottom'].set_color('#ddd')
-        ax.grid(axis='y', linestyle='--', alpha=0.7, color='#ddd')
-
-        # Ajustar el layout
-        self.figure.tight_layout()
-
-        # Actualizar gráfico en la interfaz
-        self.canvas.draw()
+        datos = dict(self.controller.obtener_datos_recaudacion(anio, direccion))
+
+        # Los 12 meses en orden, con 0 los que no tienen facturas. Si los
+        # valores no cambiaron, el gráfico reutiliza la imagen ya dibujada
+        cantidades = [datos.get(mes, 0) for mes in MESES]
+        self.grafico.mostrar(
+            (anio, direccion), f"Facturas Pagadas en {anio} ({direccion})", MESES, cantidades
+        )
+
+    def exportar_grafico(self):
+        """Guarda el gráfico actual en la carpeta de reportes."""
+        datos = self.grafico.datos_actuales()
+        if datos is None:
+            return
+        titulo, etiquetas, valores = datos
+        carpeta = getattr(QApplication.instance(), "reportes_path", "reportes")
+        os.makedirs(carpeta, exist_ok=True)
+        nombre = f"recaudacion_{self.combo_anio.currentText()}_{self.combo_direccion.currentText()}.png"
+        ruta = os.path.join(carpeta, "".join(c if c.isalnum() or c in "._-" else "_" for c in nombre))
+
+        try:
+            from app.helpers.exportar_grafico import exportar_grafico_barras
+            exportar_grafico_barras(ruta, titulo, etiquetas, valores,
+                                    self.grafico.titulo_x, self.grafico.titulo_y)
+        except ImportError:
+            # Sin matplotlib se guarda el gráfico tal como se ve en pantalla
+            if not self.grafico.grab().save(ruta):
+                QMessageBox.warning(self, "Error", "No se pudo guardar el gráfico.")
+                return
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"No se pudo exportar el gráfico: {e}")
+            return
+        QMessageBox.information(self, "Gráfico Exportado", f"Gráfico guardado en:\n{ruta}")
 
     def realizar_cierre_caja(self):
         """Realiza el cierre de caja del mes actual."""
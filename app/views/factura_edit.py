@@ -11,12 +11,11 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor, QPalette
 from app.controllers.factura_controller import FacturaController
 from app.models.factura import FacturaModel
-from app.helpers.imprimir_factura import ImprimirFactura
-from app.helpers.recuperar_lecturas import RecuperarLecturas
 from app.helpers.recuperar_factura_id import RecuperarFacturaID
 from app.helpers.recuperar_saldo_pendiente import SaldoPendienteHelper
 from app.helpers.actualizar_deudas import ActualizarDeudasHelper
 from app.helpers.sistema_logs import get_logger
+from app.services.facturacion import CARGOS_ADICIONALES, OTROS_SERVICIOS, calcular_montos
 
 class FacturaEditWidget(QDialog):
     def __init__(self, db_path, factura_data, parent=None):
@@ -225,18 +224,9 @@ class FacturaEditWidget(QDialog):
         servicios_layout.setSpacing(8)
 
         self.campos_adicionales = {}
-        servicios_items = {
-            "Traspaso": 30.00,
-            "Medidor": 50.00,
-            "Reconexión": 10.00,
-            "Multas Mingas": 10.00,
-            "Multas Sesiones": 10.00,
-            "Conexion Nueva": 500.00
-        }
-
         row = 0
         col = 0
-        for campo, valor in servicios_items.items():
+        for campo, valor in CARGOS_ADICIONALES:
             checkbox = QCheckBox(f"{campo} (${valor:.2f})")
             checkbox.toggled.connect(self.actualizar_montos)
             checkbox.setMinimumHeight(30)
@@ -285,14 +275,7 @@ class FacturaEditWidget(QDialog):
         otros_layout.setSpacing(8)
 
         self.otros_servicios = {}
-        otros_items = [
-            ("Reubicacion", 30.00),
-            ("Sanciones", 100.00),
-            ("Multa carnet", 5.00),
-            ("Carnet Nuevo", 1.00)
-        ]
-
-        for idx, (nombre, valor) in enumerate(otros_items):
+        for idx, (nombre, valor) in enumerate(OTROS_SERVICIOS):
             checkbox = QCheckBox(f"{nombre} (${valor:.2f})")
             checkbox.toggled.connect(self.actualizar_montos)
             checkbox.setMinimumHeight(30)
@@ -458,10 +441,12 @@ class FacturaEditWidget(QDialog):
         self.nombre_cliente_input.setText(self.factura_data.get("nombre_cliente", ""))
         self.direccion_cliente_input.setText(self.factura_data.get("direccion", ""))
 
-        # Obtener la cédula del cliente desde la base de datos
-        cliente = self.controller.obtener_cliente_por_id(self.factura_data.get("medidor_id", ""))
-        if cliente:
-            self.cedula_cliente_input.setText(cliente.get("cliente_ci", "No disponible"))
+        # Cédula del cliente y lecturas de la factura en una sola consulta
+        contexto = self.controller.obtener_contexto_facturacion(
+            self.factura_data.get("medidor_id", ""), self.factura_data.get("lectura_id")
+        )
+        if contexto:
+            self.cedula_cliente_input.setText(contexto["cliente"].get("cliente_ci", "No disponible"))
 
         # Datos de lectura
         self.lectura_id_input.setText(str(self.factura_data.get("lectura_id", "")))
@@ -531,27 +516,6 @@ class FacturaEditWidget(QDialog):
             consumo = float(self.monto_lectura_input.text()) if self.monto_lectura_input.text() else 0
             tipo_servicio = self.combobox_servicio.currentText()
 
-            if tipo_servicio == "DOMICILIARIA":
-                monto_basico = 2.50
-            elif tipo_servicio == "COMERCIAL":
-                monto_basico = 3.50
-            else:
-                monto_basico = 4.50
-
-            # Aplicar descuento del 50% si es tercera edad o discapacitado
-            if self.checkbox_tercera_edad.isChecked():
-                monto_basico = monto_basico * 0.50
-
-            if consumo <= 10:
-                monto_excedente = 0
-            else:
-                consumo_excedente = consumo - 10
-                if consumo <= 50:
-                    monto_excedente = consumo_excedente * 0.40
-                elif consumo <= 100:
-                    monto_excedente = consumo_excedente * 0.60
-                else:
-                    monto_excedente = consumo_excedente * 0.80
 
             total_adicionales = sum(
                 valor for checkbox, valor in self.campos_adicionales.values()
@@ -570,17 +534,27 @@ class FacturaEditWidget(QDialog):
                 except ValueError:
                     monto_materiales = 0
 
-            monto_total = monto_basico + monto_excedente + total_adicionales + monto_otros + monto_materiales
+            # Tarifa vigente en la fecha de emisión de la factura (no la de hoy) más los adicionales
+            fecha_emision = str(self.factura_data.get("fecha_emision") or "")[:10] or None
+            montos = calcular_montos(
+                self.controller.db_path, consumo, tipo_servicio, self.checkbox_tercera_edad.isChecked(),
+                adicionales=total_adicionales + monto_otros + monto_materiales, fecha=fecha_emision
+            )
 
-            self.campo_monto_basico.setText(f"{monto_basico:.2f}")
-            self.campo_monto_excedente.setText(f"{monto_excedente:.2f}")
-            self.campo_monto_total.setText(f"{monto_total:.2f}")
+            self.campo_monto_basico.setText(f"{montos['monto_basico']:.2f}")
+            self.campo_monto_excedente.setText(f"{montos['monto_excedente']:.2f}")
+            self.campo_monto_total.setText(f"{montos['monto_total']:.2f}")
 
         except ValueError:
             self.campo_monto_basico.clear()
             self.campo_monto_excedente.clear()
             self.campo_monto_total.clear()
 
+    def monto_cargo(self, campo):
+        """Valor de un cargo adicional si está marcado, si no 0."""
+        checkbox, valor = self.campos_adicionales[campo]
+        return valor if checkbox.isChecked() else 0.00
+
     def actualizar_factura(self):
         """Actualiza la factura existente en la base de datos."""
         # Confirmar la acción
@@ -616,12 +590,12 @@ class FacturaEditWidget(QDialog):
             tipo_pago = self.combobox_tipo_pago.currentText()
 
             # Obtener valores de checkboxes
-            traspaso = 30.00 if self.campos_adicionales["traspaso"][0].isChecked() else 0.00
-            medidor = 50.00 if self.campos_adicionales["medidor"][0].isChecked() else 0.00
-            reconexion = 10.00 if self.campos_adicionales["reconexión"][0].isChecked() else 0.00
-            multas_sesiones = 10.00 if self.campos_adicionales["multas sesiones"][0].isChecked() else 0.00
-            multas_mingas = 10.00 if self.campos_adicionales["multas mingas"][0].isChecked() else 0.00
-            conexion_nueva = 500.00 if self.campos_adicionales["conexion nueva"][0].isChecked() else 0.00
+            traspaso = self.monto_cargo("traspaso")
+            medidor = self.monto_cargo("medidor")
+            reconexion = self.monto_cargo("reconexión")
+            multas_sesiones = self.monto_cargo("multas sesiones")
+            multas_mingas = self.monto_cargo("multas mingas")
+            conexion_nueva = self.monto_cargo("conexion nueva")
 
             # Obtener estado de tercera edad / discapacitados
             tercera_edad = 1 if self.checkbox_tercera_edad.isChecked() else 0
@@ -668,49 +642,13 @@ class FacturaEditWidget(QDialog):
                 "tercera_edad": tercera_edad
             }
 
-            # Actualizar en la base de datos
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            query = """
-                UPDATE facturas
-                SET medidor_id = :medidor_id,
-                    nombre_cliente = :nombre_cliente,
-                    lectura_id = :lectura_id,
-                    monto_lectura = :monto_lectura,
-                    mes_facturacion = :mes_facturacion,
-                    monto_total = :monto_total,
-                    estado = :estado,
-                    servicio = :servicio,
-                    traspaso = :traspaso,
-                    medidor = :medidor,
-                    reconexion = :reconexion,
-                    multas_sesiones = :multas_sesiones,
-                    multas_mingas = :multas_mingas,
-                    conexion_nueva = :conexion_nueva,
-                    otros = :otros,
-                    tarifa_basica = :tarifa_basica,
-                    tarifa_excedente = :tarifa_excedente,
-                    direccion = :direccion,
-                    materiales = :materiales,
-                    tercera_edad = :tercera_edad
-                WHERE id = :id
-            """
-
-            cursor.execute(query, factura_data)
-            conn.commit()
-            conn.close()
-
-            # Registrar en el log
-            if self.parent() and hasattr(self.parent(), 'user_data'):
-                logger = get_logger()
-                logger.log_editar_factura(
-                    self.parent().user_data['name'],
-                    self.parent().user_data['role'],
-                    self.factura_id,
-                    nombre_cliente,
-                    monto_total
-                )
+            # Actualizar en la base de datos (en modo servidor, en el servidor de BD);
+            # el controlador registra la edición en el log con los campos que cambiaron
+            usuario = self.parent().user_data if self.parent() and hasattr(self.parent(), 'user_data') else None
+            self.controller.actualizar_factura(
+                self.factura_id, factura_data,
+                usuario['name'] if usuario else None, usuario['role'] if usuario else None
+            )
 
             QMessageBox.information(
                 self,
@@ -765,12 +703,12 @@ class FacturaEditWidget(QDialog):
             servicio = self.combobox_servicio.currentText()
             tipo_pago = self.combobox_tipo_pago.currentText()
 
-            traspaso = 30.00 if self.campos_adicionales["traspaso"][0].isChecked() else 0.00
-            medidor = 50.00 if self.campos_adicionales["medidor"][0].isChecked() else 0.00
-            reconexion = 10.00 if self.campos_adicionales["reconexión"][0].isChecked() else 0.00
-            multas_sesiones = 10.00 if self.campos_adicionales["multas sesiones"][0].isChecked() else 0.00
-            multas_mingas = 10.00 if self.campos_adicionales["multas mingas"][0].isChecked() else 0.00
-            conexion_nueva = 500.00 if self.campos_adicionales["conexion nueva"][0].isChecked() else 0.00
+            traspaso = self.monto_cargo("traspaso")
+            medidor = self.monto_cargo("medidor")
+            reconexion = self.monto_cargo("reconexión")
+            multas_sesiones = self.monto_cargo("multas sesiones")
+            multas_mingas = self.monto_cargo("multas mingas")
+            conexion_nueva = self.monto_cargo("conexion nueva")
 
             # Obtener estado de tercera edad / discapacitados
             tercera_edad = 1 if self.checkbox_tercera_edad.isChecked() else 0
@@ -787,9 +725,9 @@ class FacturaEditWidget(QDialog):
                 except ValueError:
                     monto_materiales = 0
 
-            # Obtener lecturas
-            helper_lecturas = RecuperarLecturas(self.db_path)
-            lecturas = helper_lecturas.recuperar_lecturas_por_medidor(medidor_id)
+            # Obtener lecturas de la lectura asociada a la factura
+            contexto = self.controller.obtener_contexto_facturacion(medidor_id, lectura_id or None)
+            lecturas = contexto["lectura"] if contexto else None
             lectura_anterior = lecturas.get("lectura_anterior", "No disponible") if lecturas else "No disponible"
             lectura_actual = lecturas.get("lectura_actual", "No disponible") if lecturas else "No disponible"
 
@@ -823,37 +761,11 @@ class FacturaEditWidget(QDialog):
                 "tercera_edad": tercera_edad
             }
 
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            query = """
-                UPDATE facturas
-                SET medidor_id = :medidor_id,
-                    nombre_cliente = :nombre_cliente,
-                    lectura_id = :lectura_id,
-                    monto_lectura = :monto_lectura,
-                    mes_facturacion = :mes_facturacion,
-                    monto_total = :monto_total,
-                    estado = :estado,
-                    servicio = :servicio,
-                    traspaso = :traspaso,
-                    medidor = :medidor,
-                    reconexion = :reconexion,
-                    multas_sesiones = :multas_sesiones,
-                    multas_mingas = :multas_mingas,
-                    conexion_nueva = :conexion_nueva,
-                    otros = :otros,
-                    tarifa_basica = :tarifa_basica,
-                    tarifa_excedente = :tarifa_excedente,
-                    direccion = :direccion,
-                    materiales = :materiales,
-                    tercera_edad = :tercera_edad
-                WHERE id = :id
-            """
-
-            cursor.execute(query, factura_data_update)
-            conn.commit()
-            conn.close()
+            usuario = self.parent().user_data if self.parent() and hasattr(self.parent(), 'user_data') else None
+            self.controller.actualizar_factura(
+                self.factura_id, factura_data_update,
+                usuario['name'] if usuario else None, usuario['role'] if usuario else None
+            )
 
             # Ahora reimprimir
             servicios_otros = [
@@ -889,21 +801,15 @@ class FacturaEditWidget(QDialog):
                 "Tipo de pago": tipo_pago
             }
 
+            from app.helpers.imprimir_factura import ImprimirFactura
             impresor = ImprimirFactura(factura_data_print)
             impresor.servicios_otros = servicios_otros
-            impresor.generar_pdf()
+            from app.views.abrir_pdf import mostrar_pdf
+            mostrar_pdf(self, impresor.generar_pdf(), "Factura generada en")
 
-            # Registrar en el log
+            # Registrar la reimpresión (la edición la registra el controlador)
             if self.parent() and hasattr(self.parent(), 'user_data'):
                 logger = get_logger()
-                logger.log_editar_factura(
-                    self.parent().user_data['name'],
-                    self.parent().user_data['role'],
-                    self.factura_id,
-                    nombre_cliente,
-                    monto_total
-                )
-                # También registrar la reimpresión
                 logger.log_reimprimir_factura(
                     self.parent().user_data['name'],
                     self.parent().user_data['role'],
@@ -7,17 +7,51 @@ from datetime import datetime
 import sqlite3
 import os
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor, QPalette
 from app.controllers.factura_controller import FacturaController
 from app.models.factura import FacturaModel
-from app.helpers.imprimir_factura import ImprimirFactura
-from app.helpers.recuperar_lecturas import RecuperarLecturas
-from app.helpers.recuperar_factura_id import RecuperarFacturaID
-from app.helpers.recuperar_saldo_pendiente import SaldoPendienteHelper
 from app.helpers.actualizar_deudas import ActualizarDeudasHelper
 from app.helpers.sistema_logs import get_logger
-from app.helpers.secuencia_facturacion import get_secuencia_facturacion
+from app.services.facturacion import CARGOS_ADICIONALES, OTROS_SERVICIOS, calcular_montos
+from app.helpers.facturacion_masiva import FacturacionMasiva
+from app.database.remoto import get_cliente_servidor
+from app.views.buscador_cliente import BuscadorCliente
+
+
+class FacturacionMasivaWorker(QThread):
+    """Ejecuta FacturacionMasiva.facturar_mes fuera del hilo de la interfaz."""
+    progreso = pyqtSignal(int, int)
+    terminado = pyqtSignal(dict)
+
+    def __init__(self, db_path, mes_facturacion, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.mes_facturacion = mes_facturacion
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def run(self):
+        if get_cliente_servidor() is not None:
+            # Modo servidor: factura el servidor de BD, sin progreso ni cancelación por lote
+            try:
+                resumen = FacturaController(self.db_path).facturar_mes(self.mes_facturacion)
+            except sqlite3.Error as e:
+                resumen = {
+                    "total": 0, "facturadas": 0, "monto_total": 0.0, "saldo_pendiente": 0.0,
+                    "primer_numero": None, "ultimo_numero": None, "cancelado": False,
+                    "error": str(e), "facturas": [],
+                }
+        else:
+            resumen = FacturacionMasiva(self.db_path).facturar_mes(
+                self.mes_facturacion,
+                progreso=self.progreso.emit,
+                cancelado=lambda: self._cancelar
+            )
+        self.terminado.emit(resumen)
+
 
 class FacturasWidget(QWidget):
     def __init__(self, db_path, parent=None):
@@ -55,7 +89,13 @@ class FacturasWidget(QWidget):
         self.medidor_id_input = QLineEdit()
         self.medidor_id_input.setPlaceholderText("Ingresa el numero de medidor")
         self.medidor_id_input.setMinimumHeight(35)
-        self.medidor_id_input.textChanged.connect(self.cargar_datos_cliente)
+        # Consulta diferida y en segundo plano mientras se escribe el medidor
+        self.buscador_cliente = BuscadorCliente(
+            self.medidor_id_input, "facturas", self.consultar_contexto_cliente,
+            ("clientes", "lecturas", "facturas")
+        )
+        self.buscador_cliente.cambiado.connect(self.medidor_cambiado)
+        self.buscador_cliente.encontrado.connect(self.cargar_datos_cliente)
         form_layout.addWidget(self.medidor_id_input, 1, 1)
 
         form_layout.addWidget(QLabel("Nombre Cliente:"), 1, 2)
@@ -172,17 +212,8 @@ class FacturasWidget(QWidget):
 
         # Campos adicionales con checkbox - organizados en 2 filas de 3 columnas
         self.campos_adicionales = {}
-        servicios_items = [
-            ("Traspaso", 30.00),
-            ("Medidor", 50.00),
-            ("Reconexión", 10.00),
-            ("Multas Mingas", 10.00),
-            ("Multas Sesiones", 10.00),
-            ("Conexion Nueva", 500.00)
-        ]
-
         servicios_row_start = 13
-        for idx, (campo, valor) in enumerate(servicios_items):
+        for idx, (campo, valor) in enumerate(CARGOS_ADICIONALES):
             checkbox = QCheckBox(f"{campo} (${valor:.2f})")
             checkbox.toggled.connect(self.actualizar_montos)
             checkbox.setMinimumHeight(30)
@@ -220,15 +251,8 @@ class FacturasWidget(QWidget):
         # Crear checkboxes para otros servicios en lugar de lista
         self.otros_servicios = {}
         otros_layout = QGridLayout()
-        otros_items = [
-            ("Reubicacion", 30.00),
-            ("Sanciones", 100.00),
-            ("Multa carnet", 5.00),
-            ("Carnet Nuevo", 1.00)
-        ]
-
         col = 0
-        for nombre, valor in otros_items:
+        for nombre, valor in OTROS_SERVICIOS:
             checkbox = QCheckBox(f"{nombre} (${valor:.2f})")
             checkbox.toggled.connect(self.actualizar_montos)
             otros_layout.addWidget(checkbox, 0, col)
@@ -327,6 +351,8 @@ class FacturasWidget(QWidget):
         self.registrar_button = QPushButton("Registrar Factura")
         self.registrar_button.clicked.connect(self.registrar_factura)
         self.registrar_button.setMinimumHeight(30)
+        # Se habilita cuando llegan los datos del medidor escrito
+        self.registrar_button.setEnabled(False)
         self.registrar_button.setStyleSheet("""
             QPushButton {
                 font-weight: bold;
@@ -380,10 +406,32 @@ class FacturasWidget(QWidget):
             }
         """)
 
+        self.facturacion_masiva_button = QPushButton("Facturar Mes Completo")
+        self.facturacion_masiva_button.clicked.connect(self.facturar_mes_completo)
+        self.facturacion_masiva_button.setMinimumHeight(30)
+        self.facturacion_masiva_button.setStyleSheet("""
+            QPushButton {
+                font-weight: bold;
+                font-size: 13px;
+                background-color: #6f42c1;
+                color: white;
+                border-radius: 5px;
+                padding: 8px 16px;
+            }
+            QPushButton:hover {
+                background-color: #59339d;
+            }
+            QPushButton:disabled {
+                background-color: #6c757d;
+                color: #ffffff;
+            }
+        """)
+
         # Agregar botones al layout
         buttons_layout.addWidget(self.registrar_button)
         buttons_layout.addWidget(self.imprimir_button)
         buttons_layout.addWidget(self.actualizar_deudas_button)
+        buttons_layout.addWidget(self.facturacion_masiva_button)
 
         # Agregar la barra de botones al layout principal
         main_layout.addWidget(buttons_frame)
@@ -393,67 +441,63 @@ class FacturasWidget(QWidget):
         
 
     
-    def cargar_datos_cliente(self):
+    def consultar_contexto_cliente(self, medidor_id):
+        """Cliente, última lectura y deuda del medidor (se ejecuta en segundo plano)."""
+        return self.controller.obtener_contexto_facturacion(medidor_id)
+
+    def medidor_cambiado(self, medidor_id):
+        """Al escribir otro medidor, lo mostrado es de otro cliente hasta que llegue su consulta."""
+        self.limpiar_datos_cliente()
+        self.imprimir_button.setEnabled(False)
+
+    def limpiar_datos_cliente(self):
+        """Vacía los datos del cliente y deshabilita el registro."""
+        self.contexto_facturacion = None
+        self.medidor_contexto = None
+        self.saldo_pendiente = 0.00
+        self.registrar_button.setEnabled(False)
+        self.nombre_cliente_input.clear()
+        self.cedula_cliente_input.clear()
+        self.lectura_id_input.clear()
+        self.monto_lectura_input.clear()
+        self.direccion_cliente_input.clear()
+        self.campo_monto_basico.clear()
+        self.campo_monto_excedente.clear()
+        self.campo_monto_total.clear()
+        self.campo_total_deuda.clear()
+        self.label_facturas_deuda.clear()
+
+    def cargar_datos_cliente(self, medidor_id, contexto):
         """Carga el nombre del cliente, su lectura_id, el consumo y la dirección."""
-        medidor_id = self.medidor_id_input.text()
-        if (medidor_id.isdigit()):
-            cliente = self.controller.obtener_cliente_por_id(medidor_id)
-            if cliente:
-                self.nombre_cliente_input.setText(cliente["nombre_cliente"])
-                self.cedula_cliente_input.setText(cliente.get("cliente_ci", "No disponible"))  # Asigna directamente al campo de la UI
-                
-                # Obtener datos de lectura, incluyendo dirección
-                lectura = self.controller.obtener_lectura_por_cliente_id(medidor_id)
-                if lectura:
-                    self.lectura_id_input.setText(str(lectura["id"]))
-                    self.monto_lectura_input.setText(f"{lectura['consumo']:.2f}")
-                    self.direccion_cliente_input.setText(lectura["direccion"])  # Establecer dirección
-                    
-                    # Cargar información de deuda
-                    self.cargar_informacion_deuda(medidor_id)
-                    
-                    self.actualizar_montos()  # Actualizar montos al cargar datos
-                else:
-                    self.lectura_id_input.clear()
-                    self.monto_lectura_input.clear()
-                    self.direccion_cliente_input.clear()
-                    self.campo_monto_basico.clear()
-                    self.campo_monto_excedente.clear()
-                    self.campo_monto_total.clear()
-                    self.campo_total_deuda.clear()
-                    self.label_facturas_deuda.clear()
-            else:
-                # Limpiar campos si no existe el cliente
-                self.nombre_cliente_input.clear()
-                self.cedula_cliente_input.clear()
-                self.monto_lectura_input.clear()
-                self.direccion_cliente_input.clear()
-                self.campo_monto_basico.clear()
-                self.campo_monto_excedente.clear()
-                self.campo_monto_total.clear()
-                self.campo_total_deuda.clear()
-                self.label_facturas_deuda.clear()
-        else:
-            # Limpiar campos si el medidor no es válido
-            self.nombre_cliente_input.clear()
-            self.lectura_id_input.clear()
-            self.monto_lectura_input.clear()
-            self.direccion_cliente_input.clear()
-            self.campo_total_deuda.clear()
-            self.label_facturas_deuda.clear()
-            
-    def cargar_informacion_deuda(self, medidor_id):
-        """Carga la información de deuda del cliente y la muestra en la interfaz."""
+        self.limpiar_datos_cliente()
+        cliente = contexto["cliente"] if contexto and medidor_id.isdigit() else None
+        if not cliente:
+            return
+
+        # Se conserva para registrar e imprimir con la misma lectura
+        self.contexto_facturacion = contexto
+        self.medidor_contexto = int(medidor_id)
+        self.nombre_cliente_input.setText(cliente["nombre_cliente"])
+        self.cedula_cliente_input.setText(cliente.get("cliente_ci", "No disponible"))  # Asigna directamente al campo de la UI
+        self.registrar_button.setEnabled(True)
+
+        # Obtener datos de lectura, incluyendo dirección
+        lectura = contexto["lectura"]
+        if lectura:
+            self.lectura_id_input.setText(str(lectura["id"]))
+            self.monto_lectura_input.setText(f"{lectura['consumo']:.2f}")
+            self.direccion_cliente_input.setText(lectura["direccion"])  # Establecer dirección
+
+            # Cargar información de deuda
+            self.cargar_informacion_deuda(contexto["deuda"])
+
+            self.actualizar_montos()  # Actualizar montos al cargar datos
+
+    def cargar_informacion_deuda(self, resumen_deuda):
+        """Muestra la deuda del cliente (resumen de saldos_medidor) en la interfaz."""
         try:
-            helper_saldo = SaldoPendienteHelper(self.controller.db_path)
-            saldo_pendiente = helper_saldo.obtener_saldo_pendiente(medidor_id)
-
-            # Obtener el número de facturas en deuda usando una consulta directa
-            conn = sqlite3.connect(self.controller.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM facturas WHERE medidor_id = ? AND estado = 'Deuda'", (medidor_id,))
-            num_facturas_deuda = cursor.fetchone()[0]
-            conn.close()
+            saldo_pendiente = resumen_deuda["total_deuda"]
+            num_facturas_deuda = resumen_deuda["num_deudas"]
 
             # Actualizar el campo de deuda
             self.campo_total_deuda.setText(f"${saldo_pendiente:.2f}")
@@ -496,29 +540,6 @@ class FacturasWidget(QWidget):
             # Obtener el tipo de servicio seleccionado
             tipo_servicio = self.combobox_servicio.currentText()
 
-            # Establecer monto básico según el tipo de servicio
-            if tipo_servicio == "DOMICILIARIA":
-                monto_basico = 2.50
-            elif tipo_servicio == "COMERCIAL":
-                monto_basico = 3.50
-            else:  # INDUSTRIAL
-                monto_basico = 4.50
-
-            # Aplicar descuento del 50% si es tercera edad o discapacitado
-            if self.checkbox_tercera_edad.isChecked():
-                monto_basico = monto_basico * 0.50
-
-            # Calcular monto excedente según el consumo
-            if consumo <= 10:
-                monto_excedente = 0
-            else:
-                consumo_excedente = consumo - 10
-                if consumo <= 50:  # 11-50 m³
-                    monto_excedente = consumo_excedente * 0.40
-                elif consumo <= 100:  # 51-100 m³
-                    monto_excedente = consumo_excedente * 0.60
-                else:  # >100 m³
-                    monto_excedente = consumo_excedente * 0.80
 
             # Calcular total de campos adicionales
             total_adicionales = sum(
@@ -540,13 +561,16 @@ class FacturasWidget(QWidget):
                 except ValueError:
                     monto_materiales = 0
 
-            # Calcular monto total
-            monto_total = monto_basico + monto_excedente + total_adicionales + monto_otros + monto_materiales
+            # Tarifa vigente (tablas tarifas / tarifas_excedente) más los adicionales
+            montos = calcular_montos(
+                self.controller.db_path, consumo, tipo_servicio, self.checkbox_tercera_edad.isChecked(),
+                adicionales=total_adicionales + monto_otros + monto_materiales
+            )
 
             # Actualizar campos
-            self.campo_monto_basico.setText(f"{monto_basico:.2f}")
-            self.campo_monto_excedente.setText(f"{monto_excedente:.2f}")
-            self.campo_monto_total.setText(f"{monto_total:.2f}")
+            self.campo_monto_basico.setText(f"{montos['monto_basico']:.2f}")
+            self.campo_monto_excedente.setText(f"{montos['monto_excedente']:.2f}")
+            self.campo_monto_total.setText(f"{montos['monto_total']:.2f}")
 
         except ValueError:
             # Si hay algún error en los cálculos, limpiar los campos
@@ -554,6 +578,11 @@ class FacturasWidget(QWidget):
             self.campo_monto_excedente.clear()
             self.campo_monto_total.clear()
 
+    def monto_cargo(self, campo):
+        """Valor de un cargo adicional si está marcado, si no 0."""
+        checkbox, valor = self.campos_adicionales[campo]
+        return valor if checkbox.isChecked() else 0.00
+
     def registrar_factura(self):
         """Registra una nueva factura en la base de datos."""
         try:
@@ -574,17 +603,17 @@ class FacturasWidget(QWidget):
             tipo_pago = self.combobox_tipo_pago.currentText()
 
             # Obtener valores de los checkboxes
-            traspaso = 30.00 if self.campos_adicionales["traspaso"][0].isChecked() else 0.00
+            traspaso = self.monto_cargo("traspaso")
             self.traspaso = traspaso
-            medidor = 50.00 if self.campos_adicionales["medidor"][0].isChecked() else 0.00
+            medidor = self.monto_cargo("medidor")
             self.medidor = medidor
-            reconexion = 10.00 if self.campos_adicionales["reconexión"][0].isChecked() else 0.00
+            reconexion = self.monto_cargo("reconexión")
             self.reconexion = reconexion
-            multas_sesiones = 10.00 if self.campos_adicionales["multas sesiones"][0].isChecked() else 0.00
+            multas_sesiones = self.monto_cargo("multas sesiones")
             self.multas_sesiones = multas_sesiones
-            multas_mingas = 10.00 if self.campos_adicionales["multas mingas"][0].isChecked() else 0.00
+            multas_mingas = self.monto_cargo("multas mingas")
             self.multas_mingas = multas_mingas
-            conexion_nueva = 500.00 if self.campos_adicionales["conexion nueva"][0].isChecked() else 0.00
+            conexion_nueva = self.monto_cargo("conexion nueva")
             self.conexion_nueva = conexion_nueva
 
             # Calcular el valor de los checkboxes "Otros"
@@ -607,9 +636,13 @@ class FacturasWidget(QWidget):
             # Obtener estado de tercera edad / discapacitados
             tercera_edad = 1 if self.checkbox_tercera_edad.isChecked() else 0
 
-             # Obtener datos de lectura actual y lectura anterior con el helper
-            helper_lecturas = RecuperarLecturas(self.controller.db_path)
-            lecturas = helper_lecturas.recuperar_lecturas_por_medidor(medidor_id)
+            # Lectura anterior y actual del contexto cargado con el medidor; si
+            # el medidor cambió y su consulta no terminó, el contexto es de otro
+            contexto = getattr(self, 'contexto_facturacion', None)
+            if not contexto or not medidor_id.isdigit() or getattr(self, 'medidor_contexto', None) != int(medidor_id):
+                QMessageBox.warning(self, "Advertencia", "Espera a que se carguen los datos del medidor antes de registrar la factura.")
+                return
+            lecturas = contexto["lectura"]
 
             if not lecturas:
                 QMessageBox.warning(self, "Advertencia", "No se encontraron lecturas para este cliente.")
@@ -623,14 +656,6 @@ class FacturasWidget(QWidget):
                 QMessageBox.warning(self, "Campos Vacíos", "Por favor, llena todos los campos obligatorios antes de registrar la factura.")
                 return
 
-            # Obtener el número de factura de la nueva secuencia 001-010 ANTES de registrar
-            secuencia = get_secuencia_facturacion(self.controller.db_path)
-            self.numero_factura = secuencia.obtener_siguiente_numero()
-
-            if not self.numero_factura:
-                QMessageBox.critical(self, "Error", "No se pudo generar el número de factura.")
-                return
-
             # Crear diccionario de datos para la factura
             factura_data = {
                 "medidor_id": medidor_id,
@@ -658,27 +683,19 @@ class FacturasWidget(QWidget):
                 "direccion": direccion_cliente,
                 "saldo_pendiente": saldo_pendiente,
                 "materiales": monto_materiales,
-                "numero_factura": self.numero_factura,  # Agregar el número de factura
                 "tercera_edad": tercera_edad  # Agregar descuento tercera edad
             }
 
-            # Registrar factura en la base de datos
-            factura_id = self.controller.registrar_factura(factura_data)
+            # Número, factura y deudas en una sola transacción
+            usuario, rol = None, None
+            if self.parent_window and hasattr(self.parent_window, 'user_data'):
+                usuario = self.parent_window.user_data['name']
+                rol = self.parent_window.user_data['role']
+
+            factura_id, numero_factura = self.controller.emitir_factura(factura_data, usuario, rol)
             if factura_id:
-                # Llamar al helper para obtener el ID de la última factura
-                helper_id = RecuperarFacturaID(self.controller.db_path)
-                self.factura_id = helper_id.obtener_id_factura()
-
-                # Registrar en el log
-                if self.parent_window and hasattr(self.parent_window, 'user_data'):
-                    logger = get_logger()
-                    logger.log_crear_factura(
-                        self.parent_window.user_data['name'],
-                        self.parent_window.user_data['role'],
-                        self.factura_id,
-                        nombre_cliente,
-                        monto_total
-                    )
+                self.factura_id = factura_id
+                self.numero_factura = numero_factura
 
                 # Habilitar botón de imprimir y mostrar mensaje de éxito
                 self.imprimir_button.setEnabled(True)
@@ -714,6 +731,62 @@ class FacturasWidget(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al actualizar deudas: {e}")
             
+    def facturar_mes_completo(self):
+        """Emite la factura del mes seleccionado a todos los clientes activos con lectura sin facturar."""
+        mes_facturacion = self.combobox_mes_facturacion.currentText()
+        respuesta = QMessageBox.question(
+            self,
+            "Facturación Masiva",
+            f"Se emitirá la factura de {mes_facturacion} (en estado Deuda) para todos los clientes "
+            "activos cuya última lectura aún no está facturada.\n\n¿Desea continuar?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if respuesta != QMessageBox.StandardButton.Yes:
+            return
+
+        self.facturacion_masiva_button.setEnabled(False)
+        self.progreso_masivo = QProgressDialog("Emitiendo facturas...", "Cancelar", 0, 0, self)
+        self.progreso_masivo.setWindowTitle("Facturación Masiva")
+        self.progreso_masivo.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progreso_masivo.setMinimumDuration(0)
+
+        self.worker_masivo = FacturacionMasivaWorker(self.controller.db_path, mes_facturacion, self)
+        self.worker_masivo.progreso.connect(self._actualizar_progreso_masivo)
+        self.worker_masivo.terminado.connect(self._facturacion_masiva_terminada)
+        self.progreso_masivo.canceled.connect(self.worker_masivo.cancelar)
+        self.worker_masivo.start()
+
+    def _actualizar_progreso_masivo(self, procesadas, total):
+        self.progreso_masivo.setMaximum(total)
+        self.progreso_masivo.setValue(procesadas)
+        self.progreso_masivo.setLabelText(f"Emitiendo facturas... {procesadas} de {total}")
+
+    def _facturacion_masiva_terminada(self, resumen):
+        self.progreso_masivo.close()
+        self.facturacion_masiva_button.setEnabled(True)
+        mes_facturacion = self.worker_masivo.mes_facturacion
+
+        if self.parent_window and hasattr(self.parent_window, 'user_data'):
+            get_logger().registrar_accion(
+                self.parent_window.user_data['name'],
+                self.parent_window.user_data['role'],
+                "FACTURACION_MASIVA",
+                f"{mes_facturacion}: {resumen['facturadas']} facturas "
+                f"({resumen['primer_numero']} a {resumen['ultimo_numero']}) - Monto: ${resumen['monto_total']:.2f}"
+            )
+
+        mensaje = f"Facturas emitidas: {resumen['facturadas']} de {resumen['total']}"
+        if resumen["facturadas"]:
+            mensaje += (f"\nNúmeros: {resumen['primer_numero']} a {resumen['ultimo_numero']}"
+                        f"\nMonto facturado: ${resumen['monto_total']:.2f}")
+        if resumen["cancelado"]:
+            mensaje += "\n\nProceso cancelado. Puede volver a ejecutarlo para facturar los restantes."
+
+        if resumen["error"]:
+            QMessageBox.critical(self, "Facturación Masiva", f"{mensaje}\n\nError: {resumen['error']}")
+        else:
+            QMessageBox.information(self, "Facturación Masiva", mensaje)
+
     def guardar_respaldo_pdf(self, factura_data, servicios_otros):
         """Guarda un respaldo PDF de la factura en el escritorio en la carpeta facturas_respaldo."""
         try:
@@ -731,9 +804,12 @@ class FacturasWidget(QWidget):
             ruta_pdf = os.path.join(carpeta_respaldo, nombre_archivo)
 
             # Generar el PDF de respaldo
+            from app.helpers.imprimir_factura import ImprimirFactura
             impresor = ImprimirFactura(factura_data)
             impresor.servicios_otros = servicios_otros
-            impresor.generar_pdf(ruta_pdf)
+            exito, mensaje = impresor.generar_pdf(ruta_pdf)
+            if not exito:
+                QMessageBox.critical(self, "Error", f"No se pudo guardar el respaldo PDF: {mensaje}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo guardar el respaldo PDF: {e}")
     def imprimir_factura(self):
@@ -786,9 +862,11 @@ class FacturasWidget(QWidget):
             "Tipo de pago": self.combobox_tipo_pago.currentText()
         }
 
+        from app.helpers.imprimir_factura import ImprimirFactura
         impresor = ImprimirFactura(factura_data)
         impresor.servicios_otros = servicios_otros  # Pasar los servicios seleccionados al impresor
-        impresor.generar_pdf()
+        from app.views.abrir_pdf import mostrar_pdf
+        mostrar_pdf(self, impresor.generar_pdf(), "Factura generada en")
         self.guardar_respaldo_pdf(factura_data, servicios_otros)
         # Mostrar mensaje de éxito
         # Colocar una opcion que recupera un dato de la factura anterior que sera saldo
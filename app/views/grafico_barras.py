@@ -0,0 +1,165 @@
+"""
+Gráfico de barras dibujado con QPainter para el panel de recaudación.
+
+Reemplaza la figura de matplotlib en pantalla: no necesita importar
+matplotlib y cada gráfico ya dibujado se guarda como QPixmap por clave
+(año, dirección) y tamaño, así volver a un filtro ya visto solo copia la
+imagen. La entrada de una clave se descarta cuando sus valores cambian
+(facturas nuevas, editadas o eliminadas).
+"""
+
+from collections import OrderedDict
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen, QPixmap
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+COLOR_BARRA = QColor("#3498db")
+COLOR_BARRA_VACIA = QColor("#d5dbdb")
+COLOR_TEXTO = QColor("#2c3e50")
+COLOR_EJES = QColor("#dddddd")
+
+# Gráficos guardados (cada uno con sus tamaños)
+CAPACIDAD_CACHE = 32
+
+
+class GraficoBarras(QWidget):
+    """Barras verticales con su valor encima, título y nombres de los ejes."""
+
+    def __init__(self, titulo_x="", titulo_y="", parent=None):
+        super().__init__(parent)
+        self.titulo_x = titulo_x
+        self.titulo_y = titulo_y
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumHeight(300)
+        self._clave = None
+        # {clave: (titulo, etiquetas, valores, {(ancho, alto, escala): QPixmap})}
+        self._cache = OrderedDict()
+        self.dibujados = 0
+
+    def mostrar(self, clave, titulo, etiquetas, valores):
+        """
+        Muestra un gráfico; reutiliza la imagen guardada si los datos no cambiaron.
+
+        Args:
+            clave: Identifica el gráfico en la caché (ej. (año, dirección))
+            titulo: Título sobre las barras
+            etiquetas: Texto bajo cada barra
+            valores: Altura de cada barra
+        """
+        datos = (titulo, tuple(etiquetas), tuple(valores))
+        entrada = self._cache.get(clave)
+        if entrada is None or entrada[:3] != datos:
+            self._cache[clave] = (*datos, {})
+            while len(self._cache) > CAPACIDAD_CACHE:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(clave)
+        self._clave = clave
+        self.update()
+
+    def invalidar(self):
+        """Descarta todas las imágenes guardadas."""
+        self._cache.clear()
+        self._clave = None
+        self.update()
+
+    def datos_actuales(self):
+        """(titulo, etiquetas, valores) del gráfico mostrado o None."""
+        entrada = self._cache.get(self._clave)
+        return entrada[:3] if entrada else None
+
+    def paintEvent(self, event):
+        entrada = self._cache.get(self._clave)
+        if entrada is None:
+            return
+        escala = self.devicePixelRatioF()
+        tamano = (self.width(), self.height(), escala)
+        imagenes = entrada[3]
+        imagen = imagenes.get(tamano)
+        if imagen is None:
+            imagen = QPixmap(round(self.width() * escala), round(self.height() * escala))
+            imagen.setDevicePixelRatio(escala)
+            imagen.fill(Qt.GlobalColor.white)
+            pintor = QPainter(imagen)
+            self.dibujar(pintor, QRectF(0, 0, self.width(), self.height()), *entrada[:3])
+            pintor.end()
+            # Solo se guarda el último tamaño: al redimensionar no se acumulan imágenes
+            imagenes.clear()
+            imagenes[tamano] = imagen
+            self.dibujados += 1
+        pintor = QPainter(self)
+        pintor.drawPixmap(0, 0, imagen)
+        pintor.end()
+
+    def dibujar(self, pintor, area, titulo, etiquetas, valores):
+        """Dibuja el gráfico completo en area."""
+        pintor.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pintor.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+
+        fuente_titulo = QFont("Arial", 12, QFont.Weight.Bold)
+        fuente_ejes = QFont("Arial", 10, QFont.Weight.Bold)
+        fuente_etiquetas = QFont("Arial", 9)
+        fuente_valores = QFont("Arial", 9, QFont.Weight.Bold)
+
+        # Márgenes: título arriba, nombres de meses girados abajo
+        izquierda = area.left() + 40
+        derecha = area.right() - 15
+        arriba = area.top() + 45
+        abajo = area.bottom() - 85
+        if derecha - izquierda < 50 or abajo - arriba < 50:
+            return
+
+        pintor.setPen(COLOR_TEXTO)
+        pintor.setFont(fuente_titulo)
+        pintor.drawText(QRectF(area.left(), area.top() + 5, area.width(), 30),
+                        Qt.AlignmentFlag.AlignCenter, titulo)
+
+        # Líneas guía y ejes
+        pintor.setPen(QPen(COLOR_EJES, 1, Qt.PenStyle.DashLine))
+        for i in range(1, 5):
+            y = abajo - (abajo - arriba) * i / 5
+            pintor.drawLine(QPointF(izquierda, y), QPointF(derecha, y))
+        pintor.setPen(QPen(COLOR_EJES, 1))
+        pintor.drawLine(QPointF(izquierda, arriba), QPointF(izquierda, abajo))
+        pintor.drawLine(QPointF(izquierda, abajo), QPointF(derecha, abajo))
+
+        # Barras
+        maximo = max(valores, default=0) or 1
+        ancho_columna = (derecha - izquierda) / max(len(valores), 1)
+        ancho_barra = ancho_columna * 0.7
+        pintor.setPen(Qt.PenStyle.NoPen)
+        for i, valor in enumerate(valores):
+            x = izquierda + ancho_columna * i + (ancho_columna - ancho_barra) / 2
+            alto = (abajo - arriba) * valor / maximo
+            color = QColor(COLOR_BARRA if valor > 0 else COLOR_BARRA_VACIA)
+            color.setAlphaF(0.8)
+            pintor.setBrush(color)
+            pintor.drawRect(QRectF(x, abajo - alto, ancho_barra, alto))
+            if valor > 0:
+                pintor.setPen(COLOR_TEXTO)
+                pintor.setFont(fuente_valores)
+                pintor.drawText(QRectF(x - 10, abajo - alto - 18, ancho_barra + 20, 16),
+                                Qt.AlignmentFlag.AlignCenter, str(int(valor)))
+                pintor.setPen(Qt.PenStyle.NoPen)
+
+        # Etiquetas del eje X a 45 grados
+        pintor.setPen(COLOR_TEXTO)
+        pintor.setFont(fuente_etiquetas)
+        for i, etiqueta in enumerate(etiquetas):
+            x = izquierda + ancho_columna * (i + 0.5)
+            pintor.save()
+            pintor.translate(x, abajo + 8)
+            pintor.rotate(-45)
+            pintor.drawText(QRectF(-80, -8, 80, 16),
+                            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, etiqueta)
+            pintor.restore()
+
+        # Nombres de los ejes
+        pintor.setFont(fuente_ejes)
+        pintor.drawText(QRectF(izquierda, area.bottom() - 22, derecha - izquierda, 20),
+                        Qt.AlignmentFlag.AlignCenter, self.titulo_x)
+        pintor.save()
+        pintor.translate(area.left() + 12, (arriba + abajo) / 2)
+        pintor.rotate(-90)
+        pintor.drawText(QRectF(-(abajo - arriba) / 2, -10, abajo - arriba, 20),
+                        Qt.AlignmentFlag.AlignCenter, self.titulo_y)
+        pintor.restore()
@@ -1,11 +1,12 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView,
     QLabel, QLineEdit, QPushButton, QComboBox, QHeaderView, QGroupBox,
     QFrame
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QPalette, QColor
 from app.controllers.lecturacon_controller import LecturaController
+from app.views.modelo_tabla import ModeloTablaPerezoso
 
 class ConsultaLecturasWidget(QWidget):
     def __init__(self, db_path):
@@ -174,17 +175,17 @@ class ConsultaLecturasWidget(QWidget):
         tabla_layout.setContentsMargins(15, 15, 15, 15)
 
         # Tabla de lecturas
-        self.lecturas_table = QTableWidget()
+        self.lecturas_table = QTableView()
         self.lecturas_table.setFont(QFont("Arial", 10))
-        self.lecturas_table.setColumnCount(9)
-        self.lecturas_table.setHorizontalHeaderLabels([
+        self.lecturas_model = ModeloTablaPerezoso([
             "ID", "Numero medidor", "Lectura anterior", "Lectura actual", "Consumo",
             "Fecha lectura", "Usuario", "Direccion", "Cliente"
-        ])
+        ], parent=self)
+        self.lecturas_table.setModel(self.lecturas_model)
         self.lecturas_table.horizontalHeader().setStretchLastSection(True)
         self.lecturas_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.lecturas_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 border-radius: 4px;
                 gridline-color: #ddd;
@@ -195,10 +196,10 @@ class ConsultaLecturasWidget(QWidget):
                 border: 1px solid #ddd;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e9ecef;
                 color: black;
             }
@@ -228,10 +229,5 @@ class ConsultaLecturasWidget(QWidget):
         if self.nombre_cliente_input.text():
             filtros["nombre_cliente"] = self.nombre_cliente_input.text()
 
-        lecturas = self.controller.obtener_lecturas(filtros)
-        self.lecturas_table.setRowCount(len(lecturas))
-        for row_idx, lectura in enumerate(lecturas):
-            for col_idx, dato in enumerate(lectura):
-                item = QTableWidgetItem(str(dato))
-                item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
-                self.lecturas_table.setItem(row_idx, col_idx, item)
+        # Las lecturas se leen por bloques a medida que se desplaza la tabla
+        self.lecturas_model.cargar(self.controller.iterar_lecturas(filtros))
@@ -8,6 +8,7 @@ from PyQt6.QtGui import QFont
 from app.controllers.lectura_controller import LecturaController
 from datetime import datetime
 from app.helpers.sistema_logs import get_logger
+from app.views.buscador_cliente import BuscadorCliente
 
 
 class LecturasWidget(QWidget):
@@ -50,7 +51,13 @@ class LecturasWidget(QWidget):
                 border: 1px solid #007bff;
             }
         """)
-        self.medidor_id_input.textChanged.connect(self.autocompletar_datos_cliente)
+        # Consulta diferida y en segundo plano mientras se escribe el medidor
+        self.buscador_cliente = BuscadorCliente(
+            self.medidor_id_input, "lecturas", self.consultar_contexto_cliente,
+            ("clientes", "lecturas")
+        )
+        self.buscador_cliente.cambiado.connect(self.limpiar_datos_cliente)
+        self.buscador_cliente.encontrado.connect(self.autocompletar_datos_cliente)
         cliente_layout.addRow("Número del medidor:", self.medidor_id_input)
 
         # Nombre del cliente (Solo lectura)
@@ -156,6 +163,8 @@ class LecturasWidget(QWidget):
         """)
         self.registrar_button.clicked.connect(self.registrar_lectura)
         self.registrar_button.setFixedHeight(40)
+        # Se habilita cuando llegan los datos del medidor escrito
+        self.registrar_button.setEnabled(False)
 
         # Botón alineado al centro
         button_layout = QHBoxLayout()
@@ -167,26 +176,37 @@ class LecturasWidget(QWidget):
         # Establecer el layout principal
         self.setLayout(main_layout)
 
-    def autocompletar_datos_cliente(self):
+    def consultar_contexto_cliente(self, medidor_id):
+        """Cliente y última lectura del medidor (se ejecuta en segundo plano)."""
+        cliente = self.controller.obtener_cliente_y_direccion(medidor_id)
+        if not cliente:
+            return None
+        return {"cliente": cliente, "ultima_lectura": self.controller.obtener_ultima_lectura(medidor_id)}
+
+    def limpiar_datos_cliente(self, medidor_id=None):
+        """Vacía los datos del cliente anterior mientras se consulta el medidor."""
+        self.medidor_contexto = None
+        self.registrar_button.setEnabled(False)
+        self.nombre_cliente_display.clear()
+        self.direccion_display.clear()
+        self.lectura_anterior_entry.clear()
+
+    def autocompletar_datos_cliente(self, medidor_id, contexto):
         """Autocompleta los campos de nombre, dirección y lectura anterior."""
-        medidor_id = self.medidor_id_input.text()
-        if medidor_id.isdigit():
-            cliente = self.controller.obtener_cliente_y_direccion(medidor_id)
-            if cliente:
-                self.nombre_cliente_display.setText(cliente["nombre_cliente"])
-                self.direccion_display.setText(cliente["direccion"])
+        self.limpiar_datos_cliente()
+        if medidor_id.isdigit() and contexto:
+            cliente = contexto["cliente"]
+            self.medidor_contexto = int(medidor_id)
+            self.nombre_cliente_display.setText(cliente["nombre_cliente"])
+            self.direccion_display.setText(cliente["direccion"])
 
-                # Obtener la última lectura
-                ultima_lectura = self.controller.obtener_ultima_lectura(medidor_id)
-                if ultima_lectura is not None:
-                    self.lectura_anterior_entry.setText(str(ultima_lectura))
-                else:
-                    self.lectura_anterior_entry.setText("0.0")
+            # Última lectura
+            ultima_lectura = contexto["ultima_lectura"]
+            if ultima_lectura is not None:
+                self.lectura_anterior_entry.setText(str(ultima_lectura))
             else:
-                # Limpiar campos si no se encuentra el cliente
-                self.nombre_cliente_display.clear()
-                self.direccion_display.clear()
-                self.lectura_anterior_entry.clear()
+                self.lectura_anterior_entry.setText("0.0")
+            self.registrar_button.setEnabled(True)
 
     def registrar_lectura(self):
         """Registra una nueva lectura."""
@@ -195,6 +215,10 @@ class LecturasWidget(QWidget):
             if not medidor_id.isdigit():
                 QMessageBox.critical(self, "Error", "El ID del cliente debe ser un número válido.")
                 return
+            # Nombre y lectura anterior deben ser del medidor escrito, no del anterior
+            if getattr(self, 'medidor_contexto', None) != int(medidor_id):
+                QMessageBox.warning(self, "Advertencia", "Espera a que se carguen los datos del medidor antes de registrar la lectura.")
+                return
             nombre_cliente = self.nombre_cliente_display.text()
             direccion = self.direccion_display.text()
             lectura_anterior = self.lectura_anterior_entry.text()
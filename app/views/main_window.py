@@ -2,30 +2,32 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFrame, QStackedWidget, QMessageBox
 )
+import importlib
 import os
 import sys
-from PyQt6.QtCore import Qt
+import time
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
 from PyQt6.QtGui import QFont, QPixmap
 from PyQt6.QtWidgets import QApplication
-from app.views.clients_widget import ClientsWidget
-from app.views.lecturas_widget import LecturasWidget
-from app.views.facturas_widget import FacturasWidget
-from app.views.consulta_widget import ConsultaWidget
-from app.views.lecturacon_widget import ConsultaLecturasWidget
-from app.views.consulta_clientes import ConsultaClientesWidget
-from app.views.consulta_pagados_vw import ConsultaRegistrosYDeudas
-from app.views.datos_recaudacion import DatosRecaudacion
-from app.views.servicios_widget import ServiciosWidget
 from app.helpers.sistema_logs import get_logger
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, user_data, db_path):
+    def __init__(self, user_data, db_path, precargar=False):
+        """
+        Args:
+            user_data: Datos del usuario que inició sesión
+            db_path: Ruta a la base de datos
+            precargar: Si es True, después de mostrar la ventana se construyen
+                las demás páginas de a una mientras la interfaz está libre
+        """
         super().__init__()
         self.user_data = user_data
         self.db_path = db_path
+        self.precargar = precargar
         self.app = QApplication.instance()
+        self._primera_vez_mostrada = True
         self.init_ui()
         
     def init_ui(self):
@@ -72,6 +74,7 @@ class MainWindow(QMainWindow):
             ("Consultar Usuarios", "list", self.show_list),
             ("Consulta Pagados", "pagados", self.show_pagados),
             ("Servicios", "servicios", self.show_servicios),
+            ("Auditoría", "auditoria", self.show_auditoria),
         ]
 
         for text, icon_name, callback in menu_buttons:
@@ -113,25 +116,27 @@ class MainWindow(QMainWindow):
         self.content_stack = QStackedWidget()
         self.content_stack.setObjectName("contentStack")
 
-        # Agregar widgets al QStackedWidget
-        self.datos_recaudacion_widget = DatosRecaudacion(self.db_path)
-        self.clients_widget = ClientsWidget(self.user_data)
-        self.lecturas_widget = LecturasWidget(self.db_path, self.user_data)
-        self.facturas_widget = FacturasWidget(self.db_path, self)
-        self.consulta_widget = ConsultaWidget(self.db_path, self)
-        self.consulta_lecturas_widget = ConsultaLecturasWidget(self.db_path)
-        self.consulta_clientes_widget = ConsultaClientesWidget(self.db_path)
-        self.consulta_pagados_widget = ConsultaRegistrosYDeudas(self.db_path)
-        self.servicios_widget = ServiciosWidget(self.db_path)
-        self.content_stack.addWidget(self.datos_recaudacion_widget)
-        self.content_stack.addWidget(self.clients_widget)
-        self.content_stack.addWidget(self.lecturas_widget)
-        self.content_stack.addWidget(self.facturas_widget)
-        self.content_stack.addWidget(self.consulta_widget)
-        self.content_stack.addWidget(self.consulta_lecturas_widget)
-        self.content_stack.addWidget(self.consulta_clientes_widget)
-        self.content_stack.addWidget(self.consulta_pagados_widget)
-        self.content_stack.addWidget(self.servicios_widget)
+        # Cada página se importa y se construye la primera vez que se muestra (o
+        # al precargar), así abrir la ventana no consulta lecturas, clientes ni
+        # dibuja el gráfico. {atributo: (módulo, clase, argumentos)}, en el orden del menú
+        self.constructores = {
+            "datos_recaudacion_widget": ("app.views.datos_recaudacion", "DatosRecaudacion", (self.db_path,)),
+            "clients_widget": ("app.views.clients_widget", "ClientsWidget", (self.user_data,)),
+            "lecturas_widget": ("app.views.lecturas_widget", "LecturasWidget", (self.db_path, self.user_data)),
+            "facturas_widget": ("app.views.facturas_widget", "FacturasWidget", (self.db_path, self)),
+            "consulta_widget": ("app.views.consulta_widget", "ConsultaWidget", (self.db_path, self)),
+            "consulta_lecturas_widget": ("app.views.lecturacon_widget", "ConsultaLecturasWidget", (self.db_path,)),
+            "consulta_clientes_widget": ("app.views.consulta_clientes", "ConsultaClientesWidget", (self.db_path,)),
+            "consulta_pagados_widget": ("app.views.consulta_pagados_vw", "ConsultaRegistrosYDeudas", (self.db_path,)),
+            "servicios_widget": ("app.views.servicios_widget", "ServiciosWidget", (self.db_path,)),
+            "auditoria_widget": ("app.views.auditoria_widget", "AuditoriaWidget", (self.db_path,)),
+        }
+        for nombre in self.constructores:
+            setattr(self, nombre, None)
+
+        cargando = QLabel("Cargando...")
+        cargando.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.content_stack.addWidget(cargando)
 
         right_layout.addWidget(self.content_stack)
         right_panel.setLayout(right_layout)
@@ -139,34 +144,77 @@ class MainWindow(QMainWindow):
         return right_panel
         
         
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._primera_vez_mostrada:
+            self._primera_vez_mostrada = False
+            # La página de inicio se arma cuando la ventana ya está en pantalla
+            QTimer.singleShot(0, self._mostrar_inicio)
+
+    def _mostrar_inicio(self):
+        self.show_home()
+        if self.precargar:
+            QTimer.singleShot(0, self._precargar_siguiente)
+
+    def _precargar_siguiente(self):
+        """Construye una página pendiente por vuelta del bucle de eventos."""
+        pendientes = self.paginas_pendientes()
+        if pendientes:
+            self.pagina(pendientes[0])
+            QTimer.singleShot(0, self._precargar_siguiente)
+
+    def paginas_pendientes(self):
+        return [nombre for nombre in self.constructores if getattr(self, nombre) is None]
+
+    def pagina(self, nombre):
+        """
+        Widget de una página del menú; lo construye la primera vez.
+
+        Args:
+            nombre: Atributo de la página (ej. "facturas_widget")
+        """
+        widget = getattr(self, nombre)
+        if widget is None:
+            inicio = time.perf_counter()
+            modulo, clase, argumentos = self.constructores[nombre]
+            widget = getattr(importlib.import_module(modulo), clase)(*argumentos)
+            self.content_stack.addWidget(widget)
+            setattr(self, nombre, widget)
+            print(f"[INIT] Pagina {nombre} construida en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return widget
+
+    def mostrar_pagina(self, nombre):
+        self.content_stack.setCurrentWidget(self.pagina(nombre))
+
     def show_home(self):
-        self.content_stack.setCurrentWidget(self.datos_recaudacion_widget)
+        self.mostrar_pagina("datos_recaudacion_widget")
 
     def show_clients(self):
-        self.content_stack.setCurrentWidget(self.clients_widget)
+        self.mostrar_pagina("clients_widget")
 
     def show_lecturas(self):
-        self.content_stack.setCurrentWidget(self.lecturas_widget)
+        self.mostrar_pagina("lecturas_widget")
 
     def show_billing(self):
-        self.content_stack.setCurrentWidget(self.facturas_widget)
+        self.mostrar_pagina("facturas_widget")
 
     def show_request(self):
-        self.content_stack.setCurrentWidget(self.consulta_widget)
-        
+        self.mostrar_pagina("consulta_widget")
+
     def show_queries(self):
-        self.content_stack.setCurrentWidget(self.consulta_lecturas_widget)
-        
+        self.mostrar_pagina("consulta_lecturas_widget")
+
     def show_list(self):
-        self.content_stack.setCurrentWidget(self.consulta_clientes_widget)
-        
-        
+        self.mostrar_pagina("consulta_clientes_widget")
+
     def show_pagados(self):
-        self.content_stack.setCurrentWidget(self.consulta_pagados_widget)
+        self.mostrar_pagina("consulta_pagados_widget")
 
     def show_servicios(self):
-        self.content_stack.setCurrentWidget(self.servicios_widget)
+        self.mostrar_pagina("servicios_widget")
 
+    def show_auditoria(self):
+        self.mostrar_pagina("auditoria_widget")
 
     def logout(self):
         message_box = QMessageBox(self)
@@ -0,0 +1,113 @@
+"""
+Modelo de tabla de solo lectura para las pantallas de consulta.
+
+En lugar de crear un QTableWidgetItem por celda, la vista pide a este modelo
+solo las celdas visibles y el texto y el color se calculan en data(). Las
+filas se guardan como tuplas y se leen de la fuente por bloques
+(canFetchMore/fetchMore) a medida que la vista se desplaza, así una consulta
+grande no se carga entera ni crea millones de objetos de Qt.
+"""
+
+from itertools import islice
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+# Filas que se leen de la fuente cada vez que la vista necesita más
+TAMANO_BLOQUE = 200
+
+
+def texto_celda(valor):
+    """Texto de una celda igual que el que mostraban los QTableWidgetItem."""
+    return str(valor)
+
+
+class ModeloTablaPerezoso(QAbstractTableModel):
+    """QAbstractTableModel de solo lectura alimentado por un iterable de tuplas."""
+
+    def __init__(self, encabezados, texto=texto_celda, color_fila=None,
+                 tamano_bloque=TAMANO_BLOQUE, parent=None):
+        """
+        Args:
+            encabezados: Títulos de las columnas
+            texto: Función texto(valor) que da el texto de una celda
+            color_fila: Función opcional color_fila(fila) que devuelve el
+                QColor de fondo de una fila o None
+            tamano_bloque: Filas que se leen por cada fetchMore
+        """
+        super().__init__(parent)
+        self.encabezados = list(encabezados)
+        self.texto = texto
+        self.color_fila = color_fila
+        self.tamano_bloque = tamano_bloque
+        self._filas = []
+        self._fuente = None
+
+    def cargar(self, filas):
+        """
+        Reemplaza el contenido de la tabla.
+
+        Args:
+            filas: Lista, generador o cualquier iterable de tuplas; un
+                generador solo se consume a medida que la vista lo pide
+        """
+        self.beginResetModel()
+        self._filas = []
+        self._fuente = iter(filas)
+        self.endResetModel()
+        # Primer bloque sin esperar a la vista (rowCount correcto de inmediato)
+        self.fetchMore(QModelIndex())
+
+    def limpiar(self):
+        self.cargar(())
+
+    def fila(self, numero):
+        """Tupla original de una fila."""
+        return self._filas[numero]
+
+    def todas_las_filas(self):
+        """Lee lo que falte de la fuente y devuelve todas las filas (p. ej. para imprimir)."""
+        while self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+        return self._filas
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.encabezados)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fuente is not None
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        bloque = list(islice(self._fuente, self.tamano_bloque))
+        if len(bloque) < self.tamano_bloque:
+            self._fuente = None
+        if not bloque:
+            return
+        inicio = len(self._filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(bloque) - 1)
+        self._filas.extend(bloque)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            fila = self._filas[index.row()]
+            return self.texto(fila[index.column()]) if index.column() < len(fila) else None
+        if role == Qt.ItemDataRole.BackgroundRole and self.color_fila:
+            return self.color_fila(self._filas[index.row()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.encabezados[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        # Solo lectura
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
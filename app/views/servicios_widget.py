@@ -8,7 +8,11 @@ from datetime import datetime, timedelta
 from PyQt6.QtCore import Qt, QDate
 from app.controllers.servicios_controller import ServiciosController
 from app.models.servicios import ServicioModel
-from app.helpers.imprimir_servicios import ImprimirServicio
+from app.services.pagos import (
+    NUEVO_MEDIDOR, cuotas_servicio, monto_servicio, siguiente_pago,
+    saldo_pendiente, total_pagado, validar_pago
+)
+from app.views.buscador_cliente import BuscadorCliente
 
 class ServiciosWidget(QWidget):
     def __init__(self, db_path, parent=None):
@@ -31,7 +35,13 @@ class ServiciosWidget(QWidget):
         cliente_layout.addWidget(QLabel("Número de Conexión:"), 0, 0)
         self.medidor_id_input = QLineEdit()
         self.medidor_id_input.setPlaceholderText("Ingresa el número de conexión")
-        self.medidor_id_input.textChanged.connect(self.cargar_datos_cliente)
+        # Consulta diferida y en segundo plano mientras se escribe la conexión
+        self.buscador_cliente = BuscadorCliente(
+            self.medidor_id_input, "servicios", self.consultar_contexto_cliente,
+            ("clientes", "servicios"), validar=bool
+        )
+        self.buscador_cliente.cambiado.connect(self.conexion_cambiada)
+        self.buscador_cliente.encontrado.connect(self.cargar_datos_cliente)
         cliente_layout.addWidget(self.medidor_id_input, 0, 1)
 
         cliente_layout.addWidget(QLabel("Nombre Cliente:"), 0, 2)
@@ -68,7 +78,7 @@ class ServiciosWidget(QWidget):
 
         servicio_layout.addWidget(QLabel("Usuario Servicio:"), 0, 0)
         self.usuario_servicio_combo = QComboBox()
-        self.usuario_servicio_combo.addItems(["SELECCIONE UNA OPCIÓN", "NUEVO MEDIDOR"])
+        self.usuario_servicio_combo.addItems(["SELECCIONE UNA OPCIÓN", NUEVO_MEDIDOR])
         self.usuario_servicio_combo.currentTextChanged.connect(self.actualizar_monto_servicio)
         servicio_layout.addWidget(self.usuario_servicio_combo, 0, 1)
 
@@ -157,6 +167,8 @@ class ServiciosWidget(QWidget):
         button_layout = QHBoxLayout()
         self.registrar_button = QPushButton("Registrar Servicio")
         self.registrar_button.clicked.connect(self.registrar_servicio)
+        # Se habilita cuando llegan los datos de la conexión escrita
+        self.registrar_button.setEnabled(False)
         
         self.limpiar_button = QPushButton("Limpiar Formulario")
         self.limpiar_button.clicked.connect(self.limpiar_formulario)
@@ -175,24 +187,37 @@ class ServiciosWidget(QWidget):
     def setup_connections(self):
         self.imprimir_btn.clicked.connect(self.imprimir_comprobante)
 
-    def cargar_datos_cliente(self):
-        numero_conexion = self.medidor_id_input.text()
-        if numero_conexion:
-            cliente = self.controller.obtener_datos_cliente(numero_conexion)
-            if cliente:
-                self.nombre_cliente_input.setText(cliente["nombre_cliente"])
-                self.ci_cliente_input.setText(cliente["cliente_ci"])
-                self.direccion_cliente_input.setText(cliente["direccion"])
-                self.telefono_cliente_input.setText(cliente["telefono"])
-                self.email_cliente_input.setText(cliente["email"])
-                self.cargar_estado_pagos(numero_conexion)
-            else:
-                self.limpiar_campos_cliente()
-        else:
-            self.limpiar_campos_cliente()
+    def consultar_contexto_cliente(self, numero_conexion):
+        """Cliente y servicios de la conexión (se ejecuta en segundo plano)."""
+        cliente = self.controller.obtener_datos_cliente(numero_conexion)
+        if not cliente:
+            return None
+        return {"cliente": cliente, "servicios": self.controller.obtener_servicios_por_medidor(numero_conexion)}
 
-    def cargar_estado_pagos(self, numero_conexion):
-        servicios = self.controller.obtener_servicios_por_medidor(numero_conexion)
+    def conexion_cambiada(self, numero_conexion):
+        """Vacía los datos y pagos de la conexión anterior mientras se consulta la nueva."""
+        self.limpiar_campos_cliente()
+        for _, check in self.pagos():
+            check.setChecked(False)
+            check.setEnabled(True)
+        self.actualizar_pagos_diferidos()
+
+    def cargar_datos_cliente(self, numero_conexion, contexto):
+        self.conexion_cambiada(numero_conexion)
+        if numero_conexion and contexto:
+            cliente = contexto["cliente"]
+            self.conexion_contexto = numero_conexion
+            self.nombre_cliente_input.setText(cliente["nombre_cliente"])
+            self.ci_cliente_input.setText(cliente["cliente_ci"])
+            self.direccion_cliente_input.setText(cliente["direccion"])
+            self.telefono_cliente_input.setText(cliente["telefono"])
+            self.email_cliente_input.setText(cliente["email"])
+            self.cargar_estado_pagos(numero_conexion, contexto["servicios"])
+            self.registrar_button.setEnabled(True)
+
+    def cargar_estado_pagos(self, numero_conexion, servicios=None):
+        if servicios is None:
+            servicios = self.controller.obtener_servicios_por_medidor(numero_conexion)
         if servicios:
             ultimo_servicio = servicios[-1]
             if ultimo_servicio["pago_uno"] > 0:
@@ -210,6 +235,8 @@ class ServiciosWidget(QWidget):
             self.actualizar_saldo_pendiente()
 
     def limpiar_campos_cliente(self):
+        self.conexion_contexto = None
+        self.registrar_button.setEnabled(False)
         self.nombre_cliente_input.clear()
         self.ci_cliente_input.clear()
         self.direccion_cliente_input.clear()
@@ -219,7 +246,7 @@ class ServiciosWidget(QWidget):
     def actualizar_monto_servicio(self):
         opcion_seleccionada = self.usuario_servicio_combo.currentText()
         
-        es_nuevo_medidor = opcion_seleccionada == "NUEVO MEDIDOR"
+        es_nuevo_medidor = opcion_seleccionada == NUEVO_MEDIDOR
         self.diferir_pago_check.setVisible(es_nuevo_medidor)
         self.fecha_pago_input.setVisible(es_nuevo_medidor)
         
@@ -228,89 +255,55 @@ class ServiciosWidget(QWidget):
         self.pago_tres_check.setVisible(es_nuevo_medidor)
         self.pago_cuatro_check.setVisible(es_nuevo_medidor)
         
-        if opcion_seleccionada == "NUEVO MEDIDOR":
-            self.monto_servicio_input.setValue(500.00)
+        self.monto_servicio_input.setValue(monto_servicio(opcion_seleccionada))
+        self.monto_servicio_input.setReadOnly(True)
+        if es_nuevo_medidor:
             self.fecha_pago_input.setDate(QDate.currentDate().addDays(20))
-            self.monto_servicio_input.setReadOnly(True)
-        else:
-            self.monto_servicio_input.setValue(0.00)
-            self.monto_servicio_input.setReadOnly(True)
         
         self.actualizar_pagos_diferidos()
         self.actualizar_saldo_pendiente()
 
+    def pagos(self):
+        """Campos y casillas de los cuatro pagos, en orden."""
+        return [
+            (self.pago_uno_input, self.pago_uno_check),
+            (self.pago_dos_input, self.pago_dos_check),
+            (self.pago_tres_input, self.pago_tres_check),
+            (self.pago_cuatro_input, self.pago_cuatro_check),
+        ]
+
     def actualizar_pagos_diferidos(self):
         opcion_seleccionada = self.usuario_servicio_combo.currentText()
-        
-        if opcion_seleccionada == "NUEVO MEDIDOR" and self.diferir_pago_check.isChecked():
-            self.pago_uno_input.setText("250.00")
-            self.pago_dos_input.setText("100.00")
-            self.pago_tres_input.setText("100.00")
-            self.pago_cuatro_input.setText("50.00")
-            
-            if not self.pago_uno_check.isChecked():
-                self.pago_uno_check.setEnabled(True)
-                self.pago_dos_check.setEnabled(False)
-                self.pago_tres_check.setEnabled(False)
-                self.pago_cuatro_check.setEnabled(False)
-            elif not self.pago_dos_check.isChecked():
-                self.pago_uno_check.setEnabled(False)
-                self.pago_dos_check.setEnabled(True)
-                self.pago_tres_check.setEnabled(False)
-                self.pago_cuatro_check.setEnabled(False)
-            elif not self.pago_tres_check.isChecked():
-                self.pago_uno_check.setEnabled(False)
-                self.pago_dos_check.setEnabled(False)
-                self.pago_tres_check.setEnabled(True)
-                self.pago_cuatro_check.setEnabled(False)
-            elif not self.pago_cuatro_check.isChecked():
-                self.pago_uno_check.setEnabled(False)
-                self.pago_dos_check.setEnabled(False)
-                self.pago_tres_check.setEnabled(False)
-                self.pago_cuatro_check.setEnabled(True)
-        else:
-            monto_total = self.monto_servicio_input.value()
-            self.pago_uno_input.setText(f"{monto_total:.2f}")
-            self.pago_dos_input.setText("0.00")
-            self.pago_tres_input.setText("0.00")
-            self.pago_cuatro_input.setText("0.00")
-            self.pago_uno_check.setEnabled(True)
-            self.pago_dos_check.setEnabled(False)
-            self.pago_tres_check.setEnabled(False)
-            self.pago_cuatro_check.setEnabled(False)
+        diferido = opcion_seleccionada == NUEVO_MEDIDOR and self.diferir_pago_check.isChecked()
+        cuotas = cuotas_servicio(opcion_seleccionada, self.monto_servicio_input.value(), diferido)
+        for (campo, _), cuota in zip(self.pagos(), cuotas):
+            campo.setText(f"{cuota:.2f}")
+
+        # Los pagos diferidos se registran en orden; sin diferir, solo el primero
+        siguiente = siguiente_pago([check.isChecked() for _, check in self.pagos()]) if diferido else 0
+        if siguiente is not None:
+            for indice, (_, check) in enumerate(self.pagos()):
+                check.setEnabled(indice == siguiente)
         
         self.actualizar_saldo_pendiente()
 
     def actualizar_saldo_pendiente(self):
         opcion_seleccionada = self.usuario_servicio_combo.currentText()
         
-        if opcion_seleccionada == "NUEVO MEDIDOR":
-            monto_total = 500.00
-            saldo_pagado = 0.00
-            
+        if opcion_seleccionada == NUEVO_MEDIDOR:
             try:
-                if self.pago_uno_check.isChecked():
-                    pago_uno = self.pago_uno_input.text().strip()
-                    saldo_pagado += float(pago_uno) if pago_uno else 0.0
-                if self.pago_dos_check.isChecked():
-                    pago_dos = self.pago_dos_input.text().strip()
-                    saldo_pagado += float(pago_dos) if pago_dos else 0.0
-                if self.pago_tres_check.isChecked():
-                    pago_tres = self.pago_tres_input.text().strip()
-                    saldo_pagado += float(pago_tres) if pago_tres else 0.0
-                if self.pago_cuatro_check.isChecked():
-                    pago_cuatro = self.pago_cuatro_input.text().strip()
-                    saldo_pagado += float(pago_cuatro) if pago_cuatro else 0.0
+                cuotas = [float(campo.text().strip().replace(',', '.') or 0) for campo, _ in self.pagos()]
             except ValueError:
                 QMessageBox.warning(self, "Error", "Los valores de pago deben ser números válidos.")
                 return
+
+            saldo = saldo_pendiente(monto_servicio(opcion_seleccionada), cuotas,
+                                    [check.isChecked() for _, check in self.pagos()])
+            self.saldo_pendiente_input.setText(f"${saldo:.2f}")
             
-            saldo_pendiente = monto_total - saldo_pagado
-            self.saldo_pendiente_input.setText(f"${saldo_pendiente:.2f}")
-            
-            if saldo_pendiente == 0:
+            if saldo == 0:
                 self.saldo_pendiente_input.setStyleSheet("background-color: #d4edda; color: #155724; font-weight: bold;")
-            elif saldo_pendiente > 0:
+            elif saldo > 0:
                 self.saldo_pendiente_input.setStyleSheet("background-color: #fff3cd; color: #856404; font-weight: bold;")
         else:
             self.saldo_pendiente_input.clear()
@@ -318,6 +311,10 @@ class ServiciosWidget(QWidget):
     def registrar_servicio(self):
         try:
             numero_conexion = self.medidor_id_input.text()
+            # Los datos mostrados deben ser de la conexión escrita, no de la anterior
+            if getattr(self, 'conexion_contexto', None) != numero_conexion:
+                QMessageBox.warning(self, "Advertencia", "Espera a que se carguen los datos de la conexión antes de registrar el pago.")
+                return
             nombre_usuario = self.nombre_cliente_input.text()
             direccion_usuario = self.direccion_cliente_input.text()
             usuario_servicio = self.usuario_servicio_combo.currentText()
@@ -328,19 +325,6 @@ class ServiciosWidget(QWidget):
             pago_tres = float(self.pago_tres_input.text()) if self.pago_tres_check.isChecked() else 0.0
             pago_cuatro = float(self.pago_cuatro_input.text()) if self.pago_cuatro_check.isChecked() else 0.0
 
-            if not numero_conexion or usuario_servicio != "NUEVO MEDIDOR" or monto_servicio <= 0:
-                QMessageBox.warning(self, "Campos Vacíos", "Seleccione 'NUEVO MEDIDOR' y complete los datos requeridos.")
-                return
-
-            if usuario_servicio == "NUEVO MEDIDOR" and not any([
-                self.pago_uno_check.isChecked(),
-                self.pago_dos_check.isChecked(),
-                self.pago_tres_check.isChecked(),
-                self.pago_cuatro_check.isChecked()
-            ]):
-                QMessageBox.warning(self, "Pago Requerido", "Seleccione al menos un pago para registrar.")
-                return
-
             datos_servicio = {
                 "numero_medidor": numero_conexion,
                 "nombre_usuario": nombre_usuario,
@@ -353,6 +337,11 @@ class ServiciosWidget(QWidget):
                 "pago_cuatro": pago_cuatro
             }
 
+            valido, mensaje = validar_pago(datos_servicio)
+            if not valido:
+                QMessageBox.warning(self, "Datos Incompletos", mensaje)
+                return
+
             id_servicio = self.controller.registrar_servicio(datos_servicio)
             if id_servicio:
                 QMessageBox.information(self, "Éxito", f"Pago registrado con ID: {id_servicio}")
@@ -398,20 +387,15 @@ class ServiciosWidget(QWidget):
         self.imprimir_btn.setEnabled(False)
         self.servicio_actual = None
 
+    def cuotas_y_pagados(self):
+        cuotas = [float(campo.text().replace(',', '.')) for campo, _ in self.pagos()]
+        return cuotas, [check.isChecked() for _, check in self.pagos()]
+
     def calcular_total_pagado(self):
-        total = 0.0
-        if self.pago_uno_check.isChecked():
-            total += float(self.pago_uno_input.text().replace(',', '.'))
-        if self.pago_dos_check.isChecked():
-            total += float(self.pago_dos_input.text().replace(',', '.'))
-        if self.pago_tres_check.isChecked():
-            total += float(self.pago_tres_input.text().replace(',', '.'))
-        if self.pago_cuatro_check.isChecked():
-            total += float(self.pago_cuatro_input.text().replace(',', '.'))
-        return total
+        return total_pagado(*self.cuotas_y_pagados())
 
     def calcular_saldo_pendiente(self):
-        return self.monto_servicio_input.value() - self.calcular_total_pagado()
+        return saldo_pendiente(self.monto_servicio_input.value(), *self.cuotas_y_pagados())
 
     def imprimir_comprobante(self):
         if not self.servicio_actual:
@@ -436,7 +420,7 @@ class ServiciosWidget(QWidget):
             "Fecha Emisión": QDate.currentDate().toString("dd/MM/yyyy")
         }
 
-        if tipo_servicio == "NUEVO MEDIDOR" and self.diferir_pago_check.isChecked():
+        if tipo_servicio == NUEVO_MEDIDOR and self.diferir_pago_check.isChecked():
             datos_comprobante.update({
                 "Pago 1": float(self.pago_uno_input.text()),
                 "Pago 1 Fecha": self.fecha_pago_input.date().toString("dd/MM/yyyy") if self.pago_uno_check.isChecked() else "",
@@ -455,5 +439,7 @@ class ServiciosWidget(QWidget):
                 "Es Diferido": False
             })
 
+        from app.helpers.imprimir_servicios import ImprimirServicio
         self.imprimir_servicio = ImprimirServicio(datos_comprobante)
-        self.imprimir_servicio.generar_pdf()
\ No newline at end of file
+        from app.views.abrir_pdf import mostrar_pdf
+        mostrar_pdf(self, self.imprimir_servicio.generar_pdf())
@@ -0,0 +1,107 @@
+"""
+Benchmark del almacén de respaldos frente a la copia completa.
+
+Simula varias jornadas: en cada una registra facturas y guarda un respaldo,
+con copiar_bd (una copia completa por día, lo que hacía crear_backup) y con
+guardar_instantanea (solo los bloques que cambiaron, comprimidos). Compara el
+tiempo de cada respaldo, los bytes escritos y el disco que ocupan todos los
+puntos de restauración, y mide lo que tarda restaurar la última instantánea.
+
+Uso:
+    python benchmarks/benchmark_almacen_respaldos.py [num_facturas] [jornadas] [facturas_por_jornada]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.almacen_respaldos import guardar_instantanea, restaurar_instantanea, tamano_almacen
+from app.helpers.backup_helper import copiar_bd
+from app.helpers.database_migrator import ejecutar_migraciones
+from benchmark_consulta_facturas import cargar_facturas
+from benchmark_facturacion_masiva import crear_bd
+
+
+def registrar_jornada(db_path, jornada, cantidad):
+    """Facturas de un día de ventanilla, una transacción por factura."""
+    for i in range(cantidad):
+        with get_pool().transaction(db_path) as conn:
+            conn.execute("""
+                INSERT INTO facturas (medidor_id, nombre_cliente, mes_facturacion, monto_total,
+                                      fecha_emision, estado, servicio, direccion)
+                VALUES (?, ?, 'Enero', 4.5, ?, 'Pagado', 'DOMICILIARIA', 'Centro')
+            """, (i % 5000 + 1, f"Cliente {i % 5000 + 1}", f"2026-01-{jornada % 28 + 1:02d}"))
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    jornadas = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    por_jornada = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    directorio = tempfile.mkdtemp(prefix="bench_almacen_")
+    db_path = os.path.join(directorio, "bench.db")
+    copias = os.path.join(directorio, "copias")
+    almacen = os.path.join(directorio, "almacen")
+    os.makedirs(copias)
+    try:
+        crear_bd(db_path, 0)
+        cargar_facturas(db_path, num_facturas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+
+        print(f"Respaldos diarios ({num_facturas:,} facturas, {jornadas} jornadas de {por_jornada} facturas)")
+        print("=" * 78)
+        print(f"{'Jornada':<9}{'Copia completa':>16}{'Escrito':>10}{'Instantanea':>15}{'Escrito':>10}{'Bloques nuevos':>16}")
+        t_copias = t_instantaneas = 0.0
+        escrito_copias = escrito_almacen = 0
+        for jornada in range(1, jornadas + 1):
+            registrar_jornada(db_path, jornada, por_jornada)
+
+            destino = os.path.join(copias, f"backup_{jornada:02d}.db")
+            inicio = time.perf_counter()
+            exito, mensaje = copiar_bd(db_path, destino)
+            t_copia = time.perf_counter() - inicio
+            assert exito, mensaje
+
+            inicio = time.perf_counter()
+            exito, manifiesto = guardar_instantanea(db_path, almacen)
+            t_instantanea = time.perf_counter() - inicio
+            assert exito, manifiesto
+
+            t_copias += t_copia
+            t_instantaneas += t_instantanea
+            escrito_copias += os.path.getsize(destino)
+            escrito_almacen += manifiesto["bytes_escritos"]
+            print(f"{jornada:<9}{t_copia * 1000:>14.0f}ms{os.path.getsize(destino) / 1024 / 1024:>8.1f}MB"
+                  f"{t_instantanea * 1000:>13.0f}ms{manifiesto['bytes_escritos'] / 1024 / 1024:>8.2f}MB"
+                  f"{manifiesto['bloques_nuevos']:>8} / {len(manifiesto['bloques'])}")
+
+        print("-" * 78)
+        print(f"{'Total':<9}{t_copias * 1000:>14.0f}ms{escrito_copias / 1024 / 1024:>8.1f}MB"
+              f"{t_instantaneas * 1000:>13.0f}ms{escrito_almacen / 1024 / 1024:>8.2f}MB")
+        print(f"Disco para {jornadas} puntos de restauracion: copias {escrito_copias / 1024 / 1024:.1f} MB, "
+              f"almacen {tamano_almacen(almacen) / 1024 / 1024:.1f} MB")
+
+        restaurada = os.path.join(directorio, "restaurada.db")
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exito, mensaje = restaurar_instantanea(manifiesto["id"], restaurada, almacen)
+        t_restaurar = time.perf_counter() - inicio
+        assert exito, mensaje
+        conn = sqlite3.connect(restaurada)
+        facturas = conn.execute("SELECT COUNT(*) FROM facturas").fetchone()[0]
+        conn.close()
+        print(f"Restaurar la ultima instantanea: {t_restaurar * 1000:.0f} ms ({facturas:,} facturas)")
+        print("=" * 78)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
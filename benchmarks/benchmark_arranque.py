@@ -0,0 +1,172 @@
+"""
+Benchmark del arranque de la aplicación.
+
+1. Tiempo de importación de main.py por módulo (python -X importtime) y
+   verificación de que las dependencias pesadas (PDF, gráficos, impresión,
+   bcrypt) no se importan antes del login.
+2. Tiempo hasta la ventana de login y hasta la ventana principal, en un
+   proceso nuevo por repetición, sobre una BD con N medidores.
+
+Se ejecuta sin ventana (QT_QPA_PLATFORM=offscreen). Termina con código 1 si
+alguna dependencia pesada vuelve a importarse al arrancar.
+
+Uso:
+    python benchmarks/benchmark_arranque.py [num_medidores] [--repeticiones=N]
+"""
+
+import time
+
+_INICIO_PROCESO = time.perf_counter()
+
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que no deben cargarse hasta que se usen
+PESADOS = ["matplotlib", "reportlab", "PyQt6.QtPrintSupport", "bcrypt", "numpy"]
+
+USUARIO = {"id": 1, "username": "benchmark", "name": "benchmark", "role": "Administrador"}
+
+_LINEA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _entorno():
+    return dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+
+
+def tiempos_importacion():
+    """
+    Importa main.py en un proceso nuevo con -X importtime.
+
+    Returns:
+        list: (modulo, propio_us, acumulado_us, nivel) en orden de importación
+    """
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=RAIZ, env=_entorno(), capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1])
+    modulos = []
+    for linea in resultado.stderr.splitlines():
+        coincidencia = _LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            propio, acumulado, sangria, modulo = coincidencia.groups()
+            modulos.append((modulo, int(propio), int(acumulado), len(sangria) // 2))
+    return modulos
+
+
+def _hijo(db_path):
+    """Arranca la aplicación en este proceso e imprime los tiempos en JSON."""
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    sys.path.insert(0, RAIZ)
+    sys.argv = [os.path.join(RAIZ, "main.py"), db_path]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+        from PyQt6.QtWidgets import QApplication
+
+        app = main.App(sys.argv)
+        QApplication.processEvents()
+        t_login = time.perf_counter() - _INICIO_PROCESO
+
+        app.on_login_successful(USUARIO)
+        t_principal = time.perf_counter() - _INICIO_PROCESO
+
+        ventana = app.main_window
+        while ventana.datos_recaudacion_widget is None:
+            QApplication.processEvents()
+        t_inicio = time.perf_counter() - _INICIO_PROCESO
+
+    print(json.dumps({"login": t_login, "principal": t_principal, "inicio": t_inicio}))
+
+
+def arrancar(db_path):
+    """Una repetición en un proceso nuevo; tiempos medidos desde el inicio del intérprete."""
+    inicio = time.perf_counter()
+    resultado = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--hijo", db_path],
+        cwd=RAIZ, env=_entorno(), capture_output=True, text=True
+    )
+    total = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip() or resultado.stdout.strip())
+    tiempos = json.loads(resultado.stdout.strip().splitlines()[-1])
+    tiempos["proceso"] = total
+    return tiempos
+
+
+def crear_bd_prueba(db_path, num_medidores):
+    sys.path.insert(0, RAIZ)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app.helpers.database_migrator import ejecutar_migraciones
+    from benchmark_consulta_facturas import cargar_facturas
+    from benchmark_facturacion_masiva import crear_bd
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        crear_bd(db_path, num_medidores)
+        cargar_facturas(db_path, num_medidores * 12)
+        ejecutar_migraciones(db_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--hijo":
+        _hijo(sys.argv[2])
+        sys.exit(0)
+
+    argumentos = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    num_medidores = int(argumentos[0]) if argumentos else 5_000
+    repeticiones = 5
+    for arg in sys.argv[1:]:
+        if arg.startswith("--repeticiones="):
+            repeticiones = int(arg.split("=", 1)[1])
+
+    # 1. Importaciones
+    modulos = tiempos_importacion()
+    # -X importtime escribe cada módulo después de los que importa: los de
+    # main.py son los que están entre la línea anterior de nivel 0 y la suya
+    fin = next(i for i, m in enumerate(modulos) if m[0] == "main" and m[3] == 0)
+    inicio = max((i for i, m in enumerate(modulos[:fin]) if m[3] == 0), default=-1) + 1
+    modulos = modulos[inicio:fin + 1]
+    print(f"Importacion de main.py: {modulos[-1][2] / 1000:.1f} ms ({len(modulos)} modulos)")
+    print("=" * 60)
+    print(f"{'Modulo (mas lentos, tiempo acumulado)':<44}{'ms':>8}")
+    primer_nivel = [m for m in modulos if m[3] == 1]
+    for modulo, _, acumulado, _ in sorted(primer_nivel, key=lambda m: m[2], reverse=True)[:10]:
+        print(f"  {modulo:<42}{acumulado / 1000:>8.1f}")
+    importados = {modulo for modulo, *_ in modulos}
+    pesados = [p for p in PESADOS if any(m == p or m.startswith(p + ".") for m in importados)]
+    print("-" * 60)
+    print(f"Dependencias pesadas antes del login: {', '.join(pesados) if pesados else 'ninguna'}")
+    print("=" * 60)
+
+    # 2. Login y ventana principal
+    directorio = tempfile.mkdtemp(prefix="bench_arranque_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd_prueba(db_path, num_medidores)
+        corridas = [arrancar(db_path) for _ in range(repeticiones)]
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print(f"\nArranque ({num_medidores:,} medidores, mediana de {repeticiones} procesos)")
+    print("=" * 60)
+    for clave, descripcion in (
+        ("login", "Ventana de login visible"),
+        ("principal", "Ventana principal visible"),
+        ("inicio", "Pagina de inicio lista"),
+        ("proceso", "Proceso completo"),
+    ):
+        print(f"{descripcion:<44}{statistics.median(c[clave] for c in corridas) * 1000:>8.1f} ms")
+    print("=" * 60)
+
+    sys.exit(1 if pesados else 0)
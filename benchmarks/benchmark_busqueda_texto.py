@@ -0,0 +1,96 @@
+"""
+Benchmark de la búsqueda por nombre y dirección.
+
+Compara el LIKE '%texto%' anterior (recorre la tabla completa) con el índice
+FTS5 de la migración 9 (filtro_texto) sobre N facturas con nombres y
+direcciones con tildes. LIKE distingue tildes, así que para que las dos
+búsquedas hagan el mismo trabajo el LIKE recibe el texto escrito tal como
+está guardado ('José Pérez') y FTS5 el texto sin tildes ('jose perez'); el
+benchmark verifica que ambas encuentren las mismas filas.
+
+Uso:
+    python benchmarks/benchmark_busqueda_texto.py [num_facturas]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.busqueda_texto import filtro_texto
+from app.helpers.database_migrator import ejecutar_migraciones
+from benchmark_facturacion_masiva import crear_bd
+
+NOMBRES = ["José", "María", "Ángel", "Lucía", "Pedro", "Inés", "Raúl", "Sofía", "Andrés", "Elena"]
+APELLIDOS = ["Pérez", "Gómez", "Núñez", "Ramírez", "Chávez", "Ortiz", "Suárez", "López", "Díaz", "Vera"]
+BARRIOS = ["San José Alto", "Barrio Central", "La Unión", "El Placer", "Santa Lucía"]
+
+# (descripcion, columnas, texto para FTS5, texto para LIKE)
+BUSQUEDAS = [
+    ("Nombre completo", ("nombre_cliente",), "jose perez", "José Pérez"),
+    ("Prefijo de apellido", ("nombre_cliente",), "nun", "Núñez"),
+    ("Direccion", ("direccion",), "union", "La Unión"),
+    ("Nombre poco comun", ("nombre_cliente",), "raul diaz 87", "Raúl Díaz 87"),
+]
+
+
+def cargar_facturas(db_path, num_facturas):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO facturas (medidor_id, nombre_cliente, mes_facturacion, monto_total, fecha_emision, estado, direccion)
+        VALUES (?, ?, 'Enero', 4.5, '2025-01-28', 'Deuda', ?)
+    """, (
+        (i % 5000 + 1,
+         f"{NOMBRES[i % 10]} {APELLIDOS[i // 10 % 10]} {i % 5000 + 1}",
+         BARRIOS[i % 5000 % len(BARRIOS)])
+        for i in range(num_facturas)
+    ))
+    conn.commit()
+    conn.close()
+
+
+def buscar(db_path, condicion, params):
+    with get_pool().connection(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM facturas WHERE {condicion}", params).fetchone()[0]
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    directorio = tempfile.mkdtemp(prefix="bench_busqueda_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, 0)
+        cargar_facturas(db_path, num_facturas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+
+        print(f"Busqueda de texto en facturas ({num_facturas:,} filas)")
+        print("=" * 72)
+        print(f"{'Busqueda':<22}{'LIKE':>10}{'Filas':>9}{'FTS5':>12}{'Filas':>9}")
+        for descripcion, columnas, texto, texto_like in BUSQUEDAS:
+            condicion_like = " OR ".join(f"{columna} LIKE ?" for columna in columnas)
+            filas_like, t_like = medir(
+                lambda: buscar(db_path, condicion_like, [f"%{texto_like}%"] * len(columnas))
+            )
+            condicion, params = filtro_texto(db_path, "facturas", columnas, texto)
+            filas_fts, t_fts = medir(lambda: buscar(db_path, condicion, params))
+            print(f"{descripcion:<22}{t_like * 1000:>8.1f}ms{filas_like:>9,}{t_fts * 1000:>10.1f}ms{filas_fts:>9,}")
+            assert filas_like == filas_fts, f"{descripcion}: LIKE encontro {filas_like} filas y FTS5 {filas_fts}"
+        print("=" * 72)
+        print("LIKE necesita las tildes exactas ('jose perez' no encuentra 'José Pérez'); FTS5 no.")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
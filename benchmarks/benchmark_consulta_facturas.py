@@ -0,0 +1,115 @@
+"""
+Benchmark de la consulta de facturas (ConsultaWidget).
+
+Compara la búsqueda anterior (SELECT * de todas las coincidencias y paginación
+en memoria) con el conteo guardado y la paginación por cursor de ConsultaModel,
+sobre un historial de N facturas repartidas en varios años.
+
+Uso:
+    python benchmarks/benchmark_consulta_facturas.py [num_facturas]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from app.models.consulta_model import ConsultaModel
+from benchmark_facturacion_masiva import crear_bd
+
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+         "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+# (descripcion, filtros) como los arma ConsultaWidget.buscar_facturas
+BUSQUEDAS = [
+    ("Ultimo mes", {"fecha_inicio": "2025-12-01", "fecha_fin": "2025-12-31"}),
+    ("Todo el historial", {"fecha_inicio": "2000-01-01", "fecha_fin": "2099-12-31"}),
+    ("Historial + nombre", {"fecha_inicio": "2000-01-01", "fecha_fin": "2099-12-31", "nombre": "Cliente 77"}),
+]
+
+
+def cargar_facturas(db_path, num_facturas):
+    """Facturas con fecha de emisión creciente a lo largo de seis años."""
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO facturas (medidor_id, nombre_cliente, lectura_id, mes_facturacion, monto_total,
+                              fecha_emision, estado, servicio, direccion)
+        VALUES (?, ?, ?, ?, 4.5, ?, ?, 'DOMICILIARIA', 'Centro')
+    """, (
+        (i % 5000 + 1, f"Cliente {i % 5000 + 1}", i, MESES[mes % 12],
+         f"{2020 + mes // 12}-{mes % 12 + 1:02d}-28", "Pagado" if i % 4 else "Deuda")
+        for i in range(num_facturas)
+        for mes in (i * 72 // num_facturas,)
+    ))
+    conn.commit()
+    conn.close()
+
+
+def anterior(modelo, filtros):
+    """Búsqueda anterior: todas las filas completas a memoria."""
+    condiciones, params = modelo._condiciones(filtros)
+    with get_pool().connection(modelo.db_path) as conn:
+        return conn.execute(f"SELECT * FROM facturas WHERE {condiciones}", params).fetchall()
+
+
+def medir(funcion):
+    """Tiempo de una ejecución y pico de memoria de otra (tracemalloc distorsiona el tiempo)."""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    del resultado
+    tracemalloc.start()
+    resultado = funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, duracion, pico
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    por_pagina = 20
+
+    directorio = tempfile.mkdtemp(prefix="bench_consulta_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, 0)
+        cargar_facturas(db_path, num_facturas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+        modelo = ConsultaModel(db_path)
+
+        print(f"Consulta de facturas ({num_facturas:,} facturas, {por_pagina} por pagina)")
+        print("=" * 78)
+        print(f"{'Busqueda':<20}{'Total':>9}{'Anterior':>12}{'Memoria':>10}"
+              f"{'1a pagina':>12}{'Memoria':>10}{'Ultima':>10}")
+        for descripcion, filtros in BUSQUEDAS:
+            filas, t_anterior, m_anterior = medir(lambda: anterior(modelo, filtros))
+
+            def primera_pagina():
+                total = modelo.contar_facturas(filtros, refrescar=True)
+                return total, modelo.obtener_pagina_facturas(filtros, por_pagina)
+
+            (total, pagina), t_nuevo, m_nuevo = medir(primera_pagina)
+            assert total == len(filas)
+            assert [fila[0] for fila in pagina] == [fila[0] for fila in filas[:por_pagina]]
+
+            inicio = time.perf_counter()
+            ultima = modelo.obtener_pagina_facturas(filtros, total % por_pagina or por_pagina, hacia_atras=True)
+            t_ultima = time.perf_counter() - inicio
+            assert not filas or ultima[-1][0] == filas[-1][0]
+
+            print(f"{descripcion:<20}{total:>9,}{t_anterior * 1000:>10.1f}ms{m_anterior / 2**20:>8.1f}MB"
+                  f"{t_nuevo * 1000:>10.1f}ms{m_nuevo / 2**20:>8.2f}MB{t_ultima * 1000:>8.1f}ms")
+        print("=" * 78)
+    finally:
+        get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
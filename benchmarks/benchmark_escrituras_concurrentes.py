@@ -0,0 +1,197 @@
+"""
+Prueba de estrés: varias cajas escribiendo a la vez en la misma BD.
+
+Cada caja es un proceso aparte que durante unos segundos emite facturas
+(numeración leer-modificar-escribir) y registra pagos de servicios. Otro
+proceso simula un respaldo o una importación: toma el bloqueo de escritura
+cada segundo y lo retiene más que el busy_timeout. Se compara sin
+reintentos (lo que veía el usuario: "database is locked") con
+ejecutar_escritura (BEGIN IMMEDIATE y backoff con azar):
+
+    Escritas   escrituras confirmadas según las cajas
+    Fallidas   escrituras que terminaron en error
+    Perdidas   confirmadas que no están en la BD (debe ser 0)
+    Repetidos  números de factura repetidos (debe ser 0)
+    Por seg    escrituras por segundo: mínimo / mediana / máximo
+    Espera     espera media y máxima por el bloqueo de escritura
+
+Uso:
+    python benchmarks/benchmark_escrituras_concurrentes.py [num_cajas] [segundos]
+
+tests/test_escrituras_concurrentes.py corre la misma prueba y falla si se
+pierde o falla alguna escritura.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import connection
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from benchmark_facturacion_masiva import crear_bd
+from benchmark_servidor import NUM_MEDIDORES, datos_factura
+
+# busy_timeout corto para que el bloqueador lo supere en cada ciclo
+BUSY_TIMEOUT_MS = 100
+BLOQUEO_SEGUNDOS = 0.3
+
+
+def preparar_bd(db_path):
+    """BD migrada con clientes, lecturas, facturas y la tabla servicios."""
+    crear_bd(db_path, NUM_MEDIDORES)
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE servicios (
+            id_servicio INTEGER PRIMARY KEY AUTOINCREMENT, numero_medidor TEXT, nombre_usuario TEXT,
+            direccion_usuario TEXT, usuario_servicio TEXT, monto_servicio REAL, pago_uno REAL,
+            pago_dos REAL, pago_tres REAL, pago_cuatro REAL
+        )
+    """)
+    conn.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ejecutar_migraciones(db_path)
+        get_pool().drain()
+
+
+def caja(numero, db_path, segundos, plazo, barrera, resultados):
+    """Proceso de una caja: escribe durante 'segundos' y devuelve sus medidas."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        connection.PERFILES_PRAGMA["caja"]["busy_timeout"] = BUSY_TIMEOUT_MS
+        connection.PLAZO_REINTENTOS = plazo
+        from app.controllers.factura_controller import FacturaController
+        from app.controllers.servicios_controller import ServiciosController
+        facturas = FacturaController(db_path)
+        servicios = ServiciosController(db_path)
+
+        confirmadas, fallidas, instantes = {"facturas": 0, "servicios": 0}, 0, []
+        barrera.wait()
+        fin = time.perf_counter() + segundos
+        i = 0
+        while time.perf_counter() < fin:
+            medidor_id = (numero * 100_000 + i) % NUM_MEDIDORES + 1
+            if i % 2 == 0:
+                tabla = "facturas"
+                exito = facturas.emitir_factura(datos_factura(medidor_id))[0] is not None
+            else:
+                tabla = "servicios"
+                exito = servicios.registrar_servicio({
+                    "numero_medidor": medidor_id, "nombre_usuario": f"Cliente {medidor_id}",
+                    "direccion_usuario": "Centro", "usuario_servicio": "Reconexion", "monto_servicio": 10,
+                    "pago_uno": 10,
+                }) is not None
+            if exito:
+                confirmadas[tabla] += 1
+                instantes.append(time.perf_counter())
+            else:
+                fallidas += 1
+            i += 1
+    resultados.put((confirmadas, fallidas, instantes, get_pool().metricas_escritura()))
+
+
+def bloqueador(db_path, detener):
+    """Toma el bloqueo de escritura cada segundo, como un respaldo o una importación."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    while not detener.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        time.sleep(BLOQUEO_SEGUNDOS)
+        conn.execute("COMMIT")
+        detener.wait(1.0 - BLOQUEO_SEGUNDOS)
+    conn.close()
+
+
+def medir(db_path, num_cajas, segundos, plazo):
+    barrera = multiprocessing.Barrier(num_cajas + 1)
+    resultados = multiprocessing.Queue()
+    detener = multiprocessing.Event()
+    procesos = [
+        multiprocessing.Process(target=caja, args=(n, db_path, segundos, plazo, barrera, resultados))
+        for n in range(num_cajas)
+    ]
+    proceso_bloqueador = multiprocessing.Process(target=bloqueador, args=(db_path, detener))
+    for proceso in procesos:
+        proceso.start()
+    barrera.wait()
+    proceso_bloqueador.start()
+    medidas = [resultados.get() for _ in procesos]
+    detener.set()
+    for proceso in procesos + [proceso_bloqueador]:
+        proceso.join()
+    return medidas
+
+
+def resumir(db_path, medidas):
+    confirmadas = {tabla: sum(m[0][tabla] for m in medidas) for tabla in ("facturas", "servicios")}
+    fallidas = sum(m[1] for m in medidas)
+    instantes = sorted(t for m in medidas for t in m[2])
+
+    conn = sqlite3.connect(db_path)
+    try:
+        en_bd = {
+            "facturas": conn.execute("SELECT COUNT(*) FROM facturas WHERE numero_factura IS NOT NULL").fetchone()[0],
+            "servicios": conn.execute("SELECT COUNT(*) FROM servicios").fetchone()[0],
+        }
+        repetidos = conn.execute("""
+            SELECT COUNT(*) - COUNT(DISTINCT numero_factura) FROM facturas WHERE numero_factura IS NOT NULL
+        """).fetchone()[0]
+    finally:
+        conn.close()
+
+    # Escrituras confirmadas en cada segundo completo de la prueba
+    por_segundo = [0] * max(int(instantes[-1] - instantes[0]), 1) if instantes else [0]
+    for instante in instantes:
+        segundo = int(instante - instantes[0])
+        if segundo < len(por_segundo):
+            por_segundo[segundo] += 1
+
+    escrituras = [metrica for m in medidas for metrica in m[3].values()]
+    total = sum(m["escrituras"] + m["fallidas"] for m in escrituras) or 1
+    return {
+        "escritas": sum(confirmadas.values()),
+        "fallidas": fallidas,
+        "perdidas": sum(confirmadas.values()) - sum(en_bd.values()),
+        "repetidos": repetidos,
+        "por_segundo": (min(por_segundo), statistics.median(por_segundo), max(por_segundo)),
+        "reintentos": sum(m["reintentos"] for m in escrituras),
+        "espera_media": sum(m["espera_total"] for m in escrituras) / total,
+        "espera_maxima": max((m["espera_maxima"] for m in escrituras), default=0),
+    }
+
+
+if __name__ == "__main__":
+    num_cajas = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    directorio = tempfile.mkdtemp(prefix="bench_escrituras_")
+    try:
+        print(f"{num_cajas} cajas durante {segundos:.0f} s; un proceso retiene el bloqueo "
+              f"{BLOQUEO_SEGUNDOS * 1000:.0f} ms de cada segundo (busy_timeout {BUSY_TIMEOUT_MS} ms)")
+        print("=" * 104)
+        print(f"{'Modo':<26}{'Escritas':>9}{'Fallidas':>9}{'Perdidas':>9}{'Repetidos':>10}"
+              f"{'Por seg (min/med/max)':>23}{'Reintentos':>11}{'Espera media/max':>20}")
+        modos = {
+            "Sin reintentos (antes)": 0,
+            "ejecutar_escritura": connection.PLAZO_REINTENTOS,
+        }
+        for modo, plazo in modos.items():
+            db_path = os.path.join(directorio, f"bench_{plazo:g}.db")
+            preparar_bd(db_path)
+
+            r = resumir(db_path, medir(db_path, num_cajas, segundos, plazo))
+            por_segundo = "{} / {:.0f} / {}".format(*r["por_segundo"])
+            espera = f"{r['espera_media']:.1f} / {r['espera_maxima']:.0f} ms"
+            print(f"{modo:<26}{r['escritas']:>9}{r['fallidas']:>9}{r['perdidas']:>9}{r['repetidos']:>10}"
+                  f"{por_segundo:>23}{r['reintentos']:>11}{espera:>20}")
+        print("=" * 104)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
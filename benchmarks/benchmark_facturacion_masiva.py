@@ -0,0 +1,107 @@
+"""
+Benchmark de la facturación mensual masiva.
+
+Crea una BD con N clientes activos (una lectura pendiente cada uno, parte de
+ellos con deudas anteriores) y mide FacturacionMasiva.facturar_mes.
+
+Uso:
+    python benchmarks/benchmark_facturacion_masiva.py [num_medidores]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from app.helpers.facturacion_masiva import FacturacionMasiva
+
+
+def crear_bd(db_path, num_medidores):
+    """Clientes, dos lecturas por medidor y una factura previa en deuda por cada tercer medidor."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE clientes (
+            id INTEGER PRIMARY KEY, nombre_cliente TEXT, cliente_ci TEXT, direccion TEXT,
+            telefono TEXT, email TEXT, numero_conexion TEXT, estado INTEGER DEFAULT 1,
+            fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE lecturas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, medidor_id INTEGER, lectura_anterior REAL,
+            lectura_actual REAL, consumo REAL, fecha_lectura TEXT, usuario_id INTEGER,
+            direccion TEXT, nombre_cliente TEXT
+        );
+        CREATE TABLE facturas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, medidor_id INTEGER, nombre_cliente TEXT,
+            lectura_id INTEGER, mes_facturacion TEXT, monto_total REAL, fecha_emision TEXT,
+            estado TEXT, servicio TEXT, traspaso REAL, medidor REAL, reconexion REAL,
+            multas_sesiones REAL, otros REAL, tarifa_basica REAL, tarifa_excedente REAL,
+            direccion TEXT, monto_lectura REAL, conexion_nueva REAL, multas_mingas REAL,
+            materiales REAL
+        );
+    """)
+    conn.executemany(
+        "INSERT INTO clientes (id, nombre_cliente, direccion, numero_conexion, estado) VALUES (?, ?, 'Centro', ?, 1)",
+        ((i, f"Cliente {i}", str(i)) for i in range(1, num_medidores + 1))
+    )
+    conn.executemany(
+        "INSERT INTO lecturas (medidor_id, lectura_anterior, lectura_actual, consumo, fecha_lectura, direccion) "
+        "VALUES (?, ?, ?, ?, ?, 'Centro')",
+        ((i, 0, c, c, fecha)
+         for fecha in ("2026-01-28", "2026-02-27")
+         for i in range(1, num_medidores + 1)
+         for c in (i % 120,))
+    )
+    # Las lecturas de enero ya están facturadas
+    conn.execute("""
+        INSERT INTO facturas (medidor_id, nombre_cliente, lectura_id, mes_facturacion, monto_total,
+                              fecha_emision, estado, servicio, direccion)
+        SELECT medidor_id, 'Cliente ' || medidor_id, id, 'Enero', 2.5, '2026-01-30',
+               CASE WHEN medidor_id % 3 = 0 THEN 'Deuda' ELSE 'Pagado' END, 'DOMICILIARIA', 'Centro'
+        FROM lecturas WHERE fecha_lectura = '2026-01-28'
+    """)
+    conn.commit()
+    conn.close()
+
+
+def medir(num_medidores):
+    directorio = tempfile.mkdtemp(prefix="bench_masiva_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, num_medidores)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+            facturacion = FacturacionMasiva(db_path)
+
+            inicio = time.perf_counter()
+            resumen = facturacion.facturar_mes("Febrero", fecha_emision="2026-02-28")
+            duracion = time.perf_counter() - inicio
+
+            # Una segunda ejecución no debe duplicar facturas
+            repetida = facturacion.facturar_mes("Febrero", fecha_emision="2026-02-28")
+        assert resumen["facturadas"] == num_medidores, resumen["error"]
+        assert repetida["facturadas"] == 0
+        return resumen, duracion
+    finally:
+        get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    num_medidores = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    resumen, duracion = medir(num_medidores)
+    print(f"Facturacion masiva de {num_medidores:,} medidores")
+    print("=" * 60)
+    print(f"Tiempo total:      {duracion:.2f} s ({num_medidores / duracion:,.0f} facturas/s)")
+    print(f"Numeros:           {resumen['primer_numero']} a {resumen['ultimo_numero']}")
+    print(f"Monto facturado:   ${resumen['monto_total']:,.2f}")
+    print(f"Saldo en deuda:    ${resumen['saldo_pendiente']:,.2f}")
+    print("=" * 60)
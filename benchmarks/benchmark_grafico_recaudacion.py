@@ -0,0 +1,106 @@
+"""
+Benchmark del cambio de filtros en el panel de recaudación.
+
+Mide cuánto tarda DatosRecaudacion en mostrar el gráfico al cambiar de año:
+la primera vez (consulta y dibujo con QPainter) y al volver a un año ya visto
+(consulta y copia de la imagen guardada). Si matplotlib está instalado,
+también mide el redibujo completo de la figura que se hacía antes. Se
+ejecuta sin ventana (QT_QPA_PLATFORM=offscreen).
+
+Uso:
+    python benchmarks/benchmark_grafico_recaudacion.py [num_facturas]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from app.helpers.facturacion_masiva import MESES
+from benchmark_consulta_facturas import cargar_facturas
+from benchmark_facturacion_masiva import crear_bd
+
+
+def cambiar_anio(pagina, anio):
+    inicio = time.perf_counter()
+    pagina.combo_anio.setCurrentText(anio)
+    pagina.grafico.repaint()
+    return time.perf_counter() - inicio
+
+
+def redibujo_matplotlib(pagina, anios):
+    """Redibujo anterior: figura completa con tight_layout por cada cambio."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figura = Figure(figsize=(8, 5))
+    lienzo = FigureCanvasAgg(figura)
+    tiempos = []
+    for anio in anios:
+        inicio = time.perf_counter()
+        datos = dict(pagina.controller.obtener_datos_recaudacion(anio, "Todas"))
+        cantidades = [datos.get(mes, 0) for mes in MESES]
+        figura.clear()
+        ax = figura.add_subplot(111)
+        barras = ax.bar(MESES, cantidades, color="#3498db", alpha=0.8, width=0.7)
+        for barra in barras:
+            ax.text(barra.get_x() + barra.get_width() / 2, barra.get_height() + 0.2,
+                    str(int(barra.get_height())), ha="center", va="bottom")
+        ax.set_xticks(range(len(MESES)))
+        ax.set_xticklabels(MESES, rotation=45)
+        figura.tight_layout()
+        lienzo.draw()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    app = QApplication(sys.argv)
+
+    directorio = tempfile.mkdtemp(prefix="bench_grafico_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, 0)
+        cargar_facturas(db_path, num_facturas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+
+        from app.views.datos_recaudacion import DatosRecaudacion
+        inicio = time.perf_counter()
+        pagina = DatosRecaudacion(db_path)
+        pagina.resize(1000, 700)
+        pagina.show()
+        QApplication.processEvents()
+        t_pagina = time.perf_counter() - inicio
+
+        anios = [pagina.combo_anio.itemText(i) for i in range(pagina.combo_anio.count())]
+        primeras = [cambiar_anio(pagina, anio) for anio in anios]
+        repetidas = [cambiar_anio(pagina, anio) for anio in anios * 3]
+
+        print(f"Panel de recaudacion ({num_facturas:,} facturas, {len(anios)} años)")
+        print("=" * 60)
+        print(f"Pagina lista:                       {t_pagina * 1000:9.1f} ms")
+        print(f"Cambio de año, primera vez:         {statistics.median(primeras) * 1000:9.2f} ms")
+        print(f"Cambio de año, ya dibujado:         {statistics.median(repetidas) * 1000:9.2f} ms")
+        try:
+            tiempos = redibujo_matplotlib(pagina, anios * 2)
+            print(f"Redibujo con matplotlib (anterior): {statistics.median(tiempos) * 1000:9.2f} ms")
+        except ImportError:
+            print("Redibujo con matplotlib (anterior):   (matplotlib no instalado)")
+        print("=" * 60)
+        pagina.close()
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
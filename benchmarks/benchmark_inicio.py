@@ -0,0 +1,108 @@
+"""
+Benchmark de la apertura de la ventana principal.
+
+Compara construir las nueve páginas del menú antes de mostrar la ventana
+(comportamiento anterior) con la construcción perezosa de MainWindow, sobre
+una BD con N medidores (lecturas y facturas de cada uno). Se ejecuta sin
+ventana (QT_QPA_PLATFORM=offscreen).
+
+Uso:
+    python benchmarks/benchmark_inicio.py [num_medidores]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from app.database.connection import DatabaseConnection, get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from app.views.main_window import MainWindow
+from benchmark_consulta_facturas import cargar_facturas
+from benchmark_facturacion_masiva import crear_bd
+
+USUARIO = {"name": "benchmark", "role": "Administrador"}
+
+
+class AppBenchmark(QApplication):
+    """Lo mínimo de App (main.py) que usa MainWindow."""
+
+    def get_resource_path(self, relative_path):
+        return os.path.join(RAIZ, relative_path)
+
+
+def esperar(condicion):
+    while not condicion():
+        QApplication.processEvents()
+
+
+def abrir_todas(db_path):
+    """Anterior: todas las páginas construidas antes de mostrar la ventana."""
+    inicio = time.perf_counter()
+    ventana = MainWindow(USUARIO, db_path)
+    for nombre in ventana.constructores:
+        ventana.pagina(nombre)
+    ventana.show()
+    QApplication.processEvents()
+    duracion = time.perf_counter() - inicio
+    return ventana, duracion, duracion
+
+
+def abrir_perezosa(db_path):
+    """Ventana en pantalla de inmediato; la página de inicio después."""
+    inicio = time.perf_counter()
+    ventana = MainWindow(USUARIO, db_path)
+    ventana.show()
+    t_ventana = time.perf_counter() - inicio
+    esperar(lambda: ventana.datos_recaudacion_widget is not None)
+    QApplication.processEvents()
+    return ventana, t_ventana, time.perf_counter() - inicio
+
+
+def medir(funcion, db_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ventana, t_ventana, t_inicio = funcion(db_path)
+    construidas = len(ventana.constructores) - len(ventana.paginas_pendientes())
+    ventana.close()
+    ventana.deleteLater()
+    QApplication.processEvents()
+    return t_ventana, t_inicio, construidas
+
+
+if __name__ == "__main__":
+    num_medidores = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    app = AppBenchmark(sys.argv)
+
+    directorio = tempfile.mkdtemp(prefix="bench_inicio_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            crear_bd(db_path, num_medidores)
+            cargar_facturas(db_path, num_medidores * 12)
+            ejecutar_migraciones(db_path)
+        DatabaseConnection.set_db_path(db_path)
+
+        # Se mide primero la perezosa para no favorecerla con la caché de la BD
+        perezosa = medir(abrir_perezosa, db_path)
+        todas = medir(abrir_todas, db_path)
+
+        print(f"Apertura de la ventana principal ({num_medidores:,} medidores, {num_medidores * 12:,} facturas)")
+        print("=" * 72)
+        print(f"{'':<24}{'Ventana visible':>16}{'Inicio listo':>15}{'Paginas':>10}")
+        for descripcion, (t_ventana, t_inicio, construidas) in (
+            ("Todas las paginas", todas), ("Perezosa", perezosa)
+        ):
+            print(f"{descripcion:<24}{t_ventana * 1000:>14.1f}ms{t_inicio * 1000:>13.1f}ms{construidas:>10}")
+        print("=" * 72)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
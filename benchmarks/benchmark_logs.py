@@ -0,0 +1,70 @@
+"""
+Benchmark del registro de acciones (SistemaLogs).
+
+Compara la espera que agrega cada registro en el hilo que factura: antes se
+abría, escribía y cerraba el archivo del día en cada acción; ahora
+registrar_accion solo encola y un hilo aparte escribe por lotes. También mide
+cuánto tarda el hilo escritor en dejar todo en disco.
+
+Uso:
+    python benchmarks/benchmark_logs.py [num_registros]
+"""
+
+import datetime
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.helpers.sistema_logs import SistemaLogs
+
+
+def anterior(logs_dir, usuario, rol, accion, detalle):
+    """registrar_accion anterior: abrir, agregar la línea y cerrar en cada llamada."""
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    archivo_log = os.path.join(logs_dir, f"log_{datetime.datetime.now().strftime('%Y-%m-%d')}.txt")
+    mensaje = f"[{timestamp}] [{usuario}] [{rol}] [{accion}] - {detalle}\n"
+    with open(archivo_log, "a", encoding="utf-8") as f:
+        f.write(mensaje)
+
+
+def medir(registrar, num_registros):
+    latencias = []
+    for i in range(num_registros):
+        inicio = time.perf_counter()
+        registrar("recaudador", "Recaudador", "CREAR_FACTURA",
+                  f"Factura #{i} creada para Cliente {i % 5000} - Monto: $4.50")
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+if __name__ == "__main__":
+    num_registros = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    directorio = tempfile.mkdtemp(prefix="bench_logs_")
+    try:
+        antes = medir(lambda *args: anterior(directorio, *args), num_registros)
+
+        logs = SistemaLogs(os.path.join(directorio, "nuevo"))
+        logs.vaciar()
+        inicio = time.perf_counter()
+        ahora = medir(logs.registrar_accion, num_registros)
+        logs.vaciar(timeout=60)
+        t_total = time.perf_counter() - inicio
+        logs.cerrar()
+
+        print(f"Registro de acciones ({num_registros:,} registros)")
+        print("=" * 60)
+        print(f"{'':<34}{'p50':>10}{'p99':>10}{'max':>10}")
+        for descripcion, latencias in (("Abrir/escribir/cerrar (anterior)", antes), ("Cola + hilo escritor", ahora)):
+            ordenadas = sorted(latencias)
+            print(f"{descripcion:<34}{statistics.median(ordenadas) * 1e6:>8.1f}us"
+                  f"{ordenadas[int(len(ordenadas) * 0.99)] * 1e6:>8.1f}us{ordenadas[-1] * 1e6:>8.1f}us")
+        print(f"Hasta quedar todo en disco (cola + hilo escritor): {t_total * 1000:.0f} ms")
+        print("=" * 60)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
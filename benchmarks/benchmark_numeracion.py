@@ -0,0 +1,118 @@
+"""
+Benchmark de la asignación de números de factura.
+
+Compara, con 10k, 100k y 1M facturas emitidas, la asignación anterior
+(leer todos los números 001-010-% y buscar el primer hueco en Python) con
+SecuenciaFacturacion.obtener_siguiente_numero (hueco o contador por índice).
+
+Uso:
+    python benchmarks/benchmark_numeracion.py [tamaño ...]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones, migracion_fallida
+from app.helpers.secuencia_facturacion import SecuenciaFacturacion
+from benchmark_facturacion_masiva import crear_bd
+
+
+def cargar_facturas(db_path, num_facturas):
+    """BD sin migrar (esquema de benchmark_facturacion_masiva) con num_facturas números 001-010 emitidos."""
+    crear_bd(db_path, 0)
+    conn = sqlite3.connect(db_path)
+    conn.execute("ALTER TABLE facturas ADD COLUMN numero_factura TEXT")
+    conn.executemany(
+        "INSERT INTO facturas (medidor_id, mes_facturacion, monto_total, fecha_emision, estado, servicio, numero_factura) "
+        "VALUES (?, 'Enero', 2.5, '2026-01-30', 'Pagado', 'DOMICILIARIA', ?)",
+        ((i % 5000, f"001-010-{i:010d}") for i in range(1, num_facturas + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def siguiente_numero_anterior(conn):
+    """Algoritmo previo: recorre todos los números de la serie."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT numero_factura FROM facturas
+        WHERE numero_factura LIKE ?
+        ORDER BY numero_factura ASC
+    """, ("001-010-%",))
+    usados = set()
+    for (numero,) in cursor.fetchall():
+        partes = numero.split('-')
+        if len(partes) == 3:
+            usados.add(int(partes[2]))
+    secuencial = 1
+    while secuencial in usados:
+        secuencial += 1
+    return secuencial
+
+
+def medir(num_facturas, repeticiones_anterior=5, repeticiones_nuevo=1000):
+    directorio = tempfile.mkdtemp(prefix="bench_numeracion_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        cargar_facturas(db_path, num_facturas)
+
+        conn = sqlite3.connect(db_path)
+        tiempos_anterior = []
+        for _ in range(repeticiones_anterior):
+            inicio = time.perf_counter()
+            siguiente_numero_anterior(conn)
+            tiempos_anterior.append(time.perf_counter() - inicio)
+        conn.close()
+
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+        tiempo_migracion = time.perf_counter() - inicio
+        assert migracion_fallida(db_path) is None, migracion_fallida(db_path)
+
+        secuencia = SecuenciaFacturacion(db_path)
+
+        # Algunas facturas eliminadas para que también se midan los huecos
+        with get_pool().transaction(db_path) as conn:
+            conn.execute("DELETE FROM facturas WHERE id % 1000 = 0")
+
+        tiempos_nuevo = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeticiones_nuevo):
+                inicio = time.perf_counter()
+                numero = secuencia.obtener_siguiente_numero()
+                tiempos_nuevo.append(time.perf_counter() - inicio)
+                assert numero is not None
+
+        get_pool().drain()
+        return tiempos_anterior, tiempos_nuevo, tiempo_migracion
+    finally:
+        get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    tamanos = [int(t) for t in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    print("Benchmark de numeracion de facturas")
+    print("=" * 78)
+    print(f"{'Facturas':>10}  {'Anterior (media)':>18}  {'Nuevo (media)':>15}  {'Nuevo (p99)':>13}  {'Migraciones':>13}")
+    print("-" * 78)
+    for tamano in tamanos:
+        anterior, nuevo, migracion = medir(tamano)
+        p99 = sorted(nuevo)[int(len(nuevo) * 0.99) - 1]
+        print(f"{tamano:>10,}  {statistics.mean(anterior) * 1000:>15.2f} ms"
+              f"  {statistics.mean(nuevo) * 1000:>12.3f} ms  {p99 * 1000:>10.3f} ms"
+              f"  {migracion:>11.2f} s")
+    print("=" * 78)
+    print("Anterior: LIKE + set de Python. Nuevo: hueco mas bajo o contador (incluye commit).")
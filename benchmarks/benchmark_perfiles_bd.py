@@ -0,0 +1,134 @@
+"""
+Benchmark de los perfiles de PRAGMA de la base de datos.
+
+Mide, para cada perfil de PERFILES_PRAGMA, la latencia de registrar facturas
+(un INSERT + commit por factura, como en ventanilla) y la de las consultas
+de saldo pendiente que se ejecutan al escribir el número de medidor.
+
+Uso:
+    python benchmarks/benchmark_perfiles_bd.py [num_facturas]
+"""
+
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import ConnectionPool, PERFILES_PRAGMA
+
+
+def crear_bd(db_path, num_clientes):
+    """Crea una BD mínima con la tabla facturas y datos de ejemplo."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE facturas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            medidor_id INTEGER,
+            nombre_cliente TEXT,
+            mes_facturacion TEXT,
+            monto_total REAL,
+            fecha_emision TEXT,
+            estado TEXT,
+            direccion TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO facturas (medidor_id, nombre_cliente, mes_facturacion, monto_total, fecha_emision, estado, direccion) "
+        "VALUES (?, ?, 'Enero', ?, '2026-01-15', ?, 'Centro')",
+        [(i % num_clientes, f"Cliente {i % num_clientes}", 2.5 + (i % 7), "Deuda" if i % 3 else "Pagado")
+         for i in range(num_clientes * 12)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(int(len(valores) * p), len(valores) - 1)]
+
+
+class _SinPerfil:
+    """Conexión con la configuración por defecto de SQLite (rollback journal), como referencia."""
+
+    def __init__(self):
+        self.conn = None
+
+    def _abrir(self, db_path):
+        if self.conn is None:
+            self.conn = sqlite3.connect(db_path)
+        return self.conn
+
+    def transaction(self, db_path):
+        return self._abrir(db_path)  # sqlite3.Connection como context manager confirma al salir
+
+    def connection(self, db_path):
+        return self._abrir(db_path)
+
+    def drain(self):
+        self.conn.close()
+
+
+def medir_perfil(perfil, num_facturas, num_clientes=500):
+    directorio = tempfile.mkdtemp(prefix="bench_perfil_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, num_clientes)
+
+        if perfil is None:
+            pool = _SinPerfil()
+        else:
+            pool = ConnectionPool()
+            pool.set_perfil(perfil)
+
+        # Inserciones: se omiten en los perfiles de solo lectura
+        tiempos_insert = []
+        if perfil is None or "query_only" not in PERFILES_PRAGMA[perfil]:
+            for i in range(num_facturas):
+                inicio = time.perf_counter()
+                with pool.transaction(db_path) as conn:
+                    conn.execute(
+                        "INSERT INTO facturas (medidor_id, nombre_cliente, mes_facturacion, monto_total, fecha_emision, estado, direccion) "
+                        "VALUES (?, ?, 'Febrero', 3.5, '2026-02-15', 'Deuda', 'Centro')",
+                        (i % num_clientes, f"Cliente {i % num_clientes}")
+                    )
+                tiempos_insert.append(time.perf_counter() - inicio)
+
+        tiempos_consulta = []
+        for i in range(num_facturas):
+            inicio = time.perf_counter()
+            with pool.connection(db_path) as conn:
+                conn.execute(
+                    "SELECT SUM(monto_total), COUNT(*) FROM facturas WHERE medidor_id = ? AND estado = 'Deuda'",
+                    (i % num_clientes,)
+                ).fetchone()
+            tiempos_consulta.append(time.perf_counter() - inicio)
+
+        pool.drain()
+        return tiempos_insert, tiempos_consulta
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def formatear(tiempos):
+    if not tiempos:
+        return "   (solo lectura)        "
+    return (f"{statistics.mean(tiempos) * 1000:7.3f} ms "
+            f"p95 {percentil(tiempos, 0.95) * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print(f"Benchmark de perfiles de BD ({num_facturas} operaciones por perfil)")
+    print("=" * 72)
+    print(f"{'Perfil':<14}{'INSERT + commit':<30}{'Consulta saldo':<30}")
+    print("-" * 72)
+    for perfil in [None] + list(PERFILES_PRAGMA):
+        inserts, consultas = medir_perfil(perfil, num_facturas)
+        print(f"{perfil or 'sin perfil':<14}{formatear(inserts):<30}{formatear(consultas):<30}")
+    print("=" * 72)
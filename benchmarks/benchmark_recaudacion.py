@@ -0,0 +1,92 @@
+"""
+Benchmark del panel de recaudación (DatosRecaudacion).
+
+Compara las consultas anteriores sobre facturas (strftime y DISTINCT sobre
+todo el historial) con las lecturas de resumen_recaudacion, para lo que hace
+el panel al abrirse: años, direcciones y datos del gráfico.
+
+Uso:
+    python benchmarks/benchmark_recaudacion.py [num_facturas]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.controllers.recaudacion_controller import RecaudacionController
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from benchmark_consulta_facturas import cargar_facturas
+from benchmark_facturacion_masiva import crear_bd
+
+# Consultas anteriores de RecaudacionController
+ANTERIOR = {
+    "Años": "SELECT DISTINCT strftime('%Y', fecha_emision) as año FROM facturas ORDER BY año DESC",
+    "Direcciones": "SELECT DISTINCT direccion FROM facturas ORDER BY direccion",
+    "Grafico (Todas)": """
+        SELECT mes_facturacion, COUNT(*) as cantidad FROM facturas
+        WHERE strftime('%Y', fecha_emision) = '2025' GROUP BY mes_facturacion
+    """,
+    "Grafico (Centro)": """
+        SELECT mes_facturacion, COUNT(*) as cantidad FROM facturas
+        WHERE strftime('%Y', fecha_emision) = '2025' AND direccion = 'Centro' GROUP BY mes_facturacion
+    """,
+}
+
+
+def medir(funcion, repeticiones=5):
+    """Mejor tiempo de varias ejecuciones."""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    directorio = tempfile.mkdtemp(prefix="bench_recaudacion_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, 0)
+        cargar_facturas(db_path, num_facturas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+        controlador = RecaudacionController(db_path)
+
+        nuevo = {
+            "Años": controlador.obtener_años_disponibles,
+            "Direcciones": controlador.obtener_direcciones_disponibles,
+            "Grafico (Todas)": lambda: controlador.obtener_datos_recaudacion("2025", "Todas"),
+            "Grafico (Centro)": lambda: controlador.obtener_datos_recaudacion("2025", "Centro"),
+        }
+
+        with get_pool().connection(db_path) as conn:
+            grupos = conn.execute("SELECT COUNT(*) FROM resumen_recaudacion").fetchone()[0]
+
+        print(f"Panel de recaudacion ({num_facturas:,} facturas, {grupos:,} filas en resumen_recaudacion)")
+        print("=" * 60)
+        print(f"{'Consulta':<22}{'Facturas':>12}{'Resumen':>12}{'Filas':>8}")
+        for descripcion, consulta in ANTERIOR.items():
+            def anterior():
+                with get_pool().connection(db_path) as conn:
+                    return conn.execute(consulta).fetchall()
+
+            filas_anteriores, t_anterior = medir(anterior)
+            filas, t_nuevo = medir(nuevo[descripcion])
+            assert len(filas) == len(filas_anteriores)
+            print(f"{descripcion:<22}{t_anterior * 1000:>10.1f}ms{t_nuevo * 1000:>10.2f}ms{len(filas):>8}")
+        print("=" * 60)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
@@ -0,0 +1,116 @@
+"""
+Benchmark del respaldo con la base de datos en uso.
+
+Mientras un hilo registra facturas como lo haría una caja, compara la copia
+del archivo que se hacía antes (shutil.copy2) con copiar_bd (API de backup
+de SQLite por pasos): duración, latencia de las escrituras durante la copia
+y estado de la copia. La columna Facturas compara las de la copia con las
+registradas al empezar el respaldo: la copia del archivo pierde las que
+todavía estaban solo en el archivo -wal y puede tomar páginas a medio escribir.
+
+Uso:
+    python benchmarks/benchmark_respaldo.py [num_facturas]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.backup_helper import copiar_bd
+from app.helpers.database_migrator import ejecutar_migraciones
+from benchmark_consulta_facturas import cargar_facturas
+from benchmark_facturacion_masiva import crear_bd
+
+
+class Caja(threading.Thread):
+    """Registra una factura cada milisegundo y guarda la latencia de cada commit."""
+
+    def __init__(self, db_path):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.latencias = []
+        self.detener = threading.Event()
+
+    def run(self):
+        i = 0
+        while not self.detener.is_set():
+            inicio = time.perf_counter()
+            with get_pool().transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO facturas (medidor_id, nombre_cliente, mes_facturacion, monto_total,
+                                          fecha_emision, estado, servicio, direccion)
+                    VALUES (?, ?, 'Enero', 4.5, '2026-01-28', 'Pagado', 'DOMICILIARIA', 'Centro')
+                """, (i % 5000 + 1, f"Caja {i}"))
+            self.latencias.append(time.perf_counter() - inicio)
+            i += 1
+            time.sleep(0.001)
+
+
+def respaldar(db_path, destino, copiar):
+    """Ejecuta copiar(db_path, destino) con la caja escribiendo; devuelve las medidas."""
+    caja = Caja(db_path)
+    caja.start()
+    time.sleep(0.2)
+    with get_pool().connection(db_path) as conn:
+        facturas = conn.execute("SELECT COUNT(*) FROM facturas").fetchone()[0]
+    latencias_previas = len(caja.latencias)
+
+    inicio = time.perf_counter()
+    copiar(db_path, destino)
+    duracion = time.perf_counter() - inicio
+
+    caja.detener.set()
+    caja.join()
+    durante = caja.latencias[latencias_previas:] or [0]
+
+    copia = sqlite3.connect(destino)
+    try:
+        integridad = copia.execute("PRAGMA integrity_check").fetchone()[0]
+        copiadas = copia.execute("SELECT COUNT(*) FROM facturas").fetchone()[0]
+    except sqlite3.Error as e:
+        integridad, copiadas = str(e), 0
+    finally:
+        copia.close()
+    return duracion, durante, integridad, copiadas, facturas
+
+
+if __name__ == "__main__":
+    num_facturas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    directorio = tempfile.mkdtemp(prefix="bench_respaldo_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, 0)
+        cargar_facturas(db_path, num_facturas)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+        metodos = {
+            "Copia del archivo (anterior)": lambda origen, destino: shutil.copy2(origen, destino),
+            "copiar_bd (backup por pasos)": copiar_bd,
+        }
+
+        tamano = os.path.getsize(db_path) / 1024 / 1024
+        print(f"Respaldo con la BD en uso ({num_facturas:,} facturas, {tamano:.0f} MB)")
+        print("=" * 78)
+        print(f"{'Metodo':<30}{'Duracion':>10}{'Escritura p50':>15}{'max':>9}{'Integridad':>12}  Facturas")
+        for descripcion, copiar in metodos.items():
+            destino = os.path.join(directorio, f"copia_{len(descripcion)}.db")
+            duracion, durante, integridad, copiadas, facturas = respaldar(db_path, destino, copiar)
+            print(f"{descripcion:<30}{duracion * 1000:>8.0f}ms"
+                  f"{statistics.median(durante) * 1000:>13.2f}ms{max(durante) * 1000:>7.1f}ms"
+                  f"{integridad[:10]:>12}  {copiadas:,}/{facturas:,}")
+        print("=" * 78)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
@@ -0,0 +1,161 @@
+"""
+Prueba de carga: N cajas emitiendo facturas a la vez.
+
+Cada caja es un proceso aparte (como una PC) que espera a las demás y emite
+sus facturas con FacturaController.emitir_factura, una detrás de otra.
+Compara las cajas abriendo el archivo directamente con las cajas en modo
+servidor (app/helpers/servidor_bd.py, escritor único por lotes): facturas
+por segundo, latencia por factura, errores, números repetidos y escrituras
+por lote del servidor. Con la BD en una carpeta compartida por red, el modo
+archivo paga además los bloqueos de SMB en cada transacción.
+
+Uso:
+    python benchmarks/benchmark_servidor.py [num_cajas] [facturas_por_caja]
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from app.database.connection import get_pool
+from app.database.remoto import ClienteServidor, ErrorServidor, configurar_servidor
+from app.helpers.database_migrator import ejecutar_migraciones
+from benchmark_facturacion_masiva import crear_bd
+
+NUM_MEDIDORES = 5000
+
+
+def datos_factura(medidor_id):
+    return {
+        "medidor_id": medidor_id, "nombre_cliente": f"Cliente {medidor_id}", "lectura_id": None,
+        "mes_facturacion": "Marzo", "monto_total": 4.5, "fecha_emision": "2026-03-28", "estado": "Pagado",
+        "servicio": "DOMICILIARIA", "traspaso": 0, "medidor": 0, "reconexion": 0, "multas_sesiones": 0,
+        "otros": 0, "tarifa_basica": 2.5, "tarifa_excedente": 2.0, "direccion": "Centro", "monto_lectura": 0,
+        "conexion_nueva": 0, "multas_mingas": 0, "materiales": 0, "tercera_edad": 0,
+    }
+
+
+def caja(numero, db_path, servidor, facturas, barrera, resultados):
+    """Proceso de una caja: emite sus facturas y devuelve (latencias, errores)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app.controllers.factura_controller import FacturaController
+        configurar_servidor(servidor)
+        controller = FacturaController(db_path)
+        latencias, errores = [], 0
+        barrera.wait()
+        for i in range(facturas):
+            inicio = time.perf_counter()
+            try:
+                factura_id, _ = controller.emitir_factura(datos_factura((numero * facturas + i) % NUM_MEDIDORES + 1))
+            except ErrorServidor:
+                factura_id = None
+            latencias.append(time.perf_counter() - inicio)
+            errores += factura_id is None
+    resultados.put((latencias, errores))
+
+
+def puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def iniciar_servidor(db_path, puerto):
+    """Servidor de BD en un proceso aparte; espera a que responda."""
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "app.helpers.servidor_bd", db_path, f"--puerto={puerto}"],
+        cwd=os.path.dirname(db_path), env=dict(os.environ, PYTHONPATH=RAIZ),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    cliente = ClienteServidor("127.0.0.1", puerto)
+    for _ in range(100):
+        try:
+            cliente.llamar("estado")
+            return proceso, cliente
+        except ErrorServidor:
+            time.sleep(0.1)
+    proceso.kill()
+    raise RuntimeError("El servidor de BD no respondio")
+
+
+def medir(db_path, num_cajas, facturas, servidor=None):
+    """Lanza las cajas a la vez; devuelve (duración, latencias, errores)."""
+    barrera = multiprocessing.Barrier(num_cajas + 1)
+    resultados = multiprocessing.Queue()
+    procesos = [
+        multiprocessing.Process(target=caja, args=(n, db_path, servidor, facturas, barrera, resultados))
+        for n in range(num_cajas)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    medidas = [resultados.get() for _ in procesos]
+    duracion = time.perf_counter() - inicio
+    for proceso in procesos:
+        proceso.join()
+    latencias = sorted(latencia for lista, _ in medidas for latencia in lista)
+    return duracion, latencias, sum(errores for _, errores in medidas)
+
+
+def numeros_repetidos(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT COUNT(*) - COUNT(DISTINCT numero_factura) FROM facturas WHERE numero_factura IS NOT NULL
+        """).fetchone()[0]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    num_cajas = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    facturas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    directorio = tempfile.mkdtemp(prefix="bench_servidor_")
+    try:
+        print(f"{num_cajas} cajas emitiendo {facturas} facturas cada una a la vez")
+        print("=" * 86)
+        print(f"{'Modo':<28}{'Facturas/s':>11}{'p50':>9}{'p95':>9}{'max':>9}{'Errores':>9}{'Repetidos':>11}  Por lote")
+        for modo in ("Archivo directo", "Servidor (escritor unico)"):
+            db_path = os.path.join(directorio, f"bench_{len(modo)}.db")
+            crear_bd(db_path, NUM_MEDIDORES)
+            with contextlib.redirect_stdout(io.StringIO()):
+                ejecutar_migraciones(db_path)
+                get_pool().drain()
+
+            proceso, cliente = None, None
+            if modo.startswith("Servidor"):
+                puerto = puerto_libre()
+                proceso, cliente = iniciar_servidor(db_path, puerto)
+            try:
+                duracion, latencias, errores = medir(
+                    db_path, num_cajas, facturas, f"127.0.0.1:{puerto}" if proceso else None
+                )
+                por_lote = f"{cliente.llamar('estado')['escrituras_por_lote']:.1f}" if cliente else "-"
+            finally:
+                if proceso is not None:
+                    cliente.cerrar()
+                    proceso.terminate()
+                    proceso.wait()
+
+            total = len(latencias)
+            print(f"{modo:<28}{total / duracion:>11.0f}"
+                  f"{statistics.median(latencias) * 1000:>7.1f}ms"
+                  f"{latencias[int(total * 0.95) - 1] * 1000:>7.1f}ms{latencias[-1] * 1000:>7.0f}ms"
+                  f"{errores:>9}{numeros_repetidos(db_path):>11}  {por_lote}")
+        print("=" * 86)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
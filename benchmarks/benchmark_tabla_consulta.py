@@ -0,0 +1,91 @@
+"""
+Benchmark de las tablas de consulta.
+
+Compara el llenado anterior (un QTableWidgetItem por celda, con color y flags)
+con ModeloTablaPerezoso (filas como tuplas, texto y color calculados al
+dibujar, lectura por bloques) para N filas de 8 columnas. Se ejecuta sin
+ventana (QT_QPA_PLATFORM=offscreen).
+
+Uso:
+    python benchmarks/benchmark_tabla_consulta.py [num_filas]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+from app.views.modelo_tabla import ModeloTablaPerezoso
+
+ENCABEZADOS = ["ID", "Cliente ID", "Nombre Cliente", "Lectura ID", "Mes", "Monto Total", "Fecha Emisión", "Estado"]
+COLOR_PAGADO = QColor("#e6ffe6")
+COLOR_DEUDA = QColor("#ffffff")
+
+
+def filas(num_filas):
+    return [
+        (i, i % 5000, f"Cliente {i % 5000}", i, "Enero", 4.5, "2026-01-28", "Pagado" if i % 4 else "Deuda")
+        for i in range(num_filas)
+    ]
+
+
+def llenar_widget(datos):
+    """Llenado anterior: un item por celda."""
+    tabla = QTableWidget()
+    tabla.setColumnCount(len(ENCABEZADOS))
+    tabla.setHorizontalHeaderLabels(ENCABEZADOS)
+    tabla.setRowCount(len(datos))
+    for row, fila in enumerate(datos):
+        color = COLOR_PAGADO if fila[7] == "Pagado" else COLOR_DEUDA
+        for col, dato in enumerate(fila):
+            item = QTableWidgetItem(str(dato))
+            item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
+            item.setBackground(color)
+            tabla.setItem(row, col, item)
+    return tabla
+
+
+def llenar_modelo(datos):
+    """Modelo perezoso: la vista solo pide las celdas visibles."""
+    tabla = QTableView()
+    modelo = ModeloTablaPerezoso(
+        ENCABEZADOS, color_fila=lambda fila: COLOR_PAGADO if fila[7] == "Pagado" else COLOR_DEUDA, parent=tabla
+    )
+    tabla.setModel(modelo)
+    modelo.cargar(iter(datos))
+    return tabla
+
+
+def medir(funcion, datos):
+    """Tiempo hasta que la tabla se muestra y filas que quedaron cargadas en Qt."""
+    inicio = time.perf_counter()
+    tabla = funcion(datos)
+    tabla.resize(900, 500)
+    tabla.show()
+    QApplication.processEvents()
+    duracion = time.perf_counter() - inicio
+    cargadas = tabla.model().rowCount()
+    tabla.close()
+    tabla.deleteLater()
+    QApplication.processEvents()
+    return duracion, cargadas
+
+
+if __name__ == "__main__":
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = QApplication(sys.argv)
+    datos = filas(num_filas)
+
+    t_widget, filas_widget = medir(llenar_widget, datos)
+    t_modelo, filas_modelo = medir(llenar_modelo, datos)
+
+    print(f"Tabla de consulta ({num_filas:,} filas x {len(ENCABEZADOS)} columnas)")
+    print("=" * 60)
+    print(f"QTableWidgetItem por celda:  {t_widget * 1000:9.1f} ms  {filas_widget * len(ENCABEZADOS):>9,} items de Qt")
+    print(f"ModeloTablaPerezoso:         {t_modelo * 1000:9.1f} ms  {filas_modelo:>9,} filas leidas (sin items)")
+    print("=" * 60)
@@ -0,0 +1,66 @@
+"""
+Benchmark del motor de tarifas.
+
+Compara el cálculo factura por factura (Tarifario.calcular) con el cálculo
+vectorizado (Tarifario.calcular_vector) para N consumos.
+
+Uso:
+    python benchmarks/benchmark_tarifas.py [num_consumos]
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from app.helpers.motor_tarifas import obtener_tarifario
+from benchmark_facturacion_masiva import crear_bd
+
+
+if __name__ == "__main__":
+    num_consumos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    directorio = tempfile.mkdtemp(prefix="bench_tarifas_")
+    db_path = os.path.join(directorio, "bench.db")
+    try:
+        crear_bd(db_path, 0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar_migraciones(db_path)
+
+        inicio = time.perf_counter()
+        tarifario = obtener_tarifario(db_path)
+        carga = time.perf_counter() - inicio
+
+        random.seed(1)
+        consumos = [random.randint(0, 150) for _ in range(num_consumos)]
+        servicios = [random.choice(("DOMICILIARIA", "COMERCIAL", "INDUSTRIAL")) for _ in range(num_consumos)]
+        tercera_edad = [random.random() < 0.1 for _ in range(num_consumos)]
+
+        inicio = time.perf_counter()
+        escalar = [tarifario.calcular(c, s, t) for c, s, t in zip(consumos, servicios, tercera_edad)]
+        tiempo_escalar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        basicos, excedentes = tarifario.calcular_vector(consumos, servicios, tercera_edad)
+        tiempo_vector = time.perf_counter() - inicio
+
+        assert all(abs(b - eb) < 1e-9 and abs(e - ee) < 1e-9
+                   for (b, e), eb, ee in zip(escalar[:1000], basicos[:1000], excedentes[:1000]))
+
+        print(f"Motor de tarifas ({num_consumos:,} consumos)")
+        print("=" * 50)
+        print(f"Carga y compilacion:  {carga * 1000:8.2f} ms")
+        print(f"Escalar (calcular):   {tiempo_escalar * 1000:8.2f} ms")
+        print(f"Vectorizado (NumPy):  {tiempo_vector * 1000:8.2f} ms")
+        print("=" * 50)
+    finally:
+        get_pool().drain()
+        shutil.rmtree(directorio, ignore_errors=True)
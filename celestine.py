@@ -0,0 +1,190 @@
+"""
+Celestine sin interfaz gráfica: trabajos por lotes desde la consola.
+
+Usa los servicios de app/services (sin PyQt6), así la facturación del mes,
+la importación de lecturas, los reportes y los respaldos se pueden programar
+como tareas nocturnas o de fin de mes.
+
+Uso:
+    python celestine.py bill-month <mes> [--fecha=AAAA-MM-DD]
+    python celestine.py import-readings <archivo.csv> [--fecha=AAAA-MM-DD]
+    python celestine.py report pagados|deudores|deudas|recaudacion [--mes=Enero] [--anio=AAAA]
+                               [--direccion=...] [--salida=archivo.csv|-]
+    python celestine.py backup [--sin-verificar] [--completo]
+    python celestine.py reprint <id o numero de factura> [--salida=archivo.pdf]
+
+Opciones comunes:
+    --bd=ruta          Base de datos (default: sistema_facturacion.db junto al programa)
+    --usuario=nombre   Usuario que queda en el registro de actividades (default: consola)
+
+Código de salida: 0 si todo terminó bien, 1 si hubo errores, 2 si los
+argumentos no son válidos.
+"""
+
+import contextlib
+import os
+import sys
+from datetime import datetime
+
+ROL_CONSOLA = "Consola"
+
+
+def _uso():
+    print(__doc__.split("Uso:")[1].split("Código de salida")[0].rstrip())
+    return 2
+
+
+def bill_month(db_path, argumentos, opciones, usuario):
+    """Factura el mes para todas las lecturas pendientes."""
+    from app.helpers.facturacion_masiva import MESES
+    from app.helpers.sistema_logs import get_logger
+    from app.services.facturacion import facturar_mes
+
+    mes = argumentos[0].capitalize() if argumentos else None
+    if mes not in MESES:
+        print(f"[ERROR] Mes invalido: {argumentos[0] if argumentos else ''} (opciones: {', '.join(MESES)})")
+        return 2
+
+    def mostrar_progreso(procesadas, total):
+        print(f"  {procesadas}/{total} facturas")
+
+    resumen = facturar_mes(db_path, mes, opciones.get("fecha"), progreso=mostrar_progreso)
+    if resumen["facturadas"]:
+        print(f"Numeros: {resumen['primer_numero']} a {resumen['ultimo_numero']}")
+        print(f"Monto facturado: ${resumen['monto_total']:.2f}  Saldo anterior en deuda: ${resumen['saldo_pendiente']:.2f}")
+        get_logger().registrar_accion(
+            usuario, ROL_CONSOLA, "FACTURACION_MASIVA",
+            f"{mes}: {resumen['facturadas']} facturas "
+            f"({resumen['primer_numero']} a {resumen['ultimo_numero']}) - Monto: ${resumen['monto_total']:.2f}"
+        )
+    if resumen["error"]:
+        print(f"[ERROR] {resumen['error']}")
+        return 1
+    return 0
+
+
+def import_readings(db_path, argumentos, opciones, usuario):
+    """Registra las lecturas de un archivo CSV."""
+    from app.helpers.sistema_logs import get_logger
+    from app.services.lecturas import importar_lecturas
+
+    if not argumentos:
+        return _uso()
+    try:
+        resumen = importar_lecturas(db_path, argumentos[0], opciones.get("fecha"))
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    for linea, mensaje in resumen["errores"]:
+        print(f"  [ERROR] Linea {linea}: {mensaje}" if linea else f"  [ERROR] {mensaje}")
+    if resumen["importadas"]:
+        consumo = sum(lectura[2] for lectura in resumen["lecturas"])
+        get_logger().registrar_accion(
+            usuario, ROL_CONSOLA, "IMPORTAR_LECTURAS",
+            f"{resumen['importadas']} lecturas importadas desde {os.path.basename(argumentos[0])} "
+            f"(Consumo total: {consumo:.0f} m³)"
+        )
+    return 1 if resumen["errores"] else 0
+
+
+def report(db_path, argumentos, opciones, usuario):
+    """Genera un reporte en CSV (o en la consola con --salida=-)."""
+    from app.services.reportes import REPORTES, REPORTES_DIR, escribir_csv, generar_reporte
+
+    tipo = argumentos[0] if argumentos else None
+    if tipo not in REPORTES:
+        print(f"[ERROR] Reporte invalido: {tipo or ''} (opciones: {', '.join(REPORTES)})")
+        return 2
+    mes = opciones.get("mes", "").capitalize() or None
+    try:
+        encabezados, filas = generar_reporte(
+            db_path, tipo, mes, opciones.get("anio"), opciones.get("direccion", "")
+        )
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 2
+
+    salida = opciones.get("salida")
+    if salida == "-":
+        print("\t".join(encabezados))
+        for fila in filas:
+            print("\t".join("" if valor is None else str(valor) for valor in fila))
+        return 0
+
+    if not salida:
+        periodo = mes or opciones.get("anio") or ("todos" if tipo == "deudas" else datetime.now().year)
+        salida = os.path.join(REPORTES_DIR, f"{tipo}_{periodo}_{datetime.now().strftime('%Y%m%d')}.csv")
+    print(f"[OK] {len(filas)} filas en {escribir_csv(salida, encabezados, filas)}")
+    return 0
+
+
+def backup(db_path, argumentos, opciones, usuario):
+    """Guarda una instantánea de la BD y verifica el almacén."""
+    from app.helpers.sistema_logs import get_logger
+    from app.services.respaldos import respaldar
+
+    exito, mensaje = respaldar(db_path, verificar="sin-verificar" not in opciones, completo="completo" in opciones)
+    print(f"[OK] {mensaje}" if exito else f"[ERROR] {mensaje}")
+    get_logger().registrar_accion(usuario, ROL_CONSOLA, "RESPALDO" if exito else "ERROR_RESPALDO", mensaje)
+    return 0 if exito else 1
+
+
+def reprint(db_path, argumentos, opciones, usuario):
+    """Vuelve a generar el PDF de una factura registrada."""
+    from app.helpers.sistema_logs import get_logger
+    from app.services.facturacion import buscar_factura, generar_pdf_factura
+
+    if not argumentos:
+        return _uso()
+    factura = buscar_factura(db_path, argumentos[0])
+    if factura is None:
+        print(f"[ERROR] No existe la factura {argumentos[0]}")
+        return 1
+    exito, mensaje = generar_pdf_factura(factura, opciones.get("salida"))
+    if not exito:
+        print(f"[ERROR] No se pudo generar el PDF: {mensaje}")
+        return 1
+    print(f"[OK] Factura {factura['numero_factura'] or factura['id']} en {mensaje}")
+    get_logger().log_reimprimir_factura(usuario, ROL_CONSOLA, factura["id"], factura["nombre_cliente"])
+    return 0
+
+
+COMANDOS = {
+    "bill-month": bill_month,
+    "import-readings": import_readings,
+    "report": report,
+    "backup": backup,
+    "reprint": reprint,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    argumentos = [a for a in argv if not a.startswith("--")]
+    opciones = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "") for a in argv if a.startswith("--"))
+    if not argumentos or argumentos[0] not in COMANDOS:
+        return _uso()
+
+    from app.helpers.backup_helper import get_db_path
+    from app.helpers.database_migrator import asegurar_esquema
+    from app.helpers.sistema_logs import get_logger
+
+    db_path = opciones.get("bd") or get_db_path()
+    if not os.path.exists(db_path):
+        print(f"[ERROR] No existe la base de datos {db_path}")
+        return 1
+    # Los avisos de la migración van a stderr: --salida=- deja el reporte limpio en stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        migrada = asegurar_esquema(db_path)
+    if not migrada:
+        print(f"[ERROR] No se pudo migrar la base de datos {db_path}")
+        return 1
+    get_logger().usar_bd(db_path)
+
+    comando = argumentos.pop(0)
+    return COMANDOS[comando](db_path, argumentos, opciones, opciones.get("usuario") or "consola")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
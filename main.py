@@ -4,8 +4,7 @@ import os
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QFile, QTextStream
 from app.views.login_window import LoginWindow
-from app.views.main_window import MainWindow
-from app.helpers.database_migrator import ejecutar_migraciones
+from app.helpers.database_migrator import ejecutar_migraciones, migracion_fallida
 
 class App(QApplication):
     def __init__(self, sys_argv):
@@ -19,8 +18,25 @@ class App(QApplication):
         DatabaseConnection.set_db_path(db_path)
         print(f"[INIT] Base de datos establecida en: {db_path}")
 
+        # Modo servidor: las cajas envian sus operaciones al servidor de la BD
+        modo_servidor = self.setup_servidor()
+
         # IMPORTANTE: Ejecutar migraciones de base de datos ANTES de cargar la UI
-        self.run_database_migrations()
+        # (en modo servidor las aplica el servidor: la caja no escribe en el archivo)
+        if modo_servidor:
+            print("[INIT] Modo servidor: el servidor de BD aplica las migraciones")
+        else:
+            self.run_database_migrations()
+
+        # El perfil se aplica despues de migrar: 'reporte' abre la BD en solo lectura
+        perfil = self.get_db_profile()
+        DatabaseConnection.set_perfil(perfil)
+
+        # Auditoria consultable en la BD (en solo lectura o en modo servidor queda
+        # solo el archivo de log de la caja; las facturas las audita el servidor)
+        if perfil != 'reporte' and not modo_servidor:
+            from app.helpers.sistema_logs import get_logger
+            get_logger().usar_bd(db_path)
 
         self.load_stylesheet()
         self.login_window = LoginWindow()
@@ -70,6 +86,18 @@ class App(QApplication):
             print(f"\n[ADVERTENCIA] Error durante las migraciones: {e}")
             print("La aplicacion continuara, pero algunas funciones pueden no estar disponibles.\n")
 
+        # Se avisa una sola vez: los modelos no vuelven a intentar la migracion fallida
+        error = migracion_fallida(db_path)
+        if error:
+            print(f"\n[ADVERTENCIA] {error}")
+            print("La aplicacion continuara, pero algunas funciones pueden no estar disponibles.\n")
+            from PyQt6.QtWidgets import QMessageBox
+            QMessageBox.warning(
+                None, "Migracion de la base de datos",
+                f"No se pudo actualizar la base de datos:\n\n{error}\n\n"
+                "La aplicacion continuara, pero algunas funciones pueden no estar disponibles."
+            )
+
     def get_db_path(self):
         """
         Obtiene la ruta de la base de datos con soporte para multiples fuentes.
@@ -81,8 +109,8 @@ class App(QApplication):
         4. sistema_facturacion.db en la carpeta del ejecutable (default)
         """
         # PRIORIDAD 1: Argumento de linea de comandos
-        if len(sys.argv) > 1:
-            custom_db = sys.argv[1]
+        custom_db, _ = self.parse_cli_args()
+        if custom_db:
             if os.path.exists(custom_db) and custom_db.endswith('.db'):
                 print(f"[INIT] Usando BD desde parametro CLI: {custom_db}")
                 return custom_db
@@ -91,19 +119,13 @@ class App(QApplication):
                 print(f"[WARN] Se usara la BD por defecto")
 
         # PRIORIDAD 2: Archivo de configuracion config.txt
-        if getattr(sys, 'frozen', False):
-            config_file = os.path.join(os.path.dirname(sys.executable), 'config.txt')
-            if os.path.exists(config_file):
-                try:
-                    with open(config_file, 'r', encoding='utf-8') as f:
-                        db_from_config = f.read().strip()
-                        if os.path.exists(db_from_config) and db_from_config.endswith('.db'):
-                            print(f"[INIT] Usando BD desde config.txt: {db_from_config}")
-                            return db_from_config
-                        else:
-                            print(f"[WARN] BD en config.txt no existe: {db_from_config}")
-                except Exception as e:
-                    print(f"[WARN] Error al leer config.txt: {e}")
+        db_from_config = self.read_config().get('bd')
+        if db_from_config:
+            if os.path.exists(db_from_config) and db_from_config.endswith('.db'):
+                print(f"[INIT] Usando BD desde config.txt: {db_from_config}")
+                return db_from_config
+            else:
+                print(f"[WARN] BD en config.txt no existe: {db_from_config}")
 
         # PRIORIDAD 3: Verificar si hay BD para importar (importar_bd.db)
         if getattr(sys, 'frozen', False):
@@ -120,6 +142,119 @@ class App(QApplication):
             return os.path.join(os.path.dirname(sys.executable), 'sistema_facturacion.db')
         return os.path.join(self.base_path, 'sistema_facturacion.db')
     
+    def parse_cli_args(self):
+        """
+        Separa los argumentos de linea de comandos.
+
+        Acepta la ruta de la BD como primer argumento posicional y el perfil
+        de BD como --perfil=NOMBRE o --perfil NOMBRE, en cualquier orden.
+
+        Returns:
+            tuple: (ruta_bd o None, perfil o None)
+        """
+        db_arg = None
+        perfil = None
+        args = sys.argv[1:]
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg.startswith('--perfil='):
+                perfil = arg.split('=', 1)[1]
+            elif arg == '--perfil' and i + 1 < len(args):
+                perfil = args[i + 1]
+                i += 1
+            elif not arg.startswith('-') and db_arg is None:
+                db_arg = arg
+            i += 1
+        return db_arg, perfil
+
+    def read_config(self):
+        """
+        Lee config.txt junto al ejecutable.
+
+        Una linea con la ruta de la BD (formato original) y, opcionalmente,
+        lineas clave=valor: 'bd=...', 'perfil=reporte', 'precargar=si',
+        'servidor=host:puerto' y 'clave=...' (clave del servidor).
+
+        Returns:
+            dict: Claves encontradas ('bd', 'perfil', 'precargar', 'servidor', 'clave')
+        """
+        config = {}
+        if not getattr(sys, 'frozen', False):
+            return config
+
+        config_file = os.path.join(os.path.dirname(sys.executable), 'config.txt')
+        if not os.path.exists(config_file):
+            return config
+
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    linea = linea.strip()
+                    if not linea or linea.startswith('#'):
+                        continue
+                    clave, sep, valor = linea.partition('=')
+                    if sep and clave.strip().lower() in ('bd', 'perfil', 'precargar', 'servidor', 'clave'):
+                        config[clave.strip().lower()] = valor.strip()
+                    elif 'bd' not in config:
+                        config['bd'] = linea
+        except Exception as e:
+            print(f"[WARN] Error al leer config.txt: {e}")
+        return config
+
+    def get_db_profile(self):
+        """
+        Obtiene el perfil de PRAGMA de la BD (caja, importacion, reporte).
+
+        PRIORIDAD: --perfil en linea de comandos, 'perfil=' en config.txt,
+        y por defecto 'caja'.
+        """
+        from app.database.connection import PERFIL_POR_DEFECTO
+        _, perfil = self.parse_cli_args()
+        if perfil:
+            print(f"[INIT] Perfil de BD desde parametro CLI: {perfil}")
+            return perfil
+        perfil = self.read_config().get('perfil')
+        if perfil:
+            print(f"[INIT] Perfil de BD desde config.txt: {perfil}")
+            return perfil
+        return PERFIL_POR_DEFECTO
+
+    def get_precarga(self):
+        """
+        Indica si las páginas del menú se construyen en segundo plano al abrir
+        la ventana principal ('--precargar' o 'precargar=si' en config.txt).
+        Por defecto cada página se construye al abrirla por primera vez.
+        """
+        if '--precargar' in sys.argv[1:]:
+            return True
+        return self.read_config().get('precargar', '').lower() in ('si', 'sí', '1', 'true')
+
+    def setup_servidor(self):
+        """
+        Activa el modo servidor si se indico uno ('--servidor=host:puerto' o
+        'servidor=' en config.txt). Los controladores de Facturas, Lecturas,
+        Servicios y Clientes envian sus operaciones al servidor de la BD
+        (python -m app.helpers.servidor_bd) en lugar de escribir en el archivo.
+
+        Returns:
+            bool: True si se activo el modo servidor
+        """
+        servidor = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--servidor=')), None)
+        config = self.read_config()
+        servidor = servidor or config.get('servidor')
+        if not servidor:
+            return False
+
+        from app.database.remoto import ErrorServidor, configurar_servidor
+        cliente = configurar_servidor(servidor, config.get('clave'))
+        try:
+            estado = cliente.llamar("estado")
+            print(f"[INIT] Modo servidor: {servidor} (BD {estado['bd']})")
+        except ErrorServidor as e:
+            print(f"[WARN] Modo servidor: {e}. Se reintentara en cada operacion")
+        return True
+
     def get_resource_path(self, relative_path):
         """Obtiene la ruta absoluta para cualquier recurso"""
         return os.path.join(self.base_path, relative_path)
@@ -127,7 +262,9 @@ class App(QApplication):
     def on_login_successful(self, user_data):
         self.login_window.close()
         db_path = self.get_db_path()
-        self.main_window = MainWindow(user_data, db_path)
+        # Las vistas del menú se importan después del login
+        from app.views.main_window import MainWindow
+        self.main_window = MainWindow(user_data, db_path, precargar=self.get_precarga())
         self.main_window.show()
 
     def load_stylesheet(self):
@@ -0,0 +1,32 @@
+"""
+Varias cajas escribiendo a la vez con un proceso que retiene el bloqueo de
+escritura (ver benchmarks/benchmark_escrituras_concurrentes.py): con
+ejecutar_escritura ninguna escritura debe fallar ni perderse.
+"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from app.database import connection
+from benchmark_escrituras_concurrentes import medir, preparar_bd, resumir
+
+NUM_CAJAS = 8
+SEGUNDOS = 5
+
+
+def test_escrituras_con_bloqueo_sin_perdidas(tmp_path):
+    db_path = str(tmp_path / "cajas.db")
+    preparar_bd(db_path)
+
+    r = resumir(db_path, medir(db_path, NUM_CAJAS, SEGUNDOS, connection.PLAZO_REINTENTOS))
+
+    assert r["escritas"] > 0
+    assert r["fallidas"] == 0, r
+    assert r["perdidas"] == 0, r
+    assert r["repetidos"] == 0, r
+    # El bloqueador retuvo el bloqueo más que el busy_timeout: hubo que reintentar
+    assert r["reintentos"] > 0, r
@@ -0,0 +1,115 @@
+"""
+Numeración de facturas (app/helpers/secuencia_facturacion.py y migración 5):
+los números de las facturas eliminadas vuelven como huecos y se reutilizan
+antes de avanzar el contador, sin repetir números.
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from app.database.connection import get_pool
+from app.helpers.database_migrator import ejecutar_migraciones
+from app.helpers.secuencia_facturacion import SecuenciaFacturacion
+from benchmark_facturacion_masiva import crear_bd
+
+SERIE = "001-010"
+
+
+@pytest.fixture
+def secuencia(tmp_path):
+    db_path = str(tmp_path / "numeracion.db")
+    crear_bd(db_path, 0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ejecutar_migraciones(db_path)
+        yield SecuenciaFacturacion(db_path)
+        get_pool().drain()
+
+
+def emitir(secuencia, cantidad):
+    """Reserva e inserta 'cantidad' facturas, una transacción cada una."""
+    emitidos = []
+    for _ in range(cantidad):
+        with get_pool().transaction(secuencia.db_path, immediate=True) as conn:
+            cursor = conn.cursor()
+            secuencial = secuencia.reservar_secuencial(cursor)
+            insertar(cursor, secuencia, secuencial)
+        emitidos.append(secuencial)
+    return emitidos
+
+
+def insertar(cursor, secuencia, secuencial):
+    cursor.execute(
+        "INSERT INTO facturas (medidor_id, serie, secuencial, numero_factura) VALUES (1, ?, ?, ?)",
+        (SERIE, secuencial, secuencia.formatear_numero_factura(secuencial))
+    )
+
+
+def eliminar(secuencia, *secuenciales):
+    with get_pool().transaction(secuencia.db_path) as conn:
+        conn.executemany(
+            "DELETE FROM facturas WHERE serie = ? AND secuencial = ?",
+            [(SERIE, secuencial) for secuencial in secuenciales]
+        )
+
+
+def huecos(secuencia):
+    with get_pool().connection(secuencia.db_path) as conn:
+        return [fila[0] for fila in conn.execute(
+            "SELECT secuencial FROM huecos_facturacion WHERE serie = ? ORDER BY secuencial", (SERIE,)
+        )]
+
+
+def test_eliminar_factura_deja_hueco_que_se_reutiliza(secuencia):
+    assert emitir(secuencia, 5) == [1, 2, 3, 4, 5]
+
+    eliminar(secuencia, 4, 2)
+    assert huecos(secuencia) == [2, 4]
+
+    # Primero los huecos, del menor al mayor, y después el contador
+    assert emitir(secuencia, 3) == [2, 4, 6]
+    assert huecos(secuencia) == []
+    assert secuencia.obtener_secuencial_actual() == 6
+
+
+def test_reservar_bloque_sin_repetidos(secuencia):
+    emitir(secuencia, 10)
+    eliminar(secuencia, 7, 3)
+
+    with get_pool().transaction(secuencia.db_path, immediate=True) as conn:
+        cursor = conn.cursor()
+        bloque = secuencia.reservar_bloque(cursor, 5)
+        for secuencial in bloque:
+            insertar(cursor, secuencia, secuencial)
+
+    assert bloque == [3, 7, 11, 12, 13]
+    assert huecos(secuencia) == []
+    assert secuencia.obtener_secuencial_actual() == 13
+    with get_pool().connection(secuencia.db_path) as conn:
+        emitidos = [fila[0] for fila in conn.execute("SELECT secuencial FROM facturas WHERE serie = ?", (SERIE,))]
+    assert sorted(emitidos) == list(range(1, 14))
+
+
+def test_liberar_numero_no_usado(secuencia):
+    numero = secuencia.obtener_siguiente_numero()
+    assert numero == f"{SERIE}-0000000001"
+
+    assert secuencia.liberar_numero(numero)
+    assert huecos(secuencia) == [1]
+    assert secuencia.obtener_siguiente_numero() == numero
+
+
+def test_indice_unico_rechaza_numero_repetido(secuencia):
+    emitir(secuencia, 1)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with get_pool().transaction(secuencia.db_path) as conn:
+            insertar(conn.cursor(), secuencia, 1)